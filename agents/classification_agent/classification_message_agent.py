@@ -1,6 +1,10 @@
-from openai import OpenAI
+from openai import OpenAI, AsyncOpenAI
+from typing import List
+from core.settings import CLASSIFICATION_MODEL
+import json
 
 client = OpenAI()
+async_client = AsyncOpenAI()
 
 CLASSIFICATION_CATEGORIES = [
     "Sapa", "Informasi Umum", "Produk Asuransi Oto", "Produk Asuransi Asri",
@@ -22,4 +26,43 @@ def classify_chat_agent(response_text: str) -> str:
         model="gpt-4o",
         messages=[{"role": "user", "content": prompt}]
     )
-    return completion.choices[0].message.content.strip().lower()
\ No newline at end of file
+    return completion.choices[0].message.content.strip().lower()
+
+async def classify_chat_batch(response_texts: List[str]) -> List[str]:
+    """
+    Klasifikasikan banyak pesan dalam satu panggilan LLM.
+    Hasil berurutan sesuai input, kategori di luar daftar dianggap 'others'.
+    """
+    if not response_texts:
+        return []
+
+    numbered_messages = "\n".join(
+        f"{i}. {json.dumps(text, ensure_ascii=False)}" for i, text in enumerate(response_texts)
+    )
+    prompt = f"""
+    Kategorikan setiap pesan berikut ke salah satu kategori berikut:
+    {', '.join(CLASSIFICATION_CATEGORIES)}
+
+    Pesan:
+    {numbered_messages}
+
+    Jawab dalam JSON dengan format {{"categories": ["<kategori pesan 0>", "<kategori pesan 1>", ...]}},
+    satu kategori per pesan dengan urutan yang sama.
+    """
+    completion = await async_client.chat.completions.create(
+        model=CLASSIFICATION_MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format={"type": "json_object"}
+    )
+
+    valid_categories = {category.lower() for category in CLASSIFICATION_CATEGORIES}
+    try:
+        categories = json.loads(completion.choices[0].message.content).get("categories", [])
+    except (json.JSONDecodeError, AttributeError):
+        categories = []
+
+    results = []
+    for i in range(len(response_texts)):
+        category = str(categories[i]).strip().lower() if i < len(categories) else ""
+        results.append(category if category in valid_categories else "others")
+    return results
@@ -0,0 +1,91 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict
+from core.settings import AGENT_POOL_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CustomerServiceAgentTemplate:
+    """
+    Komponen agent per client yang mahal untuk dibangun (prompt + knowledge base).
+    Agent per sesi dibuat ringan dari template ini di setiap pesan.
+    """
+    name_agent: str
+    description_agent: str
+    instructions: str
+    goal: str
+    expected_output: str
+    knowledge: Any
+    built_at: float
+
+class CustomerServiceAgentPool:
+    """
+    Pool template agent per client_id yang berumur panjang di dalam proses.
+
+    Template dibangun sekali per client dan dipakai ulang sampai di-invalidate
+    (prompt / knowledge base berubah) atau melewati ttl_seconds, supaya worker lain
+    yang tidak menerima invalidasi tetap mendapatkan data terbaru.
+    """
+    def __init__(self, ttl_seconds: int = 300):
+        self.ttl_seconds = ttl_seconds
+        self._templates: Dict[str, CustomerServiceAgentTemplate] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        # Dinaikkan setiap invalidate, supaya build yang dimulai sebelum invalidasi tidak disimpan
+        self._generations: Dict[str, int] = {}
+        self._guard = threading.Lock()
+
+    def _get_lock(self, key: str) -> threading.Lock:
+        with self._guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _generation(self, key: str) -> int:
+        with self._guard:
+            return self._generations.setdefault(key, 0)
+
+    def _is_fresh(self, template: CustomerServiceAgentTemplate) -> bool:
+        return self.ttl_seconds <= 0 or (time.monotonic() - template.built_at) < self.ttl_seconds
+
+    def get(self, client_id, builder: Callable[[Any], CustomerServiceAgentTemplate]) -> CustomerServiceAgentTemplate:
+        key = str(client_id)
+
+        template = self._templates.get(key)
+        if template and self._is_fresh(template):
+            return template
+
+        # Satu build per client dalam satu waktu, request lain menunggu hasilnya
+        with self._get_lock(key):
+            template = self._templates.get(key)
+            if template and self._is_fresh(template):
+                return template
+
+            logger.info(f"[AGENT_POOL] Building customer service agent template for client_id={key}")
+            generation = self._generation(key)
+            start = time.monotonic()
+            template = builder(client_id)
+            with self._guard:
+                if self._generations.get(key) == generation:
+                    self._templates[key] = template
+                else:
+                    # Prompt / knowledge berubah selama build: template ini dipakai sekali, request berikutnya build ulang
+                    logger.info(f"[AGENT_POOL] Template for client_id={key} was invalidated during build, not cached")
+            logger.info(f"[AGENT_POOL] Template for client_id={key} built in {time.monotonic() - start:.2f}s")
+            return template
+
+    def invalidate(self, client_id) -> None:
+        key = str(client_id)
+        with self._guard:
+            self._generations[key] = self._generations.get(key, 0) + 1
+            template = self._templates.pop(key, None)
+        if template is not None:
+            logger.info(f"[AGENT_POOL] Invalidated customer service agent template for client_id={key}")
+
+    def clear(self) -> None:
+        with self._guard:
+            for key in self._generations:
+                self._generations[key] += 1
+            self._templates.clear()
+
+customer_service_agent_pool = CustomerServiceAgentPool(ttl_seconds=AGENT_POOL_TTL_SECONDS)
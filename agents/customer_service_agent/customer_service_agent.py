@@ -10,33 +10,49 @@ from core.settings import (TELEGRAM_BOT_TOKEN,
 from agents.customer_service_agent.prompt import get_customer_service_prompt_fields
 from agno.embedder.openai import OpenAIEmbedder
 from agno.models.openai import OpenAIChat
-from agents.tools.knowledge_base_tools import get_all_urls_from_db, create_combined_knowledge_base
+from agents.tools.knowledge_base_tools import create_combined_knowledge_base
 from agents.tools.insert_customer_feedback import insert_customer_feedback
+from agents.customer_service_agent.agent_pool import customer_service_agent_pool, CustomerServiceAgentTemplate
+import time
 
 storage = PostgresStorage(table_name=SESSION_TABLE_NAME, db_url=URL_DB_POSTGRES)
 storage.upgrade_schema()
 
-def call_customer_service_agent(agent_id, session_id, user_id, client_id):
+def _build_customer_service_template(client_id) -> CustomerServiceAgentTemplate:
     name_agent, description_agent, instructions, goal, expected_output = get_customer_service_prompt_fields(client_id)
     
-    urls = get_all_urls_from_db(client_id)
+    # Hanya untuk pencarian; isi vector DB dikelola EmbeddingWorker secara inkremental
+    knowledge_base = create_combined_knowledge_base(client_id)
     
-    knowledge_base = create_combined_knowledge_base(client_id, urls)
+    return CustomerServiceAgentTemplate(
+        name_agent=name_agent,
+        description_agent=description_agent,
+        instructions=instructions,
+        goal=goal,
+        expected_output=expected_output,
+        knowledge=knowledge_base,
+        built_at=time.monotonic(),
+    )
+
+def call_customer_service_agent(agent_id, session_id, user_id, client_id):
+    template = customer_service_agent_pool.get(client_id, _build_customer_service_template)
     
+    # Agent dibuat baru per pesan (murah) supaya state sesi tidak bercampur,
+    # prompt dan knowledge base diambil dari pool per client
     agent = Agent(
-        name=name_agent,
-        description=description_agent,
-        goal=goal,
+        name=template.name_agent,
+        description=template.description_agent,
+        goal=template.goal,
         model=OpenAIChat(id='gpt-5', reasoning_effort='medium', api_key=OPENAI_API_KEY),
         agent_id=agent_id,
         session_id=f"session_{str(session_id)}",
         user_id=f"user_{str(user_id)}",
-        knowledge=knowledge_base,
+        knowledge=template.knowledge,
         search_knowledge=True,
         tools=[insert_customer_feedback, TelegramTools(token=TELEGRAM_BOT_TOKEN, chat_id=TELEGRAM_CHAT_ID)],
         show_tool_calls=True,
-        instructions=instructions,
-        expected_output=expected_output,
+        instructions=template.instructions,
+        expected_output=template.expected_output,
         storage=storage,
         add_history_to_messages=True,
         num_history_runs=3,
@@ -46,6 +62,4 @@ def call_customer_service_agent(agent_id, session_id, user_id, client_id):
         monitoring=True,
     )
     
-    agent.knowledge.load(recreate=False)
-    
-    return agent
\ No newline at end of file
+    return agent
@@ -12,7 +12,7 @@ def get_customer_service_prompt_fields(client_id):
         prompt_service = PromptService(db)
         prompts = prompt_service.fetch_customer_service_prompt(client_id)
         if not prompts:
-            return "", "", "", ""
+            return "", "", "", "", ""
         prompt = prompts[0]
         return (
             prompt.name_agent or "Default Agent",
@@ -0,0 +1,136 @@
+"""
+Cache embedding query untuk pencarian knowledge base.
+
+Pertanyaan customer sangat berulang ("cara klaim", "premi asuransi oto"), jadi
+embedding query disimpan:
+
+- L1: LRU in-process dengan TTL (EMBEDDING_CACHE_LOCAL_SIZE entri).
+- L2: Redis, dibagi antar worker/pod, vektor disimpan biner float32/float16
+  (EMBEDDING_CACHE_DTYPE) dengan TTL EMBEDDING_CACHE_TTL_SECONDS.
+
+Key = model embedder + dimensi + hash teks yang dinormalisasi, jadi query yang
+hanya beda kapitalisasi/spasi/tanda baca di ujung memakai embedding yang sama.
+Hanya dipakai untuk query; embedding dokumen saat ingest tetap lewat embedder asli.
+"""
+import hashlib
+import logging
+import re
+import threading
+import unicodedata
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from cachetools import TTLCache
+from prometheus_client import Counter
+from agno.embedder.base import Embedder
+from core.settings import (
+    EMBEDDING_CACHE_ENABLED,
+    EMBEDDING_CACHE_TTL_SECONDS,
+    EMBEDDING_CACHE_LOCAL_SIZE,
+    EMBEDDING_CACHE_LOCAL_TTL_SECONDS,
+    EMBEDDING_CACHE_DTYPE
+)
+from api.websocket.redis_client import sync_redis_binary_client
+
+logger = logging.getLogger(__name__)
+
+embedding_cache_requests_total = Counter(
+    "embedding_cache_requests_total",
+    "Query embedding lookups by the layer that answered them (l1, l2, miss)",
+    ["source"]
+)
+
+KEY_PREFIX = "emb:query"
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = " \t\n?!.,;:\"'"
+
+def normalize_query(text: str) -> str:
+    text = unicodedata.normalize("NFKC", text).lower()
+    return _WHITESPACE.sub(" ", text).strip(_EDGE_PUNCTUATION)
+
+class EmbeddingCache:
+    def __init__(self, redis, ttl_seconds: int, local_size: int, local_ttl_seconds: int, dtype: str):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.dtype = np.float16 if dtype == "float16" else np.float32
+        self._local: TTLCache = TTLCache(maxsize=local_size, ttl=local_ttl_seconds)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_id: str, text: str) -> str:
+        digest = hashlib.sha256(normalize_query(text).encode("utf-8")).hexdigest()
+        return f"{KEY_PREFIX}:{model_id}:{digest}"
+
+    def get(self, key: str) -> Optional[List[float]]:
+        with self._lock:
+            vector = self._local.get(key)
+        if vector is not None:
+            embedding_cache_requests_total.labels(source="l1").inc()
+            return vector.astype(np.float32).tolist()
+
+        try:
+            raw = self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"[EMBEDDING_CACHE] Redis get failed: {e}")
+            raw = None
+        if raw is None:
+            embedding_cache_requests_total.labels(source="miss").inc()
+            return None
+
+        vector = np.frombuffer(raw, dtype=self.dtype)
+        with self._lock:
+            self._local[key] = vector
+        embedding_cache_requests_total.labels(source="l2").inc()
+        return vector.astype(np.float32).tolist()
+
+    def set(self, key: str, embedding: List[float]):
+        vector = np.asarray(embedding, dtype=self.dtype)
+        with self._lock:
+            self._local[key] = vector
+        try:
+            self.redis.set(key, vector.tobytes(), ex=self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"[EMBEDDING_CACHE] Redis set failed: {e}")
+
+embedding_cache = EmbeddingCache(
+    redis=sync_redis_binary_client,
+    ttl_seconds=EMBEDDING_CACHE_TTL_SECONDS,
+    local_size=EMBEDDING_CACHE_LOCAL_SIZE,
+    local_ttl_seconds=EMBEDDING_CACHE_LOCAL_TTL_SECONDS,
+    dtype=EMBEDDING_CACHE_DTYPE,
+)
+
+class CachedQueryEmbedder(Embedder):
+    """
+    Membungkus embedder (OpenAIEmbedder) untuk PgVector yang dipakai agent:
+    get_embedding() query yang sama tidak lagi memanggil API embedding.
+    """
+    def __init__(self, embedder: Embedder, cache: EmbeddingCache = embedding_cache):
+        super().__init__(dimensions=embedder.dimensions)
+        self.embedder = embedder
+        self.cache = cache
+        self.id = getattr(embedder, "id", type(embedder).__name__)
+        self.model_id = f"{self.id}:{embedder.dimensions}:{np.dtype(cache.dtype).name}"
+
+    def get_embedding(self, text: str) -> List[float]:
+        key = self.cache.key(self.model_id, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        embedding = self.embedder.get_embedding(text)
+        if embedding:
+            self.cache.set(key, embedding)
+        return embedding
+
+    def get_embedding_and_usage(self, text: str) -> Tuple[List[float], Optional[Dict]]:
+        key = self.cache.key(self.model_id, text)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached, None
+        embedding, usage = self.embedder.get_embedding_and_usage(text)
+        if embedding:
+            self.cache.set(key, embedding)
+        return embedding, usage
+
+def query_embedder(embedder: Embedder) -> Embedder:
+    return CachedQueryEmbedder(embedder) if EMBEDDING_CACHE_ENABLED else embedder
@@ -0,0 +1,116 @@
+"""
+PgVector dengan hybrid search yang bisa memakai index.
+
+Hybrid search bawaan agno mengurutkan seluruh tabel berdasarkan skor gabungan
+(vektor + ts_rank), jadi index HNSW/IVFFlat tidak pernah terpakai dan latensi
+naik linear dengan jumlah chunk. Di sini kandidat diambil dulu dari dua jalur
+yang masing-masing memakai index:
+
+- `candidates` tetangga terdekat lewat ORDER BY embedding <=> query (HNSW/IVFFlat);
+- `candidates` baris teratas yang cocok dengan tsquery (GIN to_tsvector).
+
+Skor gabungan agno lalu dihitung hanya untuk gabungan kandidat tersebut.
+ef_search/probes diset per transaksi dari VectorIndexManager.
+"""
+import logging
+import re
+from typing import Any, Dict, List, Optional
+from sqlalchemy import bindparam, desc, literal_column, select, text, union
+from sqlalchemy.sql import func
+from agno.document.base import Document
+from agno.vectordb.distance import Distance
+from agno.vectordb.pgvector import PgVector
+
+logger = logging.getLogger(__name__)
+
+_LANGUAGE = re.compile(r"^[a-z_]+$")
+
+class IndexedPgVector(PgVector):
+    def __init__(self, *args, ef_search: Optional[int] = None, probes: Optional[int] = None,
+                 candidates: int = 40, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.ef_search = ef_search
+        self.probes = probes
+        self.candidates = candidates
+
+    def _can_use_candidates(self, filters: Optional[Dict[str, Any]]) -> bool:
+        # Filter metadata dengan index ANN bisa membuang semua kandidat; biarkan agno scan penuh
+        return (
+            not filters
+            and self.distance == Distance.cosine
+            and not getattr(self, "prefix_match", False)
+            and bool(_LANGUAGE.match(self.content_language))
+        )
+
+    def hybrid_search(self, query: str, limit: int = 5, filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        if not self._can_use_candidates(filters):
+            return super().hybrid_search(query=query, limit=limit, filters=filters)
+
+        query_embedding = self.embedder.get_embedding(query)
+        if query_embedding is None:
+            logger.error(f"[INDEXED_PGVECTOR] Error getting embedding for query: {query}")
+            return []
+
+        table = self.table
+        candidates = max(self.candidates, limit)
+        distance = table.c.embedding.cosine_distance(query_embedding)
+        # Ekspresi sama persis dengan index GIN: to_tsvector('<bahasa>'::regconfig, content)
+        language = literal_column(f"'{self.content_language}'::regconfig")
+        ts_vector = func.to_tsvector(language, table.c.content)
+        ts_query = func.websearch_to_tsquery(language, bindparam("query", value=query))
+        text_rank = func.ts_rank_cd(ts_vector, ts_query)
+
+        nearest = select(table.c.id).order_by(distance).limit(candidates).subquery()
+        matching = (
+            select(table.c.id)
+            .where(ts_vector.op("@@")(ts_query))
+            .order_by(desc(text_rank))
+            .limit(candidates)
+            .subquery()
+        )
+        candidate_ids = union(select(nearest.c.id), select(matching.c.id)).subquery()
+
+        weight = getattr(self, "vector_score_weight", 0.5)
+        # Rumus skor sama dengan hybrid_search agno, supaya urutan hasil tidak berubah
+        hybrid_score = (weight * (1 / (1 + distance)) + (1 - weight) * text_rank).label("hybrid_score")
+        stmt = (
+            select(
+                table.c.id,
+                table.c.name,
+                table.c.meta_data,
+                table.c.content,
+                table.c.embedding,
+                table.c.usage,
+                hybrid_score,
+            )
+            .where(table.c.id.in_(select(candidate_ids.c.id)))
+            .order_by(desc("hybrid_score"))
+            .limit(limit)
+        )
+
+        try:
+            with self.Session() as sess, sess.begin():
+                if self.ef_search:
+                    sess.execute(text(f"SET LOCAL hnsw.ef_search = {int(self.ef_search)}"))
+                if self.probes:
+                    sess.execute(text(f"SET LOCAL ivfflat.probes = {int(self.probes)}"))
+                results = sess.execute(stmt).fetchall()
+        except Exception as e:
+            logger.error(f"[INDEXED_PGVECTOR] Hybrid search gagal, fallback ke scan penuh: {e}")
+            return super().hybrid_search(query=query, limit=limit, filters=filters)
+
+        documents = [
+            Document(
+                id=result.id,
+                name=result.name,
+                meta_data=result.meta_data,
+                content=result.content,
+                embedder=self.embedder,
+                embedding=result.embedding,
+                usage=result.usage,
+            )
+            for result in results
+        ]
+        if getattr(self, "reranker", None):
+            documents = self.reranker.rerank(query=query, documents=documents)
+        return documents
@@ -1,4 +1,5 @@
 from agno.vectordb.pgvector import PgVector, SearchType
+from agno.embedder.base import Embedder
 from agno.embedder.openai import OpenAIEmbedder
 from agno.knowledge.pdf import PDFKnowledgeBase
 from agno.knowledge.json import JSONKnowledgeBase
@@ -15,6 +16,12 @@ from core.settings import (
     COMBINED_KNOWLEDGE_TABLE_NAME
 )
 from agno.document.chunking.agentic import AgenticChunking
+from agno.document.chunking.strategy import ChunkingStrategy
+from agents.tools.structured_chunking import StructuredChunking
+from agents.tools.embedding_cache import query_embedder
+from agents.tools.indexed_pgvector import IndexedPgVector
+from database.models.knowledge_base_config_model import KnowledgeBaseConfigModel
+from services.vector_index_service import VectorIndexManager, SearchParams
 
 # def knowledge_base_json ():
 #     json_knowledge_base = JSONKnowledgeBase(
@@ -74,7 +81,31 @@ def get_safe_subdomain(client_id: str) -> str:
     finally:
         db.close()
 
-def create_website_knowledge_base(client_name, urls: List[str]) -> WebsiteKnowledgeBase:
+def create_chunking_strategy(client_id) -> ChunkingStrategy:
+    """
+    Chunker sesuai ms_knowledge_base_config tenant. Default StructuredChunking
+    (lokal, deterministik); "agentic" tetap tersedia untuk tenant yang memilihnya.
+    """
+    db = next(config_db())
+    try:
+        config = (
+            db.query(KnowledgeBaseConfigModel)
+            .filter(KnowledgeBaseConfigModel.client_id == client_id)
+            .first()
+        )
+    finally:
+        db.close()
+
+    if config is None:
+        return StructuredChunking()
+    if config.chunking_strategy == "agentic":
+        return AgenticChunking()
+    return StructuredChunking(chunk_size=config.chunk_size, overlap=config.overlap)
+
+def chunking_profile(chunking_strategy: ChunkingStrategy) -> str:
+    return getattr(chunking_strategy, "profile", None) or type(chunking_strategy).__name__
+
+def create_website_knowledge_base(client_name, urls: List[str], chunking_strategy: Optional[ChunkingStrategy] = None) -> WebsiteKnowledgeBase:
     return WebsiteKnowledgeBase(
         urls=urls,
         max_links=5,
@@ -84,10 +115,10 @@ def create_website_knowledge_base(client_name, urls: List[str]) -> WebsiteKnowle
             search_type=SearchType.hybrid,
             embedder=OpenAIEmbedder()
         ),
-        chunking_strategy=AgenticChunking(),
+        chunking_strategy=chunking_strategy or StructuredChunking(),
     )
 
-def create_pdf_knowledge_base(client_name: str):
+def create_pdf_knowledge_base(client_name: str, chunking_strategy: Optional[ChunkingStrategy] = None):
     
     knowledge_base_pdf = PDFKnowledgeBase(
         path=f"resources/pdf_from_postgres/{client_name}",
@@ -98,7 +129,7 @@ def create_pdf_knowledge_base(client_name: str):
             embedder=OpenAIEmbedder()
         ),
         num_documents=3,
-        chunking_strategy=AgenticChunking(),
+        chunking_strategy=chunking_strategy or StructuredChunking(),
     )
 
     return knowledge_base_pdf
@@ -109,21 +140,39 @@ def create_combined_knowledge_base(client_id: str, urls: Optional[List[str]] = N
         urls = []
         
     name_subdomain = get_safe_subdomain(client_id)
+    chunking_strategy = create_chunking_strategy(client_id)
     
-    dynamic_table_name = COMBINED_KNOWLEDGE_TABLE_NAME + f"_{name_subdomain}"
-    
-    website_kb = create_website_knowledge_base(name_subdomain, urls)
-    pdf_kb = create_pdf_knowledge_base(name_subdomain)
+    website_kb = create_website_knowledge_base(name_subdomain, urls, chunking_strategy)
+    pdf_kb = create_pdf_knowledge_base(name_subdomain, chunking_strategy)
+    search_params = get_search_params(client_id, COMBINED_KNOWLEDGE_TABLE_NAME + f"_{name_subdomain}")
     
     return CombinedKnowledgeBase(
         sources=[pdf_kb, website_kb],
-        vector_db=PgVector(
-            table_name=dynamic_table_name,
-            db_url=URL_DB_POSTGRES,
-            search_type=SearchType.hybrid,
-            embedder=OpenAIEmbedder()
-        ),
-        chunking_strategy=AgenticChunking(),
+        # Dipakai agent untuk search_knowledge: embedding query di-cache
+        vector_db=create_combined_vector_db(name_subdomain, embedder=query_embedder(OpenAIEmbedder()), search_params=search_params),
+        chunking_strategy=chunking_strategy,
+    )
+
+def get_search_params(client_id, table_name: str) -> SearchParams:
+    """ef_search/probes sesuai index yang dibangun VectorIndexManager dan setting recall client."""
+    db = next(config_db())
+    try:
+        return VectorIndexManager(db).search_params(client_id, table_name)
+    finally:
+        db.close()
+
+def create_combined_vector_db(name_subdomain: str, embedder: Optional[Embedder] = None,
+                              search_params: Optional[SearchParams] = None) -> PgVector:
+    """Vector DB gabungan per client; dipakai agent untuk pencarian dan worker embedding untuk upsert."""
+    search_params = search_params or SearchParams()
+    return IndexedPgVector(
+        table_name=COMBINED_KNOWLEDGE_TABLE_NAME + f"_{name_subdomain}",
+        db_url=URL_DB_POSTGRES,
+        search_type=SearchType.hybrid,
+        embedder=embedder or OpenAIEmbedder(),
+        ef_search=search_params.ef_search,
+        probes=search_params.probes,
+        candidates=search_params.candidates
     )
 
 
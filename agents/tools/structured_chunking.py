@@ -0,0 +1,243 @@
+"""
+Chunker lokal yang deterministik, pengganti AgenticChunking (satu panggilan LLM
+per batas chunk).
+
+Teks dipecah menjadi blok heading, paragraf, dan tabel, lalu blok-blok itu
+digabung sampai `chunk_size` token (tokenizer embedding OpenAI). Heading baru
+memulai chunk baru (kecuali section pendek yang masih muat digabung ke chunk
+sebelumnya) dan judul section disertakan di awal setiap chunk-nya. Blok
+yang terlalu besar dipecah di batas kalimat (paragraf) atau baris (tabel, header
+diulang). `overlap` token terakhir dari chunk sebelumnya (kalimat utuh) diulang
+di awal chunk berikutnya dalam section yang sama.
+
+Input yang sama selalu menghasilkan chunk yang sama, sehingga hash chunk di
+ai.dt_knowledge_manifest stabil antar re-index.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from typing import List, Optional
+from agno.document.base import Document
+from agno.document.chunking.strategy import ChunkingStrategy
+
+logger = logging.getLogger(__name__)
+
+# Batas input model embedding OpenAI
+MAX_CHUNK_TOKENS = 8191
+
+_HEADING_MD = re.compile(r"^#{1,6}\s+\S")
+_HEADING_NUMBERED = re.compile(r"^(\d+(\.\d+)*\.?|[IVX]+\.|BAB\s+\w+|Pasal\s+\d+)\s+\S", re.IGNORECASE)
+_TABLE_ROW = re.compile(r"^\s*\|.*\|\s*$|\t.*\t")
+_SENTENCE_END = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"\S+\s*")
+
+class _Tokenizer:
+    """Hitung token dengan tiktoken; tanpa tiktoken dipakai perkiraan ~4 karakter per token."""
+    def __init__(self, encoding_name: str = "cl100k_base"):
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding_name)
+        except ImportError:
+            logger.warning("[CHUNKING] tiktoken tidak terpasang, ukuran chunk memakai perkiraan karakter")
+            self._encoding = None
+
+    def count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return max(1, (len(text) + 3) // 4) if text else 0
+
+    def split(self, text: str, max_tokens: int) -> List[str]:
+        """Potong teks panjang tanpa batas kalimat: per kata, atau per token jika satu kata pun terlalu panjang."""
+        pieces, current = [], ""
+        for word in _WORD.findall(text):
+            if current and self.count(current + word) > max_tokens:
+                pieces.append(current)
+                current = ""
+            if self.count(word) > max_tokens:
+                pieces.extend(self._split_tokens(word, max_tokens))
+                continue
+            current += word
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def _split_tokens(self, text: str, max_tokens: int) -> List[str]:
+        if self._encoding is None:
+            step = max_tokens * 4
+            return [text[i:i + step] for i in range(0, len(text), step)]
+        tokens = self._encoding.encode(text, disallowed_special=())
+        return [self._encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+_tokenizer: Optional[_Tokenizer] = None
+
+def get_tokenizer() -> _Tokenizer:
+    global _tokenizer
+    if _tokenizer is None:
+        _tokenizer = _Tokenizer()
+    return _tokenizer
+
+@dataclass
+class _Block:
+    kind: str  # heading | paragraph | table
+    text: str
+
+def _is_heading(line: str, next_line: str) -> bool:
+    stripped = line.strip()
+    if _HEADING_MD.match(stripped):
+        return True
+    if len(stripped) > 80 or stripped.endswith((".", ",", ";", ":")):
+        return False
+    # Teks hasil ekstraksi PDF tidak punya markup: judul bernomor atau huruf kapital
+    # semua yang berdiri sendiri sebelum paragraf dianggap heading
+    if _HEADING_NUMBERED.match(stripped) and len(stripped.split()) <= 12:
+        return True
+    letters = [c for c in stripped if c.isalpha()]
+    return len(letters) >= 3 and all(c.isupper() for c in letters) and not next_line.strip().isupper()
+
+def split_blocks(text: str) -> List[_Block]:
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    blocks: List[_Block] = []
+    paragraph: List[str] = []
+    table: List[str] = []
+
+    def flush():
+        if paragraph:
+            blocks.append(_Block("paragraph", " ".join(part.strip() for part in paragraph)))
+            paragraph.clear()
+        if table:
+            blocks.append(_Block("table", "\n".join(table)))
+            table.clear()
+
+    for i, line in enumerate(lines):
+        if not line.strip():
+            flush()
+            continue
+        if _TABLE_ROW.search(line):
+            if paragraph:
+                flush()
+            table.append(line.rstrip())
+            continue
+        if table:
+            flush()
+        next_line = lines[i + 1] if i + 1 < len(lines) else ""
+        if not paragraph and _is_heading(line, next_line):
+            blocks.append(_Block("heading", line.strip().lstrip("#").strip()))
+            continue
+        paragraph.append(line)
+    flush()
+    return blocks
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence for sentence in _SENTENCE_END.split(text) if sentence.strip()]
+
+class StructuredChunking(ChunkingStrategy):
+    def __init__(self, chunk_size: int = 500, overlap: int = 50):
+        self.chunk_size = max(1, min(chunk_size, MAX_CHUNK_TOKENS))
+        self.overlap = max(0, min(overlap, self.chunk_size // 2))
+        self.tokenizer = get_tokenizer()
+
+    @property
+    def profile(self) -> str:
+        """Identitas konfigurasi; chunk hanya bisa dipakai ulang jika profile sama."""
+        return f"structured:{self.chunk_size}:{self.overlap}"
+
+    def _units(self, block: _Block, budget: int) -> List[str]:
+        """Pecah blok menjadi unit yang masing-masing muat dalam budget token."""
+        if self.tokenizer.count(block.text) <= budget:
+            return [block.text]
+        if block.kind == "table":
+            rows = block.text.split("\n")
+            header, units, current = rows[0], [], rows[0]
+            for row in rows[1:]:
+                candidate = f"{current}\n{row}"
+                if self.tokenizer.count(candidate) > budget and current != header:
+                    units.append(current)
+                    candidate = f"{header}\n{row}"
+                current = candidate
+            units.append(current)
+            return [unit for part in units for unit in (
+                [part] if self.tokenizer.count(part) <= budget else self.tokenizer.split(part, budget)
+            )]
+        units = []
+        for sentence in split_sentences(block.text):
+            if self.tokenizer.count(sentence) <= budget:
+                units.append(sentence)
+            else:
+                units.extend(self.tokenizer.split(sentence, budget))
+        return units
+
+    def _sections(self, text: str):
+        heading, body = None, []
+        for block in split_blocks(text):
+            if block.kind == "heading":
+                if body or heading is not None:
+                    yield heading, body
+                heading, body = block.text, []
+            else:
+                body.append(block)
+        if body or heading is not None:
+            yield heading, body
+
+    def _pack(self, heading: Optional[str], blocks: List[_Block]) -> List[str]:
+        prefix = f"{heading}\n\n" if heading else ""
+        budget = max(1, self.chunk_size - self.tokenizer.count(prefix))
+
+        # (teks, pemisah sebelum unit, jumlah token): kalimat satu paragraf disambung
+        # spasi, blok baru dimulai di baris baru
+        units = []
+        for block in blocks:
+            for i, unit in enumerate(self._units(block, budget)):
+                separator = " " if i > 0 and block.kind == "paragraph" else "\n"
+                units.append((unit, separator, self.tokenizer.count(separator + unit)))
+
+        chunks: List[str] = []
+        start = 0
+        while start < len(units):
+            end, tokens = start, 0
+            while end < len(units) and (end == start or tokens + units[end][2] <= budget):
+                tokens += units[end][2]
+                end += 1
+            window = units[start:end]
+            chunks.append(prefix + window[0][0] + "".join(separator + text for text, separator, _ in window[1:]))
+            if end == len(units):
+                break
+            # Mundur beberapa unit untuk overlap, selama unit berikutnya tetap muat
+            next_start, back = end, 0
+            while (
+                next_start - 1 > start
+                and back + units[next_start - 1][2] <= self.overlap
+                and back + units[next_start - 1][2] + units[end][2] <= budget
+            ):
+                next_start -= 1
+                back += units[next_start][2]
+            start = next_start
+
+        if not chunks and heading:
+            chunks.append(heading)
+        return chunks
+
+    def split_text(self, text: str) -> List[str]:
+        texts: List[str] = []
+        for heading, blocks in self._sections(text):
+            section = self._pack(heading, blocks)
+            # Section pendek (mis. judul huruf kapital di PDF) digabung dengan chunk terakhir
+            # section sebelumnya selama masih muat, supaya tidak muncul chunk yang sangat kecil
+            if texts and section and self.tokenizer.count(texts[-1] + "\n\n" + section[0]) <= self.chunk_size:
+                texts[-1] = texts[-1] + "\n\n" + section.pop(0)
+            texts.extend(section)
+        return texts
+
+    def chunk(self, document: Document) -> List[Document]:
+        texts = self.split_text(document.content)
+        chunked = []
+        for number, text in enumerate(texts, start=1):
+            meta_data = dict(document.meta_data or {})
+            meta_data["chunk"] = number
+            meta_data["chunk_size"] = len(text)
+            chunked.append(Document(
+                id=f"{document.id}_{number}" if document.id else None,
+                name=document.name,
+                meta_data=meta_data,
+                content=text,
+            ))
+        return chunked
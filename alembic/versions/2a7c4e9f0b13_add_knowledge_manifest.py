@@ -0,0 +1,47 @@
+"""add knowledge manifest
+
+Revision ID: 2a7c4e9f0b13
+Revises: 6d2f8b1c9a47
+Create Date: 2025-08-29 14:06:31.552109
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2a7c4e9f0b13'
+down_revision: Union[str, Sequence[str], None] = '6d2f8b1c9a47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "dt_knowledge_manifest",
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("source_type", sa.String(20), nullable=False),
+        sa.Column("source_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("source_name", sa.Text(), nullable=False),
+        sa.Column("content_hash", sa.String(64), nullable=False),
+        sa.Column("chunk_hashes", sa.JSON(), nullable=False, server_default="[]"),
+        sa.Column("embedding_model", sa.String(255), nullable=False),
+        sa.Column("etag", sa.Text()),
+        sa.Column("last_modified", sa.Text()),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("client_id", "source_type", "source_id"),
+        schema="ai"
+    )
+    op.add_column(
+        "dt_embedding_jobs",
+        sa.Column("chunk_hashes", sa.JSON(), nullable=False, server_default="[]"),
+        schema="ai"
+    )
+
+
+def downgrade():
+    op.drop_column("dt_embedding_jobs", "chunk_hashes", schema="ai")
+    op.drop_table("dt_knowledge_manifest", schema="ai")
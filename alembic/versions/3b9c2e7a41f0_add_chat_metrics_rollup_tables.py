@@ -0,0 +1,85 @@
+"""add chat metrics rollup tables
+
+Revision ID: 3b9c2e7a41f0
+Revises: d755333cc3b4
+Create Date: 2025-08-20 10:12:04.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b9c2e7a41f0'
+down_revision: Union[str, Sequence[str], None] = 'd755333cc3b4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "dt_chat_metrics_hourly",
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("bucket_start", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("chat_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("total_tokens", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("latency_sum_seconds", sa.Float(), nullable=False, server_default="0"),
+        sa.Column("latency_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("escalation_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("client_id", "bucket_start"),
+        schema="ai"
+    )
+    op.create_table(
+        "dt_chat_category_daily",
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("category", sa.String(255), nullable=False),
+        sa.Column("chat_count", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.PrimaryKeyConstraint("client_id", "day", "category"),
+        schema="ai"
+    )
+    op.create_index("ix_dt_chats_client_id_created_at", "dt_chats", ["client_id", "created_at"], schema="ai")
+
+    # Backfill seluruh histori; setelah ini scheduler hanya menghitung ulang jam-jam terakhir
+    op.execute("""
+        INSERT INTO ai.dt_chat_metrics_hourly (
+            client_id, bucket_start, chat_count, total_tokens,
+            latency_sum_seconds, latency_count, escalation_count, updated_at
+        )
+        SELECT
+            c.client_id,
+            date_trunc('hour', c.created_at),
+            COUNT(*),
+            COALESCE(SUM(c.agent_total_tokens), 0),
+            COALESCE(SUM(EXTRACT(EPOCH FROM c.agent_response_latency)), 0),
+            COUNT(c.agent_response_latency),
+            COUNT(*) FILTER (WHERE EXISTS (
+                SELECT 1 FROM unnest(c.agent_tools_call) AS tool
+                WHERE tool ILIKE '%INSERT INTO ai.dt_customer_feedback%'
+                   OR tool ILIKE '%INSERT INTO ai.customer_feedback%'
+            )),
+            now()
+        FROM ai.dt_chats c
+        WHERE c.created_at IS NOT NULL
+        GROUP BY c.client_id, date_trunc('hour', c.created_at)
+    """)
+    op.execute("""
+        INSERT INTO ai.dt_chat_category_daily (client_id, day, category, chat_count, updated_at)
+        SELECT c.client_id, CAST(c.created_at AS date), c.agent_response_category, COUNT(*), now()
+        FROM ai.dt_chats c
+        WHERE c.created_at IS NOT NULL
+          AND c.agent_response_category IS NOT NULL
+          AND c.agent_response_category NOT IN ('', 'pending')
+        GROUP BY c.client_id, CAST(c.created_at AS date), c.agent_response_category
+    """)
+
+
+def downgrade():
+    op.drop_index("ix_dt_chats_client_id_created_at", table_name="dt_chats", schema="ai")
+    op.drop_table("dt_chat_category_daily", schema="ai")
+    op.drop_table("dt_chat_metrics_hourly", schema="ai")
@@ -0,0 +1,46 @@
+"""unique active embedding job per source
+
+Revision ID: 3d8a5f2c7b41
+Revises: f1b6d3a8c2e7
+Create Date: 2025-09-10 14:06:38.117420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3d8a5f2c7b41'
+down_revision: Union[str, Sequence[str], None] = 'f1b6d3a8c2e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Duplikat job aktif dari enqueue yang balapan: sisakan yang paling awal dibuat
+    op.execute("""
+        UPDATE ai.dt_embedding_jobs AS j
+        SET status = 'cancelled',
+            last_error = 'Duplicate active job for the same source.',
+            locked_by = NULL,
+            finished_at = now()
+        WHERE j.status IN ('queued', 'running')
+            AND EXISTS (
+                SELECT 1
+                FROM ai.dt_embedding_jobs o
+                WHERE o.source_type = j.source_type
+                    AND o.source_id = j.source_id
+                    AND o.status IN ('queued', 'running')
+                    AND (o.created_at, o.id) < (j.created_at, j.id)
+            )
+    """)
+    op.create_index(
+        "ux_dt_embedding_jobs_active_source", "dt_embedding_jobs", ["source_type", "source_id"],
+        unique=True, schema="ai", postgresql_where=sa.text("status IN ('queued', 'running')")
+    )
+
+
+def downgrade():
+    op.drop_index("ux_dt_embedding_jobs_active_source", table_name="dt_embedding_jobs", schema="ai")
@@ -0,0 +1,59 @@
+"""add full-text and trigram search indexes
+
+Revision ID: 5c7f1a9e3d24
+Revises: 8e41d5c0a2b7
+Create Date: 2025-08-22 13:41:09.284716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c7f1a9e3d24'
+down_revision: Union[str, Sequence[str], None] = '8e41d5c0a2b7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (nama index, tabel, ekspresi). Ekspresi to_tsvector harus sama dengan utils/search_utils.py
+SEARCH_INDEXES = [
+    ("ix_dt_chats_message_fts", "ai.dt_chats", "to_tsvector('simple', coalesce(message, ''))"),
+    ("ix_dt_chats_message_trgm", "ai.dt_chats", "message gin_trgm_ops"),
+    ("ix_dt_room_conversation_name_trgm", "ai.dt_room_conversation", "name gin_trgm_ops"),
+    ("ix_dt_room_conversation_description_trgm", "ai.dt_room_conversation", "description gin_trgm_ops"),
+    ("ix_dt_room_conversation_last_message_trgm", "ai.dt_room_conversation", "last_message gin_trgm_ops"),
+    ("ix_ms_admin_users_email_trgm", "ms_admin_users", "email gin_trgm_ops"),
+    ("ix_ms_admin_users_full_name_trgm", "ms_admin_users", "full_name gin_trgm_ops"),
+    ("ix_dt_customer_profile_full_name_trgm", "ai.dt_customer_profile", "full_name gin_trgm_ops"),
+    ("ix_dt_customer_profile_email_trgm", "ai.dt_customer_profile", "email gin_trgm_ops"),
+    ("ix_dt_customer_profile_phone_number_trgm", "ai.dt_customer_profile", "phone_number gin_trgm_ops"),
+    ("ix_dt_user_activity_log_endpoint_trgm", "ai.dt_user_activity_log", "endpoint gin_trgm_ops"),
+]
+
+# Index UUID biasa untuk pencocokan exact (pengganti cast(id AS text) LIKE)
+UUID_INDEXES = [
+    ("ix_dt_chats_sender_id", "ai.dt_chats", "sender_id"),
+    ("ix_dt_chats_room_conversation_id", "ai.dt_chats", "room_conversation_id"),
+    ("ix_dt_user_activity_log_user_id", "ai.dt_user_activity_log", "user_id"),
+]
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    # CONCURRENTLY tidak boleh di dalam transaksi; tabel chat besar tidak ikut terkunci
+    with op.get_context().autocommit_block():
+        for name, table, expression in SEARCH_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} USING gin ({expression})")
+        for name, table, column in UUID_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({column})")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in SEARCH_INDEXES + UUID_INDEXES:
+            schema = table.split(".")[0] + "." if "." in table else ""
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}{name}")
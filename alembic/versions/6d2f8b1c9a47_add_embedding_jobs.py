@@ -0,0 +1,56 @@
+"""add embedding jobs
+
+Revision ID: 6d2f8b1c9a47
+Revises: a41e6b8d9c53
+Create Date: 2025-08-28 09:41:52.210734
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6d2f8b1c9a47'
+down_revision: Union[str, Sequence[str], None] = 'a41e6b8d9c53'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "dt_embedding_jobs",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("source_type", sa.String(20), nullable=False),
+        sa.Column("source_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("source_name", sa.Text(), nullable=False),
+        sa.Column("status", sa.String(20), nullable=False, server_default="queued"),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("max_attempts", sa.Integer(), nullable=False),
+        sa.Column("total_pages", sa.Integer()),
+        sa.Column("completed_pages", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("last_error", sa.Text()),
+        sa.Column("locked_by", sa.String(100)),
+        sa.Column("heartbeat_at", sa.DateTime(timezone=True)),
+        sa.Column("run_after", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("started_at", sa.DateTime(timezone=True)),
+        sa.Column("finished_at", sa.DateTime(timezone=True)),
+        schema="ai"
+    )
+    op.create_index(
+        "ix_dt_embedding_jobs_claim", "dt_embedding_jobs", ["run_after"],
+        schema="ai", postgresql_where=sa.text("status = 'queued'")
+    )
+    op.create_index("ix_dt_embedding_jobs_client_created", "dt_embedding_jobs", ["client_id", "created_at"], schema="ai")
+    op.create_index("ix_dt_embedding_jobs_source", "dt_embedding_jobs", ["source_type", "source_id"], schema="ai")
+
+
+def downgrade():
+    op.drop_index("ix_dt_embedding_jobs_source", table_name="dt_embedding_jobs", schema="ai")
+    op.drop_index("ix_dt_embedding_jobs_client_created", table_name="dt_embedding_jobs", schema="ai")
+    op.drop_index("ix_dt_embedding_jobs_claim", table_name="dt_embedding_jobs", schema="ai")
+    op.drop_table("dt_embedding_jobs", schema="ai")
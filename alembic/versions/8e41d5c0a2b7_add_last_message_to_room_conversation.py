@@ -0,0 +1,53 @@
+"""add last message to dt_room_conversation
+
+Revision ID: 8e41d5c0a2b7
+Revises: 3b9c2e7a41f0
+Create Date: 2025-08-21 09:03:47.551920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e41d5c0a2b7'
+down_revision: Union[str, Sequence[str], None] = '3b9c2e7a41f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    with op.batch_alter_table("dt_room_conversation", schema="ai") as batch_op:
+        batch_op.add_column(sa.Column("last_message_id", sa.Uuid(), nullable=True))
+        batch_op.add_column(sa.Column("last_message", sa.String(), nullable=True))
+        batch_op.add_column(sa.Column("last_message_at", sa.DateTime(timezone=True), nullable=True))
+
+    op.execute("""
+        UPDATE ai.dt_room_conversation r
+        SET last_message_id = latest.id,
+            last_message = latest.message,
+            last_message_at = latest.created_at
+        FROM (
+            SELECT DISTINCT ON (room_conversation_id) room_conversation_id, id, message, created_at
+            FROM ai.dt_chats
+            ORDER BY room_conversation_id, created_at DESC, id DESC
+        ) latest
+        WHERE latest.room_conversation_id = r.id
+    """)
+
+    op.create_index(
+        "ix_dt_room_conversation_inbox",
+        "dt_room_conversation",
+        ["client_id", "status", sa.text("last_message_at DESC"), sa.text("id DESC")],
+        schema="ai"
+    )
+
+
+def downgrade():
+    op.drop_index("ix_dt_room_conversation_inbox", table_name="dt_room_conversation", schema="ai")
+    with op.batch_alter_table("dt_room_conversation", schema="ai") as batch_op:
+        batch_op.drop_column("last_message_at")
+        batch_op.drop_column("last_message")
+        batch_op.drop_column("last_message_id")
@@ -0,0 +1,36 @@
+"""move uploaded file content to blob store
+
+Revision ID: 9b3e5d1f7c62
+Revises: 2a7c4e9f0b13
+Create Date: 2025-09-01 09:42:18.230417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9b3e5d1f7c62'
+down_revision: Union[str, Sequence[str], None] = '2a7c4e9f0b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    # Isi baris lama dipindah ke blob store dengan `python -m utils.migrate_file_blobs`
+    op.add_column("dt_uploaded_file", sa.Column("blob_key", sa.String(100), nullable=True))
+    op.add_column("dt_uploaded_file", sa.Column("sha256", sa.String(64), nullable=True))
+    op.alter_column("dt_uploaded_file", "content", existing_type=sa.LargeBinary(), nullable=True)
+    op.create_index("ix_dt_uploaded_file_sha256", "dt_uploaded_file", ["sha256"])
+    op.create_index("ix_dt_uploaded_file_listing", "dt_uploaded_file", ["client_id", "status", sa.text("uploaded_at DESC")])
+
+
+def downgrade():
+    op.drop_index("ix_dt_uploaded_file_listing", table_name="dt_uploaded_file")
+    op.drop_index("ix_dt_uploaded_file_sha256", table_name="dt_uploaded_file")
+    # Gagal jika masih ada baris yang isinya hanya di blob store
+    op.alter_column("dt_uploaded_file", "content", existing_type=sa.LargeBinary(), nullable=False)
+    op.drop_column("dt_uploaded_file", "sha256")
+    op.drop_column("dt_uploaded_file", "blob_key")
@@ -0,0 +1,44 @@
+"""add keyset pagination indexes
+
+Revision ID: a41e6b8d9c53
+Revises: 5c7f1a9e3d24
+Create Date: 2025-08-25 10:27:15.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41e6b8d9c53'
+down_revision: Union[str, Sequence[str], None] = '5c7f1a9e3d24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Urutan kolom mengikuti utils/pagination_utils.keyset_order: filter tenant lalu (created_at, id) DESC.
+# created_at yang nullable diurutkan NULLS LAST, jadi index-nya harus sama agar tetap dipakai untuk ORDER BY.
+KEYSET_INDEXES = [
+    ("ix_dt_chats_keyset", "ai.dt_chats", "client_id, created_at DESC NULLS LAST, id DESC"),
+    ("ix_ms_admin_users_keyset", "ms_admin_users", "client_id, created_at DESC NULLS LAST, id DESC"),
+    ("ix_dt_customer_profile_keyset", "ai.dt_customer_profile", "client_id, created_at DESC, customer_id DESC"),
+    ("ix_dt_customer_interactions_keyset", "ai.dt_customer_interactions", "client_id, created_at DESC NULLS LAST, id DESC"),
+    ("ix_dt_customer_feedback_keyset", "ai.dt_customer_feedback", "client_id, created_at DESC NULLS LAST, id DESC"),
+    ("ix_dt_room_conversation_keyset", "ai.dt_room_conversation", "client_id, created_at DESC NULLS LAST, id DESC"),
+    ("ix_dt_notifications_keyset", "ai.dt_notifications", "client_id, receiver_id, created_at DESC, id DESC"),
+]
+
+
+def upgrade():
+    with op.get_context().autocommit_block():
+        for name, table, columns in KEYSET_INDEXES:
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name, table, _ in KEYSET_INDEXES:
+            schema = table.split(".")[0] + "." if "." in table else ""
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {schema}{name}")
@@ -0,0 +1,29 @@
+"""add chunking strategy to knowledge base config
+
+Revision ID: c8f2a6d4e1b9
+Revises: 9b3e5d1f7c62
+Create Date: 2025-09-03 11:18:52.640291
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c8f2a6d4e1b9'
+down_revision: Union[str, Sequence[str], None] = '9b3e5d1f7c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.add_column(
+        "ms_knowledge_base_config",
+        sa.Column("chunking_strategy", sa.String(20), nullable=False, server_default="structured")
+    )
+
+
+def downgrade():
+    op.drop_column("ms_knowledge_base_config", "chunking_strategy")
@@ -0,0 +1,45 @@
+"""add answer cache
+
+Revision ID: e4a9c7b2d508
+Revises: c8f2a6d4e1b9
+Create Date: 2025-09-05 15:27:40.118362
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4a9c7b2d508'
+down_revision: Union[str, Sequence[str], None] = 'c8f2a6d4e1b9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.create_table(
+        "dt_answer_cache",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("query_text", sa.Text(), nullable=False),
+        sa.Column("query_embedding", Vector(1536), nullable=False),
+        sa.Column("answer", sa.Text(), nullable=False),
+        sa.Column("source_chat_id", postgresql.UUID(as_uuid=True)),
+        sa.Column("hits", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("last_hit_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+        schema="ai"
+    )
+    # Entri per client dibatasi ANSWER_CACHE_MAX_ENTRIES, jadi pencarian exact per client cukup
+    op.create_index("ix_dt_answer_cache_client_last_hit", "dt_answer_cache", ["client_id", "last_hit_at"], schema="ai")
+
+
+def downgrade():
+    op.drop_index("ix_dt_answer_cache_client_last_hit", table_name="dt_answer_cache", schema="ai")
+    op.drop_table("dt_answer_cache", schema="ai")
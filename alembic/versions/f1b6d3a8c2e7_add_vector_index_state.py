@@ -0,0 +1,50 @@
+"""add vector index state and search tuning
+
+Revision ID: f1b6d3a8c2e7
+Revises: e4a9c7b2d508
+Create Date: 2025-09-08 10:42:16.503817
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1b6d3a8c2e7'
+down_revision: Union[str, Sequence[str], None] = 'e4a9c7b2d508'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade():
+    op.create_table(
+        "dt_vector_index",
+        sa.Column("table_name", sa.String(255), primary_key=True),
+        sa.Column("client_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("index_type", sa.String(20), nullable=False),
+        sa.Column("index_name", sa.String(63)),
+        sa.Column("build_params", sa.JSON(), nullable=False, server_default="{}"),
+        sa.Column("generation", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("built_rows", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("row_count", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.Column("built_at", sa.DateTime(timezone=True)),
+        sa.Column("checked_at", sa.DateTime(timezone=True), nullable=False, server_default=sa.func.now()),
+        schema="ai"
+    )
+    op.add_column(
+        "ms_knowledge_base_config",
+        sa.Column("vector_index_type", sa.String(20), nullable=False, server_default="auto")
+    )
+    op.add_column(
+        "ms_knowledge_base_config",
+        sa.Column("vector_search_recall", sa.String(20), nullable=False, server_default="balanced")
+    )
+
+
+def downgrade():
+    op.drop_column("ms_knowledge_base_config", "vector_search_recall")
+    op.drop_column("ms_knowledge_base_config", "vector_index_type")
+    op.drop_table("dt_vector_index", schema="ai")
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, Body, status
+from fastapi.concurrency import run_in_threadpool
 from datetime import datetime
 from jose import jwt
 from core.settings import SECRET_KEY_ADMIN, ALGORITHM
@@ -30,7 +31,7 @@ async def generate_user_id_endpoint(
     auth_service: AuthService = Depends(get_auth_service),
 ):
     logger.info(f"[AUTH] Generating user_id with role={request.role}")
-    return auth_service.generate_user_id(role=request.role, client_id=client_id)
+    return await run_in_threadpool(auth_service.generate_user_id, role=request.role, client_id=client_id)
 
 @router.post("/auth/generate_token", response_model=TokenResponse)
 @handle_exceptions(tag="[AUTH]")
@@ -40,8 +41,8 @@ async def generate_token_endpoint(
     auth_service: AuthService = Depends(get_auth_service)
 ):
     logger.info(f"[AUTH] Generating access + refresh token for user_id={request.user_id}")
-    access_data = auth_service.generate_access_token(user_id=request.user_id)
-    refresh_token = auth_service.generate_refresh_token(user_id=request.user_id)
+    access_data = await run_in_threadpool(auth_service.generate_access_token, user_id=request.user_id)
+    refresh_token = await run_in_threadpool(auth_service.generate_refresh_token, user_id=request.user_id)
 
     expires_in = access_data["expires_at"] - int(datetime.utcnow().timestamp())
 
@@ -64,8 +65,8 @@ async def refresh_token_endpoint(
     if user_id is None:
         raise ValueError("Invalid refresh token")
 
-    new_access_data = auth_service.generate_access_token(user_id=user_id)
-    new_refresh_token = auth_service.generate_refresh_token(user_id=user_id)
+    new_access_data = await run_in_threadpool(auth_service.generate_access_token, user_id=user_id)
+    new_refresh_token = await run_in_threadpool(auth_service.generate_refresh_token, user_id=user_id)
 
     return TokenResponse(
         access_token=new_access_data["access_token"],
@@ -81,7 +82,7 @@ async def login_endpoint(
     # client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[AUTH] Login attempt for email={request.email}")
-    tokens = auth_service.login_user(email=request.email, password=request.password)
+    tokens = await run_in_threadpool(auth_service.login_user, email=request.email, password=request.password)
 
     expires_in = tokens["expires_at"] - int(datetime.utcnow().timestamp())
 
@@ -93,13 +94,13 @@ async def login_endpoint(
 
 @router.post("/auth/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 @handle_exceptions(tag="[AUTH]")
-def create_new_user(
+async def create_new_user(
     user_data: UserCreate = Body(...),
     user_service: UserService = Depends(get_user_service),
     client_id: UUID = Depends(get_authenticated_client)
 ):
     logger.info(f"[AUTH] Registering new user with email={user_data.email}, role={user_data.role}")
-    return user_service.create_user(
+    return await run_in_threadpool(user_service.create_user,
         email=user_data.email,
         password=user_data.password,
         full_name=user_data.full_name,
@@ -1,5 +1,6 @@
 import logging
 from fastapi import APIRouter, Depends, Query, Path
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from uuid import UUID
 from services.chat_history_service import ChatHistoryService, get_chat_history_service
@@ -8,6 +9,7 @@ from schemas.chat_history_schema import ChatHistoryResponse, UserHistoryResponse
 from utils.exception_handler import handle_exceptions
 from middleware.auth_client_dependency import get_authenticated_client
 from datetime import datetime
+from enums.count_mode_enum import CountMode
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -18,13 +20,18 @@ router = APIRouter(tags=["history"])
 @handle_exceptions(tag="[HISTORY][ALL]")
 async def read_all_chat_history_endpoint(
     chat_history_service: ChatHistoryService = Depends(get_chat_history_service),
-    offset: int = Query(0),
+    offset: int = Query(0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, le=200),
     search: Optional[str] = Query(None, description="Filter chat by message or sender_id"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact, estimate or none"),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
-    logger.info(f"[HISTORY][ALL] Fetching all chat history with offset={offset}, limit={limit}, search={search}")
-    return chat_history_service.get_all_chat_history(offset=offset, limit=limit, search=search, client_id=client_id)
+    logger.info(f"[HISTORY][ALL] Fetching all chat history with cursor={cursor}, offset={offset}, limit={limit}, search={search}")
+    return await run_in_threadpool(
+        chat_history_service.get_all_chat_history,
+        offset=offset, limit=limit, search=search, client_id=client_id, cursor=cursor, count_mode=count_mode
+    )
 
 @router.get("/history/{user_id}", response_model=UserHistoryByIdResponse)
 @handle_exceptions(tag="[HISTORY][USER_ID]")
@@ -36,7 +43,7 @@ async def get_user_history_by_user_id_endpoint(
     client_id: UUID = Depends(get_authenticated_client)
 ):
     logger.info(f"[HISTORY][USER_ID] Fetching chat history for user_id={user_id}, cursor={cursor}, limit={limit}")
-    result = chat_history_service.get_user_chat_history_by_user_id(
+    result = await run_in_threadpool(chat_history_service.get_user_chat_history_by_user_id,
         user_id, cursor=cursor, limit=limit, client_id=client_id
     )
 
@@ -71,7 +78,7 @@ async def get_user_history_by_room_id_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id) 
 ):
     logger.info(f"[HISTORY][ROOM_ID] Fetching chat history for room_id={room_id}, cursor={cursor}, limit={limit}")
-    result = chat_history_service.get_user_chat_history_by_room_id(
+    result = await run_in_threadpool(chat_history_service.get_user_chat_history_by_room_id,
         room_id, cursor=cursor, limit=limit, client_id=client_id
     )
 
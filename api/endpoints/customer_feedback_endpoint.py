@@ -1,12 +1,14 @@
 # app/api/endpoints/customer_feedback_endpoint.py
 import logging
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from schemas.customer_feedback_response_schema import CustomerFeedbackResponse
 from services.customer_feedback_service import CustomerFeedbackService, get_customer_feedback_service
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from utils.exception_handler import handle_exceptions
 from uuid import UUID
+from enums.count_mode_enum import CountMode
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -16,24 +18,31 @@ router = APIRouter(tags=["customer-feedback"])
 @router.get("/feedbacks", response_model=List[CustomerFeedbackResponse])
 @handle_exceptions(tag="[FEEDBACK]")
 async def get_feedbacks_endpoint(
+    response: Response,
     customer_feedback_service: CustomerFeedbackService = Depends(get_customer_feedback_service),
-    offset: int = Query(0, description="Number of items to skip"),
+    offset: int = Query(0, description="Number of items to skip (deprecated, use cursor)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
     limit: int = Query(100, description="Number of items to return per page", le=200),
     search: Optional[str] = Query(None, description="Search keyword on feedback"),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
-    logger.info(f"[FEEDBACK] Request: offset={offset}, limit={limit}, search='{search}'")
-    feedbacks = customer_feedback_service.fetch_all_feedbacks(offset=offset, limit=limit, search=search, client_id=client_id)
-    logger.info(f"[FEEDBACK] Returned {len(feedbacks)} feedback entries.")
-    return feedbacks
+    logger.info(f"[FEEDBACK] Request: cursor={cursor}, offset={offset}, limit={limit}, search='{search}'")
+    page = await run_in_threadpool(
+        customer_feedback_service.fetch_all_feedbacks, offset=offset, limit=limit, search=search, client_id=client_id, cursor=cursor
+    )
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    logger.info(f"[FEEDBACK] Returned {len(page.items)} feedback entries.")
+    return page.items
 
 @router.get("/feedbacks/total", response_model=int)
 @handle_exceptions(tag="[FEEDBACK_TOTAL]")
 async def get_total_feedbacks_endpoint(
     customer_feedback_service: CustomerFeedbackService = Depends(get_customer_feedback_service),
+    count_mode: CountMode = Query(CountMode.exact, description="exact or estimate"),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[FEEDBACK_TOTAL] Request received.")
-    total_feedbacks = customer_feedback_service.count_total_feedbacks(client_id=client_id)
+    total_feedbacks = await run_in_threadpool(customer_feedback_service.count_total_feedbacks, client_id=client_id, count_mode=count_mode)
     logger.info(f"[FEEDBACK_TOTAL] Returning count: {total_feedbacks}")
     return total_feedbacks
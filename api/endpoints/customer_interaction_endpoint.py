@@ -1,5 +1,6 @@
 import logging
 from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from fastapi.encoders import jsonable_encoder
 from schemas.customer_interaction_schema import PaginatedCustomerInteractionResponse, CustomerInteractionResponse
@@ -7,6 +8,7 @@ from services.customer_interaction_service import CustomerInteractionService, ge
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from utils.exception_handler import handle_exceptions
 from uuid import UUID
+from enums.count_mode_enum import CountMode
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,21 +19,27 @@ router = APIRouter(tags=["customer-interactions"])
 @handle_exceptions(tag="[INTERACTION]")
 async def get_all_customer_interactions_endpoint(
     customer_interaction: CustomerInteractionService = Depends(get_customer_interaction_service),
-    offset: int = Query(0),
+    offset: int = Query(0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, le=200),
     search: Optional[str] = Query(None),
+    count_mode: CountMode = Query(CountMode.exact, description="exact, estimate or none"),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     """
     Endpoint untuk mendapatkan semua interaksi customer dengan pagination.
     Membutuhkan access token dan API key yang valid.
     """
-    logger.info(f"[INTERACTION] Fetching interactions offset={offset}, limit={limit}")
-    result = customer_interaction.get_all_customer_interactions(client_id, offset, limit, search)
+    logger.info(f"[INTERACTION] Fetching interactions cursor={cursor}, offset={offset}, limit={limit}")
+    result = await run_in_threadpool(
+        customer_interaction.get_all_customer_interactions, client_id, offset, limit, search, cursor, count_mode
+    )
 
     logger.info(f"[INTERACTION] Fetched total={result['total']}")
     return PaginatedCustomerInteractionResponse(
         total=result["total"],
+        total_is_estimate=result["total_is_estimate"],
+        next_cursor=result["next_cursor"],
         data=[
             CustomerInteractionResponse(**jsonable_encoder(row))
             for row in result["data"]
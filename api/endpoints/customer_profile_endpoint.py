@@ -6,6 +6,7 @@ from services.customer_profile_service import CustomerProfileService, get_custom
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from exceptions.custom_exceptions import DatabaseException, ServiceException
 from uuid import UUID
+from enums.count_mode_enum import CountMode
 
 router = APIRouter(tags=["Customers"])
 
@@ -14,20 +15,26 @@ logger = logging.getLogger(__name__)
 
 @router.get("/customer", response_model=dict)
 def get_all_customers(
-    offset: int = Query(0),
+    offset: int = Query(0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(10),
     search: Optional[str] = Query(None),
+    count_mode: CountMode = Query(CountMode.exact, description="exact, estimate or none"),
     customer_service: CustomerProfileService = Depends(get_customer_service),
     client_id: UUID = Depends(verify_access_token_and_get_client_id) 
 ):
     try:
-        logger.info(f"[CUSTOMER] Get all customers offset={offset}, limit={limit}, search={search}")
-        result = customer_service.get_all_customers(limit=limit, offset=offset, search=search, client_id=client_id)
+        logger.info(f"[CUSTOMER] Get all customers cursor={cursor}, offset={offset}, limit={limit}, search={search}")
+        result = customer_service.get_all_customers(
+            limit=limit, offset=offset, search=search, client_id=client_id, cursor=cursor, count_mode=count_mode
+        )
         logger.info(f"[CUSTOMER] Retrieved {len(result['data'])} customers")
 
         return {
             "data": [CustomerResponse.from_orm(customer) for customer in result["data"]],
-            "total": result["total"]
+            "total": result["total"],
+            "total_is_estimate": result["total_is_estimate"],
+            "next_cursor": result["next_cursor"]
         }
 
     except DatabaseException as e:
@@ -1,5 +1,6 @@
 import logging
 from fastapi import APIRouter, Depends
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Dict
 from services.chat_history_service import ChatHistoryService, get_chat_history_service
 from services.user_service import UserService, get_user_service
@@ -21,7 +22,7 @@ async def get_total_conversations_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching total conversations")
-    return chat_history_service.get_total_conversations(client_id)
+    return await run_in_threadpool(chat_history_service.get_total_conversations, client_id)
 
 
 @router.get("/stats/total-users", response_model=int)
@@ -31,7 +32,7 @@ async def get_total_users_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching total users")
-    return user_service.get_total_users(client_id=client_id)
+    return await run_in_threadpool(user_service.get_total_users, client_id=client_id)
 
 
 @router.get("/stats/total-tokens", response_model=float)
@@ -41,7 +42,7 @@ async def get_total_tokens_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching total tokens used")
-    return chat_history_service.get_total_tokens_used(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_total_tokens_used, client_id=client_id)
 
 
 @router.get("/stats/categories-frequency", response_model=List[CategoryFrequencyResponse])
@@ -51,7 +52,7 @@ async def get_categories_frequency_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching categories frequency")
-    return chat_history_service.get_categories_by_frequency(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_categories_by_frequency, client_id=client_id)
 
 
 @router.get("/stats/monthly-new-users", response_model=Dict[str, int])
@@ -61,7 +62,7 @@ async def get_monthly_new_users_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching monthly new users")
-    return user_service.get_monthly_user_additions(client_id=client_id)
+    return await run_in_threadpool(user_service.get_monthly_user_additions, client_id=client_id)
 
 
 @router.get("/stats/monthly-conversations", response_model=Dict[str, int])
@@ -71,7 +72,7 @@ async def get_monthly_conversations_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching monthly conversations")
-    return chat_history_service.get_monthly_conversations(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_monthly_conversations, client_id=client_id)
 
 
 @router.get("/stats/daily-avg-latency", response_model=Dict[str, float])
@@ -81,7 +82,7 @@ async def get_daily_average_latency_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching daily average latency")
-    return chat_history_service.get_daily_average_latency_seconds(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_daily_average_latency_seconds, client_id=client_id)
 
 
 @router.get("/stats/monthly-avg-latency", response_model=Dict[str, float])
@@ -91,7 +92,7 @@ async def get_monthly_average_latency_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching monthly average latency")
-    return chat_history_service.get_monthly_average_latency_seconds(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_monthly_average_latency_seconds, client_id=client_id)
 
 
 @router.get("/stats/monthly-escalations", response_model=Dict[str, int])
@@ -101,7 +102,7 @@ async def get_monthly_escalation_count_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching monthly escalations")
-    return chat_history_service.get_escalation_by_month(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_escalation_by_month, client_id=client_id)
 
 
 @router.get("/stats/monthly-tokens-usage", response_model=Dict[str, float])
@@ -111,7 +112,7 @@ async def get_monthly_tokens_usage_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching monthly tokens usage")
-    return chat_history_service.get_monthly_tokens_used(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_monthly_tokens_used, client_id=client_id)
 
 
 @router.get("/stats/conversations/weekly", response_model=Dict[str, int])
@@ -121,7 +122,7 @@ async def get_weekly_conversations_api(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching weekly conversations")
-    return chat_history_service.get_conversations_by_week(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_conversations_by_week, client_id=client_id)
 
 
 @router.get("/stats/conversations/monthly", response_model=Dict[str, int])
@@ -131,7 +132,7 @@ async def get_monthly_conversations_api(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching conversations by month")
-    return chat_history_service.get_conversations_by_month(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_conversations_by_month, client_id=client_id)
 
 
 @router.get("/stats/conversations/yearly", response_model=Dict[str, int])
@@ -141,7 +142,7 @@ async def get_yearly_conversations_api(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching conversations by year")
-    return chat_history_service.get_conversations_by_year(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_conversations_by_year, client_id=client_id)
 
 
 @router.get("/stats/escalations/weekly", response_model=Dict[str, int])
@@ -151,7 +152,7 @@ async def get_weekly_escalations_api(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching escalations by week")
-    return chat_history_service.get_weekly_escalation_count(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_weekly_escalation_count, client_id=client_id)
 
 
 @router.get("/stats/escalations/monthly", response_model=Dict[str, int])
@@ -161,7 +162,7 @@ async def get_monthly_escalations_api(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching escalations by month")
-    return chat_history_service.get_monthly_escalation_count(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_monthly_escalation_count, client_id=client_id)
 
 
 @router.get("/stats/escalations/yearly", response_model=Dict[str, int])
@@ -171,4 +172,4 @@ async def get_yearly_escalations_api(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[DASHBOARD] Fetching escalations by year")
-    return chat_history_service.get_yearly_escalation_count(client_id=client_id)
+    return await run_in_threadpool(chat_history_service.get_yearly_escalation_count, client_id=client_id)
@@ -0,0 +1,34 @@
+from fastapi import APIRouter, Depends, Path, Query
+from fastapi.concurrency import run_in_threadpool
+from typing import Optional
+from uuid import UUID
+import logging
+from services.embedding_job_service import EmbeddingJobService, get_embedding_job_service
+from schemas.embedding_job_schema import EmbeddingJobInfo, EmbeddingJobListResponse
+from middleware.token_dependency import verify_access_token_and_get_client_id
+from utils.exception_handler import handle_exceptions
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["embedding-jobs"])
+
+@router.get("/embedding-jobs", response_model=EmbeddingJobListResponse)
+@handle_exceptions(tag="[EMBEDDING_JOB]")
+async def list_embedding_jobs_endpoint(
+    status: Optional[str] = Query(None, description="queued | running | completed | failed | cancelled"),
+    limit: int = Query(50, ge=1, le=200),
+    job_service: EmbeddingJobService = Depends(get_embedding_job_service),
+    client_id: UUID = Depends(verify_access_token_and_get_client_id)
+):
+    logger.info(f"[EMBEDDING_JOB] Listing embedding jobs for client_id={client_id}, status={status}")
+    jobs = await run_in_threadpool(job_service.list_jobs, client_id=client_id, status=status, limit=limit)
+    return EmbeddingJobListResponse(items=jobs)
+
+@router.get("/embedding-jobs/{job_id}", response_model=EmbeddingJobInfo)
+@handle_exceptions(tag="[EMBEDDING_JOB]")
+async def get_embedding_job_endpoint(
+    job_id: UUID = Path(..., description="ID job embedding"),
+    job_service: EmbeddingJobService = Depends(get_embedding_job_service),
+    client_id: UUID = Depends(verify_access_token_and_get_client_id)
+):
+    return await run_in_threadpool(job_service.get_job, job_id=job_id, client_id=client_id)
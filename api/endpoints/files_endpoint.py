@@ -1,5 +1,8 @@
-from fastapi import APIRouter, Depends, status, Path, UploadFile, File
+from fastapi import APIRouter, Depends, status, Path, Request
+from fastapi.concurrency import run_in_threadpool
 from services.file_service import FileService, get_file_service
+from services.upload_stream import receive_uploads
+from core.settings import FILE_UPLOAD_MAX_BYTES, FILE_UPLOAD_MAX_FILES
 from schemas.file_response_schema import FileInfo, FileDeletedResponse, UploadSuccessResponse, EmbeddingProcessResponse
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from typing import List
@@ -19,7 +22,7 @@ async def get_all_files_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[FILES] Fetching all uploaded files.")
-    return file_service.fetch_all_files(client_id=client_id)
+    return await run_in_threadpool(file_service.fetch_all_files, client_id=client_id)
 
 @router.delete("/files/{uuid_file}", response_model=FileDeletedResponse)
 @handle_exceptions(tag="[FILES]")
@@ -29,32 +32,45 @@ async def delete_file_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id) 
 ):
     logger.info(f"[FILES] Request to delete file UUID: {uuid_file}")
-    return file_service.delete_file_from_db(uuid_file=uuid_file, client_id=client_id)
+    return await run_in_threadpool(file_service.delete_file_from_db, uuid_file=uuid_file, client_id=client_id)
 
 @router.post(
     "/files/upload-file", 
     response_model=List[UploadSuccessResponse],
-    status_code=status.HTTP_201_CREATED
+    status_code=status.HTTP_201_CREATED,
+    # Body dibaca manual secara streaming, jadi skema multipart didokumentasikan di sini
+    openapi_extra={"requestBody": {"required": True, "content": {"multipart/form-data": {"schema": {
+        "type": "object",
+        "required": ["files"],
+        "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}}
+    }}}}}
 )
 @handle_exceptions(tag="[FILES]")
 async def upload_file_endpoint(
-    files: List[UploadFile] = File(..., description="Files to upload"), 
+    request: Request,
     file_service: FileService = Depends(get_file_service),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
-    logger.info(f"[FILES] Uploading {len(files)} file(s)")
-    
-    uploaded_files = []
-    for file in files:
-        file_model = await file_service.save_file(file, client_id)
-        uploaded_files.append(
+    logger.info("[FILES] Receiving streamed upload")
+    received = await receive_uploads(
+        request,
+        field_name="files",
+        max_files=FILE_UPLOAD_MAX_FILES,
+        max_size=FILE_UPLOAD_MAX_BYTES
+    )
+
+    def save_and_describe() -> List[UploadSuccessResponse]:
+        # Atribut model yang expired setelah commit dimuat ulang di thread ini, bukan di event loop
+        return [
             UploadSuccessResponse(
                 message="File uploaded successfully",
                 uuid_file=file_model.uuid_file,
                 filename=file_model.filename
             )
-        )
-    return uploaded_files
+            for file_model in file_service.save_uploaded_files(received, client_id)
+        ]
+
+    return await run_in_threadpool(save_and_describe)
 
 @router.post("/files/embedding-file", response_model=EmbeddingProcessResponse)
 @handle_exceptions(tag="[FILES]")
@@ -63,5 +79,5 @@ async def process_embedding_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id) 
 ):
     logger.info("[FILES] Processing file embedding.")
-    result = await file_service.process_embedding(client_id=client_id)
+    result = await run_in_threadpool(file_service.process_embedding, client_id=client_id)
     return EmbeddingProcessResponse(**result)
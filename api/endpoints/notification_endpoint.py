@@ -1,4 +1,6 @@
 from uuid import UUID
+from typing import Optional
+from enums.count_mode_enum import CountMode
 from fastapi import APIRouter, Depends, Query, Body
 from services.notification_service import NotificationService, get_notification_service
 from middleware.token_dependency import verify_access_token
@@ -14,7 +16,9 @@ logger = logging.getLogger(__name__)
 @handle_exceptions(tag="[NOTIFICATION]")
 async def get_notifications_endpoint(
     limit: int = Query(20),
-    offset: int = Query(0),
+    offset: int = Query(0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    count_mode: CountMode = Query(CountMode.exact, description="exact, estimate or none"),
     current_user: str = Depends(verify_access_token),
     notification_service: NotificationService = Depends(get_notification_service),
     client_id: UUID = Depends(get_authenticated_client)
@@ -22,13 +26,15 @@ async def get_notifications_endpoint(
     user_id = UUID(current_user)
     logger.info(f"[NOTIFICATION] Getting notifications for user_id={user_id}")
 
-    notifs, total = await notification_service.get_notifications(user_id, client_id, limit, offset)
+    page = await notification_service.get_notifications(user_id, client_id, limit, offset, cursor=cursor, count_mode=count_mode)
 
-    notifs_response = [NotificationItem.model_validate(n) for n in notifs]
+    notifs_response = [NotificationItem.model_validate(n) for n in page.items]
 
     return NotificationListResponse(
         success=True,
-        total=total,
+        total=page.total,
+        total_is_estimate=page.total_is_estimate,
+        next_cursor=page.next_cursor,
         data=notifs_response
     )
 
@@ -1,6 +1,7 @@
 # app/api/endpoints/prompt_endpoint.py
 import logging
 from fastapi import APIRouter, Depends, Path
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from services.prompt_service import PromptService, get_prompt_service
 from schemas.prompt_schema import PromptResponse, PromptUpdate
@@ -20,7 +21,7 @@ async def get_prompts_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info("[PROMPT] Fetching all prompts.")
-    return prompt_service.fetch_customer_service_prompt(client_id=client_id)
+    return await run_in_threadpool(prompt_service.fetch_customer_service_prompt, client_id=client_id)
 
 @router.put("/prompts/{prompt_id}", response_model=PromptResponse)
 @handle_exceptions(tag="[PROMPT]")
@@ -31,4 +32,4 @@ async def update_prompt_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[PROMPT] Updating prompt with ID: {prompt_id}")
-    return prompt_service.update_prompt(prompt_id, prompt_update, client_id)
+    return await run_in_threadpool(prompt_service.update_prompt, prompt_id, prompt_update, client_id)
@@ -1,6 +1,8 @@
 # app/routes/chat_history_routes.py
 import logging
 from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from fastapi.concurrency import run_in_threadpool
 from uuid import UUID
 from services.report_service import ReportService, get_report_service
 from middleware.token_dependency import verify_access_token_and_get_client_id
@@ -18,15 +20,24 @@ async def read_all_chat_history_endpoint(
     report_type: str = Query(..., description="Jenis report, contoh: CUSTOMER_FEEDBACK"),
     start_date: str = Query(..., description="Tanggal awal format YYYY-MM-DD"),
     end_date: str = Query(..., description="Tanggal akhir format YYYY-MM-DD"),
+    file_format: Optional[str] = Query(None, alias="format", description="csv, xlsx, atau parquet (default csv; ALL_DATA selalu xlsx)"),
     report_service: ReportService = Depends(get_report_service),
     client_id: UUID = Depends(verify_access_token_and_get_client_id) 
 ):
     """
-    Menghasilkan file CSV dari report_type tertentu dalam rentang tanggal.
+    Menghasilkan file report_type tertentu dalam rentang tanggal (CSV, XLSX, atau Parquet).
+    File dikirim streaming, dibaca per batch dari database.
     """
     try:
         logger.info(f"[REPORT] Generating report: {report_type} from {start_date} to {end_date}")
-        return report_service.report_csv(report_type=report_type, start_date=start_date, end_date=end_date, client_id=client_id)
+        return await run_in_threadpool(
+            report_service.export_report,
+            report_type=report_type,
+            start_date=start_date,
+            end_date=end_date,
+            client_id=client_id,
+            file_format=file_format
+        )
 
     except DatabaseException as e:
         logger.error(f"[REPORT] Database error: {e.message}", exc_info=True)
@@ -1,6 +1,7 @@
 # app/api/endpoints/room_routes.py
 import logging
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from typing import List, Optional
 from services.room_service import RoomService, get_room_service
 from middleware.token_dependency import verify_access_token_and_get_client_id
@@ -17,13 +18,18 @@ router = APIRouter(tags=["rooms"])
 @router.get("/rooms/get-all-rooms", response_model=List[RoomConversationResponse])
 @handle_exceptions(tag="[ROOM]")
 async def get_all_rooms_endpoint(
+    response: Response,
     room_service: RoomService = Depends(get_room_service),
-    offset: int = Query(0, description="Number of items to skip"), 
+    offset: int = Query(0, description="Number of items to skip (deprecated, use cursor)"), 
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
     limit: int = Query(100, description="Number of items to return per page", le=200), 
     client_id: UUID = Depends(verify_access_token_and_get_client_id) 
 ):
-    logger.info(f"[ROOM] get_all_rooms: offset={offset}, limit={limit}")
-    return room_service.get_all_rooms(offset=offset, limit=limit, client_id=client_id)
+    logger.info(f"[ROOM] get_all_rooms: cursor={cursor}, offset={offset}, limit={limit}")
+    page = await run_in_threadpool(room_service.get_all_rooms, offset=offset, limit=limit, client_id=client_id, cursor=cursor)
+    if page.next_cursor:
+        response.headers["X-Next-Cursor"] = page.next_cursor
+    return page.items
 
 # @router.get("/rooms/active-rooms", response_model=List[RoomConversationResponse])
 # @handle_exceptions(tag="[ROOM]")
@@ -42,9 +48,12 @@ async def get_all_rooms_endpoint(
 async def get_active_rooms_endpoint(
     room_service: RoomService = Depends(get_room_service),
     cursor: Optional[datetime] = Query(None, description="Last fetched time for pagination"),
+    cursor_id: Optional[UUID] = Query(None, description="Last fetched room ID, breaks ties on cursor time"),
     limit: int = Query(15, description="Number of active items to return per page", le=200),
     search: Optional[str] = Query(None, description="Search keyword for room ID, name, or message"),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
-    logger.info(f"[ROOM] get_active_rooms: cursor={cursor}, limit={limit}, search={search}")
-    return room_service.get_active_rooms(cursor=cursor, limit=limit, search=search, client_id=client_id)
+    logger.info(f"[ROOM] get_active_rooms: cursor={cursor}, cursor_id={cursor_id}, limit={limit}, search={search}")
+    return await run_in_threadpool(
+        room_service.get_active_rooms, cursor=cursor, cursor_id=cursor_id, limit=limit, search=search, client_id=client_id
+    )
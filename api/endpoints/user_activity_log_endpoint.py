@@ -2,6 +2,7 @@ import logging
 from typing import List, Optional
 from uuid import UUID
 from fastapi import APIRouter, Depends, Query, Path
+from fastapi.concurrency import run_in_threadpool
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from schemas.user_activity_log_schema import UserActivityLogResponse
 from services.user_activity_log_service import UserActivityLogService, get_user_activity_log_service
@@ -22,7 +23,7 @@ async def get_user_activity_logs(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[USER_ACTIVITY_LOG] Requesting logs (offset={offset}, limit={limit}, search={search})")
-    return log_service.get_all_logs(offset=offset, limit=limit, client_id=client_id, search=search)
+    return await run_in_threadpool(log_service.get_all_logs, offset=offset, limit=limit, client_id=client_id, search=search)
 
 @router.get("/activity-logs/{user_id}", response_model=List[UserActivityLogResponse])
 @handle_exceptions(tag="[ACTIVITY_LOG]")
@@ -33,4 +34,4 @@ async def get_activity_logs_by_user_id(
     activity_service: UserActivityLogService = Depends(get_user_activity_log_service),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
-    return activity_service.get_logs_by_user_id(user_id=user_id, client_id=client_id, offset=offset, limit=limit)
\ No newline at end of file
+    return await run_in_threadpool(activity_service.get_logs_by_user_id, user_id=user_id, client_id=client_id, offset=offset, limit=limit)
\ No newline at end of file
@@ -1,6 +1,7 @@
 # app/api/endpoints/user_routes.py
 import logging
 from fastapi import APIRouter, Depends, Path, Body, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from uuid import UUID
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from schemas.user_schema import UserResponse, UserUpdate, UserCreate, UserListResponse
@@ -9,6 +10,7 @@ from utils.exception_handler import handle_exceptions
 from typing import Optional, Dict, Any
 from fastapi import Query
 from schemas.user_schema import ChangePasswordRequest
+from enums.count_mode_enum import CountMode
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -23,7 +25,7 @@ async def create_new_user(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[USER] Creating new user with email: {user_data.email}")
-    return user_service.create_user(
+    return await run_in_threadpool(user_service.create_user,
         email=user_data.email,
         password=user_data.password,
         full_name=user_data.full_name,
@@ -35,23 +37,29 @@ async def create_new_user(
 @handle_exceptions(tag="[USER]")
 async def get_user_profile(
     user_service: UserService = Depends(get_user_service),
-    offset: int = Query(0, ge=0),
+    offset: int = Query(0, ge=0, description="Deprecated, use cursor"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     limit: int = Query(100, le=200),
     search: Optional[str] = Query(None),
+    count_mode: CountMode = Query(CountMode.exact, description="exact, estimate or none"),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ) -> Dict[str, Any]:
-    logger.info(f"[USER] Fetching all user profile (offset={offset}, limit={limit}, search={search})")
+    logger.info(f"[USER] Fetching all user profile (cursor={cursor}, offset={offset}, limit={limit}, search={search})")
 
-    result = user_service.get_all_user(
+    result = await run_in_threadpool(user_service.get_all_user,
         client_id=client_id,
         offset=offset,
         limit=limit,
-        search=search
+        search=search,
+        cursor=cursor,
+        count_mode=count_mode
     )
 
     return {
         "data": result["data"],
-        "total_users": result["total"]
+        "total_users": result["total"],
+        "total_is_estimate": result["total_is_estimate"],
+        "next_cursor": result["next_cursor"]
     }
 
 @router.get("/users/{user_id}", response_model=UserResponse)
@@ -62,7 +70,7 @@ async def get_user_profile(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[USER] Fetching user profile for ID: {user_id}")
-    user = user_service.get_user_by_id(str(user_id), client_id=client_id)
+    user = await run_in_threadpool(user_service.get_user_by_id, str(user_id), client_id=client_id)
     if not user:
         logger.warning(f"[USER] User not found: {user_id}")
         raise HTTPException(status_code=404, detail="Pengguna tidak ditemukan.")
@@ -77,7 +85,7 @@ async def update_user_profile(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[USER] Updating profile for ID: {user_id}")
-    updated_user = user_service.update_user_profile(str(user_id), user_updates.model_dump(exclude_unset=True), client_id=client_id)
+    updated_user = await run_in_threadpool(user_service.update_user_profile, str(user_id), user_updates.model_dump(exclude_unset=True), client_id=client_id)
     if not updated_user:
         logger.warning(f"[USER] Update failed: user {user_id} not found.")
         raise HTTPException(status_code=404, detail="Pengguna tidak ditemukan atau tidak dapat diperbarui.")
@@ -91,7 +99,7 @@ async def delete_user(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[USER] Request to delete user with ID: {user_id}")
-    user_service.delete_user(user_id=user_id, client_id=client_id)
+    await run_in_threadpool(user_service.delete_user, user_id=user_id, client_id=client_id)
     logger.info(f"[USER] User with ID {user_id} deleted successfully")
     return None 
 
@@ -104,7 +112,7 @@ async def change_user_password(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[USER] Change password request for user_id={user_id}")
-    updated_user = user_service.change_password(
+    updated_user = await run_in_threadpool(user_service.change_password,
         user_id=user_id,
         client_id=client_id,
         old_password=payload.old_password,
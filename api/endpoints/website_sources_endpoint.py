@@ -1,9 +1,11 @@
 from fastapi import APIRouter, Depends, status, Body
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from uuid import UUID
 import logging
 from services.web_source_service import WebSourceService, get_web_source_service
 from schemas.website_source_schema import WebsiteKBInfo, WebsiteKBCreateResponse, WebsiteUrlPayload
+from schemas.file_response_schema import EmbeddingProcessResponse
 from middleware.token_dependency import verify_access_token_and_get_client_id
 from utils.exception_handler import handle_exceptions
 
@@ -19,7 +21,7 @@ async def get_all_website_kb_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[WEBSITE_KB] Fetching website KB for client_id={client_id}")
-    return kb_service.fetch_all_links(client_id=client_id)
+    return await run_in_threadpool(kb_service.fetch_all_links, client_id=client_id)
 
 @router.post(
     "/website-source",
@@ -33,7 +35,7 @@ async def create_website_kb_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[WEBSITE_KB] Creating new website KB for client_id={client_id} with {url} urls")
-    result = kb_service.add_link(url=url, client_id=client_id)
+    result = await run_in_threadpool(kb_service.add_link, url=url, client_id=client_id)
     return WebsiteKBCreateResponse(
         message="Website knowledge base created successfully",
         url=result.url
@@ -47,13 +49,14 @@ async def delete_website_by_id_endpoint(
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[WEBSITE_KB] Deleting all KB data for client_id={client_id}")
-    return kb_service.delete_link_by_id(url_id=url_id, client_id=client_id)
+    return await run_in_threadpool(kb_service.delete_link_by_id, url_id=url_id, client_id=client_id)
 
-@router.post("/website-source/process-embedding")
+@router.post("/website-source/process-embedding", response_model=EmbeddingProcessResponse)
 @handle_exceptions(tag="[WEBSITE_KB]")
 async def process_website_kb_embedding_endpoint(
     kb_service: WebSourceService = Depends(get_web_source_service),
     client_id: UUID = Depends(verify_access_token_and_get_client_id)
 ):
     logger.info(f"[WEBSITE_KB] Processing website KB embedding for client_id={client_id}")
-    return await kb_service.process_embedding(client_id=client_id)
+    result = await run_in_threadpool(kb_service.process_embedding, client_id=client_id)
+    return EmbeddingProcessResponse(**result)
@@ -0,0 +1,307 @@
+"""
+Worker embedding knowledge base.
+
+Berjalan di dalam proses API (EMBEDDING_WORKER_ENABLED=true) atau sebagai proses
+terpisah yang bisa di-scale sendiri:
+
+    python -m api.jobs.embedding_worker
+"""
+import asyncio
+import logging
+import os
+import signal
+import socket
+import threading
+import uuid
+from typing import List, Optional
+from prometheus_client import Counter, Gauge
+from agno.document.base import Document
+from agno.document.reader.pdf_reader import PDFReader
+from agno.document.reader.website_reader import WebsiteReader
+from core.config_db import SessionLocal
+from core.settings import (
+    EMBEDDING_WORKER_CONCURRENCY,
+    EMBEDDING_JOB_POLL_INTERVAL,
+    EMBEDDING_JOB_BATCH_PAGES,
+    EMBEDDING_JOB_STALE_SECONDS
+)
+from database.models import EmbeddingJob, FileModel, WebSourceModel
+from services.embedding_job_service import EmbeddingJobService, SOURCE_FILE
+from services.file_service import open_file_content
+from services.knowledge_index_service import KnowledgeIndexService, hash_bytes, hash_pages, chunk_hash
+from agents.tools.knowledge_base_tools import (
+    create_combined_vector_db,
+    create_chunking_strategy,
+    chunking_profile,
+    get_safe_subdomain
+)
+from agents.customer_service_agent.agent_pool import customer_service_agent_pool
+from services.answer_cache_service import invalidate_answer_cache
+from services.vector_index_service import VectorIndexManager
+
+logger = logging.getLogger(__name__)
+
+embedding_jobs_finished_total = Counter("embedding_jobs_finished_total", "Embedding jobs finished by outcome", ["outcome"])
+embedding_pages_processed_total = Counter("embedding_pages_processed_total", "Source pages chunked and upserted into the vector DB")
+embedding_chunks_total = Counter("embedding_chunks_total", "Chunks handled by incremental indexing", ["action"])
+embedding_jobs_running = Gauge("embedding_jobs_running", "Embedding jobs currently running in this process")
+
+class _WorkerStopping(Exception):
+    pass
+
+class _JobHeartbeat:
+    """
+    Thread yang memperbarui heartbeat_at selama job berjalan, dengan session sendiri.
+    Satu batch (crawl, parsing PDF besar, embedding) bisa lebih lama dari
+    EMBEDDING_JOB_STALE_SECONDS; tanpa ini job yang masih hidup diambil worker lain.
+    """
+    def __init__(self, job_id: uuid.UUID, worker_id: str, interval: float):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"embedding-heartbeat-{job_id}", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                with SessionLocal() as db:
+                    if not EmbeddingJobService(db).heartbeat(self.job_id, self.worker_id):
+                        logger.warning(f"[EMBEDDING_WORKER] Job {self.job_id} is no longer held by {self.worker_id}")
+                        return
+            except Exception as e:
+                logger.warning(f"[EMBEDDING_WORKER] Heartbeat failed for job {self.job_id}: {e}")
+
+def _read_file_pages(source: FileModel) -> List[Document]:
+    name = source.filename.rsplit(".", 1)[0]
+    with open_file_content(source) as stream:
+        if source.content_type == "application/pdf":
+            pages = PDFReader(chunk=False).read(stream)
+        else:
+            pages = [Document(name=name, id=f"{name}_1", content=stream.read().decode("utf-8", errors="replace"))]
+    # Nama dokumen harus sama dengan yang dipakai FileService.delete_file_from_db
+    for page in pages:
+        page.name = name
+    return pages
+
+def _read_website_pages(source: WebSourceModel) -> List[Document]:
+    pages = WebsiteReader(max_links=5, chunk=False).read(source.url)
+    # Semua halaman hasil crawl dihapus bersama oleh WebSourceService.delete_link_by_id
+    for page in pages:
+        page.name = source.url
+    return pages
+
+class EmbeddingWorker:
+    """
+    Menjalankan job dari ai.dt_embedding_jobs dengan `concurrency` slot.
+
+    Setiap job: dokumen yang tidak berubah sejak index terakhir dilewati (lihat
+    KnowledgeIndexService); selain itu dibaca per halaman, lalu per
+    EMBEDDING_JOB_BATCH_PAGES halaman di-chunk, hanya chunk baru yang di-embed ke
+    vector DB gabungan client, dan progress di-commit. Job yang
+    gagal/terputus dilanjutkan dari completed_pages terakhir. Pekerjaan blocking
+    (parsing PDF, embedding) berjalan di thread, bukan di event loop.
+    """
+    def __init__(self, concurrency: int, poll_interval: float, batch_pages: int):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.batch_pages = batch_pages
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self._stopping = threading.Event()
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        if self._tasks:
+            return
+        self._stopping.clear()
+        self._tasks = [asyncio.create_task(self._slot()) for _ in range(self.concurrency)]
+        logger.info(f"[EMBEDDING_WORKER] Started {self.concurrency} slots as {self.worker_id}")
+
+    async def stop(self):
+        self._stopping.set()
+        for task in self._tasks:
+            task.cancel()
+        # Job yang sedang berjalan di thread berhenti di batas batch berikutnya
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def _slot(self):
+        while not self._stopping.is_set():
+            try:
+                processed = await asyncio.to_thread(self.run_once)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[EMBEDDING_WORKER] Slot error: {e}", exc_info=True)
+                processed = False
+            if not processed:
+                await asyncio.sleep(self.poll_interval)
+
+    def run_once(self) -> bool:
+        with SessionLocal() as db:
+            service = EmbeddingJobService(db)
+            job = service.claim_next(self.worker_id)
+            if job is None:
+                return False
+            embedding_jobs_running.inc()
+            try:
+                # Heartbeat beberapa kali dalam satu jendela stale, terlepas dari kapan batch selesai
+                with _JobHeartbeat(job.id, self.worker_id, max(EMBEDDING_JOB_STALE_SECONDS / 3, 1)):
+                    self._run_job(service, job)
+            finally:
+                embedding_jobs_running.dec()
+            return True
+
+    def _load_source(self, service: EmbeddingJobService, job: EmbeddingJob):
+        if job.source_type == SOURCE_FILE:
+            return service.db.query(FileModel).filter(FileModel.uuid_file == job.source_id).first()
+        return service.db.query(WebSourceModel).filter(WebSourceModel.id == job.source_id).first()
+
+    def _finish_unchanged(self, service: EmbeddingJobService, job: EmbeddingJob, source):
+        source.status = "processed"
+        service.complete(job)
+        embedding_jobs_finished_total.labels(outcome="unchanged").inc()
+        logger.info(f"[EMBEDDING_WORKER] Job {job.id} skipped: {job.source_name} unchanged since last index")
+
+    def _maintain_indexes(self, db, job: EmbeddingJob):
+        # Antrian client sudah habis: bangun/perbarui index ANN sekali untuk seluruh batch ingest
+        try:
+            actions = VectorIndexManager(db).maintain_client(job.client_id)
+            customer_service_agent_pool.invalidate(job.client_id)
+            logger.info(f"[EMBEDDING_WORKER] Vector index maintenance for client {job.client_id}: {actions}")
+        except Exception as e:
+            db.rollback()
+            logger.error(f"[EMBEDDING_WORKER] Vector index maintenance failed for client {job.client_id}: {e}", exc_info=True)
+
+    def _run_job(self, service: EmbeddingJobService, job: EmbeddingJob):
+        db = service.db
+        logger.info(f"[EMBEDDING_WORKER] Job {job.id} ({job.source_type}: {job.source_name}), attempt {job.attempts}")
+        source = self._load_source(service, job)
+        if source is None or source.status == "inactive":
+            service.cancel(job, "Source was deleted before embedding finished.")
+            embedding_jobs_finished_total.labels(outcome="cancelled").inc()
+            return
+
+        try:
+            source.status = "processing"
+            db.commit()
+
+            vector_db = create_combined_vector_db(get_safe_subdomain(job.client_id))
+            vector_db.create()
+            chunker = create_chunking_strategy(job.client_id)
+            index = KnowledgeIndexService(db, vector_db, chunking_profile(chunker))
+            manifest = index.get_manifest(job)
+
+            # Cek murah sebelum parsing/crawl: hash file atau conditional GET website
+            validators = None
+            content_hash = None
+            if job.source_type == SOURCE_FILE:
+                content_hash = source.sha256 or hash_bytes(source.content)
+            else:
+                validators = index.fetch_validators(source.url, manifest)
+            if job.completed_pages == 0 and index.is_unchanged(manifest, content_hash, validators):
+                index.mark_checked(manifest, validators)
+                self._finish_unchanged(service, job, source)
+                return
+
+            pages = _read_file_pages(source) if job.source_type == SOURCE_FILE else _read_website_pages(source)
+            if content_hash is None:
+                content_hash = hash_pages(pages)
+                if job.completed_pages == 0 and index.is_unchanged(manifest, content_hash):
+                    index.mark_checked(manifest, validators)
+                    self._finish_unchanged(service, job, source)
+                    return
+
+            total = len(pages)
+            # Jumlah halaman berubah (mis. website di-crawl ulang): mulai dari awal
+            done = job.completed_pages if job.total_pages == total else 0
+            seen = list(job.chunk_hashes or []) if done else []
+            seen_set = set(seen)
+            known = index.known_chunk_hashes(manifest)
+            if done == 0 and not known:
+                # Vector dari sebelum ada manifest (atau model embedding lain) tidak bisa di-diff
+                index.delete_source_vectors(pages[0].name if pages else job.source_name)
+            service.record_progress(job, done, total, chunk_hashes=seen)
+
+            embedded = 0
+            for start in range(done, total, self.batch_pages):
+                if self._stopping.is_set():
+                    raise _WorkerStopping()
+                batch = pages[start:start + self.batch_pages]
+                fresh = []
+                for chunk in (chunk for page in batch for chunk in chunker.chunk(page)):
+                    digest = chunk_hash(chunk)
+                    if digest in seen_set:
+                        continue
+                    seen.append(digest)
+                    seen_set.add(digest)
+                    if digest not in known:
+                        chunk.id = index.vector_id(job, digest)
+                        fresh.append(chunk)
+                if fresh:
+                    vector_db.upsert(fresh)
+                    embedded += len(fresh)
+                service.record_progress(job, start + len(batch), chunk_hashes=seen)
+                embedding_pages_processed_total.inc(len(batch))
+
+            removed = index.delete_orphans(job, known - seen_set)
+            index.save_manifest(job, content_hash, seen, validators)
+            source.status = "processed"
+            if embedded or removed:
+                # Isi knowledge berubah: jawaban cache bisa basi, dihapus dalam transaksi yang sama
+                invalidate_answer_cache(db, job.client_id)
+            service.complete(job)
+            customer_service_agent_pool.invalidate(job.client_id)
+            embedding_chunks_total.labels(action="embedded").inc(embedded)
+            embedding_chunks_total.labels(action="reused").inc(len(seen) - embedded)
+            embedding_chunks_total.labels(action="deleted").inc(removed)
+            embedding_jobs_finished_total.labels(outcome="completed").inc()
+            logger.info(
+                f"[EMBEDDING_WORKER] Job {job.id} completed: {total} pages, {embedded} chunks embedded, "
+                f"{len(seen) - embedded} reused, {removed} orphaned vectors deleted"
+            )
+            if (embedded or removed) and not service.has_active_jobs(job.client_id):
+                self._maintain_indexes(db, job)
+
+        except _WorkerStopping:
+            service.release(job)
+            logger.info(f"[EMBEDDING_WORKER] Job {job.id} released at page {job.completed_pages} (worker stopping)")
+        except Exception as e:
+            logger.error(f"[EMBEDDING_WORKER] Job {job.id} failed: {e}", exc_info=True)
+            if service.fail(job, str(e)):
+                embedding_jobs_finished_total.labels(outcome="retry").inc()
+                return
+            source = self._load_source(service, job)
+            if source is not None and source.status == "processing":
+                source.status = "failed"
+                db.commit()
+            embedding_jobs_finished_total.labels(outcome="failed").inc()
+
+embedding_worker = EmbeddingWorker(
+    concurrency=EMBEDDING_WORKER_CONCURRENCY,
+    poll_interval=EMBEDDING_JOB_POLL_INTERVAL,
+    batch_pages=EMBEDDING_JOB_BATCH_PAGES,
+)
+
+async def _main():
+    loop = asyncio.get_running_loop()
+    stopped = asyncio.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stopped.set)
+
+    await embedding_worker.start()
+    await stopped.wait()
+    logger.info("[EMBEDDING_WORKER] Shutting down...")
+    await embedding_worker.stop()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    asyncio.run(_main())
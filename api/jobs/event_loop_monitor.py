@@ -0,0 +1,50 @@
+import asyncio
+import logging
+from typing import Optional
+from prometheus_client import Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds",
+    "Delay between the scheduled and actual wake-up of the event loop probe",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+event_loop_lag_last_seconds = Gauge("event_loop_lag_last_seconds", "Most recent event loop lag measurement")
+
+class EventLoopLagMonitor:
+    """
+    Probe yang tidur selama `interval` detik lalu mengukur keterlambatannya bangun.
+    Keterlambatan = waktu event loop tertahan oleh kode blocking.
+    """
+    def __init__(self, interval: float = 0.5, warn_threshold: float = 0.5):
+        self.interval = interval
+        self.warn_threshold = warn_threshold
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("[EVENT_LOOP] Lag monitor started.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            event_loop_lag_seconds.observe(lag)
+            event_loop_lag_last_seconds.set(lag)
+            if lag >= self.warn_threshold:
+                logger.warning(f"[EVENT_LOOP] Event loop blocked for {lag:.3f}s")
+
+event_loop_lag_monitor = EventLoopLagMonitor()
@@ -3,6 +3,10 @@ from apscheduler.triggers.interval import IntervalTrigger
 from sqlalchemy.orm import Session
 from core.config_db import config_db
 from api.jobs.chat_analysis import process_user_chats
+from services.chat_rollup_service import ChatRollupService
+from services.embedding_job_service import EmbeddingJobService
+from services.vector_index_service import VectorIndexManager
+from core.settings import CHAT_ROLLUP_INTERVAL_MINUTES, CHAT_ROLLUP_LOOKBACK_HOURS, WEB_RECRAWL_INTERVAL_HOURS, VECTOR_INDEX_INTERVAL_MINUTES
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +20,45 @@ def run_analysis_job():
     with next(config_db()) as db:
         process_user_chats(db)
 
+def run_chat_rollup_job():
+    """
+    Menghitung ulang agregat dashboard untuk beberapa jam terakhir.
+    """
+    logger.info("Running scheduled chat rollup job...")
+
+    with next(config_db()) as db:
+        try:
+            ChatRollupService(db).refresh_recent(CHAT_ROLLUP_LOOKBACK_HOURS)
+        except Exception as e:
+            logger.error(f"Chat rollup job failed: {e}", exc_info=True)
+
+def run_web_recrawl_job():
+    """
+    Mengantrikan crawl ulang website yang index-nya lebih tua dari WEB_RECRAWL_INTERVAL_HOURS.
+    """
+    logger.info("Running scheduled website re-crawl job...")
+
+    with next(config_db()) as db:
+        try:
+            EmbeddingJobService(db).enqueue_recrawl(WEB_RECRAWL_INTERVAL_HOURS)
+        except Exception as e:
+            logger.error(f"Website re-crawl job failed: {e}", exc_info=True)
+
+def run_vector_index_job():
+    """
+    Memeriksa index ANN/full-text semua tabel knowledge client (jumlah baris berubah,
+    tipe index di konfigurasi client diganti) dan membangun ulang bila perlu.
+    """
+    logger.info("Running scheduled vector index maintenance job...")
+
+    with next(config_db()) as db:
+        try:
+            actions = VectorIndexManager(db).maintain_all()
+            changed = {table: action for table, action in actions.items() if action not in ("unchanged", "missing")}
+            logger.info(f"Vector index maintenance finished: {changed or 'no changes'}")
+        except Exception as e:
+            logger.error(f"Vector index maintenance job failed: {e}", exc_info=True)
+
 def start_scheduler():
     """
     Inisialisasi dan jalankan scheduler dengan interval tertentu.
@@ -27,5 +70,29 @@ def start_scheduler():
         id="chat_analysis_job",
         replace_existing=True
     )
+    scheduler.add_job(
+        run_chat_rollup_job,
+        trigger=IntervalTrigger(minutes=CHAT_ROLLUP_INTERVAL_MINUTES),
+        id="chat_rollup_job",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    scheduler.add_job(
+        run_web_recrawl_job,
+        trigger=IntervalTrigger(hours=1),
+        id="web_recrawl_job",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
+    scheduler.add_job(
+        run_vector_index_job,
+        trigger=IntervalTrigger(minutes=VECTOR_INDEX_INTERVAL_MINUTES),
+        id="vector_index_job",
+        replace_existing=True,
+        max_instances=1,
+        coalesce=True
+    )
     scheduler.start()
     logger.info("Scheduler started.")
@@ -13,7 +13,7 @@ from prometheus_client import Counter, Gauge
 from middleware.auth_client_ws import get_authenticated_client_ws
 import json
 import asyncio
-from services.chat_singleton import active_admin_websockets, active_user_websockets
+from services.chat_singleton import ws_fanout, presence_registry
 
 ws_connection_count = Counter("ws_connections_total", "Total WebSocket connections ever created")
 ws_active_users = Gauge("ws_active_users", "Number of active WebSocket connections")
@@ -33,6 +33,7 @@ async def chat_ws(
     api_key: str = None,
     access_token: str = None,
     room_id: str = None,
+    stream: bool = False,
     db: AsyncSession = Depends(get_db)
 ):
     start_time = time.time()
@@ -71,12 +72,7 @@ async def chat_ws(
         
         chat_service = init_chat_service(db=db)
     
-        # === Subscribe task ===    
-        asyncio.create_task(chat_service.subscribe_user_events(user_uuid))
-        
-        await chat_service.mark_online(user_uuid, role, client_id, ttl_seconds=30)
-        online_users = await chat_service.get_all_online("user", client_id)
-        logger.info(f"Online users in Redis on chat_ws: {online_users}")
+        await chat_service.mark_online(user_uuid, role, client_id)
 
         ws_connection_count.inc()
         ws_active_users.inc()
@@ -85,16 +81,16 @@ async def chat_ws(
 
         # === Room Handling ===
         if role in {"user", "chatbot"}:
-            active_user_websockets.setdefault(client_id, {})[user_uuid] = websocket
+            await ws_fanout.register(client_id, role, user_uuid, websocket)
             logger.info(f"[WS] Mencoba mendapatkan atau membuat room untuk user_id={user_uuid}, role={role}")
             room_uuid = await chat_service.find_or_create_room_and_add_member(db, user_uuid, role, client_id)
             
-            online_admin_uuids = await chat_service.get_all_online("admin", client_id)
-            logger.info(f"Found {len(online_admin_uuids)} online admins from Redis for active rooms broadcast.")
+            online_admin_count = await presence_registry.count_online(client_id, "admin")
+            logger.info(f"Found {online_admin_count} online admins for active rooms broadcast.")
 
         elif role == "admin":
             try:
-                active_admin_websockets.setdefault(client_id, {})[user_uuid] = websocket
+                await ws_fanout.register(client_id, role, user_uuid, websocket)
                 logger.info(f"[WS] Admin {user_uuid} connected, attempting to takeover room {room_id}")
             except ValueError:
                 await websocket.send_json({"error": "room_id tidak valid"})
@@ -109,6 +105,12 @@ async def chat_ws(
             
             logger.info(f"Received data: {data}")
 
+            # Ping dari client hanya memperbarui heartbeat presence
+            if message_type == "ping":
+                await chat_service.refresh_online_ttl(user_uuid, role, client_id)
+                await websocket.send_json({"type": "pong"})
+                continue
+
             if not sender_id_str or not sender_role:
                 logger.info("Pesan tanpa user_id atau role: %s", data)
                 continue
@@ -136,7 +138,7 @@ async def chat_ws(
                     target_room_uuid = UUID(target_room_id_str)
                     await redis_client.set(f"room_mode:{target_room_uuid}", new_mode)
                     await websocket.send_json({"success": True, "message": f"Mode diubah ke {new_mode}"})
-                    await chat_service.broadcast_to_room(target_room_uuid, {
+                    await chat_service.broadcast_to_room(db, client_id, target_room_uuid, {
                         "event": "mode_changed",
                         "mode": new_mode,
                         "message": f"Mode percakapan diubah menjadi {new_mode}"
@@ -167,6 +169,10 @@ async def chat_ws(
                             logger.info(f"Mode admin_assist: skip bot reply karena admin baru saja balas.")
                             return
 
+                    # Mode streaming bisa diaktifkan per koneksi (?stream=true) atau per pesan ("stream": true)
+                    if stream:
+                        data.setdefault("stream", True)
+
                     await chat_service.handle_user_message(db, websocket, data, user_uuid, room_uuid, start_time, client_id)
 
                 elif role == "admin":
@@ -212,19 +218,13 @@ async def chat_ws(
         if client:
             if role == "admin":
                 await redis_client.delete(f"admin_room:{user_uuid}:{client_id}")
-                if client_id in active_admin_websockets and user_uuid in active_admin_websockets[client_id]:
-                    await chat_service.mark_offline(user_uuid, role, client_id)
-                    del active_admin_websockets[client_id][user_uuid]
-                    if not active_admin_websockets[client_id]:
-                        del active_admin_websockets[client_id]
+                await chat_service.mark_offline(user_uuid, role, client_id)
+                await ws_fanout.unregister(client_id, role, user_uuid, websocket)
 
             if role in {"user", "chatbot"}:
                 await redis_client.delete(f"{role}_room:{user_uuid}:{client_id}")
-                if client_id in active_user_websockets and user_uuid in active_user_websockets[client_id]:
-                    await chat_service.mark_offline(user_uuid, role, client_id)
-                    del active_user_websockets[client_id][user_uuid]
-                    if not active_user_websockets[client_id]:
-                        del active_user_websockets[client_id]
+                await chat_service.mark_offline(user_uuid, role, client_id)
+                await ws_fanout.unregister(client_id, role, user_uuid, websocket)
 
         if room_uuid and client:
             try:
@@ -238,6 +238,8 @@ async def chat_ws(
 
         if client:
             await chat_service.mark_offline(user_uuid, role, client_id)
+            if user_uuid:
+                await ws_fanout.unregister(client_id, role, user_uuid, websocket)
         ws_active_users.dec()
 
         try:
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+from prometheus_client import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+presence_reaped_total = Counter("presence_reaped_total", "Stale presence entries removed by the reaper")
+presence_heartbeat_errors_total = Counter("presence_heartbeat_errors_total", "Failed presence heartbeat batches")
+
+KEY_PREFIX = "presence"
+# Di luar pola scan reaper (presence:*), karena tipenya hash, bukan sorted set
+CONNECTIONS_PREFIX = "presence_conns"
+
+# Kurangi jumlah koneksi user di semua worker; entry presence baru dihapus saat
+# koneksi terakhir tertutup. Atomik agar tidak balapan dengan mark_online worker lain.
+_RELEASE_SCRIPT = """
+local remaining = redis.call('HINCRBY', KEYS[1], ARGV[1], -tonumber(ARGV[2]))
+if remaining <= 0 then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[2], ARGV[1])
+end
+return remaining
+"""
+
+# Hapus entry yang heartbeat-nya basi beserta hitungan koneksinya (sisa dari worker yang crash)
+_REAP_SCRIPT = """
+local stale = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+for i = 1, #stale, 500 do
+    local part = {unpack(stale, i, math.min(i + 499, #stale))}
+    redis.call('ZREM', KEYS[1], unpack(part))
+    redis.call('HDEL', KEYS[2], unpack(part))
+end
+return #stale
+"""
+
+def _presence_key(client_id, role: str) -> str:
+    return f"{KEY_PREFIX}:{client_id}:{role}s"
+
+def _connections_key(client_id, role: str) -> str:
+    return f"{CONNECTIONS_PREFIX}:{client_id}:{role}s"
+
+class PresenceRegistry:
+    """
+    Status online user/admin berbasis heartbeat di Redis.
+
+    Setiap (client, role) disimpan sebagai sorted set `presence:{client_id}:{role}s`
+    dengan score = epoch heartbeat terakhir. Online berarti heartbeat lebih baru
+    dari ttl_seconds, dicek dengan ZSCORE/ZMSCORE (O(1) per user).
+
+    Node ini me-refresh heartbeat semua socket lokalnya secara berkala, jadi
+    entry dari proses yang crash berhenti diperbarui dan dianggap offline
+    setelah TTL; reaper menghapusnya dari sorted set.
+
+    User yang sama bisa punya beberapa socket di beberapa worker. Jumlahnya
+    dihitung di hash `presence_conns:{client_id}:{role}s`, dan entry presence
+    hanya dihapus saat socket terakhirnya tertutup.
+    """
+    def __init__(self, redis, ttl_seconds: int, heartbeat_interval: float, reap_interval: float):
+        self.redis = redis
+        self.ttl_seconds = ttl_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.reap_interval = reap_interval
+        # Jumlah socket lokal per user, per (client, role)
+        self._local: Dict[Tuple[str, str], Dict[str, int]] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._reaper_task: Optional[asyncio.Task] = None
+        Gauge("presence_local_connections", "Presence entries kept alive by this node").set_function(
+            lambda: sum(len(users) for users in self._local.values())
+        )
+
+    def _cutoff(self) -> float:
+        return time.time() - self.ttl_seconds
+
+    async def start(self):
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+        if self._reaper_task is None or self._reaper_task.done():
+            self._reaper_task = asyncio.create_task(self._reaper_loop())
+        logger.info("[PRESENCE] Heartbeat and reaper started.")
+
+    async def stop(self):
+        for task in (self._heartbeat_task, self._reaper_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._heartbeat_task = None
+        self._reaper_task = None
+
+        # Socket lokal ikut mati bersama proses ini
+        entries = [
+            (client_key, role, user, count)
+            for (client_key, role), users in self._local.items()
+            for user, count in users.items()
+        ]
+        self._local.clear()
+        if entries:
+            pipe = self.redis.pipeline(transaction=False)
+            for client_key, role, user, count in entries:
+                pipe.eval(_RELEASE_SCRIPT, 2, _connections_key(client_key, role), _presence_key(client_key, role), user, count)
+            await pipe.execute()
+
+    async def mark_online(self, client_id: UUID, role: str, user_id: UUID):
+        users = self._local.setdefault((str(client_id), role), {})
+        users[str(user_id)] = users.get(str(user_id), 0) + 1
+        connections_key = _connections_key(client_id, role)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hincrby(connections_key, str(user_id), 1)
+        pipe.expire(connections_key, self.ttl_seconds * 2)
+        await pipe.execute()
+        await self.heartbeat(client_id, role, user_id)
+
+    async def mark_offline(self, client_id: UUID, role: str, user_id: UUID):
+        users = self._local.get((str(client_id), role))
+        if users is None or str(user_id) not in users:
+            return
+        users[str(user_id)] -= 1
+        if users[str(user_id)] <= 0:
+            del users[str(user_id)]
+            if not users:
+                del self._local[(str(client_id), role)]
+        # Masih ada socket user ini (di worker mana pun): biarkan entry; sisanya dibersihkan TTL/reaper
+        await self.redis.eval(
+            _RELEASE_SCRIPT, 2, _connections_key(client_id, role), _presence_key(client_id, role), str(user_id), 1
+        )
+
+    async def heartbeat(self, client_id: UUID, role: str, user_id: UUID):
+        key = _presence_key(client_id, role)
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.zadd(key, {str(user_id): time.time()})
+        # Key tenant yang sudah tidak punya koneksi sama sekali hilang sendiri
+        pipe.expire(key, self.ttl_seconds * 2)
+        await pipe.execute()
+
+    async def is_online(self, client_id: UUID, role: str, user_id: UUID) -> bool:
+        score = await self.redis.zscore(_presence_key(client_id, role), str(user_id))
+        return score is not None and float(score) >= self._cutoff()
+
+    async def online_among(self, client_id: UUID, role: str, user_ids: Iterable[UUID]) -> Dict[UUID, bool]:
+        """Cek banyak user sekaligus dengan satu ZMSCORE."""
+        user_ids = list(user_ids)
+        if not user_ids:
+            return {}
+        scores = await self.redis.zmscore(_presence_key(client_id, role), [str(u) for u in user_ids])
+        cutoff = self._cutoff()
+        return {
+            user_id: score is not None and float(score) >= cutoff
+            for user_id, score in zip(user_ids, scores)
+        }
+
+    async def count_online(self, client_id: UUID, role: str) -> int:
+        return await self.redis.zcount(_presence_key(client_id, role), self._cutoff(), "+inf")
+
+    async def get_all_online(self, client_id: UUID, role: str) -> List[UUID]:
+        members = await self.redis.zrangebyscore(_presence_key(client_id, role), self._cutoff(), "+inf")
+        return [UUID(m.decode() if isinstance(m, bytes) else m) for m in members]
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            if not self._local:
+                continue
+            try:
+                now = time.time()
+                pipe = self.redis.pipeline(transaction=False)
+                for (client_key, role), users in list(self._local.items()):
+                    if not users:
+                        continue
+                    key = _presence_key(client_key, role)
+                    pipe.zadd(key, {user: now for user in users})
+                    pipe.expire(key, self.ttl_seconds * 2)
+                    pipe.expire(_connections_key(client_key, role), self.ttl_seconds * 2)
+                await pipe.execute()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                presence_heartbeat_errors_total.inc()
+                logger.warning(f"[PRESENCE] Heartbeat batch failed: {e}")
+
+    async def _reaper_loop(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                cutoff = self._cutoff()
+                async for key in self.redis.scan_iter(match=f"{KEY_PREFIX}:*", count=500):
+                    key = key.decode() if isinstance(key, bytes) else key
+                    connections_key = CONNECTIONS_PREFIX + key[len(KEY_PREFIX):]
+                    removed = await self.redis.eval(_REAP_SCRIPT, 2, key, connections_key, f"({cutoff}")
+                    if removed:
+                        presence_reaped_total.inc(removed)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"[PRESENCE] Reaper pass failed: {e}")
@@ -1,4 +1,5 @@
 import redis.asyncio as redis
+import redis as redis_sync
 from core.settings import REDIS_HOST, REDIS_PORT
 
 redis_client = redis.Redis(
@@ -7,5 +8,18 @@ redis_client = redis.Redis(
     decode_responses=True 
 )
 
+# Untuk dependency/service sync yang berjalan di threadpool
+sync_redis_client = redis_sync.Redis(
+    host=REDIS_HOST,
+    port=REDIS_PORT,
+    decode_responses=True
+)
+
 def get_redis_client() -> redis.Redis:
-    return redis_client
\ No newline at end of file
+    return redis_client
+
+# Untuk nilai biner (mis. vektor embedding); tanpa decode_responses
+sync_redis_binary_client = redis_sync.Redis(
+    host=REDIS_HOST,
+    port=REDIS_PORT
+)
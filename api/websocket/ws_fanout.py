@@ -0,0 +1,244 @@
+import asyncio
+import json
+import logging
+import uuid
+from typing import Any, Dict, Optional
+from uuid import UUID
+from prometheus_client import Counter
+from starlette.websockets import WebSocket
+from core.settings import WS_SEND_QUEUE_SIZE
+
+logger = logging.getLogger(__name__)
+
+ws_fanout_published_total = Counter("ws_fanout_published_total", "Frames published to Redis for other nodes", ["target"])
+ws_fanout_delivered_total = Counter("ws_fanout_delivered_total", "Frames queued for a local WebSocket", ["source"])
+ws_fanout_dropped_total = Counter("ws_fanout_dropped_total", "Frames dropped because a WebSocket send queue was full")
+ws_fanout_send_errors_total = Counter("ws_fanout_send_errors_total", "Frames that failed to send on a WebSocket")
+
+CHANNEL_PREFIX = "ws"
+
+def _admins_channel(client_id) -> str:
+    return f"{CHANNEL_PREFIX}:{client_id}:admins"
+
+def _user_channel(client_id, user_id) -> str:
+    # Di luar pola client: hanya node yang memegang socket user ini yang subscribe,
+    # sehingga jumlah penerima PUBLISH menunjukkan apakah user benar-benar terhubung
+    return f"{CHANNEL_PREFIX}:user:{client_id}:{user_id}"
+
+def _client_pattern(client_id) -> str:
+    return f"{CHANNEL_PREFIX}:{client_id}:*"
+
+class _SocketSender:
+    """
+    Antrian kirim berukuran tetap untuk satu WebSocket.
+    Socket yang lambat tidak menahan pengirim lain, frame dibuang jika antrian penuh.
+    """
+    def __init__(self, websocket: WebSocket, max_queue_size: int):
+        self.websocket = websocket
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    def offer(self, payload: Dict[str, Any]) -> bool:
+        try:
+            self._queue.put_nowait(payload)
+            return True
+        except asyncio.QueueFull:
+            ws_fanout_dropped_total.inc()
+            return False
+
+    async def _run(self):
+        while True:
+            payload = await self._queue.get()
+            try:
+                await self.websocket.send_json(payload)
+            except Exception as e:
+                ws_fanout_send_errors_total.inc()
+                logger.warning(f"[WS_FANOUT] Failed to send frame: {e}")
+
+    def close(self):
+        self._task.cancel()
+
+class WebSocketFanout:
+    """
+    Fan-out pesan WebSocket antar worker/pod lewat Redis pub/sub.
+
+    Setiap proses memakai satu koneksi pub/sub yang mem-psubscribe pola
+    `ws:{client_id}:*` hanya untuk client yang punya socket lokal, dan
+    men-subscribe `ws:user:{client_id}:{user_id}` untuk setiap user lokal.
+    Pesan dikirim langsung ke socket lokal, dan dipublish ke Redis untuk node
+    lain bila target tidak (hanya) ada di node ini.
+    """
+    def __init__(
+        self,
+        redis,
+        active_admin_websockets: Dict[UUID, Dict[UUID, WebSocket]],
+        active_user_websockets: Dict[UUID, Dict[UUID, WebSocket]],
+        max_queue_size: int = WS_SEND_QUEUE_SIZE
+    ):
+        self.redis = redis
+        self.active_admin_websockets = active_admin_websockets
+        self.active_user_websockets = active_user_websockets
+        self.max_queue_size = max_queue_size
+        self.node_id = uuid.uuid4().hex
+        self._senders: Dict[int, _SocketSender] = {}
+        self._client_refs: Dict[str, int] = {}
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+
+    async def start(self):
+        if self._listener and not self._listener.done():
+            return
+        self._pubsub = self.redis.pubsub()
+        # Channel milik node ini supaya koneksi pub/sub selalu aktif walau belum ada client
+        await self._pubsub.subscribe(f"{CHANNEL_PREFIX}:node:{self.node_id}")
+        for client_key in self._client_refs:
+            await self._pubsub.psubscribe(_client_pattern(client_key))
+        for client_id, users in self.active_user_websockets.items():
+            for user_id in users:
+                await self._pubsub.subscribe(_user_channel(client_id, user_id))
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"[WS_FANOUT] Subscriber started for node {self.node_id}")
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+        for sender in self._senders.values():
+            sender.close()
+        self._senders.clear()
+
+    async def register(self, client_id: UUID, role: str, user_id: UUID, websocket: WebSocket):
+        table = self.active_admin_websockets if role == "admin" else self.active_user_websockets
+        previous = table.setdefault(client_id, {}).get(user_id)
+        if previous is not None:
+            self._drop_sender(previous)
+        table[client_id][user_id] = websocket
+        self._senders[id(websocket)] = _SocketSender(websocket, self.max_queue_size)
+        if role != "admin" and previous is None and self._pubsub is not None:
+            await self._pubsub.subscribe(_user_channel(client_id, user_id))
+
+        if previous is not None:
+            # Socket pengganti memakai slot yang sama; unregister socket lama tidak akan mengurangi hitungan
+            return
+        client_key = str(client_id)
+        self._client_refs[client_key] = self._client_refs.get(client_key, 0) + 1
+        if self._client_refs[client_key] == 1 and self._pubsub is not None:
+            await self._pubsub.psubscribe(_client_pattern(client_key))
+
+    async def unregister(self, client_id: UUID, role: str, user_id: UUID, websocket: WebSocket):
+        table = self.active_admin_websockets if role == "admin" else self.active_user_websockets
+        sockets = table.get(client_id, {})
+        if sockets.get(user_id) is not websocket:
+            return
+        del sockets[user_id]
+        if not sockets:
+            del table[client_id]
+        self._drop_sender(websocket)
+        if role != "admin" and self._pubsub is not None:
+            await self._pubsub.unsubscribe(_user_channel(client_id, user_id))
+
+        client_key = str(client_id)
+        self._client_refs[client_key] = self._client_refs.get(client_key, 1) - 1
+        if self._client_refs[client_key] <= 0:
+            del self._client_refs[client_key]
+            if self._pubsub is not None:
+                await self._pubsub.punsubscribe(_client_pattern(client_key))
+
+    def _drop_sender(self, websocket: WebSocket):
+        sender = self._senders.pop(id(websocket), None)
+        if sender:
+            sender.close()
+
+    def _deliver_local(self, websocket: WebSocket, payload: Dict[str, Any], source: str) -> bool:
+        sender = self._senders.get(id(websocket))
+        if sender and sender.offer(payload):
+            ws_fanout_delivered_total.labels(source=source).inc()
+            return True
+        return False
+
+    def _deliver_admins_local(self, client_id, payload: Dict[str, Any], exclude_admin_id, source: str) -> int:
+        delivered = 0
+        for admin_user_id, ws_conn in list(self.active_admin_websockets.get(client_id, {}).items()):
+            if exclude_admin_id and str(admin_user_id) == str(exclude_admin_id):
+                continue
+            if self._deliver_local(ws_conn, payload, source):
+                delivered += 1
+        return delivered
+
+    async def _publish(self, channel: str, envelope: Dict[str, Any], target: str) -> int:
+        """Publish ke node lain; mengembalikan jumlah subscriber Redis yang menerima."""
+        envelope["origin"] = self.node_id
+        receivers = await self.redis.publish(channel, json.dumps(envelope, default=str))
+        ws_fanout_published_total.labels(target=target).inc()
+        return receivers
+
+    async def send_to_admins(self, client_id: UUID, payload: Dict[str, Any], exclude_admin_id: Optional[UUID] = None) -> int:
+        """Kirim ke semua admin client di semua node. Mengembalikan jumlah admin lokal yang menerima."""
+        delivered = self._deliver_admins_local(client_id, payload, exclude_admin_id, source="local")
+        await self._publish(
+            _admins_channel(client_id),
+            {"payload": payload, "exclude_admin_id": str(exclude_admin_id) if exclude_admin_id else None},
+            target="admins"
+        )
+        return delivered
+
+    async def send_to_user(self, client_id: UUID, user_id: UUID, payload: Dict[str, Any]) -> bool:
+        """
+        Kirim ke satu user; langsung jika socket-nya di node ini, selain itu lewat Redis.
+        Mengembalikan False jika tidak ada node yang memegang socket user tersebut.
+        """
+        websocket = self.active_user_websockets.get(client_id, {}).get(user_id)
+        if websocket is not None:
+            return self._deliver_local(websocket, payload, source="local")
+
+        receivers = await self._publish(_user_channel(client_id, user_id), {"payload": payload}, target="user")
+        return receivers > 0
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") not in ("message", "pmessage"):
+                        continue
+                    self._route(message.get("channel"), message.get("data"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[WS_FANOUT] Subscriber error, retrying: {e}", exc_info=True)
+                await asyncio.sleep(1)
+
+    def _route(self, channel, data):
+        try:
+            envelope = json.loads(data)
+        except (TypeError, ValueError):
+            logger.warning(f"[WS_FANOUT] Invalid frame on {channel}")
+            return
+
+        if envelope.get("origin") == self.node_id:
+            return
+
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        parts = channel.split(":")
+        payload = envelope.get("payload") or {}
+        if len(parts) == 4 and parts[1] == "user":
+            try:
+                client_id, user_id = UUID(parts[2]), UUID(parts[3])
+            except ValueError:
+                return
+            websocket = self.active_user_websockets.get(client_id, {}).get(user_id)
+            if websocket is not None:
+                self._deliver_local(websocket, payload, source="remote")
+        elif len(parts) == 3 and parts[2] == "admins":
+            try:
+                client_id = UUID(parts[1])
+            except ValueError:
+                return
+            self._deliver_admins_local(client_id, payload, envelope.get("exclude_admin_id"), source="remote")
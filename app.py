@@ -10,6 +10,15 @@ from fastapi.staticfiles import StaticFiles
 from exceptions.custom_exceptions import ServiceException
 from starlette.middleware.base import BaseHTTPMiddleware
 from middleware.log_user_activity import log_user_activity  
+from middleware.activity_log_writer import activity_log_writer
+from services.chat_classifier import chat_classifier
+from services.chat_singleton import ws_fanout, presence_registry, chat_persistence
+from services.identity_cache import identity_cache
+from services.fcm_service import push_sender
+from api.jobs.event_loop_monitor import event_loop_lag_monitor
+from api.jobs.embedding_worker import embedding_worker
+from core.settings import THREADPOOL_SIZE, EMBEDDING_WORKER_ENABLED
+import anyio.to_thread
 from middleware.timeout_dependecy import TimeoutMiddleware
 #router
 from api.endpoints.auth_endpoint import router as auth_endpoint
@@ -28,6 +37,7 @@ from api.endpoints.user_activity_log_endpoint import router as user_activity_log
 from api.endpoints.notification_endpoint import router as notification_endpoint
 from api.endpoints.fcm_endpoint import router as fcm_endpoint
 from api.endpoints.website_sources_endpoint import router as web_source_endpoint
+from api.endpoints.embedding_job_endpoint import router as embedding_job_endpoint
 from api.websocket.chat_ws import router as chat_ws
 
 app = FastAPI()
@@ -108,6 +118,7 @@ app.include_router(user_activity_log_endpoint)
 app.include_router(notification_endpoint)
 app.include_router(fcm_endpoint)
 app.include_router(web_source_endpoint)
+app.include_router(embedding_job_endpoint)
 #Daftar route websocket
 app.include_router(chat_ws)
 
@@ -133,6 +144,77 @@ def healthz():
 @app.on_event("startup")
 def startup_event():
     start_scheduler()
+
+@app.on_event("startup")
+async def start_activity_log_writer():
+    activity_log_writer.start()
+
+@app.on_event("shutdown")
+async def stop_activity_log_writer():
+    await activity_log_writer.stop()
+
+@app.on_event("startup")
+async def start_chat_classifier():
+    await chat_classifier.start()
+
+@app.on_event("shutdown")
+async def stop_chat_classifier():
+    await chat_classifier.stop()
+
+@app.on_event("startup")
+async def start_ws_fanout():
+    await ws_fanout.start()
+
+@app.on_event("shutdown")
+async def stop_ws_fanout():
+    await ws_fanout.stop()
+
+@app.on_event("startup")
+async def start_presence_registry():
+    await presence_registry.start()
+
+@app.on_event("shutdown")
+async def stop_presence_registry():
+    await presence_registry.stop()
+
+@app.on_event("startup")
+async def start_identity_cache():
+    await identity_cache.start()
+
+@app.on_event("shutdown")
+async def stop_identity_cache():
+    await identity_cache.stop()
+
+@app.on_event("shutdown")
+async def close_push_sender():
+    await push_sender.close()
+
+@app.on_event("startup")
+async def start_embedding_worker():
+    if EMBEDDING_WORKER_ENABLED:
+        await embedding_worker.start()
+
+@app.on_event("shutdown")
+async def stop_embedding_worker():
+    await embedding_worker.stop()
+
+@app.on_event("startup")
+async def start_chat_persistence():
+    await chat_persistence.start()
+
+@app.on_event("shutdown")
+async def stop_chat_persistence():
+    await chat_persistence.stop()
+
+@app.on_event("startup")
+async def start_event_loop_monitor():
+    # Service sync dijalankan di threadpool, ukurannya disamakan dengan kapasitas pool DB
+    anyio.to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    event_loop_lag_monitor.start()
+
+@app.on_event("shutdown")
+async def stop_event_loop_monitor():
+    await event_loop_lag_monitor.stop()
     
 @app.exception_handler(ServiceException)
 async def service_exception_handler(request: Request, exc: ServiceException):
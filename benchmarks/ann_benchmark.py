@@ -0,0 +1,136 @@
+"""
+Benchmark index ANN pgvector untuk tabel knowledge: exact scan vs HNSW vs IVFFlat.
+
+Membuat tabel sementara di schema `bench` berisi vektor sintetis ter-normalisasi
+yang berkelompok (campuran Gaussian, mirip embedding chunk dokumen yang
+bertopik), lalu untuk tiap ukuran mengukur:
+
+- waktu build index dengan parameter pilihan VectorIndexManager (plan_index);
+- recall@k terhadap exact scan dan latensi median/p95 untuk setiap profil
+  recall client (fast/balanced/accurate -> ef_search / probes dari plan_search).
+
+Query adalah vektor tersimpan yang diberi noise, seperti pertanyaan yang mirip
+dengan isi sebuah chunk.
+
+    python -m benchmarks.ann_benchmark --sizes 10000 100000 --dim 1536 --queries 100
+"""
+import argparse
+import statistics
+import time
+from typing import List, Tuple
+import numpy as np
+from sqlalchemy import text
+from core.config_db import engine
+from services.vector_index_service import RECALL_FACTORS, plan_index, plan_search
+
+INSERT_BATCH = 1000
+
+def _vector_literal(vector: np.ndarray) -> str:
+    return "[" + ",".join(f"{value:.6f}" for value in vector) + "]"
+
+def _synthetic_vectors(size: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.standard_normal((clusters, dim)).astype(np.float32)
+    labels = rng.integers(0, clusters, size)
+    vectors = centers[labels] + 0.35 * rng.standard_normal((size, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+def _queries(vectors: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+    picked = vectors[rng.integers(0, len(vectors), count)]
+    noisy = picked + 0.05 * rng.standard_normal(picked.shape).astype(np.float32)
+    return noisy / np.linalg.norm(noisy, axis=1, keepdims=True)
+
+def _populate(conn, vectors: np.ndarray):
+    dim = vectors.shape[1]
+    conn.execute(text("DROP TABLE IF EXISTS bench.vectors"))
+    conn.execute(text(f"CREATE TABLE bench.vectors (id bigint PRIMARY KEY, embedding vector({dim}) NOT NULL)"))
+    for start in range(0, len(vectors), INSERT_BATCH):
+        conn.execute(
+            text("INSERT INTO bench.vectors (id, embedding) VALUES (:id, CAST(:embedding AS vector))"),
+            [{"id": start + i, "embedding": _vector_literal(v)} for i, v in enumerate(vectors[start:start + INSERT_BATCH])]
+        )
+    conn.execute(text("ANALYZE bench.vectors"))
+
+def _search(conn, queries: List[str], k: int, setting: str = None) -> Tuple[List[List[int]], List[float]]:
+    results, timings = [], []
+    for query in queries:
+        with conn.begin():
+            if setting:
+                conn.execute(text(f"SET LOCAL {setting}"))
+            started = time.perf_counter()
+            rows = conn.execute(
+                text("SELECT id FROM bench.vectors ORDER BY embedding <=> CAST(:q AS vector) LIMIT :k"),
+                {"q": query, "k": k}
+            ).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        results.append([row[0] for row in rows])
+    return results, timings
+
+def _recall(truth: List[List[int]], found: List[List[int]]) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / max(sum(len(t) for t in truth), 1)
+
+def _report(size: int, mode: str, recall: float, timings: List[float], extra: str = ""):
+    timings = sorted(timings)
+    p95 = timings[max(0, int(len(timings) * 0.95) - 1)]
+    print(f"{size:>9} | {mode:<30} | {recall:>7.1%} | {statistics.median(timings):>9.2f} | {p95:>9.2f} | {extra}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--clusters", type=int, default=200)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"dim {args.dim}, {args.queries} queries, recall@{args.k}")
+    print(f"{'rows':>9} | {'mode':<30} | {'recall':>7} | {'median ms':>9} | {'p95 ms':>9} | build")
+    print("-" * 96)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS bench"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
+        conn.commit()
+        try:
+            for size in args.sizes:
+                vectors = _synthetic_vectors(size, args.dim, args.clusters, rng)
+                queries = [_vector_literal(q) for q in _queries(vectors, args.queries, rng)]
+                _populate(conn, vectors)
+                conn.commit()
+
+                truth, timings = _search(conn, queries, args.k)
+                _report(size, "exact scan", 1.0, timings)
+
+                for index_type in ("hnsw", "ivfflat"):
+                    plan = plan_index(size, index_type)
+                    if plan.index_type == "none":
+                        print(f"{size:>9} | {index_type:<30} | below VECTOR_INDEX_MIN_ROWS, manager keeps exact scan")
+                        continue
+                    options = ", ".join(f"{key} = {value}" for key, value in plan.build_params.items())
+                    started = time.perf_counter()
+                    conn.execute(text(
+                        f"CREATE INDEX bench_vectors_ann ON bench.vectors "
+                        f"USING {plan.index_type} (embedding vector_cosine_ops) WITH ({options})"
+                    ))
+                    conn.commit()
+                    build = f"{time.perf_counter() - started:.1f}s ({options})"
+
+                    for recall_profile in RECALL_FACTORS:
+                        search = plan_search(plan, size, recall_profile)
+                        setting = (
+                            f"hnsw.ef_search = {search.ef_search}" if search.ef_search
+                            else f"ivfflat.probes = {search.probes}"
+                        )
+                        found, timings = _search(conn, queries, args.k, setting)
+                        _report(size, f"{index_type} {recall_profile} ({setting.split('.')[1]})",
+                                _recall(truth, found), timings, build)
+                    conn.execute(text("DROP INDEX bench.bench_vectors_ann"))
+                    conn.commit()
+        finally:
+            conn.rollback()
+            conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
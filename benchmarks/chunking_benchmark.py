@@ -0,0 +1,148 @@
+"""
+Benchmark chunker knowledge base: throughput dan kualitas retrieval.
+
+Korpus sintetis meniru dokumen polis: section bernomor, paragraf, dan tabel
+premi. Kode manfaat hanya ada di judul section, sedangkan kalimat "fakta" (batas
+tahunan) ada di tengah paragrafnya, jadi fakta baru bisa dijawab jika chunk
+membawa konteks section-nya. Retrieval memakai BM25 lokal (tanpa API) atas
+chunk, dan dihitung:
+
+- recall@k: chunk berisi kode dan fakta utuh ada di k chunk teratas;
+- intact: persentase fakta yang utuh bersama kodenya di minimal satu chunk;
+- deterministic: dua kali chunking menghasilkan chunk yang sama.
+
+    python -m benchmarks.chunking_benchmark --docs 50 --sections 12
+    python -m benchmarks.chunking_benchmark --pdf polis.pdf --agentic   # AgenticChunking butuh OPENAI_API_KEY
+"""
+import argparse
+import math
+import random
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+from agno.document.base import Document
+from agno.document.chunking.fixed import FixedSizeChunking
+from agno.document.chunking.recursive import RecursiveChunking
+from agents.tools.structured_chunking import StructuredChunking, get_tokenizer
+
+_TOPICS = ["rawat inap", "rawat jalan", "kecelakaan diri", "kendaraan bermotor", "kebakaran rumah",
+           "perjalanan", "jiwa berjangka", "gigi", "kehamilan", "penyakit kritis"]
+_FILLER = [
+    "Ketentuan ini berlaku sepanjang polis masih aktif dan premi telah dibayar lunas.",
+    "Tertanggung wajib menyampaikan dokumen pendukung dalam bentuk asli atau salinan yang dilegalisir.",
+    "Penanggung berhak melakukan verifikasi atas setiap pengajuan sebelum pembayaran dilakukan.",
+    "Apabila terdapat perbedaan penafsiran, maka yang berlaku adalah ketentuan dalam polis induk.",
+    "Masa tunggu dihitung sejak tanggal mulai berlakunya pertanggungan sebagaimana tercantum pada ikhtisar polis.",
+    "Pengajuan yang tidak lengkap akan dikembalikan kepada tertanggung untuk dilengkapi.",
+]
+_WORD = re.compile(r"\w+")
+
+def build_corpus(docs: int, sections: int, seed: int) -> Tuple[List[Document], List[Tuple[str, str, str]]]:
+    rng = random.Random(seed)
+    documents, facts = [], []
+    for d in range(docs):
+        parts = [f"POLIS ASURANSI PRODUK {d + 1}"]
+        for s in range(sections):
+            code = f"M{d:03d}{s:02d}"
+            topic = rng.choice(_TOPICS)
+            limit = rng.randint(1, 500) * 100_000
+            fact = f"Batas tahunan manfaat ini sebesar Rp {limit:,} untuk setiap tertanggung."
+            filler = rng.sample(_FILLER, k=len(_FILLER))
+            position = rng.randint(0, len(filler))
+            body = filler[:position] + [fact] + filler[position:]
+            parts.append(f"{s + 1}. Ketentuan Manfaat {topic.title()} (kode {code})")
+            # Paragraf panjang dipecah beberapa blok seperti teks hasil ekstraksi PDF
+            parts.append(" ".join(body[:4]))
+            parts.append(" ".join(body[4:]))
+            if rng.random() < 0.3:
+                rows = "\n".join(f"| {rng.choice(_TOPICS)} | Rp {rng.randint(1, 90) * 10_000:,} |" for _ in range(rng.randint(3, 12)))
+                parts.append(f"| Manfaat | Premi |\n{rows}")
+            facts.append((f"berapa batas tahunan manfaat {topic} kode {code}", code, fact))
+        documents.append(Document(id=f"doc{d}", name=f"doc{d}", content="\n\n".join(parts)))
+    return documents, facts
+
+class BM25:
+    def __init__(self, texts: List[str], k1: float = 1.5, b: float = 0.75):
+        self.docs = [Counter(_WORD.findall(text.lower())) for text in texts]
+        self.lengths = [sum(doc.values()) for doc in self.docs]
+        self.avg_length = sum(self.lengths) / max(len(self.lengths), 1)
+        df: Dict[str, int] = Counter(term for doc in self.docs for term in doc)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+        self.k1, self.b = k1, b
+
+    def top(self, query: str, k: int) -> List[int]:
+        terms = _WORD.findall(query.lower())
+        scores = []
+        for i, doc in enumerate(self.docs):
+            score = 0.0
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    norm = tf + self.k1 * (1 - self.b + self.b * self.lengths[i] / self.avg_length)
+                    score += self.idf[term] * tf * (self.k1 + 1) / norm
+            scores.append((score, i))
+        return [i for _, i in sorted(scores, reverse=True)[:k]]
+
+def evaluate(name: str, chunker, documents: List[Document], facts: List[Tuple[str, str, str]], k: int):
+    tokenizer = get_tokenizer()
+    started = time.perf_counter()
+    chunks = [chunk.content for doc in documents for chunk in chunker.chunk(doc)]
+    seconds = time.perf_counter() - started
+    deterministic = chunks == [chunk.content for doc in documents for chunk in chunker.chunk(doc)]
+
+    index = BM25(chunks)
+    intact = hits = 0
+    for query, code, fact in facts:
+        if any(code in chunk and fact in chunk for chunk in chunks):
+            intact += 1
+        if any(code in chunks[i] and fact in chunks[i] for i in index.top(query, k)):
+            hits += 1
+    tokens = [tokenizer.count(chunk) for chunk in chunks]
+    print(
+        f"{name:<22} | {len(documents) / seconds:>9.1f} | {len(chunks):>7} | {sum(tokens) / len(tokens):>7.0f} | "
+        f"{max(tokens):>7} | {intact / len(facts):>7.1%} | {hits / len(facts):>9.1%} | {str(deterministic):>6}"
+    )
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=30)
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--chunk-size", type=int, default=500, help="Token untuk StructuredChunking")
+    parser.add_argument("--overlap", type=int, default=50)
+    parser.add_argument("--k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--pdf", nargs="*", default=[], help="PDF tambahan (hanya untuk throughput)")
+    parser.add_argument("--agentic", action="store_true", help="Sertakan AgenticChunking (memanggil LLM)")
+    args = parser.parse_args()
+
+    documents, facts = build_corpus(args.docs, args.sections, args.seed)
+    # Chunker berbasis karakter diberi ukuran setara (~4 karakter per token)
+    chunkers = [
+        (f"structured({args.chunk_size}t)", StructuredChunking(args.chunk_size, args.overlap)),
+        (f"fixed({args.chunk_size * 4}c)", FixedSizeChunking(chunk_size=args.chunk_size * 4, overlap=args.overlap * 4)),
+        (f"recursive({args.chunk_size * 4}c)", RecursiveChunking(chunk_size=args.chunk_size * 4, overlap=args.overlap * 4)),
+    ]
+    if args.agentic:
+        from agno.document.chunking.agentic import AgenticChunking
+        chunkers.append(("agentic", AgenticChunking()))
+
+    print(f"{len(documents)} docs, {len(facts)} facts, recall@{args.k}")
+    print(f"{'chunker':<22} | {'docs/s':>9} | {'chunks':>7} | {'avg tok':>7} | {'max tok':>7} | {'intact':>7} | {'recall@k':>9} | {'determ':>6}")
+    print("-" * 104)
+    for name, chunker in chunkers:
+        evaluate(name, chunker, documents, facts, args.k)
+
+    if args.pdf:
+        from agno.document.reader.pdf_reader import PDFReader
+        pages = [page for path in args.pdf for page in PDFReader(chunk=False).read(path)]
+        print(f"\nPDF throughput ({len(pages)} pages)")
+        for name, chunker in chunkers:
+            started = time.perf_counter()
+            count = sum(len(chunker.chunk(page)) for page in pages)
+            seconds = time.perf_counter() - started
+            print(f"{name:<22} | {len(pages) / seconds:>9.1f} pages/s | {count:>7} chunks")
+
+if __name__ == "__main__":
+    main()
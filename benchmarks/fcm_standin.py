@@ -0,0 +1,132 @@
+"""
+Stand-in lokal untuk endpoint OAuth token Google dan FCM HTTP v1, plus benchmark
+pengiriman push: pola lama (token baru + client baru per pesan, berurutan) vs
+FCMPushSender (token di-cache, client pooled, paralel).
+
+Token device berawalan `invalid-` dijawab 404 UNREGISTERED seperti FCM asli.
+
+    python -m benchmarks.fcm_standin --devices 200 --latency-ms 80
+    python -m benchmarks.fcm_standin --serve --port 8765   # hanya jalankan stand-in
+
+Saat --serve, arahkan aplikasi ke stand-in dengan
+FCM_BASE_URL=http://127.0.0.1:8765 dan FCM_TOKEN_URL=http://127.0.0.1:8765/token.
+"""
+import argparse
+import asyncio
+import threading
+import time
+import httpx
+import uvicorn
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from services.fcm_service import FCMPushSender
+
+def build_standin_app(latency_ms: float) -> FastAPI:
+    app = FastAPI()
+    app.state.token_requests = 0
+    app.state.send_requests = 0
+
+    @app.post("/token")
+    async def token():
+        app.state.token_requests += 1
+        await asyncio.sleep(latency_ms / 1000)
+        return {"access_token": f"standin-{app.state.token_requests}", "expires_in": 3600, "token_type": "Bearer"}
+
+    @app.post("/v1/projects/{project_id}/messages:send")
+    async def send(project_id: str, request: Request):
+        app.state.send_requests += 1
+        await asyncio.sleep(latency_ms / 1000)
+        body = await request.json()
+        device_token = body["message"]["token"]
+        if device_token.startswith("invalid-"):
+            return JSONResponse(status_code=404, content={"error": {
+                "code": 404,
+                "status": "NOT_FOUND",
+                "details": [{"@type": "type.googleapis.com/google.firebase.fcm.v1.FcmError", "errorCode": "UNREGISTERED"}]
+            }})
+        return {"name": f"projects/{project_id}/messages/{app.state.send_requests}"}
+
+    return app
+
+def _start_server(app: FastAPI, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+def _private_key_pem() -> str:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ).decode()
+
+def _configure(sender: FCMPushSender, private_key: str):
+    sender.project_id = "standin"
+    sender.client_email = "standin@example.iam.gserviceaccount.com"
+    sender.private_key = private_key
+
+async def _legacy_send_all(base_url: str, sender: FCMPushSender, tokens):
+    # Meniru FCMService lama: token OAuth dan AsyncClient baru untuk setiap pesan, berurutan
+    for device_token in tokens:
+        assertion = sender._sign_assertion()
+        token_res = httpx.post(f"{base_url}/token", data={"assertion": assertion})
+        access_token = token_res.json()["access_token"]
+        async with httpx.AsyncClient() as client:
+            await client.post(
+                f"{base_url}/v1/projects/{sender.project_id}/messages:send",
+                headers={"Authorization": f"Bearer {access_token}"},
+                json={"message": {"token": device_token, "notification": {"title": "t", "body": "b"}}}
+            )
+
+async def _run_benchmark(base_url: str, devices: int, invalid: int, concurrency: int):
+    private_key = _private_key_pem()
+    tokens = [f"device-{i}" for i in range(devices - invalid)] + [f"invalid-{i}" for i in range(invalid)]
+
+    legacy = FCMPushSender(base_url, f"{base_url}/token", concurrency, timeout=30, refresh_margin=300)
+    _configure(legacy, private_key)
+    started = time.perf_counter()
+    await _legacy_send_all(base_url, legacy, tokens)
+    legacy_seconds = time.perf_counter() - started
+
+    pooled = FCMPushSender(base_url, f"{base_url}/token", concurrency, timeout=30, refresh_margin=300)
+    _configure(pooled, private_key)
+    started = time.perf_counter()
+    results = await pooled.send_many(tokens, "t", "b")
+    pooled_seconds = time.perf_counter() - started
+    await pooled.close()
+
+    print(f"{'mode':<24} | {'devices':>8} | {'seconds':>8}")
+    print("-" * 46)
+    print(f"{'sequential (legacy)':<24} | {devices:>8} | {legacy_seconds:>8.2f}")
+    print(f"{'pooled + concurrent':<24} | {devices:>8} | {pooled_seconds:>8.2f}")
+    print(f"invalid tokens detected: {sum(r.invalid_token for r in results)} / {invalid}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--devices", type=int, default=100)
+    parser.add_argument("--invalid", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--serve", action="store_true", help="Hanya jalankan stand-in sampai dihentikan")
+    args = parser.parse_args()
+
+    app = build_standin_app(args.latency_ms)
+    if args.serve:
+        uvicorn.run(app, host="127.0.0.1", port=args.port)
+        return
+
+    server = _start_server(app, args.port)
+    try:
+        asyncio.run(_run_benchmark(f"http://127.0.0.1:{args.port}", args.devices, args.invalid, args.concurrency))
+        print(f"token endpoint calls: {app.state.token_requests}, send calls: {app.state.send_requests}")
+    finally:
+        server.should_exit = True
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark pencarian chat history: LIKE lama vs full-text + trigram (utils/search_utils.py).
+
+Membuat tabel sementara di schema `bench`, mengisinya dengan pesan sintetis
+pada beberapa ukuran, lalu mengukur latensi median/p95 untuk tiap mode.
+
+    python -m benchmarks.search_benchmark --sizes 10000 100000 1000000 --runs 20
+"""
+import argparse
+import statistics
+import time
+import uuid
+from sqlalchemy import Column, DateTime, MetaData, String, Table, Uuid, cast, desc, func, or_, select, text
+from core.config_db import engine
+from utils.search_utils import SearchQuery
+
+metadata = MetaData(schema="bench")
+bench_chats = Table(
+    "chats",
+    metadata,
+    Column("id", Uuid, primary_key=True),
+    Column("client_id", Uuid, nullable=False),
+    Column("sender_id", Uuid, nullable=False),
+    Column("message", String, nullable=False),
+    Column("created_at", DateTime(timezone=True), nullable=False),
+)
+
+WORDS = [
+    "pesanan", "refund", "pengiriman", "alamat", "invoice", "produk", "garansi", "akun",
+    "password", "pembayaran", "promo", "voucher", "stok", "retur", "komplain", "jadwal",
+]
+
+def _populate(conn, size: int, client_id: uuid.UUID):
+    conn.execute(text("DROP TABLE IF EXISTS bench.chats"))
+    metadata.create_all(conn)
+    words = "ARRAY[" + ",".join(f"'{w}'" for w in WORDS) + "]"
+    conn.execute(text(f"""
+        INSERT INTO bench.chats (id, client_id, sender_id, message, created_at)
+        SELECT
+            gen_random_uuid(),
+            :client_id,
+            gen_random_uuid(),
+            'halo saya mau tanya soal ' || ({words})[1 + (i % 16)] || ' nomor ' || i
+                || ' dan ' || ({words})[1 + ((i * 7) % 16)],
+            now() - (i || ' seconds')::interval
+        FROM generate_series(1, :size) AS i
+    """), {"client_id": client_id, "size": size})
+    conn.execute(text("CREATE INDEX ON bench.chats (client_id, created_at)"))
+    conn.execute(text("ANALYZE bench.chats"))
+
+def _create_search_indexes(conn):
+    conn.execute(text("CREATE INDEX ON bench.chats USING gin (to_tsvector('simple', coalesce(message, '')))"))
+    conn.execute(text("CREATE INDEX ON bench.chats USING gin (message gin_trgm_ops)"))
+    conn.execute(text("CREATE INDEX ON bench.chats (sender_id)"))
+    conn.execute(text("ANALYZE bench.chats"))
+
+def _legacy_query(client_id, term):
+    pattern = f"%{term.lower()}%"
+    return (
+        select(bench_chats.c.id)
+        .where(
+            bench_chats.c.client_id == client_id,
+            or_(
+                func.lower(bench_chats.c.message).like(pattern),
+                func.lower(cast(bench_chats.c.sender_id, String)).like(pattern)
+            )
+        )
+        .order_by(desc(bench_chats.c.created_at))
+        .limit(20)
+    )
+
+def _search_query(client_id, term):
+    search = SearchQuery(term=term, fulltext_columns=[bench_chats.c.message], uuid_columns=[bench_chats.c.sender_id])
+    return (
+        select(bench_chats.c.id)
+        .where(bench_chats.c.client_id == client_id, search.filter())
+        .order_by(search.rank().desc(), desc(bench_chats.c.created_at))
+        .limit(20)
+    )
+
+def _measure(conn, stmt, runs: int):
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        conn.execute(stmt).fetchall()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[max(0, int(len(timings) * 0.95) - 1)]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--term", default="garansi nomor 4242")
+    args = parser.parse_args()
+
+    client_id = uuid.uuid4()
+    print(f"{'rows':>10} | {'mode':<18} | {'median ms':>10} | {'p95 ms':>10}")
+    print("-" * 58)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE SCHEMA IF NOT EXISTS bench"))
+        conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        conn.commit()
+        try:
+            for size in args.sizes:
+                _populate(conn, size, client_id)
+                conn.commit()
+                results = [("like (no index)", _measure(conn, _legacy_query(client_id, args.term), args.runs))]
+                _create_search_indexes(conn)
+                conn.commit()
+                results.append(("like (indexed)", _measure(conn, _legacy_query(client_id, args.term), args.runs)))
+                results.append(("fts + trgm", _measure(conn, _search_query(client_id, args.term), args.runs)))
+                for mode, (median, p95) in results:
+                    print(f"{size:>10} | {mode:<18} | {median:>10.2f} | {p95:>10.2f}")
+        finally:
+            conn.execute(text("DROP SCHEMA IF EXISTS bench CASCADE"))
+            conn.commit()
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,19 @@
-from core.settings import URL_DB_POSTGRES
+from core.settings import (
+    URL_DB_POSTGRES,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING
+)
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
 from sqlalchemy.orm import declarative_base, sessionmaker
+from prometheus_client import Counter, Gauge, Histogram
+import time
 
 Base = declarative_base() 
 
@@ -26,17 +37,61 @@ async def get_db():
 async def init_db():
     async with async_engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
-        
+
+# === Metrics pool koneksi sync (diekspos lewat /metrics Instrumentator) ===
+db_pool_checkout_wait_seconds = Histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time spent waiting to check out a connection from the sync DB pool",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+)
+db_pool_checkouts_total = Counter("db_pool_checkouts_total", "Total connections checked out from the sync DB pool")
+db_pool_checkout_timeouts_total = Counter("db_pool_checkout_timeouts_total", "Checkouts that timed out waiting for the sync DB pool")
+db_pool_connections_created_total = Counter("db_pool_connections_created_total", "New DBAPI connections opened by the sync DB pool")
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool yang mencatat lama menunggu checkout koneksi."""
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            db_pool_checkout_timeouts_total.inc()
+            raise
+        finally:
+            db_pool_checkout_wait_seconds.observe(time.perf_counter() - start)
+
+# Satu engine per proses, dipakai ulang oleh semua dependency dan helper sync
+engine = create_engine(
+    URL_DB_POSTGRES,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+
+@event.listens_for(engine, "checkout")
+def _on_checkout(dbapi_connection, connection_record, connection_proxy):
+    db_pool_checkouts_total.inc()
+
+@event.listens_for(engine, "connect")
+def _on_connect(dbapi_connection, connection_record):
+    db_pool_connections_created_total.inc()
+
+Gauge("db_pool_size", "Configured size of the sync DB pool").set_function(lambda: engine.pool.size())
+Gauge("db_pool_checked_out", "Connections currently checked out of the sync DB pool").set_function(lambda: engine.pool.checkedout())
+Gauge("db_pool_checked_in", "Idle connections currently in the sync DB pool").set_function(lambda: engine.pool.checkedin())
+Gauge("db_pool_overflow", "Current overflow of the sync DB pool").set_function(lambda: engine.pool.overflow())
     
 def config_db():
 
-    engine = create_engine(URL_DB_POSTGRES)
-    SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
-
     db = SessionLocal()
 
     try:
         yield db
 
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
@@ -34,4 +34,78 @@ FIREBASE_CONFIG = os.getenv("FIREBASE_CONFIG")
 REDIS_HOST = os.getenv("REDIS_HOST")
 REDIS_PORT = os.getenv("REDIS_PORT") 
 CLIENT_ID_BRINS = os.getenv("CLIENT_ID_BRINS")
-CLIENT_ID_TALKVERA = os.getenv("CLIENT_ID_TALKVERA")
\ No newline at end of file
+CLIENT_ID_TALKVERA = os.getenv("CLIENT_ID_TALKVERA")
+AGENT_POOL_TTL_SECONDS = int(os.getenv("AGENT_POOL_TTL_SECONDS", "300"))
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+ACTIVITY_LOG_QUEUE_SIZE = int(os.getenv("ACTIVITY_LOG_QUEUE_SIZE", "10000"))
+ACTIVITY_LOG_BATCH_SIZE = int(os.getenv("ACTIVITY_LOG_BATCH_SIZE", "200"))
+ACTIVITY_LOG_FLUSH_INTERVAL = float(os.getenv("ACTIVITY_LOG_FLUSH_INTERVAL", "2"))
+ACTIVITY_LOG_SAMPLE_RATE = float(os.getenv("ACTIVITY_LOG_SAMPLE_RATE", "1"))
+ACTIVITY_LOG_MAX_PAYLOAD_BYTES = int(os.getenv("ACTIVITY_LOG_MAX_PAYLOAD_BYTES", "16384"))
+CLASSIFICATION_MODEL = os.getenv("CLASSIFICATION_MODEL", "gpt-4o")
+CLASSIFICATION_QUEUE_SIZE = int(os.getenv("CLASSIFICATION_QUEUE_SIZE", "5000"))
+CLASSIFICATION_BATCH_SIZE = int(os.getenv("CLASSIFICATION_BATCH_SIZE", "20"))
+CLASSIFICATION_FLUSH_INTERVAL = float(os.getenv("CLASSIFICATION_FLUSH_INTERVAL", "5"))
+CLASSIFICATION_CACHE_SIZE = int(os.getenv("CLASSIFICATION_CACHE_SIZE", "10000"))
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", "256"))
+# Default sama dengan kapasitas pool DB, supaya thread tidak antre menunggu koneksi (QueuePool timeout)
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+CHAT_ROLLUP_INTERVAL_MINUTES = int(os.getenv("CHAT_ROLLUP_INTERVAL_MINUTES", "5"))
+CHAT_ROLLUP_LOOKBACK_HOURS = int(os.getenv("CHAT_ROLLUP_LOOKBACK_HOURS", "2"))
+PRESENCE_TTL_SECONDS = int(os.getenv("PRESENCE_TTL_SECONDS", "30"))
+PRESENCE_HEARTBEAT_INTERVAL = float(os.getenv("PRESENCE_HEARTBEAT_INTERVAL", "10"))
+PRESENCE_REAP_INTERVAL = float(os.getenv("PRESENCE_REAP_INTERVAL", "60"))
+CHAT_WRITE_BEHIND_ENABLED = os.getenv("CHAT_WRITE_BEHIND_ENABLED", "false").lower() == "true"
+CHAT_WRITE_BEHIND_QUEUE_SIZE = int(os.getenv("CHAT_WRITE_BEHIND_QUEUE_SIZE", "5000"))
+CHAT_WRITE_BEHIND_BATCH_SIZE = int(os.getenv("CHAT_WRITE_BEHIND_BATCH_SIZE", "200"))
+CHAT_WRITE_BEHIND_FLUSH_INTERVAL = float(os.getenv("CHAT_WRITE_BEHIND_FLUSH_INTERVAL", "0.2"))
+CHAT_WRITE_BEHIND_STREAM = os.getenv("CHAT_WRITE_BEHIND_STREAM", "chat:write_behind")
+IDENTITY_CACHE_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_TTL_SECONDS", "300"))
+IDENTITY_CACHE_LOCAL_TTL_SECONDS = int(os.getenv("IDENTITY_CACHE_LOCAL_TTL_SECONDS", "30"))
+IDENTITY_CACHE_SIZE = int(os.getenv("IDENTITY_CACHE_SIZE", "10000"))
+IDENTITY_CACHE_CHANNEL = os.getenv("IDENTITY_CACHE_CHANNEL", "auth:identity:invalidate")
+FCM_BASE_URL = os.getenv("FCM_BASE_URL", "https://fcm.googleapis.com")
+FCM_TOKEN_URL = os.getenv("FCM_TOKEN_URL", "https://oauth2.googleapis.com/token")
+FCM_MAX_CONCURRENCY = int(os.getenv("FCM_MAX_CONCURRENCY", "50"))
+FCM_TIMEOUT_SECONDS = float(os.getenv("FCM_TIMEOUT_SECONDS", "10"))
+FCM_TOKEN_REFRESH_MARGIN_SECONDS = int(os.getenv("FCM_TOKEN_REFRESH_MARGIN_SECONDS", "300"))
+NOTIFICATION_DEBOUNCE_SECONDS = int(os.getenv("NOTIFICATION_DEBOUNCE_SECONDS", "60"))
+EMBEDDING_WORKER_ENABLED = os.getenv("EMBEDDING_WORKER_ENABLED", "true").lower() == "true"
+EMBEDDING_WORKER_CONCURRENCY = int(os.getenv("EMBEDDING_WORKER_CONCURRENCY", "2"))
+EMBEDDING_JOB_TENANT_CONCURRENCY = int(os.getenv("EMBEDDING_JOB_TENANT_CONCURRENCY", "1"))
+EMBEDDING_JOB_BATCH_PAGES = int(os.getenv("EMBEDDING_JOB_BATCH_PAGES", "10"))
+EMBEDDING_JOB_MAX_ATTEMPTS = int(os.getenv("EMBEDDING_JOB_MAX_ATTEMPTS", "5"))
+EMBEDDING_JOB_POLL_INTERVAL = float(os.getenv("EMBEDDING_JOB_POLL_INTERVAL", "2"))
+EMBEDDING_JOB_STALE_SECONDS = int(os.getenv("EMBEDDING_JOB_STALE_SECONDS", "300"))
+EMBEDDING_JOB_RETRY_BACKOFF_SECONDS = int(os.getenv("EMBEDDING_JOB_RETRY_BACKOFF_SECONDS", "30"))
+WEB_RECRAWL_INTERVAL_HOURS = int(os.getenv("WEB_RECRAWL_INTERVAL_HOURS", "24"))
+BLOB_STORE_BACKEND = os.getenv("BLOB_STORE_BACKEND", "local").lower()
+BLOB_STORE_LOCAL_ROOT = os.getenv("BLOB_STORE_LOCAL_ROOT", "resources/blobs")
+BLOB_S3_ENDPOINT_URL = os.getenv("BLOB_S3_ENDPOINT_URL")
+BLOB_S3_BUCKET = os.getenv("BLOB_S3_BUCKET", "knowledge-files")
+BLOB_S3_ACCESS_KEY = os.getenv("BLOB_S3_ACCESS_KEY")
+BLOB_S3_SECRET_KEY = os.getenv("BLOB_S3_SECRET_KEY")
+BLOB_S3_REGION = os.getenv("BLOB_S3_REGION", "us-east-1")
+FILE_UPLOAD_MAX_BYTES = int(os.getenv("FILE_UPLOAD_MAX_BYTES", str(10 * 1024 * 1024)))
+FILE_UPLOAD_MAX_FILES = int(os.getenv("FILE_UPLOAD_MAX_FILES", "10"))
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+EMBEDDING_CACHE_LOCAL_SIZE = int(os.getenv("EMBEDDING_CACHE_LOCAL_SIZE", "5000"))
+EMBEDDING_CACHE_LOCAL_TTL_SECONDS = int(os.getenv("EMBEDDING_CACHE_LOCAL_TTL_SECONDS", "3600"))
+EMBEDDING_CACHE_DTYPE = os.getenv("EMBEDDING_CACHE_DTYPE", "float32").lower()
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "false").lower() == "true"
+ANSWER_CACHE_SIMILARITY_THRESHOLD = float(os.getenv("ANSWER_CACHE_SIMILARITY_THRESHOLD", "0.95"))
+ANSWER_CACHE_HISTORY_THRESHOLD = float(os.getenv("ANSWER_CACHE_HISTORY_THRESHOLD", "0.98"))
+ANSWER_CACHE_TTL_SECONDS = int(os.getenv("ANSWER_CACHE_TTL_SECONDS", "86400"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "2000"))
+ANSWER_CACHE_HISTORY_WINDOW_SECONDS = int(os.getenv("ANSWER_CACHE_HISTORY_WINDOW_SECONDS", "900"))
+VECTOR_INDEX_MIN_ROWS = int(os.getenv("VECTOR_INDEX_MIN_ROWS", "5000"))
+VECTOR_INDEX_REBUILD_GROWTH = float(os.getenv("VECTOR_INDEX_REBUILD_GROWTH", "2.0"))
+VECTOR_INDEX_MAINTENANCE_WORK_MEM = os.getenv("VECTOR_INDEX_MAINTENANCE_WORK_MEM", "512MB")
+VECTOR_INDEX_INTERVAL_MINUTES = int(os.getenv("VECTOR_INDEX_INTERVAL_MINUTES", "30"))
+VECTOR_SEARCH_CANDIDATES = int(os.getenv("VECTOR_SEARCH_CANDIDATES", "40"))
+REPORT_EXPORT_BATCH_ROWS = int(os.getenv("REPORT_EXPORT_BATCH_ROWS", "5000"))
@@ -13,7 +13,14 @@ from .notification_model import Notification
 from .user_activity_log_model import UserActivityLog
 from .user_model import User
 from .web_source_model import WebSourceModel
+from .chat_rollup_model import ChatMetricsHourly, ChatCategoryDaily
+from .embedding_job_model import EmbeddingJob
+from .knowledge_manifest_model import KnowledgeManifest
+from .answer_cache_model import AnswerCacheEntry
+from .vector_index_model import VectorIndexState
 
 __all__ = ["Client", "RoomConversation", "Member", "Chat", "UserIds", "Prompt", "FileModel",
            "CustomerFeedback", "CustomerInteraction", "Customer", "KnowledgeBaseConfigModel",
-           "Notification", "UserActivityLog", "User", "WebSourceModel"]
\ No newline at end of file
+           "Notification", "UserActivityLog", "User", "WebSourceModel", "ChatMetricsHourly",
+           "ChatCategoryDaily", "EmbeddingJob", "KnowledgeManifest", "AnswerCacheEntry",
+           "VectorIndexState"]
\ No newline at end of file
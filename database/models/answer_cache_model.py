@@ -0,0 +1,29 @@
+from sqlalchemy import Column, DateTime, Integer, Text, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from pgvector.sqlalchemy import Vector
+import uuid
+from database.base import Base
+
+class AnswerCacheEntry(Base):
+    """
+    Jawaban bot yang bisa dipakai ulang untuk pertanyaan yang mirip secara
+    semantik dalam satu client. Seluruh entri client dihapus saat prompt atau
+    knowledge base client berubah.
+    """
+    __tablename__ = "dt_answer_cache"
+    __table_args__ = (
+        Index("ix_dt_answer_cache_client_last_hit", "client_id", "last_hit_at"),
+        {"schema": "ai"}
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
+    query_text = Column(Text, nullable=False)
+    query_embedding = Column(Vector(1536), nullable=False)
+    answer = Column(Text, nullable=False)
+    source_chat_id = Column(UUID(as_uuid=True))
+    hits = Column(Integer, nullable=False, default=0, server_default="0")
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    last_hit_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    expires_at = Column(DateTime(timezone=True), nullable=False)
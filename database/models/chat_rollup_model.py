@@ -0,0 +1,34 @@
+from sqlalchemy import Column, DateTime, Date, String, Integer, BigInteger, Float, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from database.base import Base
+
+class ChatMetricsHourly(Base):
+    """Agregat dt_chats per client per jam, dipakai oleh endpoint /stats/*."""
+    __tablename__ = "dt_chat_metrics_hourly"
+    __table_args__ = (
+        PrimaryKeyConstraint("client_id", "bucket_start"),
+        {"schema": "ai"}
+    )
+
+    client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
+    bucket_start = Column(DateTime(timezone=True), nullable=False)
+    chat_count = Column(Integer, nullable=False, default=0)
+    total_tokens = Column(BigInteger, nullable=False, default=0)
+    latency_sum_seconds = Column(Float, nullable=False, default=0)
+    latency_count = Column(Integer, nullable=False, default=0)
+    escalation_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+class ChatCategoryDaily(Base):
+    """Jumlah kategori jawaban agent per client per hari."""
+    __tablename__ = "dt_chat_category_daily"
+    __table_args__ = (
+        PrimaryKeyConstraint("client_id", "day", "category"),
+        {"schema": "ai"}
+    )
+
+    client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
+    day = Column(Date, nullable=False)
+    category = Column(String(255), nullable=False)
+    chat_count = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
@@ -0,0 +1,48 @@
+from sqlalchemy import Column, DateTime, String, Integer, Text, JSON, ForeignKey, Index, text
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+import uuid
+from database.base import Base
+
+class EmbeddingJob(Base):
+    """
+    Satu job embedding per dokumen (file upload atau website source).
+
+    Progress dicatat per halaman sumber (completed_pages); job yang gagal atau
+    ditinggal worker dilanjutkan dari halaman terakhir yang sudah tersimpan.
+    """
+    __tablename__ = "dt_embedding_jobs"
+    __table_args__ = (
+        Index("ix_dt_embedding_jobs_claim", "run_after", postgresql_where=text("status = 'queued'")),
+        Index("ix_dt_embedding_jobs_client_created", "client_id", "created_at"),
+        Index("ix_dt_embedding_jobs_source", "source_type", "source_id"),
+        # Satu job queued/running per sumber, juga saat dua request enqueue bersamaan
+        Index(
+            "ux_dt_embedding_jobs_active_source", "source_type", "source_id",
+            unique=True, postgresql_where=text("status IN ('queued', 'running')")
+        ),
+        {"schema": "ai"}
+    )
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
+    source_type = Column(String(20), nullable=False)  # file | website
+    source_id = Column(UUID(as_uuid=True), nullable=False)
+    source_name = Column(Text, nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued | running | completed | failed | cancelled
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    total_pages = Column(Integer)
+    completed_pages = Column(Integer, nullable=False, default=0)
+    # Hash chunk dari halaman yang sudah selesai, agar job yang dilanjutkan tahu chunk mana yang masih dipakai
+    chunk_hashes = Column(JSON, nullable=False, default=list)
+    last_error = Column(Text)
+    locked_by = Column(String(100))
+    heartbeat_at = Column(DateTime(timezone=True))
+    run_after = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+
+    def __repr__(self):
+        return f"<EmbeddingJob(id={self.id}, source={self.source_type}:{self.source_name}, status={self.status})>"
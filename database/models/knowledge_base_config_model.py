@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, UUID
+from sqlalchemy import Column, Integer, ForeignKey, UUID, String
 from database.base import Base
 
 class KnowledgeBaseConfigModel(Base):
@@ -8,4 +8,10 @@ class KnowledgeBaseConfigModel(Base):
     client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
     chunk_size = Column(Integer, nullable=False)
     overlap = Column(Integer, nullable=False)
-    num_documents = Column(Integer, nullable=False)
\ No newline at end of file
+    num_documents = Column(Integer, nullable=False)
+    # "structured" (StructuredChunking, chunk_size/overlap dalam token) atau "agentic" (LLM)
+    chunking_strategy = Column(String(20), nullable=False, default="structured", server_default="structured")
+    # Index ANN tabel vector: "auto" (HNSW setelah VECTOR_INDEX_MIN_ROWS baris), "hnsw", "ivfflat", "none"
+    vector_index_type = Column(String(20), nullable=False, default="auto", server_default="auto")
+    # Trade-off recall vs latensi pencarian (ef_search / probes): "fast", "balanced", "accurate"
+    vector_search_recall = Column(String(20), nullable=False, default="balanced", server_default="balanced")
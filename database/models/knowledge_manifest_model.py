@@ -0,0 +1,27 @@
+from sqlalchemy import Column, DateTime, String, Text, JSON, ForeignKey, PrimaryKeyConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from database.base import Base
+
+class KnowledgeManifest(Base):
+    """
+    Sidik jari dokumen knowledge base per client: hash konten, hash tiap chunk yang
+    sudah ada di vector DB, dan model embedding yang dipakai. Worker embedding
+    memakainya untuk hanya meng-embed chunk yang berubah.
+    """
+    __tablename__ = "dt_knowledge_manifest"
+    __table_args__ = (
+        PrimaryKeyConstraint("client_id", "source_type", "source_id"),
+        {"schema": "ai"}
+    )
+
+    client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
+    source_type = Column(String(20), nullable=False)
+    source_id = Column(UUID(as_uuid=True), nullable=False)
+    source_name = Column(Text, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+    chunk_hashes = Column(JSON, nullable=False, default=list)
+    embedding_model = Column(String(255), nullable=False)
+    etag = Column(Text)
+    last_modified = Column(Text)
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
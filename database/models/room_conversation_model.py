@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Uuid, Boolean, UUID, ForeignKey
+from sqlalchemy import Column, String, DateTime, Uuid, Boolean, UUID, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database.base import Base
 import uuid
@@ -16,8 +16,20 @@ class RoomConversation(Base):
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     agent_active = Column(Boolean, default=True, nullable=False)
+    # Denormalisasi pesan terakhir, di-update oleh ChatService.save_chat_history
+    last_message_id = Column(Uuid)
+    last_message = Column(String)
+    last_message_at = Column(DateTime(timezone=True))
     members = relationship("Member", back_populates="room_conversation", cascade="all, delete-orphan")
     chats = relationship("Chat", back_populates="room_conversation", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<RoomConversation(id='{self.id}', name='{self.name}', status='{self.status}')>"
+
+Index(
+    "ix_dt_room_conversation_inbox",
+    RoomConversation.client_id,
+    RoomConversation.status,
+    RoomConversation.last_message_at.desc(),
+    RoomConversation.id.desc()
+)
@@ -1,4 +1,5 @@
 from sqlalchemy import Column, String, LargeBinary, TIMESTAMP, func, BigInteger, ForeignKey, Integer
+from sqlalchemy.orm import deferred
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
 from database.base import Base
@@ -11,7 +12,11 @@ class FileModel(Base):
     uuid_file = Column(UUID(as_uuid=True), unique=True, nullable=False)
     filename = Column(String, nullable=False)
     content_type = Column(String, nullable=False)
-    content = Column(LargeBinary, nullable=False)
+    # Isi file ada di blob store (services/blob_store.py); content hanya terisi untuk
+    # baris lama yang belum dipindah oleh utils/migrate_file_blobs.py
+    content = deferred(Column(LargeBinary, nullable=True))
+    blob_key = Column(String(100), nullable=True)
+    sha256 = Column(String(64), nullable=True, index=True)
     size = Column(BigInteger, nullable=False)
     uploaded_at = Column(TIMESTAMP, server_default=func.now())
     status = Column(String(50), nullable=False, default="pending")
@@ -0,0 +1,25 @@
+from sqlalchemy import Column, DateTime, String, Integer, BigInteger, JSON, ForeignKey
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.sql import func
+from database.base import Base
+
+class VectorIndexState(Base):
+    """
+    Index ANN yang sedang aktif di satu tabel PgVector client, beserta parameter
+    build dan jumlah baris saat dibangun. VectorIndexManager membandingkannya
+    dengan rencana terbaru untuk memutuskan apakah index perlu dibangun ulang.
+    """
+    __tablename__ = "dt_vector_index"
+    __table_args__ = {"schema": "ai"}
+
+    table_name = Column(String(255), primary_key=True)
+    client_id = Column(UUID(as_uuid=True), ForeignKey("ai.ms_clients.id", ondelete="CASCADE"), nullable=False)
+    # hnsw | ivfflat | none (tabel kecil: exact scan)
+    index_type = Column(String(20), nullable=False)
+    index_name = Column(String(63))
+    build_params = Column(JSON, nullable=False, default=dict)
+    generation = Column(Integer, nullable=False, default=0)
+    built_rows = Column(BigInteger, nullable=False, default=0)
+    row_count = Column(BigInteger, nullable=False, default=0)
+    built_at = Column(DateTime(timezone=True))
+    checked_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
@@ -0,0 +1,181 @@
+import asyncio
+import datetime
+import json
+import logging
+import uuid
+from dataclasses import dataclass
+from typing import Any, List, Optional
+import jwt
+from prometheus_client import Counter, Gauge
+from sqlalchemy import insert
+from core.config_db import AsyncSessionLocal
+from core.settings import (
+    ALGORITHM,
+    SECRET_KEY_ADMIN,
+    ACTIVITY_LOG_QUEUE_SIZE,
+    ACTIVITY_LOG_BATCH_SIZE,
+    ACTIVITY_LOG_FLUSH_INTERVAL,
+    ACTIVITY_LOG_MAX_PAYLOAD_BYTES
+)
+from database.models.user_activity_log_model import UserActivityLog
+
+logger = logging.getLogger(__name__)
+
+activity_log_enqueued_total = Counter("activity_log_enqueued_total", "User activity log entries accepted into the write queue")
+activity_log_dropped_total = Counter("activity_log_dropped_total", "User activity log entries dropped because the write queue was full")
+activity_log_written_total = Counter("activity_log_written_total", "User activity log entries written to the database")
+activity_log_failed_total = Counter("activity_log_failed_total", "User activity log entries lost because a bulk insert failed")
+
+@dataclass
+class ActivityLogEntry:
+    """
+    Data mentah satu request. Decode JWT dan JSON dilakukan di worker,
+    bukan di jalur request.
+    """
+    client_id: Any
+    endpoint: str
+    method: str
+    status_code: int
+    timestamp: datetime.datetime
+    auth_token: Optional[str] = None
+    request_body: Optional[bytes] = None
+    request_size: Optional[int] = None
+    response_body: Optional[bytes] = None
+    response_size: Optional[int] = None
+
+def _decode_payload(body: Optional[bytes], size: Optional[int], max_bytes: int) -> Optional[Any]:
+    if body is None and not size:
+        return None
+
+    if size is not None and size > max_bytes:
+        return {"truncated": True, "size": size}
+
+    try:
+        return json.loads(body.decode("utf-8")) if body else None
+    except Exception:
+        return None
+
+def _decode_user_id(token: Optional[str]) -> Optional[uuid.UUID]:
+    if not token:
+        return None
+    try:
+        payload = jwt.decode(token, SECRET_KEY_ADMIN, algorithms=[ALGORITHM])
+        raw_user_id = payload.get("user_id") or payload.get("sub")
+        return uuid.UUID(raw_user_id) if raw_user_id else None
+    except Exception as e:
+        logger.debug(f"[ACTIVITY_LOG] JWT decode error: {e}")
+        return None
+
+class ActivityLogWriter:
+    """
+    Antrian in-process berukuran tetap untuk UserActivityLog.
+
+    Middleware hanya memanggil enqueue() (non-blocking); task background
+    menulis ke database dengan bulk INSERT setiap batch_size entry atau
+    setiap flush_interval detik, mana yang lebih dulu.
+    """
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float, max_payload_bytes: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_payload_bytes = max_payload_bytes
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+        Gauge("activity_log_queue_depth", "User activity log entries waiting to be written").set_function(self._queue.qsize)
+
+    def enqueue(self, entry: ActivityLogEntry) -> bool:
+        try:
+            self._queue.put_nowait(entry)
+            activity_log_enqueued_total.inc()
+            return True
+        except asyncio.QueueFull:
+            activity_log_dropped_total.inc()
+            return False
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            logger.info("[ACTIVITY_LOG] Background writer started.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing:
+            # Batch yang sedang ditulis saat task dibatalkan dibiarkan selesai
+            await self._flushing
+            self._flushing = None
+
+        # Flush sisa antrian sebelum proses berhenti
+        remaining: List[ActivityLogEntry] = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i:i + self.batch_size])
+        logger.info(f"[ACTIVITY_LOG] Background writer stopped, flushed {len(remaining)} pending entries.")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                await self._flush_shielded(batch)
+                raise
+
+            await self._flush_shielded(batch)
+
+    async def _flush_shielded(self, batch: List[ActivityLogEntry]):
+        # Batch sudah keluar dari antrian, jadi cancel saat shutdown tidak boleh memutus insert-nya;
+        # flush tetap berjalan sebagai task sendiri dan ditunggu oleh stop()
+        self._flushing = asyncio.create_task(self._flush(batch))
+        await asyncio.shield(self._flushing)
+        self._flushing = None
+
+    def _to_row(self, entry: ActivityLogEntry) -> dict:
+        return {
+            "id": uuid.uuid4(),
+            "user_id": _decode_user_id(entry.auth_token),
+            "client_id": entry.client_id,
+            "endpoint": entry.endpoint,
+            "method": entry.method,
+            "request_data": _decode_payload(entry.request_body, entry.request_size, self.max_payload_bytes),
+            "response_data": _decode_payload(entry.response_body, entry.response_size, self.max_payload_bytes),
+            "status_code": entry.status_code,
+            "timestamp": entry.timestamp,
+        }
+
+    async def _flush(self, batch: List[ActivityLogEntry]):
+        if not batch:
+            return
+
+        rows = [self._to_row(entry) for entry in batch]
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(UserActivityLog), rows)
+                await db.commit()
+            activity_log_written_total.inc(len(rows))
+            logger.debug(f"[ACTIVITY_LOG] Flushed {len(rows)} user activity logs.")
+        except Exception as e:
+            activity_log_failed_total.inc(len(rows))
+            logger.error(f"[ACTIVITY_LOG] Failed to flush {len(rows)} user activity logs: {e}", exc_info=True)
+
+activity_log_writer = ActivityLogWriter(
+    max_queue_size=ACTIVITY_LOG_QUEUE_SIZE,
+    batch_size=ACTIVITY_LOG_BATCH_SIZE,
+    flush_interval=ACTIVITY_LOG_FLUSH_INTERVAL,
+    max_payload_bytes=ACTIVITY_LOG_MAX_PAYLOAD_BYTES,
+)
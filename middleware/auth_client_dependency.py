@@ -2,10 +2,9 @@ from fastapi import Request, HTTPException, Depends, status
 from fastapi.security import APIKeyHeader, HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
 from core.config_db import config_db
-from database.models.client_model import Client
+from services.identity_cache import identity_cache, memoize_on_request
 from jose import jwt, JWTError
 from core.settings import SECRET_KEY_ADMIN, ALGORITHM
-from sqlalchemy import text
 import logging
 
 logger = logging.getLogger(__name__)
@@ -47,28 +46,18 @@ def get_authenticated_client(
                     detail="Invalid token: missing user_id"
                 )
 
-            result = db.execute(
-                text("""
-                    SELECT client_id
-                    FROM ai.ms_admin_users
-                    WHERE id = :user_id
-                """),
-                {"user_id": user_id}
-            ).fetchone()
-
-            if not result or not result.client_id:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="User identity not found or client_id missing"
-                )
+            client = memoize_on_request(
+                request,
+                f"admin:{user_id}",
+                lambda: identity_cache.get_admin_client(db, user_id)
+            )
 
-            client = db.query(Client).filter(Client.id == result.client_id).first()
             if not client:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Client not found"
+                    detail="User identity not found or client_id missing"
                 )
-            if client.status != "active":
+            if not client.is_active:
                 raise HTTPException(
                     status_code=status.HTTP_403_FORBIDDEN,
                     detail="Client is inactive"
@@ -94,10 +83,11 @@ def get_authenticated_client(
 
     if api_key:
         logger.info(f"[AUTH MIDDLEWARE] Validating API Key for subdomain: {subdomain}")
-        client = db.query(Client).filter(
-            Client.subdomain == subdomain,
-            Client.api_key == api_key
-        ).first()
+        client = memoize_on_request(
+            request,
+            f"api_key:{subdomain}",
+            lambda: identity_cache.get_client_by_api_key(db, subdomain, api_key)
+        )
 
         if not client:
             logger.warning(f"Unauthorized access attempt. Subdomain: {subdomain}, API Key: {api_key}")
@@ -105,8 +95,8 @@ def get_authenticated_client(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Invalid API Key or Subdomain"
             )
-        if client.status != "active":
-            logger.warning(f"Inactive client tried to access API: {client.name}")
+        if not client.is_active:
+            logger.warning(f"Inactive client tried to access API: {client.id}")
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
                 detail="Client is inactive"
@@ -1,11 +1,9 @@
 from fastapi import WebSocket, status
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.future import select
-from sqlalchemy import text
 from jose import jwt
 from core.settings import SECRET_KEY_ADMIN, ALGORITHM
 from utils.exception_handler import ServiceException
-from database.models.client_model import Client
+from services.identity_cache import identity_cache, ClientIdentity
 
 async def get_authenticated_client_ws(
     db: AsyncSession,
@@ -13,7 +11,7 @@ async def get_authenticated_client_ws(
     api_key: str = None,
     role: str = None,
     access_token: str = None,
-) -> Client | None:
+) -> ClientIdentity | None:
     """
     Autentikasi client berdasarkan subdomain dan API Key untuk WebSocket (async version).
     Role 'user' pakai subdomain + api_key.
@@ -32,13 +30,7 @@ async def get_authenticated_client_ws(
             host_without_port = host.split(":")[0]
             subdomain = host_without_port.split(".")[0].lower()
 
-            stmt = select(Client).filter(
-                Client.subdomain == subdomain,
-                Client.api_key == api_key
-            )
-            result = await db.execute(stmt)
-            client = result.scalars().first()
-            return client
+            return await identity_cache.aget_client_by_api_key(db, subdomain, api_key)
         except Exception as e:
             print(f"DB Error (user): {e}")
             return None
@@ -56,22 +48,8 @@ async def get_authenticated_client_ws(
                     detail="Invalid token: missing user_id",
                 )
 
-            # Ambil client_id dari ms_admin_users (async)
-            query = text("""
-                SELECT client_id
-                FROM ai.ms_admin_users
-                WHERE id = :user_id
-            """)
-            result = await db.execute(query, {"user_id": user_id})
-            row = result.fetchone()
-            if not row or not row.client_id:
-                return None
-
-            # Ambil Client instance berdasarkan client_id
-            stmt_client = select(Client).filter(Client.id == row.client_id)
-            client_result = await db.execute(stmt_client)
-            client = client_result.scalars().first()
-            return client
+            # client_id dari ms_admin_users, lewat cache identitas
+            return await identity_cache.aget_admin_client(db, user_id)
 
         except Exception as e:
             print(f"DB or JWT Error (admin): {e}")
@@ -1,4 +1,5 @@
 from fastapi import Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from database.models.user_model import User
@@ -21,7 +22,7 @@ async def get_current_user(
         if user_id is None:
             raise HTTPException(status_code=401, detail="Invalid token")
 
-        user = user_service.get_user_by_id(user_id, client_id)
+        user = await run_in_threadpool(user_service.get_user_by_id, user_id, client_id)
 
         if user is None:
             raise HTTPException(status_code=401, detail="User not found")
@@ -1,88 +1,68 @@
-
 from fastapi import Request
 from starlette.middleware.base import RequestResponseEndpoint
 from starlette.responses import Response
-from starlette.types import Message
-from sqlalchemy.orm import Session
-from core.config_db import config_db
-from database.models.user_activity_log_model import UserActivityLog
-import uuid
+from middleware.activity_log_writer import activity_log_writer, ActivityLogEntry
+from core.settings import ACTIVITY_LOG_SAMPLE_RATE, ACTIVITY_LOG_MAX_PAYLOAD_BYTES
 import datetime
-import jwt
-from core.settings import ALGORITHM, SECRET_KEY_ADMIN
-import json
+import random
+
+def _should_log(request: Request) -> bool:
+    # Request yang mengubah data selalu dicatat, GET bisa di-sampling
+    if request.method != "GET" or ACTIVITY_LOG_SAMPLE_RATE >= 1:
+        return True
+    return random.random() < ACTIVITY_LOG_SAMPLE_RATE
 
 async def log_user_activity(request: Request, call_next: RequestResponseEndpoint) -> Response:
-    print("proses User activity logged.")
+    if not _should_log(request):
+        return await call_next(request)
+
+    timestamp = datetime.datetime.utcnow()
 
-    request_body = await request.body()
-    request_body_str = None
+    request_body = None
+    request_size = None
     content_type = request.headers.get("content-type", "")
     if "application/json" in content_type:
-        try:
-            request_body_str = request_body.decode("utf-8")
-        except UnicodeDecodeError:
-            request_body_str = None
+        content_length = request.headers.get("content-length")
+        request_size = int(content_length) if content_length and content_length.isdigit() else None
+        if request_size is None or request_size <= ACTIVITY_LOG_MAX_PAYLOAD_BYTES:
+            request_body = await request.body()
+            request_size = len(request_body)
 
     auth_header = request.headers.get("authorization")
-    user_id = None
+    auth_token = None
     if auth_header and auth_header.startswith("Bearer "):
-        token = auth_header.split(" ")[1]
-        try:
-            payload = jwt.decode(token, SECRET_KEY_ADMIN, algorithms=[ALGORITHM])
-            raw_user_id = payload.get("user_id") or payload.get("sub")
-            user_id = uuid.UUID(raw_user_id) if raw_user_id else None
-        except Exception as e:
-            print("JWT decode error:", str(e))
+        auth_token = auth_header.split(" ")[1]
 
     response: Response = await call_next(request)
 
-    response_body = b""
-    async for chunk in response.body_iterator:
-        response_body += chunk
-
-    new_response = Response(
-        content=response_body,
-        status_code=response.status_code,
-        headers=dict(response.headers),
-        media_type=response.media_type
-    )
+    capture_response = "application/json" in response.headers.get("content-type", "")
+    body_iterator = response.body_iterator
 
-    try:
-        db: Session = next(config_db())
-
-        request_json = None
-        try:
-            request_json = json.loads(request_body_str) if request_body_str else None
-        except Exception:
-            request_json = None  
-
-        response_json = None
+    async def tee_body():
+        # Response diteruskan per chunk, hanya max_payload_bytes pertama yang disalin untuk log
+        captured = bytearray()
+        total = 0
         try:
-            response_json = json.loads(response_body.decode("utf-8")) if response_body else None
-        except Exception:
-            response_json = None
-            
-        client_id = getattr(request.state, "client_id", None)
-
-        if not client_id:
-            print("⚠️ Skip logging: client_id is missing")
-            return new_response
-
-        log = UserActivityLog(
-            user_id=user_id,
-            client_id=client_id,
-            endpoint=str(request.url.path),
-            method=request.method,
-            request_data=request_json,
-            response_data=response_json,
-            status_code=new_response.status_code,
-            timestamp=datetime.datetime.utcnow()
-        )
-        db.add(log)
-        db.commit()
-        print("✅ User activity logged.")
-    except Exception as e:
-        print("❌ Logging failed:", str(e))
+            async for chunk in body_iterator:
+                if capture_response and len(captured) < ACTIVITY_LOG_MAX_PAYLOAD_BYTES:
+                    captured.extend(chunk[:ACTIVITY_LOG_MAX_PAYLOAD_BYTES - len(captured)])
+                total += len(chunk)
+                yield chunk
+        finally:
+            client_id = getattr(request.state, "client_id", None)
+            if client_id:
+                activity_log_writer.enqueue(ActivityLogEntry(
+                    client_id=client_id,
+                    endpoint=str(request.url.path),
+                    method=request.method,
+                    status_code=response.status_code,
+                    timestamp=timestamp,
+                    auth_token=auth_token,
+                    request_body=request_body,
+                    request_size=request_size,
+                    response_body=bytes(captured) if capture_response else None,
+                    response_size=total if capture_response else None,
+                ))
 
-    return new_response
+    response.body_iterator = tee_body()
+    return response
@@ -25,23 +25,23 @@
 #             detail="Invalid token",
 #         )
 
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
 from sqlalchemy.orm import Session
 from core.settings import SECRET_KEY_ADMIN, ALGORITHM
 from core.config_db import config_db
 from utils.exception_handler import ServiceException
-from sqlalchemy import text
+from services.identity_cache import identity_cache, memoize_on_request
 
 security = HTTPBearer()
 
 def verify_access_token_and_get_client_id(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(config_db)
 ) -> str:
     token = credentials.credentials
-    print("token yang dikirim dari ui : " + token)
     try:
         payload = jwt.decode(token, SECRET_KEY_ADMIN, algorithms=[ALGORITHM])
         user_id: str = payload.get("sub")
@@ -51,24 +51,19 @@ def verify_access_token_and_get_client_id(
                 detail="Invalid token: missing user_id",
             )
 
-        print("user_id yang diterima: "+ user_id)
-        
-        result = db.execute(
-            text("""
-                SELECT client_id
-                FROM ai.ms_admin_users
-                WHERE id = :user_id
-            """),
-            {"user_id": user_id}
-        ).fetchone()
+        client = memoize_on_request(
+            request,
+            f"admin:{user_id}",
+            lambda: identity_cache.get_admin_client(db, user_id)
+        )
 
-        if not result:
+        if not client:
             raise ServiceException(code="USER_ID_NOT_FOUND",
                 status_code=status.HTTP_404_NOT_FOUND,
                 message="User identity not found"
             )
 
-        return str(result.client_id)
+        return str(client.id)
 
     except JWTError:
         raise ServiceException(code="INVALID_TOKEN",
@@ -58,5 +58,7 @@ class UserHistoryByIdResponse(BaseModel):
 
     
 class PaginatedChatHistoryResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     data: List[ChatHistoryResponse]
\ No newline at end of file
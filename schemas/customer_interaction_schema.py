@@ -30,6 +30,8 @@ class CustomerInteractionResponse(BaseModel):
     updated_at: datetime
 
 class PaginatedCustomerInteractionResponse(BaseModel):
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     data: List[CustomerInteractionResponse]
 
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from uuid import UUID
+from datetime import datetime
+
+class EmbeddingJobInfo(BaseModel):
+    """
+    Status dan progress satu job embedding dokumen.
+    """
+    id: UUID
+    source_type: str
+    source_id: UUID
+    source_name: str
+    status: str
+    attempts: int
+    max_attempts: int
+    total_pages: Optional[int] = None
+    completed_pages: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    model_config = {
+        "from_attributes": True
+    }
+
+class EmbeddingJobListResponse(BaseModel):
+    items: List[EmbeddingJobInfo]
@@ -1,6 +1,8 @@
 from pydantic import BaseModel
+from typing import List
 from uuid import UUID
 from datetime import datetime
+from schemas.embedding_job_schema import EmbeddingJobInfo
 
 class FileInfo(BaseModel):
     """
@@ -30,3 +32,4 @@ class EmbeddingProcessResponse(BaseModel):
     Respons model untuk hasil pemrosesan embedding file.
     """
     message: str
+    jobs: List[EmbeddingJobInfo] = []
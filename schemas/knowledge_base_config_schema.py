@@ -1,7 +1,11 @@
 from pydantic import BaseModel
+from typing import Literal
 
 # Simpan konfigurasi default
 class KnowledgeBaseConfig(BaseModel):
     chunk_size: int 
     overlap: int 
-    num_documents: int 
\ No newline at end of file
+    num_documents: int
+    chunking_strategy: Literal["structured", "agentic"] = "structured"
+    vector_index_type: Literal["auto", "hnsw", "ivfflat", "none"] = "auto"
+    vector_search_recall: Literal["fast", "balanced", "accurate"] = "balanced"
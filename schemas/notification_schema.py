@@ -2,7 +2,7 @@
 from pydantic import BaseModel
 from uuid import UUID
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 
 class NotificationItem(BaseModel):
     id: UUID
@@ -17,5 +17,7 @@ class NotificationItem(BaseModel):
 
 class NotificationListResponse(BaseModel):
     success: bool
-    total: int
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     data: List[NotificationItem]
@@ -39,7 +39,9 @@ class UserCreate(BaseModel):
 
 class UserListResponse(BaseModel):
     data: List[UserResponse]
-    total_users: int
+    total_users: Optional[int] = None
+    total_is_estimate: bool = False
+    next_cursor: Optional[str] = None
     
 class ChangePasswordRequest(BaseModel):
     old_password: str = Field(..., min_length=8, description="Password lama")
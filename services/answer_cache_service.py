@@ -0,0 +1,221 @@
+"""
+Cache jawaban semantik per client.
+
+Banyak pertanyaan customer hampir identik ("cara klaim rawat inap?") dan selalu
+dijawab sama, tetapi tiap pertanyaan menjalankan agent penuh (gpt-5 + pencarian
+knowledge). Jawaban agent disimpan di ai.dt_answer_cache bersama embedding
+pertanyaannya; pertanyaan berikutnya di client yang sama dengan cosine similarity
+>= ANSWER_CACHE_SIMILARITY_THRESHOLD langsung dijawab dari cache.
+
+- Hanya jawaban yang benar-benar mencari di knowledge base dan tidak memakai
+  tool lain (seperti insert customer feedback atau Telegram) yang disimpan.
+- Percakapan yang masih berjalan (balasan chatbot dalam
+  ANSWER_CACHE_HISTORY_WINDOW_SECONDS) memakai ANSWER_CACHE_HISTORY_THRESHOLD
+  yang lebih ketat, dan pertanyaan lanjutan ("berapa biayanya?", "yang tadi")
+  tidak memakai cache sama sekali karena jawabannya bergantung pada riwayat.
+  Jawaban dari percakapan seperti ini juga tidak disimpan ke cache.
+- Seluruh entri client dihapus saat prompt atau knowledge base-nya berubah.
+"""
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from uuid import UUID
+from fastapi.concurrency import run_in_threadpool
+from prometheus_client import Counter
+from sqlalchemy import delete, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from agno.embedder.openai import OpenAIEmbedder
+from agents.tools.embedding_cache import query_embedder
+from database.models import AnswerCacheEntry, Chat
+from core.settings import (
+    ANSWER_CACHE_ENABLED,
+    ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    ANSWER_CACHE_HISTORY_THRESHOLD,
+    ANSWER_CACHE_TTL_SECONDS,
+    ANSWER_CACHE_MAX_ENTRIES,
+    ANSWER_CACHE_HISTORY_WINDOW_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+answer_cache_requests_total = Counter(
+    "answer_cache_requests_total",
+    "Answer cache lookups by outcome (hit, miss, bypass)",
+    ["outcome"]
+)
+
+# Tool pencarian knowledge bawaan agno; tool lain punya efek samping atau data per user
+KNOWLEDGE_SEARCH_TOOL = "search_knowledge_base("
+
+_FOLLOWUP_WORDS = re.compile(
+    r"\b(itu|tersebut|tadi|barusan|sebelumnya|diatas|di atas|yang sama|lanjut|lagi|juga|"
+    r"it|that|this|those|these|above|previous|again)\b"
+)
+_FOLLOWUP_SUFFIX = re.compile(r"\b\w{3,}nya\b")
+_MIN_STANDALONE_WORDS = 3
+
+@dataclass
+class CachedAnswer:
+    entry_id: UUID
+    answer: str
+    similarity: float
+
+@dataclass
+class CacheLookup:
+    """Hasil find(): jawaban cache (jika hit) dan apakah jawaban agent boleh disimpan."""
+    cached: Optional[CachedAnswer] = None
+    storable: bool = False
+
+def is_followup(message: str) -> bool:
+    """Heuristik: pertanyaan pendek atau berisi kata rujukan ke giliran sebelumnya."""
+    text = message.lower()
+    if len(text.split()) < _MIN_STANDALONE_WORDS:
+        return True
+    return bool(_FOLLOWUP_WORDS.search(text) or _FOLLOWUP_SUFFIX.search(text))
+
+def is_cacheable(content: Optional[str], tools_call: Optional[List[str]]) -> bool:
+    if not content or not content.strip() or not tools_call:
+        return False
+    # Jawaban tanpa pencarian knowledge (sapaan, jawaban umum model) tidak di-cache
+    return all(str(tool).startswith(KNOWLEDGE_SEARCH_TOOL) for tool in tools_call)
+
+class AnswerCache:
+    def __init__(self, similarity_threshold: float, history_threshold: float,
+                 ttl_seconds: int, max_entries: int, history_window_seconds: int):
+        self.similarity_threshold = similarity_threshold
+        self.history_threshold = history_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.history_window_seconds = history_window_seconds
+        self._embedder = None
+
+    def _get_embedder(self):
+        if self._embedder is None:
+            # Embedding query yang sama dipakai ulang oleh pencarian knowledge agent
+            self._embedder = query_embedder(OpenAIEmbedder())
+        return self._embedder
+
+    async def embed(self, message: str) -> Optional[List[float]]:
+        try:
+            return await run_in_threadpool(self._get_embedder().get_embedding, message)
+        except Exception as e:
+            logger.warning(f"[ANSWER_CACHE] Gagal membuat embedding: {e}")
+            return None
+
+    async def has_recent_history(self, db: AsyncSession, room_id: UUID) -> bool:
+        since = datetime.now(timezone.utc) - timedelta(seconds=self.history_window_seconds)
+        result = await db.execute(
+            select(Chat.id)
+            .where(Chat.room_conversation_id == room_id, Chat.role == "chatbot", Chat.created_at >= since)
+            .limit(1)
+        )
+        return result.first() is not None
+
+    async def lookup(self, db: AsyncSession, client_id: UUID, embedding: List[float],
+                     threshold: float) -> Optional[CachedAnswer]:
+        distance = AnswerCacheEntry.query_embedding.cosine_distance(embedding)
+        result = await db.execute(
+            select(AnswerCacheEntry.id, AnswerCacheEntry.answer, (1 - distance).label("similarity"))
+            .where(AnswerCacheEntry.client_id == client_id, AnswerCacheEntry.expires_at > func.now())
+            .order_by(distance)
+            .limit(1)
+        )
+        row = result.first()
+        if row is None or row.similarity < threshold:
+            return None
+
+        await db.execute(
+            update(AnswerCacheEntry)
+            .where(AnswerCacheEntry.id == row.id)
+            .values(hits=AnswerCacheEntry.hits + 1, last_hit_at=func.now())
+        )
+        await db.commit()
+        return CachedAnswer(entry_id=row.id, answer=row.answer, similarity=float(row.similarity))
+
+    async def find(self, db: AsyncSession, client_id: UUID, room_id: UUID,
+                   message: str, embedding: Optional[List[float]]) -> CacheLookup:
+        """
+        Cari jawaban untuk pesan user. storable False jika pesan ada di tengah
+        percakapan: jawaban agent bergantung pada riwayat room sehingga tidak
+        boleh dipakai ulang untuk room lain.
+        """
+        if embedding is None:
+            answer_cache_requests_total.labels(outcome="bypass").inc()
+            return CacheLookup()
+
+        if await self.has_recent_history(db, room_id):
+            if is_followup(message):
+                answer_cache_requests_total.labels(outcome="bypass").inc()
+                logger.info(f"[ANSWER_CACHE] Bypass untuk pertanyaan lanjutan di room {room_id}")
+                return CacheLookup()
+            threshold, storable = self.history_threshold, False
+        else:
+            threshold, storable = self.similarity_threshold, True
+
+        try:
+            cached = await self.lookup(db, client_id, embedding, threshold)
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"[ANSWER_CACHE] Lookup gagal untuk client {client_id}: {e}")
+            answer_cache_requests_total.labels(outcome="bypass").inc()
+            return CacheLookup(storable=storable)
+
+        answer_cache_requests_total.labels(outcome="hit" if cached else "miss").inc()
+        if cached:
+            logger.info(f"[ANSWER_CACHE] Hit {cached.entry_id} (similarity {cached.similarity:.3f}) untuk client {client_id}")
+        return CacheLookup(cached=cached, storable=storable)
+
+    async def store(self, db: AsyncSession, client_id: UUID, message: str, embedding: List[float],
+                    answer: str, chat_id: Optional[UUID]):
+        try:
+            db.add(AnswerCacheEntry(
+                client_id=client_id,
+                query_text=message,
+                query_embedding=embedding,
+                answer=answer,
+                source_chat_id=chat_id,
+                expires_at=datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+            ))
+            await db.flush()
+
+            # Batasi jumlah entri per client: yang paling lama tidak terpakai dibuang
+            keep = (
+                select(AnswerCacheEntry.id)
+                .where(AnswerCacheEntry.client_id == client_id)
+                .order_by(AnswerCacheEntry.last_hit_at.desc())
+                .limit(self.max_entries)
+            )
+            await db.execute(
+                delete(AnswerCacheEntry)
+                .where(AnswerCacheEntry.client_id == client_id, AnswerCacheEntry.id.not_in(keep))
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.warning(f"[ANSWER_CACHE] Gagal menyimpan jawaban untuk client {client_id}: {e}")
+
+def invalidate_answer_cache(db: Session, client_id: UUID) -> int:
+    """
+    Hapus semua jawaban cache client. Tidak commit: ikut transaksi caller, jadi
+    cache hanya hilang jika perubahan prompt/knowledge base ikut tersimpan.
+    """
+    result = db.execute(
+        delete(AnswerCacheEntry)
+        .where(AnswerCacheEntry.client_id == client_id)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount:
+        logger.info(f"[ANSWER_CACHE] {result.rowcount} entri client {client_id} dihapus")
+    return result.rowcount
+
+answer_cache = AnswerCache(
+    similarity_threshold=ANSWER_CACHE_SIMILARITY_THRESHOLD,
+    history_threshold=ANSWER_CACHE_HISTORY_THRESHOLD,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+    max_entries=ANSWER_CACHE_MAX_ENTRIES,
+    history_window_seconds=ANSWER_CACHE_HISTORY_WINDOW_SECONDS,
+) if ANSWER_CACHE_ENABLED else None
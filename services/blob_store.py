@@ -0,0 +1,231 @@
+"""
+Penyimpanan blob file knowledge base, di luar baris Postgres.
+
+Blob dialamatkan berdasarkan isi (`sha256/ab/cd/<sha256>`), jadi upload yang
+identik hanya disimpan sekali. Backend dipilih lewat BLOB_STORE_BACKEND:
+
+- `local` (default): filesystem di BLOB_STORE_LOCAL_ROOT.
+- `s3`: bucket S3-compatible (butuh `pip install boto3`). Untuk pengembangan
+  lokal arahkan BLOB_S3_ENDPOINT_URL ke stand-in seperti MinIO
+  (`docker run -p 9000:9000 minio/minio server /data`) atau `moto_server`.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, Optional
+from core.settings import (
+    BLOB_STORE_BACKEND,
+    BLOB_STORE_LOCAL_ROOT,
+    BLOB_S3_ENDPOINT_URL,
+    BLOB_S3_BUCKET,
+    BLOB_S3_ACCESS_KEY,
+    BLOB_S3_SECRET_KEY,
+    BLOB_S3_REGION
+)
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+
+class BlobTooLarge(Exception):
+    pass
+
+@dataclass
+class StoredBlob:
+    key: str
+    sha256: str
+    size: int
+    deduplicated: bool = False
+
+def blob_key(sha256: str) -> str:
+    return f"sha256/{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+class BlobWriter(ABC):
+    """
+    Menerima isi blob per chunk sambil menghitung sha256 dan menegakkan batas
+    ukuran; blob baru tersimpan di bawah key-nya saat commit().
+    """
+    def __init__(self, max_size: Optional[int]):
+        self.max_size = max_size
+        self.size = 0
+        self._digest = hashlib.sha256()
+
+    def write(self, chunk: bytes):
+        self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            raise BlobTooLarge(f"Blob exceeds {self.max_size} bytes")
+        self._digest.update(chunk)
+        self._write(chunk)
+
+    @abstractmethod
+    def commit(self) -> StoredBlob:
+        ...
+
+    @abstractmethod
+    def abort(self):
+        ...
+
+    @abstractmethod
+    def _write(self, chunk: bytes):
+        ...
+
+    @property
+    def sha256(self) -> str:
+        return self._digest.hexdigest()
+
+class BlobStore(ABC):
+    """Antarmuka backend blob. Semua operasi blocking; panggil dari thread di kode async."""
+
+    @abstractmethod
+    def writer(self, max_size: Optional[int] = None) -> BlobWriter:
+        ...
+
+    def put(self, stream: BinaryIO, max_size: Optional[int] = None) -> StoredBlob:
+        writer = self.writer(max_size)
+        try:
+            while True:
+                chunk = stream.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                writer.write(chunk)
+            return writer.commit()
+        except BaseException:
+            writer.abort()
+            raise
+
+    @abstractmethod
+    def open(self, key: str) -> BinaryIO:
+        """Stream biner yang bisa di-seek dan punya `name` (dibutuhkan PDFReader); caller wajib menutupnya."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str):
+        ...
+
+class LocalBlobStore(BlobStore):
+    def __init__(self, root: str):
+        self.root = root
+        self._tmp_dir = os.path.join(root, "tmp")
+        os.makedirs(self._tmp_dir, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def writer(self, max_size: Optional[int] = None) -> BlobWriter:
+        return _LocalBlobWriter(self, max_size)
+
+    def open(self, key: str) -> BinaryIO:
+        return open(self._path(key), "rb")
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+class S3BlobStore(BlobStore):
+    def __init__(self, bucket: str, endpoint_url: Optional[str], access_key: Optional[str],
+                 secret_key: Optional[str], region: Optional[str]):
+        try:
+            import boto3
+            from botocore.exceptions import ClientError
+        except ImportError:
+            raise RuntimeError("BLOB_STORE_BACKEND=s3 membutuhkan paket boto3")
+        self.bucket = bucket
+        self._client_error = ClientError
+        self._client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key,
+            region_name=region
+        )
+
+    def writer(self, max_size: Optional[int] = None) -> BlobWriter:
+        return _S3BlobWriter(self, max_size)
+
+    def open(self, key: str) -> BinaryIO:
+        tmp = tempfile.NamedTemporaryFile(suffix=".blob")
+        self._client.download_fileobj(self.bucket, key, tmp)
+        tmp.seek(0)
+        return tmp
+
+    def exists(self, key: str) -> bool:
+        try:
+            self._client.head_object(Bucket=self.bucket, Key=key)
+            return True
+        except self._client_error as e:
+            if e.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+
+    def delete(self, key: str):
+        self._client.delete_object(Bucket=self.bucket, Key=key)
+
+class _LocalBlobWriter(BlobWriter):
+    def __init__(self, store: LocalBlobStore, max_size: Optional[int]):
+        super().__init__(max_size)
+        self.store = store
+        fd, self._tmp_path = tempfile.mkstemp(dir=store._tmp_dir)
+        self._tmp = os.fdopen(fd, "wb")
+
+    def _write(self, chunk: bytes):
+        self._tmp.write(chunk)
+
+    def commit(self) -> StoredBlob:
+        self._tmp.close()
+        key = blob_key(self.sha256)
+        path = self.store._path(key)
+        if os.path.exists(path):
+            self.abort()
+            return StoredBlob(key=key, sha256=self.sha256, size=self.size, deduplicated=True)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Rename atomik: pembaca tidak pernah melihat blob setengah jadi
+        os.replace(self._tmp_path, path)
+        return StoredBlob(key=key, sha256=self.sha256, size=self.size)
+
+    def abort(self):
+        self._tmp.close()
+        if os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+class _S3BlobWriter(BlobWriter):
+    # Key bergantung pada hash isi, jadi isi di-spool dulu (RAM kecil, selebihnya disk)
+    def __init__(self, store: S3BlobStore, max_size: Optional[int]):
+        super().__init__(max_size)
+        self.store = store
+        self._tmp = tempfile.SpooledTemporaryFile(max_size=CHUNK_SIZE)
+
+    def _write(self, chunk: bytes):
+        self._tmp.write(chunk)
+
+    def commit(self) -> StoredBlob:
+        key = blob_key(self.sha256)
+        try:
+            if self.store.exists(key):
+                return StoredBlob(key=key, sha256=self.sha256, size=self.size, deduplicated=True)
+            self._tmp.seek(0)
+            self.store._client.upload_fileobj(self._tmp, self.store.bucket, key)
+            return StoredBlob(key=key, sha256=self.sha256, size=self.size)
+        finally:
+            self._tmp.close()
+
+    def abort(self):
+        self._tmp.close()
+
+def create_blob_store() -> BlobStore:
+    if BLOB_STORE_BACKEND == "s3":
+        logger.info(f"[BLOB_STORE] Using S3 bucket {BLOB_S3_BUCKET} ({BLOB_S3_ENDPOINT_URL or 'AWS'})")
+        return S3BlobStore(BLOB_S3_BUCKET, BLOB_S3_ENDPOINT_URL, BLOB_S3_ACCESS_KEY, BLOB_S3_SECRET_KEY, BLOB_S3_REGION)
+    return LocalBlobStore(BLOB_STORE_LOCAL_ROOT)
+
+blob_store = create_blob_store()
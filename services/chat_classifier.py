@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+from uuid import UUID
+from cachetools import LRUCache
+from prometheus_client import Counter, Gauge
+from sqlalchemy import text, update
+from sqlalchemy.future import select
+from core.config_db import AsyncSessionLocal
+from core.settings import (
+    CLASSIFICATION_QUEUE_SIZE,
+    CLASSIFICATION_BATCH_SIZE,
+    CLASSIFICATION_FLUSH_INTERVAL,
+    CLASSIFICATION_CACHE_SIZE
+)
+from database.models import Chat
+from agents.classification_agent.classification_message_agent import classify_chat_batch
+
+logger = logging.getLogger(__name__)
+
+CATEGORY_PENDING = "pending"
+# Batch yang gagal (LLM/DB error) dicoba ulang sampai sekian kali sebelum dibiarkan 'pending'
+MAX_ATTEMPTS = 3
+# Semua proses API memanggil _requeue_pending saat start; hanya satu yang mengantrikan ulang
+_REQUEUE_LOCK_KEY = 724_311_908
+
+classification_cache_hits_total = Counter("chat_classification_cache_hits_total", "Chat classifications served from the local cache")
+classification_llm_batches_total = Counter("chat_classification_llm_batches_total", "Batched LLM classification calls")
+classification_llm_messages_total = Counter("chat_classification_llm_messages_total", "Distinct messages sent to the LLM classifier")
+classification_dropped_total = Counter("chat_classification_dropped_total", "Chats left pending because the classification queue was full")
+classification_failed_total = Counter("chat_classification_failed_total", "Chats left pending because a classification batch failed")
+classification_retried_total = Counter("chat_classification_retried_total", "Chats re-queued after a failed classification batch")
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+@dataclass
+class ClassificationJob:
+    chat_id: UUID
+    text: str
+    attempts: int = 0
+
+class ChatClassifier:
+    """
+    Klasifikasi kategori jawaban bot di luar jalur kirim pesan.
+
+    Chat disimpan dengan kategori 'pending', lalu task background mengumpulkan
+    beberapa pesan, mengklasifikasikan teks unik dalam satu panggilan LLM dan
+    meng-update Chat.agent_response_category secara bulk. Teks yang sama
+    (setelah normalisasi) dijawab dari cache LRU tanpa LLM.
+    """
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float, cache_size: int):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._cache: LRUCache = LRUCache(maxsize=cache_size)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        Gauge("chat_classification_queue_depth", "Chats waiting for classification").set_function(self._queue.qsize)
+
+    def cached_category(self, text: str) -> Optional[str]:
+        category = self._cache.get(_normalize(text))
+        if category is not None:
+            classification_cache_hits_total.inc()
+        return category
+
+    def enqueue(self, chat_id: UUID, text: str, attempts: int = 0) -> bool:
+        try:
+            self._queue.put_nowait(ClassificationJob(chat_id=chat_id, text=text, attempts=attempts))
+            return True
+        except asyncio.QueueFull:
+            classification_dropped_total.inc()
+            logger.warning(f"[CLASSIFIER] Queue full, chat {chat_id} stays '{CATEGORY_PENDING}'.")
+            return False
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            await self._requeue_pending()
+            self._task = asyncio.create_task(self._run())
+            logger.info("[CLASSIFIER] Background classifier started.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Chat yang belum terklasifikasi tetap 'pending' dan diambil ulang saat start berikutnya
+
+    async def _requeue_pending(self):
+        try:
+            async with AsyncSessionLocal() as db:
+                locked = (await db.execute(
+                    text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REQUEUE_LOCK_KEY}
+                )).scalar()
+                if not locked:
+                    logger.info("[CLASSIFIER] Pending chats are being re-queued by another process.")
+                    return
+                result = await db.execute(
+                    select(Chat.id, Chat.message)
+                    .where(Chat.agent_response_category == CATEGORY_PENDING)
+                    .limit(self._queue.maxsize)
+                )
+                rows = result.all()
+                await db.commit()
+            for chat_id, message in rows:
+                self.enqueue(chat_id, message)
+            if rows:
+                logger.info(f"[CLASSIFIER] Re-queued {len(rows)} pending chats.")
+        except Exception as e:
+            logger.error(f"[CLASSIFIER] Failed to re-queue pending chats: {e}", exc_info=True)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            await self._process(batch)
+
+    async def _process(self, batch: List[ClassificationJob]):
+        categories: Dict[str, str] = {}
+        unknown: List[str] = []
+        for job in batch:
+            key = _normalize(job.text)
+            if key in categories or key in unknown:
+                continue
+            cached = self._cache.get(key)
+            if cached is not None:
+                classification_cache_hits_total.inc()
+                categories[key] = cached
+            else:
+                unknown.append(key)
+
+        try:
+            if unknown:
+                classification_llm_batches_total.inc()
+                classification_llm_messages_total.inc(len(unknown))
+                for key, category in zip(unknown, await classify_chat_batch(unknown)):
+                    self._cache[key] = category
+                    categories[key] = category
+
+            async with AsyncSessionLocal() as db:
+                await db.execute(
+                    update(Chat),
+                    [
+                        {"id": job.chat_id, "agent_response_category": categories[_normalize(job.text)]}
+                        for job in batch
+                    ]
+                )
+                await db.commit()
+            logger.info(f"[CLASSIFIER] Classified {len(batch)} chats ({len(unknown)} via LLM).")
+        except Exception as e:
+            logger.error(f"[CLASSIFIER] Failed to classify batch of {len(batch)} chats: {e}", exc_info=True)
+            retry = [job for job in batch if job.attempts + 1 < MAX_ATTEMPTS]
+            classification_failed_total.inc(len(batch) - len(retry))
+            if retry:
+                # Jeda sebelum mencoba lagi agar LLM/DB yang sedang gangguan tidak langsung dihantam ulang
+                await asyncio.sleep(self.flush_interval)
+                requeued = sum(self.enqueue(job.chat_id, job.text, job.attempts + 1) for job in retry)
+                classification_retried_total.inc(requeued)
+
+chat_classifier = ChatClassifier(
+    max_queue_size=CLASSIFICATION_QUEUE_SIZE,
+    batch_size=CLASSIFICATION_BATCH_SIZE,
+    flush_interval=CLASSIFICATION_FLUSH_INTERVAL,
+    cache_size=CLASSIFICATION_CACHE_SIZE,
+)
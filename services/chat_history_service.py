@@ -9,7 +9,7 @@ from sqlalchemy.exc import SQLAlchemyError
 from fastapi import Depends 
 from typing import List, Dict, Any, Optional
 from collections import defaultdict
-from database.models import Chat, RoomConversation, Member
+from database.models import Chat, RoomConversation, Member, ChatMetricsHourly, ChatCategoryDaily
 from core.config_db import config_db
 from sqlalchemy import TEXT, Text
 from dateutil.relativedelta import relativedelta, SU
@@ -17,6 +17,9 @@ from schemas.chat_history_schema import PaginatedChatHistoryResponse, ChatHistor
 from sqlalchemy import or_, func, desc
 from sqlalchemy import cast, String
 from exceptions.custom_exceptions import ServiceException, DatabaseException
+from utils.search_utils import SearchQuery
+from utils.pagination_utils import paginate, count_rows
+from enums.count_mode_enum import CountMode
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -38,23 +41,23 @@ class ChatHistoryService:
         str, int]:
         """
         Helper private untuk mendapatkan jumlah percakapan berdasarkan format grup periode.
-        Digunakan oleh metode weekly, monthly, yearly.
+        Digunakan oleh metode weekly, monthly, yearly. Membaca tabel rollup per jam.
         """
         try:
             if self.db.bind.name == 'postgresql':
-                period_expr = func.to_char(Chat.created_at, group_format)
+                period_expr = func.to_char(ChatMetricsHourly.bucket_start, group_format)
             elif self.db.bind.name == 'mysql':
-                period_expr = func.date_format(Chat.created_at, group_format)
+                period_expr = func.date_format(ChatMetricsHourly.bucket_start, group_format)
             else:  # SQLite
-                period_expr = func.strftime(group_format, Chat.created_at)
+                period_expr = func.strftime(group_format, ChatMetricsHourly.bucket_start)
 
             query_results = self.db.query(
                 period_expr.label("period"),
-                func.count(distinct(Chat.id)).label("total_conversations")
+                func.sum(ChatMetricsHourly.chat_count).label("total_conversations")
             ).filter(
-                Chat.created_at >= start_date,
-                Chat.created_at <= end_date,
-                Chat.client_id == client_id
+                ChatMetricsHourly.bucket_start >= start_date,
+                ChatMetricsHourly.bucket_start <= end_date,
+                ChatMetricsHourly.client_id == client_id
             ).group_by("period").all()
 
             return {row.period: row.total_conversations for row in query_results}
@@ -140,43 +143,25 @@ class ChatHistoryService:
 
         return result
     
-    def _get_escalation_condition(self):
-        """
-        Mengembalikan kondisi SQLAlchemy untuk mengidentifikasi eskalasi.
-        Berdasarkan kemunculan 'INSERT INTO ai.dt_customer_feedback' di agent_tools_call.
-        """
-        return exists(
-            select(1)
-            .select_from(
-                func.unnest(Chat.agent_tools_call).alias("tool")
-            )
-            .where(
-                or_(
-                    column("tool", type_=Text).ilike('%INSERT INTO ai.dt_customer_feedback%'),
-                    column("tool", type_=Text).ilike('%INSERT INTO ai.customer_feedback%')
-                )
-            )
-        )
-
     def _get_escalation_counts_by_period(self, group_format: str, start_date: datetime, end_date: datetime, client_id: UUID) -> Dict[str, int]:
         """
         Helper private untuk mendapatkan jumlah eskalasi berdasarkan format grup periode.
-        Digunakan oleh metode weekly, monthly, yearly.
+        Digunakan oleh metode weekly, monthly, yearly. Membaca tabel rollup per jam.
         """
         try:
             if self.db.bind.name == 'postgresql':
-                period_expr = func.to_char(Chat.created_at, group_format)
+                period_expr = func.to_char(ChatMetricsHourly.bucket_start, group_format)
             else:  
-                period_expr = func.strftime(group_format, Chat.created_at)
+                period_expr = func.strftime(group_format, ChatMetricsHourly.bucket_start)
 
             query_results = self.db.query(
                 period_expr.label("period"),
-                func.count(distinct(Chat.id)).label("total_escalations")
+                func.sum(ChatMetricsHourly.escalation_count).label("total_escalations")
             ).filter(
-                Chat.created_at >= start_date,
-                Chat.created_at <= end_date,
-                Chat.client_id == client_id,
-                self._get_escalation_condition()  
+                ChatMetricsHourly.bucket_start >= start_date,
+                ChatMetricsHourly.bucket_start <= end_date,
+                ChatMetricsHourly.client_id == client_id,
+                ChatMetricsHourly.escalation_count > 0
             ).group_by("period").all()  
 
             result_dict = {row.period: row.total_escalations for row in query_results}
@@ -260,30 +245,43 @@ class ChatHistoryService:
 
         return final_yearly_stats
 
-    def get_all_chat_history(self, offset: int, limit: int, client_id: UUID, search: Optional[str] = None) -> PaginatedChatHistoryResponse:
+    def get_all_chat_history(
+        self,
+        offset: int,
+        limit: int,
+        client_id: UUID,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.exact
+    ) -> PaginatedChatHistoryResponse:
         try:
-            logger.info(f"Fetching chat history. offset={offset}, limit={limit}, search='{search}'")
+            logger.info(f"Fetching chat history. cursor={cursor}, offset={offset}, limit={limit}, search='{search}', count_mode={count_mode}")
             query = self.db.query(Chat).filter(Chat.client_id == client_id)
 
             if search:
-                search_filter = f"%{search.lower()}%"
-                query = query.filter(
-                    or_(
-                        func.lower(Chat.message).like(search_filter),
-                        func.lower(cast(Chat.sender_id, String)).like(search_filter)
-                    )
-                )
-
-            total_count = query.count()
-
-            chat_history = query.order_by(desc(Chat.created_at))\
-                                .offset(offset)\
-                                .limit(limit)\
-                                .all()
+                # Hasil pencarian diurutkan berdasarkan relevansi, jadi memakai offset
+                query = SearchQuery(
+                    term=search,
+                    fulltext_columns=[Chat.message],
+                    uuid_columns=[Chat.sender_id, Chat.room_conversation_id]
+                ).apply(query).order_by(desc(Chat.created_at))
+
+            page = paginate(query, Chat.created_at, Chat.id, limit, cursor=cursor, offset=offset, ranked=bool(search))
+
+            if count_mode == CountMode.estimate and not search:
+                # Tanpa filter, total chat client sudah tersedia di tabel rollup
+                total_count = self.db.query(
+                    func.coalesce(func.sum(ChatMetricsHourly.chat_count), 0)
+                ).filter(ChatMetricsHourly.client_id == client_id).scalar()
+                is_estimate = True
+            else:
+                total_count, is_estimate = count_rows(self.db, query, count_mode)
 
             return PaginatedChatHistoryResponse(
                 total=total_count,
-                data=[ChatHistoryResponse.from_orm(chat) for chat in chat_history]
+                total_is_estimate=is_estimate,
+                next_cursor=page.next_cursor,
+                data=[ChatHistoryResponse.from_orm(chat) for chat in page.items]
             )
         except SQLAlchemyError as e:
             logger.error(f"SQLAlchemy error: {e}", exc_info=True)
@@ -303,14 +301,12 @@ class ChatHistoryService:
             logger.info("Getting categories by frequency.")
             
             category_counts = self.db.query(
-                Chat.agent_response_category,
-                func.count(Chat.agent_response_category).label('count')
+                ChatCategoryDaily.category,
+                func.sum(ChatCategoryDaily.chat_count).label('count')
             ).filter(
-                Chat.client_id == client_id,
-                Chat.agent_response_category.isnot(None),
-                Chat.agent_response_category != ''
+                ChatCategoryDaily.client_id == client_id
             ).group_by(
-                Chat.agent_response_category
+                ChatCategoryDaily.category
             ).order_by(
                 desc('count') 
             ).all()
@@ -452,18 +448,16 @@ class ChatHistoryService:
     def get_total_tokens_used(self, client_id: UUID) -> float:
         """
         Menghitung total jumlah token yang digunakan oleh client tertentu
-        dengan menjumlahkan kolom 'agent_total_tokens' dari tabel Chat
-        yang terhubung dengan RoomConversation milik client tersebut.
+        dari tabel rollup dt_chat_metrics_hourly.
         """
         try:
             logger.info(f"[SERVICE][TOKEN] Calculating total tokens used for client_id={client_id}.")
 
             total_tokens = (
                 self.db.query(
-                    func.coalesce(func.sum(cast(Chat.agent_total_tokens, Float)), 0.0)
+                    func.coalesce(func.sum(cast(ChatMetricsHourly.total_tokens, Float)), 0.0)
                 )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
-                .filter(RoomConversation.client_id == client_id)
+                .filter(ChatMetricsHourly.client_id == client_id)
                 .scalar()
             )
 
@@ -483,9 +477,8 @@ class ChatHistoryService:
             logger.info(f"Counting total unique conversations for client_id={client_id}")
             
             total_conversations = (
-                self.db.query(func.count(distinct(Chat.id)))
-                .join(RoomConversation)
-                .filter(RoomConversation.client_id == client_id)
+                self.db.query(func.sum(ChatMetricsHourly.chat_count))
+                .filter(ChatMetricsHourly.client_id == client_id)
                 .scalar()
             )
 
@@ -502,11 +495,10 @@ class ChatHistoryService:
             logger.info(f"Getting monthly total conversations for client_id={client_id}")
             monthly_conversation_counts_raw = (
                 self.db.query(
-                    func.to_char(Chat.created_at, 'YYYY-MM').label('month'),
-                    func.count(distinct(Chat.id)).label('count')
+                    func.to_char(ChatMetricsHourly.bucket_start, 'YYYY-MM').label('month'),
+                    func.sum(ChatMetricsHourly.chat_count).label('count')
                 )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
-                .filter(RoomConversation.client_id == client_id)
+                .filter(ChatMetricsHourly.client_id == client_id)
                 .group_by('month')
                 .order_by('month')
                 .all()
@@ -543,15 +535,14 @@ class ChatHistoryService:
 
             daily_latency_raw = (
                 self.db.query(
-                    func.to_char(Chat.created_at, 'YYYY-MM-DD').label('day'),
-                    func.avg(func.extract('epoch', Chat.agent_response_latency)).label('avg_latency_seconds')
+                    func.to_char(ChatMetricsHourly.bucket_start, 'YYYY-MM-DD').label('day'),
+                    (func.sum(ChatMetricsHourly.latency_sum_seconds) / func.nullif(func.sum(ChatMetricsHourly.latency_count), 0)).label('avg_latency_seconds')
                 )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
                 .filter(
-                    RoomConversation.client_id == client_id,
-                    Chat.agent_response_latency.isnot(None),
-                    Chat.created_at >= start_date,
-                    Chat.created_at <= end_date
+                    ChatMetricsHourly.client_id == client_id,
+                    ChatMetricsHourly.latency_count > 0,
+                    ChatMetricsHourly.bucket_start >= start_date,
+                    ChatMetricsHourly.bucket_start <= end_date
                 )
                 .group_by('day')
                 .order_by('day')
@@ -589,14 +580,13 @@ class ChatHistoryService:
             
             monthly_latency_raw = (
                 self.db.query(
-                    func.to_char(Chat.created_at, 'YYYY-MM').label('month'),
-                    func.avg(func.extract('epoch', Chat.agent_response_latency)).label('avg_latency_seconds')
+                    func.to_char(ChatMetricsHourly.bucket_start, 'YYYY-MM').label('month'),
+                    (func.sum(ChatMetricsHourly.latency_sum_seconds) / func.nullif(func.sum(ChatMetricsHourly.latency_count), 0)).label('avg_latency_seconds')
                 )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
                 .filter(
-                    RoomConversation.client_id == client_id,
-                    Chat.agent_response_latency.isnot(None),
-                    func.extract('year', Chat.created_at) == current_year
+                    ChatMetricsHourly.client_id == client_id,
+                    ChatMetricsHourly.latency_count > 0,
+                    func.extract('year', ChatMetricsHourly.bucket_start) == current_year
                 )
                 .group_by('month')
                 .order_by('month')
@@ -621,35 +611,19 @@ class ChatHistoryService:
     def get_escalation_by_month(self, client_id: UUID):
         """
         Menghitung total eskalasi bulanan berdasarkan kemunculan 'INSERT INTO ai.dt_customer_feedback'
-        di dalam array 'agent_tools_call' pada tabel 'dt_chats', difilter per client.
+        di dalam array 'agent_tools_call', dibaca dari tabel rollup dt_chat_metrics_hourly.
         """
         try:
             logger.info(f"Getting monthly escalation count for client_id={client_id}")
 
-            exists_condition = exists(
-                select(1)
-                .select_from(
-                    func.unnest(Chat.agent_tools_call).alias("tool")
-                )
-                .where(
-                    or_(
-                        column("tool", type_=Text).ilike('%INSERT INTO ai.dt_customer_feedback%'),
-                        column("tool", type_=Text).ilike('%INSERT INTO ai.customer_feedback%')
-                    )
-                )
-            )
-
             monthly_escalation_raw = (
                 self.db.query(
-                    func.to_char(Chat.created_at, 'YYYY-MM').label('month'),
-                    func.count(Chat.id).label('count')
+                    func.to_char(ChatMetricsHourly.bucket_start, 'YYYY-MM').label('month'),
+                    func.sum(ChatMetricsHourly.escalation_count).label('count')
                 )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
                 .filter(
-                    RoomConversation.client_id == client_id,
-                    Chat.agent_tools_call.isnot(None),
-                    func.cardinality(Chat.agent_tools_call) > 0,
-                    exists_condition
+                    ChatMetricsHourly.client_id == client_id,
+                    ChatMetricsHourly.escalation_count > 0
                 )
                 .group_by('month')
                 .order_by('month')
@@ -687,17 +661,16 @@ class ChatHistoryService:
             logger.info(f"Calculating monthly tokens used for client_id={client_id}")
             current_year = datetime.now().year
 
-            month_expr = func.to_char(Chat.created_at, 'YYYY-MM')
+            month_expr = func.to_char(ChatMetricsHourly.bucket_start, 'YYYY-MM')
 
             monthly_tokens = (
                 self.db.query(
                     month_expr.label('month'),
-                    func.sum(Chat.agent_total_tokens).label('total_tokens')
+                    func.sum(ChatMetricsHourly.total_tokens).label('total_tokens')
                 )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
                 .filter(
-                    RoomConversation.client_id == client_id,
-                    extract('year', Chat.created_at) == current_year
+                    ChatMetricsHourly.client_id == client_id,
+                    extract('year', ChatMetricsHourly.bucket_start) == current_year
                 )
                 .group_by(month_expr)
                 .order_by(month_expr)
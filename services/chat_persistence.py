@@ -0,0 +1,379 @@
+import asyncio
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import Boolean, and_, bindparam, case, func, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from core.config_db import AsyncSessionLocal
+from database.models import Chat, Member, RoomConversation
+from exceptions.custom_exceptions import DatabaseException
+
+logger = logging.getLogger(__name__)
+
+chat_turn_db_round_trips = Histogram(
+    "chat_turn_db_round_trips",
+    "Database round trips issued on the hot path of one chat turn",
+    buckets=(0, 1, 2, 3, 4, 5, 6, 8, 10, 15)
+)
+chat_write_behind_flushed_total = Counter("chat_write_behind_flushed_total", "Chat rows written by the write-behind buffer")
+chat_write_behind_spilled_total = Counter("chat_write_behind_spilled_total", "Chat rows spilled to the Redis stream because the database write failed")
+chat_write_behind_replayed_total = Counter("chat_write_behind_replayed_total", "Chat rows replayed from the Redis stream into the database")
+chat_write_behind_sync_fallback_total = Counter("chat_write_behind_sync_fallback_total", "Chat turns written synchronously because the write-behind buffer was full")
+
+REPLAY_BATCH_SIZE = 1000
+REPLAY_LOCK_SECONDS = 300
+
+_rooms_table = RoomConversation.__table__
+
+# Satu UPDATE untuk banyak room (executemany): pesan terakhir hanya maju, updated_at
+# hanya diubah untuk turn yang memang menyentuh room (balasan bot).
+_ROOM_UPDATE = (
+    update(_rooms_table)
+    .where(
+        _rooms_table.c.id == bindparam("b_room_id"),
+        or_(
+            _rooms_table.c.last_message_at.is_(None),
+            _rooms_table.c.last_message_at <= bindparam("b_last_message_at")
+        )
+    )
+    .values(
+        last_message_id=bindparam("b_last_message_id"),
+        last_message=bindparam("b_last_message"),
+        last_message_at=bindparam("b_last_message_at"),
+        updated_at=case(
+            (bindparam("b_touch", type_=Boolean), bindparam("b_last_message_at")),
+            else_=_rooms_table.c.updated_at
+        )
+    )
+)
+
+@dataclass
+class ChatTurn:
+    """
+    Unit of work untuk satu giliran chat: semua baris Chat dan update room
+    dikumpulkan lalu ditulis dalam satu transaksi (atau diserahkan ke buffer
+    write-behind). round_trips menghitung query yang dikirim di jalur turn ini.
+    queued berarti turn sudah diterima buffer write-behind dan tidak boleh
+    di-commit lagi oleh pemanggil.
+    """
+    room_id: UUID
+    client_id: UUID
+    rows: List[Dict[str, Any]] = field(default_factory=list)
+    touch_room: bool = False
+    round_trips: int = 0
+    persisted: bool = False
+    queued: bool = False
+    on_persisted: List[Callable[[], Any]] = field(default_factory=list)
+
+    def add_message(
+        self,
+        sender_id: UUID,
+        message: str,
+        role: str,
+        chat_id: Optional[UUID] = None,
+        **agent_fields
+    ) -> UUID:
+        chat_id = chat_id or uuid.uuid4()
+        self.rows.append({
+            "id": chat_id,
+            "room_conversation_id": self.room_id,
+            "client_id": self.client_id,
+            "sender_id": sender_id,
+            "message": message,
+            "role": role,
+            # created_at diisi di sini agar urutan tetap benar walau ditulis belakangan
+            "created_at": datetime.now(timezone.utc),
+            "agent_response_category": agent_fields.get("agent_response_category"),
+            "agent_response_latency": agent_fields.get("agent_response_latency"),
+            "agent_total_tokens": agent_fields.get("agent_total_tokens"),
+            "agent_input_tokens": agent_fields.get("agent_input_tokens"),
+            "agent_output_tokens": agent_fields.get("agent_output_tokens"),
+            "agent_other_metrics": agent_fields.get("agent_other_metrics"),
+            "agent_tools_call": agent_fields.get("agent_tools_call"),
+        })
+        return chat_id
+
+    @property
+    def handed_off(self) -> bool:
+        return self.persisted or self.queued
+
+def _room_updates(rows: List[Dict[str, Any]], touched_rooms: set) -> List[Dict[str, Any]]:
+    latest: Dict[UUID, Dict[str, Any]] = {}
+    for row in rows:
+        current = latest.get(row["room_conversation_id"])
+        if current is None or row["created_at"] >= current["created_at"]:
+            latest[row["room_conversation_id"]] = row
+    return [
+        {
+            "b_room_id": room_id,
+            "b_last_message_id": row["id"],
+            "b_last_message": row["message"],
+            "b_last_message_at": row["created_at"],
+            "b_touch": room_id in touched_rooms,
+        }
+        for room_id, row in latest.items()
+    ]
+
+def _row_to_json(row: Dict[str, Any], touch_room: bool) -> str:
+    payload = {key: (str(value) if isinstance(value, UUID) else value) for key, value in row.items()}
+    payload["created_at"] = row["created_at"].isoformat()
+    latency = row.get("agent_response_latency")
+    payload["agent_response_latency"] = latency.total_seconds() if latency is not None else None
+    payload["_touch_room"] = touch_room
+    return json.dumps(payload, default=str)
+
+def _row_from_json(raw: str) -> Tuple[Dict[str, Any], bool]:
+    payload = json.loads(raw)
+    touch_room = payload.pop("_touch_room", False)
+    for key in ("id", "room_conversation_id", "client_id", "sender_id"):
+        payload[key] = UUID(payload[key])
+    payload["created_at"] = datetime.fromisoformat(payload["created_at"])
+    latency = payload.get("agent_response_latency")
+    payload["agent_response_latency"] = timedelta(seconds=latency) if latency is not None else None
+    return payload, touch_room
+
+async def _write_rows(db: AsyncSession, rows: List[Dict[str, Any]], touched_rooms: set) -> int:
+    """Tulis baris chat + update room dalam satu transaksi. Mengembalikan jumlah round trip."""
+    # ON CONFLICT membuat replay dari Redis stream aman diulang
+    await db.execute(pg_insert(Chat).on_conflict_do_nothing(index_elements=["id"]), rows)
+    await db.execute(_ROOM_UPDATE, _room_updates(rows, touched_rooms))
+    await db.commit()
+    return 3
+
+class ChatWriteBehindBuffer:
+    """
+    Buffer in-process berukuran tetap yang menggabungkan insert Chat dari banyak
+    koneksi menjadi satu transaksi per batch_size baris atau per flush_interval.
+
+    Jika penulisan ke database gagal (atau saat shutdown database tidak bisa
+    dijangkau), baris ditulis ke Redis stream dan diputar ulang saat start
+    berikutnya, sehingga pesan yang sudah dikirim ke user tidak hilang.
+    """
+    def __init__(self, redis, max_queue_size: int, batch_size: int, flush_interval: float, stream_key: str):
+        self.redis = redis
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.stream_key = stream_key
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Task] = None
+        Gauge("chat_write_behind_queue_depth", "Chat turns waiting in the write-behind buffer").set_function(self._queue.qsize)
+
+    def offer(self, turn: ChatTurn) -> bool:
+        try:
+            self._queue.put_nowait(turn)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+    async def start(self):
+        if self._task is None or self._task.done():
+            await self._replay_stream()
+            self._task = asyncio.create_task(self._run())
+            logger.info("[CHAT_PERSISTENCE] Write-behind buffer started.")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing:
+            # Batch yang sedang ditulis saat task dibatalkan dibiarkan selesai (atau di-spill)
+            await self._flushing
+            self._flushing = None
+
+        remaining: List[ChatTurn] = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for i in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[i:i + self.batch_size])
+        logger.info(f"[CHAT_PERSISTENCE] Write-behind buffer stopped, flushed {len(remaining)} pending turns.")
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_interval
+            try:
+                while sum(len(turn.rows) for turn in batch) < self.batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout=timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                await self._flush_shielded(batch)
+                raise
+
+            await self._flush_shielded(batch)
+
+    async def _flush_shielded(self, batch: List[ChatTurn]):
+        # Turn sudah keluar dari antrian, jadi cancel saat shutdown tidak boleh memutus insert-nya;
+        # flush tetap berjalan sebagai task sendiri dan ditunggu oleh stop()
+        self._flushing = asyncio.create_task(self._flush(batch))
+        await asyncio.shield(self._flushing)
+        self._flushing = None
+
+    async def _flush(self, batch: List[ChatTurn]):
+        rows = [row for turn in batch for row in turn.rows]
+        if not rows:
+            return
+        touched_rooms = {turn.room_id for turn in batch if turn.touch_room}
+        try:
+            async with AsyncSessionLocal() as db:
+                await _write_rows(db, rows, touched_rooms)
+            chat_write_behind_flushed_total.inc(len(rows))
+        except Exception as e:
+            logger.error(f"[CHAT_PERSISTENCE] Failed to flush {len(rows)} chats, spilling to Redis: {e}", exc_info=True)
+            await self._spill(batch)
+            return
+
+        for turn in batch:
+            turn.persisted = True
+            _run_callbacks(turn)
+
+    async def _spill(self, batch: List[ChatTurn]):
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for turn in batch:
+                for row in turn.rows:
+                    pipe.xadd(self.stream_key, {"row": _row_to_json(row, turn.touch_room)})
+            await pipe.execute()
+            chat_write_behind_spilled_total.inc(sum(len(turn.rows) for turn in batch))
+        except Exception as e:
+            logger.critical(f"[CHAT_PERSISTENCE] Failed to spill chats to Redis, {len(batch)} turns lost: {e}", exc_info=True)
+
+    async def _replay_stream(self):
+        """
+        Putar ulang seluruh isi stream per REPLAY_BATCH_SIZE entry sampai habis.
+        Hanya satu worker yang me-replay sekaligus (lock Redis); worker lain yang
+        start bersamaan langsung lanjut karena insert replay idempoten.
+        """
+        lock_key = f"{self.stream_key}:replay_lock"
+        try:
+            if not await self.redis.set(lock_key, "1", nx=True, ex=REPLAY_LOCK_SECONDS):
+                logger.info(f"[CHAT_PERSISTENCE] Replay {self.stream_key} sedang dijalankan worker lain, dilewati.")
+                return
+        except Exception as e:
+            logger.error(f"[CHAT_PERSISTENCE] Failed to acquire write-behind replay lock: {e}", exc_info=True)
+            return
+
+        replayed = 0
+        try:
+            while True:
+                try:
+                    entries = await self.redis.xrange(self.stream_key, count=REPLAY_BATCH_SIZE)
+                except Exception as e:
+                    logger.error(f"[CHAT_PERSISTENCE] Failed to read write-behind stream: {e}", exc_info=True)
+                    return
+                if not entries:
+                    break
+
+                rows, touched_rooms = [], set()
+                for entry_id, fields in entries:
+                    try:
+                        row, touch_room = _row_from_json(fields["row"])
+                    except Exception as e:
+                        # Entry rusak tidak bisa diputar ulang; dibuang bersama batch ini agar loop tidak macet
+                        logger.error(f"[CHAT_PERSISTENCE] Dropping unreadable write-behind entry {entry_id}: {e}")
+                        continue
+                    rows.append(row)
+                    if touch_room:
+                        touched_rooms.add(row["room_conversation_id"])
+                try:
+                    if rows:
+                        async with AsyncSessionLocal() as db:
+                            await _write_rows(db, rows, touched_rooms)
+                    await self.redis.xdel(self.stream_key, *[entry_id for entry_id, _ in entries])
+                    await self.redis.expire(lock_key, REPLAY_LOCK_SECONDS)
+                except Exception as e:
+                    logger.error(f"[CHAT_PERSISTENCE] Failed to replay write-behind stream: {e}", exc_info=True)
+                    return
+                chat_write_behind_replayed_total.inc(len(rows))
+                replayed += len(rows)
+        finally:
+            try:
+                await self.redis.delete(lock_key)
+            except Exception as e:
+                logger.warning(f"[CHAT_PERSISTENCE] Failed to release write-behind replay lock: {e}")
+            if replayed:
+                logger.info(f"[CHAT_PERSISTENCE] Replayed {replayed} chats from {self.stream_key}.")
+
+def _run_callbacks(turn: ChatTurn):
+    for callback in turn.on_persisted:
+        try:
+            callback()
+        except Exception as e:
+            logger.warning(f"[CHAT_PERSISTENCE] on_persisted callback failed: {e}")
+
+class ChatPersistence:
+    """
+    Lapisan penyimpanan jalur pesan chat.
+
+    load_turn_context() mengambil agent_active dan chatbot room dalam satu query;
+    commit_turn() menulis semua baris turn dalam satu transaksi, atau menyerahkannya
+    ke ChatWriteBehindBuffer jika CHAT_WRITE_BEHIND_ENABLED.
+    """
+    def __init__(self, buffer: Optional[ChatWriteBehindBuffer] = None):
+        self.buffer = buffer
+
+    async def start(self):
+        if self.buffer is not None:
+            await self.buffer.start()
+
+    async def stop(self):
+        if self.buffer is not None:
+            await self.buffer.stop()
+
+    def new_turn(self, room_id: UUID, client_id: UUID) -> ChatTurn:
+        return ChatTurn(room_id=room_id, client_id=client_id)
+
+    async def load_turn_context(self, db: AsyncSession, turn: ChatTurn) -> Tuple[Optional[bool], Optional[UUID]]:
+        result = await db.execute(
+            select(RoomConversation.agent_active, Member.user_id)
+            .outerjoin(
+                Member,
+                and_(Member.room_conversation_id == RoomConversation.id, Member.role == "chatbot")
+            )
+            .where(RoomConversation.id == turn.room_id)
+            .limit(1)
+        )
+        turn.round_trips += 1
+        row = result.first()
+        return (row[0], row[1]) if row else (None, None)
+
+    async def commit_turn(self, db: AsyncSession, turn: ChatTurn):
+        if turn.handed_off or not turn.rows:
+            return
+
+        if self.buffer is not None:
+            if self.buffer.offer(turn):
+                turn.queued = True
+                return
+            chat_write_behind_sync_fallback_total.inc()
+
+        try:
+            turn.round_trips += await _write_rows(db, turn.rows, {turn.room_id} if turn.touch_room else set())
+        except SQLAlchemyError as e:
+            logger.error(f"[CHAT_PERSISTENCE] Error saving chat turn for room {turn.room_id}: {e}", exc_info=True)
+            await db.rollback()
+            raise DatabaseException("SAVE_CHAT_HISTORY", "Error saving chat history.")
+
+        turn.persisted = True
+        _run_callbacks(turn)
+
+    def observe(self, turn: ChatTurn):
+        chat_turn_db_round_trips.observe(turn.round_trips)
@@ -0,0 +1,118 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import SQLAlchemyError
+from exceptions.custom_exceptions import DatabaseException
+from services.chat_classifier import CATEGORY_PENDING
+
+logger = logging.getLogger(__name__)
+
+# Kondisi eskalasi sama dengan yang dipakai dashboard sebelumnya:
+# agent memanggil tool yang meng-INSERT ke tabel customer feedback.
+ESCALATION_CONDITION = """
+    EXISTS (
+        SELECT 1 FROM unnest(c.agent_tools_call) AS tool
+        WHERE tool ILIKE '%INSERT INTO ai.dt_customer_feedback%'
+           OR tool ILIKE '%INSERT INTO ai.customer_feedback%'
+    )
+"""
+
+REFRESH_HOURLY_SQL = f"""
+    INSERT INTO ai.dt_chat_metrics_hourly (
+        client_id, bucket_start, chat_count, total_tokens,
+        latency_sum_seconds, latency_count, escalation_count, updated_at
+    )
+    SELECT
+        c.client_id,
+        date_trunc('hour', c.created_at) AS bucket_start,
+        COUNT(*),
+        COALESCE(SUM(c.agent_total_tokens), 0),
+        COALESCE(SUM(EXTRACT(EPOCH FROM c.agent_response_latency)), 0),
+        COUNT(c.agent_response_latency),
+        COUNT(*) FILTER (WHERE {ESCALATION_CONDITION}),
+        now()
+    FROM ai.dt_chats c
+    WHERE c.created_at >= :bucket_from
+      AND (CAST(:client_id AS uuid) IS NULL OR c.client_id = CAST(:client_id AS uuid))
+    GROUP BY c.client_id, date_trunc('hour', c.created_at)
+"""
+
+REFRESH_CATEGORY_SQL = """
+    INSERT INTO ai.dt_chat_category_daily (client_id, day, category, chat_count, updated_at)
+    SELECT
+        c.client_id,
+        CAST(c.created_at AS date) AS day,
+        c.agent_response_category,
+        COUNT(*),
+        now()
+    FROM ai.dt_chats c
+    WHERE c.created_at >= :day_from
+      AND c.agent_response_category IS NOT NULL
+      AND c.agent_response_category NOT IN ('', :pending)
+      AND (CAST(:client_id AS uuid) IS NULL OR c.client_id = CAST(:client_id AS uuid))
+    GROUP BY c.client_id, CAST(c.created_at AS date), c.agent_response_category
+"""
+
+# Dua refresh yang bersamaan (scheduler di tiap proses API, backfill manual) saling
+# menghapus dan meng-insert bucket yang sama; refresh dijalankan bergantian.
+_REFRESH_LOCK_KEY = 724_311_907
+
+class ChatRollupService:
+    """
+    Menjaga tabel agregat dt_chat_metrics_hourly dan dt_chat_category_daily.
+
+    Setiap refresh menghitung ulang bucket sejak `since` dari dt_chats
+    (hapus lalu insert dalam satu transaksi), sehingga idempotent dan ikut
+    menangkap kategori yang baru selesai diklasifikasi. Transaksi refresh
+    memegang advisory lock; dengan wait=False refresh dilewati jika proses
+    lain sedang menjalankannya.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def refresh(self, since: datetime, client_id: Optional[UUID] = None, wait: bool = True) -> bool:
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        bucket_from = since.replace(minute=0, second=0, microsecond=0)
+        day_from = since.date()
+        client_param = str(client_id) if client_id else None
+
+        try:
+            if wait:
+                self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _REFRESH_LOCK_KEY})
+            elif not self.db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _REFRESH_LOCK_KEY}).scalar():
+                self.db.rollback()
+                logger.info("[SERVICE][CHAT_ROLLUP] Refresh sedang berjalan di proses lain, dilewati.")
+                return False
+
+            client_filter = "AND client_id = CAST(:client_id AS uuid)" if client_id else ""
+            self.db.execute(
+                text(f"DELETE FROM ai.dt_chat_metrics_hourly WHERE bucket_start >= :bucket_from {client_filter}"),
+                {"bucket_from": bucket_from, "client_id": client_param}
+            )
+            self.db.execute(
+                text(REFRESH_HOURLY_SQL),
+                {"bucket_from": bucket_from, "client_id": client_param}
+            )
+            self.db.execute(
+                text(f"DELETE FROM ai.dt_chat_category_daily WHERE day >= :day_from {client_filter}"),
+                {"day_from": day_from, "client_id": client_param}
+            )
+            self.db.execute(
+                text(REFRESH_CATEGORY_SQL),
+                {"day_from": day_from, "pending": CATEGORY_PENDING, "client_id": client_param}
+            )
+            self.db.commit()
+            logger.info(f"[SERVICE][CHAT_ROLLUP] Refreshed rollups since {bucket_from.isoformat()}.")
+            return True
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"[SERVICE][CHAT_ROLLUP] SQL error at refresh: {e}", exc_info=True)
+            raise DatabaseException("CHAT_ROLLUP_REFRESH", "Failed to refresh chat metrics rollup.")
+
+    def refresh_recent(self, lookback_hours: int) -> bool:
+        # Dipanggil scheduler di setiap proses; cukup satu yang menghitung per putaran
+        return self.refresh(datetime.now(timezone.utc) - timedelta(hours=lookback_hours), wait=False)
@@ -15,11 +15,15 @@ from sqlalchemy import update, and_
 from openai import OpenAI
 from datetime import datetime
 import json
-from agents.classification_agent.classification_message_agent import classify_chat_agent
+from services.chat_classifier import chat_classifier, CATEGORY_PENDING
 from agents.audio_handler_agent.audio_agent import speech_to_text
 from services.notification_service import NotificationService
 from database.models.user_model import UserFCM, User
 from services.fcm_service import FCMService
+from api.websocket.ws_fanout import WebSocketFanout
+from api.websocket.presence_registry import PresenceRegistry
+from services.chat_persistence import ChatPersistence
+from services.answer_cache_service import answer_cache, is_cacheable
 from exceptions.custom_exceptions import ServiceException, DatabaseException
 import asyncio
 
@@ -31,12 +35,18 @@ logger = logging.getLogger(__name__)
 class ChatService:
     def __init__(self, db: AsyncSession, redis, 
                 active_admin_websockets: Dict[uuid.UUID, Dict[uuid.UUID, WebSocket]],
-                active_user_websockets: Dict[uuid.UUID, Dict[uuid.UUID, WebSocket]]
+                active_user_websockets: Dict[uuid.UUID, Dict[uuid.UUID, WebSocket]],
+                fanout: WebSocketFanout,
+                presence: PresenceRegistry,
+                persistence: ChatPersistence
                 ):
         self.active_admin_websockets = active_admin_websockets
         self.active_user_websockets = active_user_websockets
+        self.fanout = fanout
+        self.presence = presence
+        self.persistence = persistence
         self.redis = redis
-        self.classify_chat_agent = classify_chat_agent
+        self.chat_classifier = chat_classifier
         self.speech_to_text = speech_to_text
         self.notification_service = NotificationService(db, redis)
         self.fcm_service = FCMService(db)
@@ -155,54 +165,55 @@ class ChatService:
        agent_output_tokens: int = None,
        agent_other_metrics: dict = None,
        agent_tools_call: List[str] = None,
-       role: str = None
+       role: str = None,
+       chat_id: Optional[uuid.UUID] = None
     ):
         logger.info(f"Saving chat history for room: {room_conversation_id}, sender: {sender_id}, role: {role}")
-        chat_history = Chat(
-            room_conversation_id=room_conversation_id,
-            sender_id=sender_id,
-            message=message,
+        turn = self.persistence.new_turn(room_conversation_id, client_id)
+        turn.add_message(
+            sender_id,
+            message,
+            role,
+            chat_id=chat_id,
             agent_response_category=agent_response_category,
             agent_response_latency=agent_response_latency,
             agent_total_tokens=agent_total_tokens,
             agent_input_tokens=agent_input_tokens,
             agent_output_tokens=agent_output_tokens,
             agent_other_metrics=agent_other_metrics,
-            agent_tools_call=agent_tools_call,
-            role=role,
-            client_id=client_id
+            agent_tools_call=agent_tools_call
         )
-        db.add(chat_history)
-        try:
-            await db.commit()
-            logger.info("Chat history saved successfully.")
-        except SQLAlchemyError as e:
-            logger.error(f"Error saving chat history: {e}", exc_info=True)
-            await db.rollback()
-            raise DatabaseException("SAVE_CHAT_HISTORY", "Error saving chat history.")
-        
+        await self.persistence.commit_turn(db, turn)
+        self.persistence.observe(turn)
+        logger.info("Chat history saved successfully.")
+
         return message
     
     async def broadcast_to_admins(self, db: AsyncSession, client_id: UUID, room_id: UUID):
         try:
             admin_fcm_tokens = await self.get_all_admin_fcm_tokens(db, client_id)
+            if not admin_fcm_tokens:
+                return
 
-            for user_id, fcm_token in admin_fcm_tokens:
-                logger.info(f"Broadcasting message to user_id={user_id} with token={fcm_token}")
-
-                await self.fcm_service.send_message(
-                    fcm_token,
-                    title="Pesan Baru di Chat",
-                    body=f"User mengirim pesan di Room {room_id}"
-                )
+            # Pesan beruntun di room yang sama dalam jendela debounce digabung menjadi
+            # satu notifikasi; push FCM ikut dilewati agar admin tidak dibanjiri.
+            created = await self.notification_service.create_broadcast_notification(
+                receiver_ids=[user_id for user_id, _ in admin_fcm_tokens],
+                client_id=client_id,
+                message=f"User mengirim pesan di Room {room_id}",
+                notif_type="chat",
+                dedupe_key=f"room:{room_id}"
+            )
+            if not created:
+                return
 
-                await self.notification_service.create_notification(
-                    receiver_id=user_id,
-                    client_id=client_id,
-                    message=f"User mengirim pesan di Room {room_id}",
-                    notif_type="chat",
-                    is_broadcast=True
-                )
+            logger.info(f"Broadcasting message to {len(admin_fcm_tokens)} admin devices in room {room_id}")
+            await self.fcm_service.send_many(
+                db,
+                [fcm_token for _, fcm_token in admin_fcm_tokens],
+                title="Pesan Baru di Chat",
+                body=f"User mengirim pesan di Room {room_id}"
+            )
         except Exception as e:
             logger.error(f"Error broadcasting message to admins: {e}", exc_info=True)
 
@@ -214,28 +225,12 @@ class ChatService:
             await websocket.send_json({"success": False, "error": "Message is required"})
             return
 
+        # Pesan user dan balasan chatbot disimpan bersama di akhir turn (satu transaksi);
+        # jika agent gagal/nonaktif, pesan user tetap disimpan di blok finally.
+        turn = self.persistence.new_turn(room_id, client_id)
+        turn.add_message(user_id, message, "user")
         try:
-            room_result = await db.execute(
-                select(RoomConversation.agent_active).where(RoomConversation.id == room_id).limit(1)
-            )
-            is_agent_active = room_result.scalar_one_or_none()
-
-            await self.save_chat_history(
-                db,
-                room_conversation_id=room_id,
-                sender_id=user_id,
-                message=message,
-                agent_response_category=None,
-                agent_response_latency=None,
-                agent_total_tokens=None,
-                agent_input_tokens=None,
-                agent_output_tokens=None,
-                agent_other_metrics=None,
-                agent_tools_call=None,
-                role="user",
-                client_id=client_id
-            )
-            logger.info("User message saved.")
+            is_agent_active, chatbot_id = await self.persistence.load_turn_context(db, turn)
 
             await self._send_message_to_associated_admins(
                 client_id,
@@ -247,22 +242,31 @@ class ChatService:
                 logger.info(f"Agent is inactive in room {room_id}")
                 return
 
-            chatbot_result = await db.execute(
-                select(Member.user_id).where(
-                    Member.room_conversation_id == room_id,
-                    Member.role == "chatbot"
-                )
-            )
-            chatbot_id = chatbot_result.scalar_one_or_none()
-
             if not chatbot_id:
                 logger.error(f"Chatbot not found in room {room_id}")
                 await websocket.send_json({"success": False, "error": "Chatbot not found in this room."})
                 return
 
+            stream = bool(data.get("stream"))
+            query_embedding = None
+            cache_lookup = None
+            if answer_cache is not None:
+                query_embedding = await answer_cache.embed(message)
+                cache_lookup = await answer_cache.find(db, client_id, room_id, message, query_embedding)
+                if cache_lookup.cached is not None:
+                    await self._send_cached_answer(db, websocket, turn, cache_lookup.cached, stream, start_time, client_id, room_id, chatbot_id)
+                    return
+
             agent = call_customer_service_agent(str(chatbot_id), str(user_id), str(user_id), client_id)
             logger.debug(f"Running agent for message: {message}")
-            agent_response = await agent.arun(message)
+
+            time_to_first_token = None
+            if stream:
+                agent_response, time_to_first_token = await self._stream_agent_response(
+                    agent, message, websocket, client_id, room_id, chatbot_id
+                )
+            else:
+                agent_response = await agent.arun(message)
             
             input_token = getattr(getattr(agent_response.messages[-1], 'metrics', None), 'input_tokens', None)
             output_token = getattr(getattr(agent_response.messages[-1], 'metrics', None), 'output_tokens', None)
@@ -270,56 +274,210 @@ class ChatService:
             tools_call = getattr(agent_response, 'formatted_tool_calls', None)
             content = getattr(agent_response, 'content', None)
 
-            category = self.classify_chat_agent(content) if content else ""
+            # Kategori diambil dari cache jika teks sama pernah diklasifikasi,
+            # selain itu disimpan 'pending' dan diklasifikasi di background
+            category = ""
+            if content:
+                category = self.chat_classifier.cached_category(content) or CATEGORY_PENDING
             latency = timedelta(seconds=(time.time() - start_time))
+            other_metrics = {"time_to_first_token": time_to_first_token} if stream else None
 
-            saved_response_message = await self.save_chat_history(
-                db,
-                room_conversation_id=room_id,
-                sender_id=chatbot_id,
-                message=content,
+            response_chat_id = turn.add_message(
+                chatbot_id,
+                content,
+                "chatbot",
                 agent_response_category=category,
                 agent_response_latency=latency,
                 agent_total_tokens=total_token,
                 agent_input_tokens=input_token,
                 agent_output_tokens=output_token,
-                agent_other_metrics=None,
-                agent_tools_call=tools_call,
-                role="chatbot",
-                client_id=client_id
+                agent_other_metrics=other_metrics,
+                agent_tools_call=tools_call
             )
-            logger.info("Chatbot response saved.")
+            turn.touch_room = True
+            if category == CATEGORY_PENDING:
+                # Classifier baru boleh update baris setelah baris tersebut benar-benar tertulis
+                turn.on_persisted.append(lambda: self.chat_classifier.enqueue(response_chat_id, content))
+            await self.persistence.commit_turn(db, turn)
+            saved_response_message = content
+            logger.info("User message and chatbot response saved.")
+
+            if cache_lookup is not None and cache_lookup.storable and is_cacheable(content, tools_call):
+                await answer_cache.store(db, client_id, message, query_embedding, content, response_chat_id)
+
+            if stream:
+                done_frame = {
+                    "success": True,
+                    "type": "done",
+                    "message": saved_response_message,
+                    "message_id": str(response_chat_id),
+                    "sender": "chatbot",
+                    "room_id": str(room_id),
+                    "sender_id": str(chatbot_id),
+                    "metrics": {
+                        "latency_seconds": latency.total_seconds(),
+                        "time_to_first_token": time_to_first_token,
+                        "input_tokens": input_token,
+                        "output_tokens": output_token,
+                        "total_tokens": total_token,
+                    }
+                }
+                await websocket.send_json(done_frame)
+                await self._send_message_to_associated_admins(
+                    client_id,
+                    room_id,
+                    {**done_frame, "user_id": str(chatbot_id), "role": "chatbot"}
+                )
+            else:
+                await websocket.send_json({
+                    "success": True,
+                    "message": saved_response_message,
+                    "sender": "chatbot",
+                    "room_id": str(room_id),
+                    "sender_id": str(chatbot_id),
+                    "type": "message"
+                })
+
+                await self._send_message_to_associated_admins(
+                    client_id,
+                    room_id,
+                    {"user_id": str(chatbot_id), "message": content, "role": "chatbot", "room_id": str(room_id)}
+                )
 
+            await self.broadcast_to_admins(db, client_id, room_id)
+
+        except Exception as e:
+            logger.exception(f"Error handling user message in room {room_id}: {e}")
+            await websocket.send_json({"success": False, "error": f"Terjadi kesalahan saat memproses pesan: {str(e)}"})
+        finally:
+            if not turn.handed_off:
+                try:
+                    await self.persistence.commit_turn(db, turn)
+                except DatabaseException as e:
+                    logger.error(f"Failed to persist user message in room {room_id}: {e}")
+            self.persistence.observe(turn)
+
+    async def _send_cached_answer(self, db: AsyncSession, websocket: WebSocket, turn, cached, stream: bool,
+                                  start_time: float, client_id: UUID, room_id: UUID, chatbot_id: UUID):
+        """
+        Balas dari cache jawaban tanpa menjalankan agent. Frame yang dikirim sama dengan
+        jawaban agent biasa (delta + done saat streaming), hit dicatat di agent_other_metrics.
+        """
+        content = cached.answer
+        category = self.chat_classifier.cached_category(content) or CATEGORY_PENDING
+        latency = timedelta(seconds=(time.time() - start_time))
+        response_chat_id = turn.add_message(
+            chatbot_id,
+            content,
+            "chatbot",
+            agent_response_category=category,
+            agent_response_latency=latency,
+            agent_total_tokens=0,
+            agent_input_tokens=0,
+            agent_output_tokens=0,
+            agent_other_metrics={
+                "answer_cache": {"hit": True, "entry_id": str(cached.entry_id), "similarity": round(cached.similarity, 4)}
+            },
+            agent_tools_call=None
+        )
+        turn.touch_room = True
+        if category == CATEGORY_PENDING:
+            turn.on_persisted.append(lambda: self.chat_classifier.enqueue(response_chat_id, content))
+        await self.persistence.commit_turn(db, turn)
+        logger.info(f"User message and cached chatbot response saved for room {room_id}.")
+
+        if stream:
+            delta_frame = {
+                "success": True,
+                "type": "delta",
+                "delta": content,
+                "sender": "chatbot",
+                "room_id": str(room_id),
+                "sender_id": str(chatbot_id)
+            }
+            done_frame = {
+                "success": True,
+                "type": "done",
+                "message": content,
+                "message_id": str(response_chat_id),
+                "sender": "chatbot",
+                "room_id": str(room_id),
+                "sender_id": str(chatbot_id),
+                "metrics": {
+                    "latency_seconds": latency.total_seconds(),
+                    "time_to_first_token": latency.total_seconds(),
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "total_tokens": 0,
+                    "answer_cache_hit": True,
+                }
+            }
+            for frame in (delta_frame, done_frame):
+                await websocket.send_json(frame)
+                await self._send_message_to_associated_admins(
+                    client_id,
+                    room_id,
+                    {**frame, "user_id": str(chatbot_id), "role": "chatbot"}
+                )
+        else:
             await websocket.send_json({
                 "success": True,
-                "message": saved_response_message,
+                "message": content,
                 "sender": "chatbot",
                 "room_id": str(room_id),
                 "sender_id": str(chatbot_id),
                 "type": "message"
             })
-
             await self._send_message_to_associated_admins(
                 client_id,
                 room_id,
                 {"user_id": str(chatbot_id), "message": content, "role": "chatbot", "room_id": str(room_id)}
             )
 
-            await db.execute(
-                update(RoomConversation)
-                .where(and_(
-                    RoomConversation.id == room_id,
-                    RoomConversation.client_id == client_id
-                ))
-                .values(updated_at=datetime.utcnow())
+        await self.broadcast_to_admins(db, client_id, room_id)
+
+    async def _stream_agent_response(
+        self,
+        agent,
+        message: str,
+        websocket: WebSocket,
+        client_id: UUID,
+        room_id: UUID,
+        chatbot_id: UUID
+    ):
+        """
+        Jalankan agent dengan mode streaming, kirim setiap potongan jawaban sebagai frame `delta`
+        ke user dan admin terkait. Mengembalikan RunResponse lengkap dan time-to-first-token (detik).
+        """
+        run_start = time.time()
+        time_to_first_token = None
+
+        response_stream = await agent.arun(message, stream=True)
+        async for chunk in response_stream:
+            delta = getattr(chunk, "content", None)
+            if not delta or not isinstance(delta, str):
+                continue
+
+            if time_to_first_token is None:
+                time_to_first_token = time.time() - run_start
+                logger.info(f"First token for room {room_id} after {time_to_first_token:.2f}s")
+
+            delta_frame = {
+                "success": True,
+                "type": "delta",
+                "delta": delta,
+                "sender": "chatbot",
+                "room_id": str(room_id),
+                "sender_id": str(chatbot_id)
+            }
+            await websocket.send_json(delta_frame)
+            await self._send_message_to_associated_admins(
+                client_id,
+                room_id,
+                {**delta_frame, "user_id": str(chatbot_id), "role": "chatbot"}
             )
-            await db.commit()
-            
-            await self.broadcast_to_admins(db, client_id, room_id)
 
-        except Exception as e:
-            logger.exception(f"Error handling user message in room {room_id}: {e}")
-            await websocket.send_json({"success": False, "error": f"Terjadi kesalahan saat memproses pesan: {str(e)}"})
+        return agent.run_response, time_to_first_token
 
     async def handle_chatbot_message(self, db : AsyncSession, websocket: WebSocket, data: dict, sender_id: uuid.UUID, room_id: uuid.UUID, client_id: UUID):
         
@@ -360,20 +518,18 @@ class ChatService:
             user_members = user_members_result.scalars().all()
 
             for member in user_members:
-                user_websocket = await self.get_active_user_ws(client_id, member.user_id)
-                if user_websocket:
-                    try:
-                        await user_websocket.send_json({
-                        "success": True,
-                        "message": message,
-                        "sender": "chatbot",
-                        "room_id": str(room_id),
-                        "sender_id": str(sender_id),
-                        "type": "message"
-                    })
-                        logger.info(f"Pesan chatbot dikirim ke user {member.user_id} di room {room_id}")
-                    except Exception as e:
-                        logger.error(f"Gagal mengirim pesan chatbot ke user {member.user_id} di room {room_id}: {e}", exc_info=True)
+                delivered = await self.fanout.send_to_user(client_id, member.user_id, {
+                    "success": True,
+                    "message": message,
+                    "sender": "chatbot",
+                    "room_id": str(room_id),
+                    "sender_id": str(sender_id),
+                    "type": "message"
+                })
+                if delivered:
+                    logger.info(f"Pesan chatbot dikirim ke user {member.user_id} di room {room_id}")
+                else:
+                    logger.info(f"User {member.user_id} tidak terhubung di node mana pun, pesan chatbot room {room_id} tidak terkirim")
 
             await self._send_message_to_associated_admins(
                 client_id,
@@ -420,11 +576,8 @@ class ChatService:
                 await websocket.send_json({"success": False, "error": "Target user tidak memiliki user_id"})
                 return
 
-            # Cek online users di Redis
-            online_users = await self.get_all_online("user", client_id)
-            logger.info(f"[CHAT_SERVICE] Online users in Redis: {online_users}")
-
-            if target_user_id not in online_users:
+            # Cek presence user target langsung (ZSCORE), tanpa membaca seluruh daftar online
+            if not await self.is_online(target_user_id, "user", client_id):
                 logger.info(f"[REDIS][CHECK] User {target_user_id} tidak online")
                 await self.save_chat_history(
                     db,
@@ -437,10 +590,6 @@ class ChatService:
                 await websocket.send_json({"success": False, "error": "User tidak aktif"})
                 return
 
-            # Refresh TTL Redis
-            await self.refresh_online_ttl(target_user_id, "user", client_id, ttl_seconds=30)
-            logger.info(f"[REDIS][REFRESH] TTL untuk user {target_user_id} diperbarui")
-
             # Simpan chat history
             await self.save_chat_history(
                 db,
@@ -467,24 +616,19 @@ class ChatService:
             #     "room_id": str(room_id)
             # })
             
-            user_websocket = await self.get_active_user_ws(client_id, target_user_id)
-            
-            if user_websocket:
-                try:
-                    await user_websocket.send_json({
-                        "success": True,
-                        "message": admin_message,
-                        "sender": "admin",
-                        "room_id": str(room_id),
-                        "sender_id": str(sender_id),
-                        "type": "message"
-                    })
-
-                    logger.info(f"Pesan admin {sender_id} dikirim ke user {target_user_id} di room {room_id}")
-                except Exception as e:
-                    logger.error(f"Gagal mengirim pesan admin ke user {target_user_id} di room {room_id}: {e}", exc_info=True)
+            delivered = await self.fanout.send_to_user(client_id, target_user_id, {
+                "success": True,
+                "message": admin_message,
+                "sender": "admin",
+                "room_id": str(room_id),
+                "sender_id": str(sender_id),
+                "type": "message"
+            })
+
+            if delivered:
+                logger.info(f"Pesan admin {sender_id} dikirim ke user {target_user_id} di room {room_id}")
             else:
-                logger.info(f"Websocket untuk user {target_user_id} tidak ditemukan atau tidak aktif dan isi pesan admin {admin_message}.")
+                logger.info(f"Websocket untuk user {target_user_id} tidak dapat menerima pesan admin {admin_message}.")
             
         except SQLAlchemyError as e:
             logger.error(f"Error in handle_admin_message for room {room_id}: {e}", exc_info=True)
@@ -500,7 +644,8 @@ class ChatService:
     async def handle_disconnect(self, db: AsyncSession, user_id: uuid.UUID, role: str, room_id: Optional[uuid.UUID], client_id: UUID):
         logger.info(f"{role.capitalize()} {user_id} terputus untuk client {client_id}.")
 
-        await self.mark_offline(user_id, role, client_id)
+        # Presence sudah dilepas sekali per socket oleh handler WebSocket; mark_offline
+        # mengurangi hitungan koneksi, jadi memanggilnya lagi di sini melepas socket lain milik user ini
 
         if room_id:
             try:
@@ -530,34 +675,28 @@ class ChatService:
         else:
             logger.info(f"User {user_id} disconnected without an associated room_id (client {client_id}).")
 
-    async def mark_online(self, user_id: uuid.UUID, role: str, client_id: UUID, ttl_seconds: int = 30):
-        key = f"online:{client_id}:{role}s"
-        await self.redis.sadd(key, str(user_id))
-        # await self.redis.expire(key, ttl_seconds)  
-        logger.debug(f"[REDIS][SET] Mark {role} {user_id} online, TTL={ttl_seconds}s")
+    async def mark_online(self, user_id: uuid.UUID, role: str, client_id: UUID):
+        await self.presence.mark_online(client_id, role, user_id)
+        logger.debug(f"[PRESENCE][SET] Mark {role} {user_id} online")
 
-    async def refresh_online_ttl(self, user_id: uuid.UUID, role: str, client_id: UUID, ttl_seconds: int = 30):
-        key = f"online:{client_id}:{role}s"
-        exists = await self.redis.sismember(key, str(user_id))
-        if exists:
-            # await self.redis.expire(key, ttl_seconds)
-            logger.debug(f"[REDIS][REFRESH] Refreshed TTL for {role} {user_id} to {ttl_seconds}s")
+    async def refresh_online_ttl(self, user_id: uuid.UUID, role: str, client_id: UUID):
+        await self.presence.heartbeat(client_id, role, user_id)
+        logger.debug(f"[PRESENCE][REFRESH] Heartbeat for {role} {user_id}")
 
     async def mark_offline(self, user_id: uuid.UUID, role: str, client_id: UUID):
-        key = f"online:{client_id}:{role}s"
-        await self.redis.srem(key, str(user_id))
-        logger.debug(f"[REDIS][DEL] Mark {role} {user_id} offline")
+        await self.presence.mark_offline(client_id, role, user_id)
+        logger.debug(f"[PRESENCE][DEL] Mark {role} {user_id} offline")
 
     async def get_all_online(self, role: str, client_id: UUID) -> List[uuid.UUID]:
-        key = f"online:{client_id}:{role}s"
-        members = await self.redis.smembers(key)
-        return [uuid.UUID(m.decode() if isinstance(m, bytes) else m) for m in members]
-    
+        return await self.presence.get_all_online(client_id, role)
+
+    async def get_online_among(self, role: str, client_id: UUID, user_ids: List[uuid.UUID]) -> Dict[uuid.UUID, bool]:
+        return await self.presence.online_among(client_id, role, user_ids)
+
     async def is_online(self, user_id: uuid.UUID, role: str, client_id: UUID) -> bool:
-        key = f"online:{client_id}:{role}s"
-        exists = await self.redis.sismember(key, str(user_id))
-        logger.debug(f"[REDIS][CHECK] Is {role} {user_id} online? {exists}")
-        return bool(exists)
+        online = await self.presence.is_online(client_id, role, user_id)
+        logger.debug(f"[PRESENCE][CHECK] Is {role} {user_id} online? {online}")
+        return online
 
     async def set_user_room_mapping(self, user_id: UUID, client_id: UUID, role: str, room_id: Optional[UUID] = None, ttl: int = 3600):
         key = f"{role}_room:{user_id}:{client_id}"
@@ -583,23 +722,22 @@ class ChatService:
         log_prefix = f"[client={client_id} room={room_id}]"
         logger.info(f"{log_prefix} Preparing to send message to associated admins.")
 
-        admins = self.active_admin_websockets.get(client_id, {})
-        logger.info(f"{log_prefix} Found {len(admins)} active admin websockets.")
-
-        if not admins:
-            return
-
-        for admin_user_id, ws_conn in admins.items():
-            if exclude_admin_id and admin_user_id == exclude_admin_id:
-                logger.debug(f"{log_prefix} Skipping excluded admin {admin_user_id}.")
-                continue
+        payload = {"type": "message", **message_data}
+        delivered = await self.fanout.send_to_admins(client_id, payload, exclude_admin_id=exclude_admin_id)
+        logger.info(f"{log_prefix} Sent message to {delivered} local admins and published to other nodes.")
 
-            try:
-                payload = {**message_data, "type": "message"}
-                await ws_conn.send_json(payload)
-                logger.info(f"{log_prefix} Sent message to admin {admin_user_id}.")
-            except Exception as e:
-                logger.error(f"{log_prefix} Failed to send to admin {admin_user_id}: {e}", exc_info=True)
+    async def broadcast_to_room(self, db: AsyncSession, client_id: UUID, room_id: UUID, message_data: Dict[str, Any]):
+        result = await db.execute(
+            select(Member.user_id).where(
+                Member.room_conversation_id == room_id,
+                Member.role == "user",
+                Member.client_id == client_id
+            )
+        )
+        payload = {"type": "event", "room_id": str(room_id), **message_data}
+        for user_id in result.scalars().all():
+            await self.fanout.send_to_user(client_id, user_id, payload)
+        await self.fanout.send_to_admins(client_id, payload)
 
     async def get_admin_ids_in_room(self, db: AsyncSession, room_id: UUID) -> List[UUID]:
         result = await db.execute(
@@ -635,34 +773,3 @@ class ChatService:
         )
         result = await db.execute(stmt)
         return result.fetchall()
-
-    async def subscribe_user_events(self, user_id: uuid.UUID):
-        pubsub = self.redis.pubsub()
-        channel = f"chat_user:{user_id}"
-        await pubsub.subscribe(channel)
-        logger.info(f"[REDIS][SUBSCRIBE] Listening on {channel}")
-
-        try:
-            async for msg in pubsub.listen():
-                if msg["type"] != "message":
-                    continue
-                try:
-                    data = json.loads(msg["data"])
-                except Exception as e:
-                    logger.error(f"[REDIS] Invalid JSON: {e}")
-                    continue
-
-                ws = self.active_websockets.get(user_id)
-                if ws:
-                    await ws.send_json({
-                        "success": True,
-                        "data": data["message"],
-                        "from": data["from"]
-                    })
-                else:
-                    logger.debug(f"[WS] User {user_id} offline di instance ini.")
-        finally:
-            await pubsub.unsubscribe(channel)
-
-
-
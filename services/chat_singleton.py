@@ -1,6 +1,17 @@
 # services/chat_singleton.py
 from services.chat_service import ChatService
 from api.websocket.redis_client import redis_client
+from api.websocket.ws_fanout import WebSocketFanout
+from api.websocket.presence_registry import PresenceRegistry
+from services.chat_persistence import ChatPersistence, ChatWriteBehindBuffer
+from core.settings import PRESENCE_TTL_SECONDS, PRESENCE_HEARTBEAT_INTERVAL, PRESENCE_REAP_INTERVAL
+from core.settings import (
+    CHAT_WRITE_BEHIND_ENABLED,
+    CHAT_WRITE_BEHIND_QUEUE_SIZE,
+    CHAT_WRITE_BEHIND_BATCH_SIZE,
+    CHAT_WRITE_BEHIND_FLUSH_INTERVAL,
+    CHAT_WRITE_BEHIND_STREAM
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Dict
 from uuid import UUID
@@ -10,6 +21,31 @@ from starlette.websockets import WebSocket
 active_admin_websockets: Dict[UUID, Dict[UUID, WebSocket]] = {}
 active_user_websockets: Dict[UUID, Dict[UUID, WebSocket]] = {}
 
+# Satu subscriber Redis per proses untuk fan-out antar worker/pod
+ws_fanout = WebSocketFanout(
+    redis=redis_client,
+    active_admin_websockets=active_admin_websockets,
+    active_user_websockets=active_user_websockets,
+)
+
+presence_registry = PresenceRegistry(
+    redis=redis_client,
+    ttl_seconds=PRESENCE_TTL_SECONDS,
+    heartbeat_interval=PRESENCE_HEARTBEAT_INTERVAL,
+    reap_interval=PRESENCE_REAP_INTERVAL,
+)
+
+# Write-behind opsional: tanpa buffer setiap turn ditulis langsung dalam satu transaksi
+chat_persistence = ChatPersistence(
+    buffer=ChatWriteBehindBuffer(
+        redis=redis_client,
+        max_queue_size=CHAT_WRITE_BEHIND_QUEUE_SIZE,
+        batch_size=CHAT_WRITE_BEHIND_BATCH_SIZE,
+        flush_interval=CHAT_WRITE_BEHIND_FLUSH_INTERVAL,
+        stream_key=CHAT_WRITE_BEHIND_STREAM,
+    ) if CHAT_WRITE_BEHIND_ENABLED else None
+)
+
 chat_service_singleton: ChatService = None
 
 def init_chat_service(db: AsyncSession):
@@ -20,5 +56,8 @@ def init_chat_service(db: AsyncSession):
             redis=redis_client,
             active_admin_websockets=active_admin_websockets,
             active_user_websockets=active_user_websockets,
+            fanout=ws_fanout,
+            presence=presence_registry,
+            persistence=chat_persistence,
         )
     return chat_service_singleton
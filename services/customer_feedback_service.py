@@ -8,6 +8,8 @@ from fastapi import Depends
 from core.config_db import config_db
 from exceptions.custom_exceptions import DatabaseException
 from uuid import UUID
+from utils.pagination_utils import KeysetPage, paginate, count_rows
+from enums.count_mode_enum import CountMode
 logger = logging.getLogger(__name__)
 
 class CustomerFeedbackService:
@@ -17,9 +19,11 @@ class CustomerFeedbackService:
     def __init__(self, db: Session):
         self.db = db
 
-    def fetch_all_feedbacks(self, offset: int, limit: int, client_id: UUID, search: Optional[str] = None) -> List[CustomerFeedback]:
+    def fetch_all_feedbacks(
+        self, offset: int, limit: int, client_id: UUID, search: Optional[str] = None, cursor: Optional[str] = None
+    ) -> KeysetPage:
         try:
-            logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Fetching feedbacks for client_id={client_id}, offset={offset}, limit={limit}, search='{search}'")
+            logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Fetching feedbacks for client_id={client_id}, cursor={cursor}, offset={offset}, limit={limit}, search='{search}'")
             
             query = self.db.query(CustomerFeedback).filter(CustomerFeedback.client_id == client_id)
 
@@ -27,31 +31,27 @@ class CustomerFeedbackService:
                 search_filter = f"%{search.lower()}%"
                 query = query.filter(func.lower(CustomerFeedback.feedback_from_customer).like(search_filter))
 
-            feedbacks = (
-                query.order_by(desc(CustomerFeedback.created_at))
-                    .offset(offset)
-                    .limit(limit)
-                    .all()
-            )
+            page = paginate(query, CustomerFeedback.created_at, CustomerFeedback.id, limit, cursor=cursor, offset=offset)
 
-            logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Retrieved {len(feedbacks)} feedback(s) for client_id={client_id}")
-            return feedbacks
+            logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Retrieved {len(page.items)} feedback(s) for client_id={client_id}")
+            return page
 
         except SQLAlchemyError as e:
             logger.error(f"[SERVICE][CUSTOMER_FEEDBACK] DB error while fetching feedbacks: {e}", exc_info=True)
             raise DatabaseException(code="DB_FETCH_ERROR", message="Failed to fetch feedbacks from database.")
 
 
-    def count_total_feedbacks(self, client_id: UUID) -> int:
+    def count_total_feedbacks(self, client_id: UUID, count_mode: CountMode = CountMode.exact) -> int:
         """
         Menghitung total jumlah feedback di database berdasarkan client_id.
+        Dengan count_mode=estimate, nilai diambil dari perkiraan planner.
         """
         try:
-            logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Counting total feedbacks for client_id={client_id}")
-            total_count = (
-                self.db.query(func.count(CustomerFeedback.id))
-                .filter(CustomerFeedback.client_id == client_id)
-                .scalar()
+            logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Counting total feedbacks for client_id={client_id}, count_mode={count_mode}")
+            total_count, _ = count_rows(
+                self.db,
+                self.db.query(CustomerFeedback).filter(CustomerFeedback.client_id == client_id),
+                count_mode if count_mode != CountMode.none else CountMode.exact
             )
             logger.info(f"[SERVICE][CUSTOMER_FEEDBACK] Total feedbacks for client_id={client_id}: {total_count}")
             return total_count
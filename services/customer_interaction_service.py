@@ -8,6 +8,8 @@ from database.models.customer_interaction_model import CustomerInteraction
 from exceptions.custom_exceptions import DatabaseException
 from typing import Optional
 from uuid import UUID
+from utils.pagination_utils import paginate, count_rows
+from enums.count_mode_enum import CountMode
 
 logger = logging.getLogger(__name__)
 
@@ -19,20 +21,30 @@ class CustomerInteractionService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all_customer_interactions(self, client_id: UUID, offset: int = 0, limit: int = 100, search: Optional[str] = None) -> dict:
+    def get_all_customer_interactions(
+        self,
+        client_id: UUID,
+        offset: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.exact
+    ) -> dict:
         """
         Mengambil semua customer interactions milik client tertentu dengan pagination.
 
         Args:
             client_id (UUID): ID client (tenant) yang sedang login.
-            offset (int): Data yang dilewati.
+            offset (int): Data yang dilewati (deprecated, gunakan cursor).
             limit (int): Jumlah maksimum data yang diambil.
+            cursor (str): next_cursor dari halaman sebelumnya.
+            count_mode (CountMode): exact, estimate, atau none untuk total.
 
         Returns:
-            dict: Berisi total dan list data.
+            dict: Berisi total, next_cursor dan list data.
         """
         try:
-            logger.info(f"[SERVICE][CUSTOMER_INTERACTION] Fetching interactions for client_id={client_id}, offset={offset}, limit={limit}, search='{search}'")
+            logger.info(f"[SERVICE][CUSTOMER_INTERACTION] Fetching interactions for client_id={client_id}, cursor={cursor}, offset={offset}, limit={limit}, search='{search}'")
 
             query = self.db.query(CustomerInteraction).filter(CustomerInteraction.client_id == client_id)
 
@@ -48,20 +60,16 @@ class CustomerInteractionService:
                     )
                 )
 
-            total = query.count()
+            page = paginate(query, CustomerInteraction.created_at, CustomerInteraction.id, limit, cursor=cursor, offset=offset)
+            total, is_estimate = count_rows(self.db, query, count_mode)
 
-            interactions = (
-                query.order_by(CustomerInteraction.created_at.desc())
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
-
-            logger.info(f"[SERVICE][CUSTOMER_INTERACTION] Retrieved {len(interactions)} interaction(s) for client_id={client_id}")
+            logger.info(f"[SERVICE][CUSTOMER_INTERACTION] Retrieved {len(page.items)} interaction(s) for client_id={client_id}")
 
             return {
                 "total": total,
-                "data": interactions
+                "total_is_estimate": is_estimate,
+                "next_cursor": page.next_cursor,
+                "data": page.items
             }
 
         except SQLAlchemyError as e:
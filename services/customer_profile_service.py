@@ -8,6 +8,9 @@ from core.config_db import config_db
 from database.models.customer_model import Customer
 from schemas.customer_schema import CustomerCreate, CustomerUpdate
 from exceptions.custom_exceptions import DatabaseException
+from utils.search_utils import SearchQuery
+from utils.pagination_utils import paginate, count_rows
+from enums.count_mode_enum import CountMode
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
@@ -32,29 +35,35 @@ class CustomerProfileService:
             raise DatabaseException(code="DB_GET_CUSTOMER_BY_ID_ERROR", message="Failed to fetch customer by ID.")
 
 
-    def get_all_customers(self, client_id: UUID, limit: int = 10, offset: int = 0, search: Optional[str] = None) -> Dict:
+    def get_all_customers(
+        self,
+        client_id: UUID,
+        limit: int = 10,
+        offset: int = 0,
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.exact
+    ) -> Dict:
         try:
-            logger.info(f"[SERVICE][CUSTOMER] Fetching all customers for client {client_id}: offset={offset}, limit={limit}, search='{search}'")
+            logger.info(f"[SERVICE][CUSTOMER] Fetching all customers for client {client_id}: cursor={cursor}, offset={offset}, limit={limit}, search='{search}'")
             query = self.db.query(Customer).filter(Customer.client_id == client_id)
 
             if search:
-                search_term = f"%{search.lower()}%"
-                query = query.filter(
-                    or_(
-                        func.lower(Customer.full_name).ilike(search_term),
-                        func.lower(Customer.email).ilike(search_term),
-                        func.lower(Customer.phone_number).ilike(search_term)
-                    )
-                )
+                query = SearchQuery(
+                    term=search,
+                    trigram_columns=[Customer.full_name, Customer.email, Customer.phone_number]
+                ).apply(query).order_by(Customer.customer_id)
 
-            total = query.count()
-            data = query.offset(offset).limit(limit).all()
+            page = paginate(query, Customer.created_at, Customer.customer_id, limit, cursor=cursor, offset=offset, ranked=bool(search))
+            total, is_estimate = count_rows(self.db, query, count_mode)
 
-            logger.info(f"[SERVICE][CUSTOMER] Found {len(data)} customer(s) for client {client_id}")
+            logger.info(f"[SERVICE][CUSTOMER] Found {len(page.items)} customer(s) for client {client_id}")
 
             return {
-                "data": data,
-                "total": total
+                "data": page.items,
+                "total": total,
+                "total_is_estimate": is_estimate,
+                "next_cursor": page.next_cursor
             }
 
         except SQLAlchemyError as e:
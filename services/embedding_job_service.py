@@ -0,0 +1,383 @@
+import logging
+from datetime import timedelta
+from typing import List, Optional
+from uuid import UUID
+from fastapi import Depends
+from sqlalchemy import text, desc, func, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from core.config_db import config_db
+from core.settings import (
+    EMBEDDING_JOB_MAX_ATTEMPTS,
+    EMBEDDING_JOB_TENANT_CONCURRENCY,
+    EMBEDDING_JOB_STALE_SECONDS,
+    EMBEDDING_JOB_RETRY_BACKOFF_SECONDS
+)
+from database.models import EmbeddingJob, FileModel, KnowledgeManifest, WebSourceModel
+from exceptions.custom_exceptions import DatabaseException, ServiceException
+
+logger = logging.getLogger(__name__)
+
+SOURCE_FILE = "file"
+SOURCE_WEBSITE = "website"
+ACTIVE_STATUSES = ("queued", "running")
+# Predikat index unik ux_dt_embedding_jobs_active_source (satu job aktif per sumber)
+_ACTIVE_SOURCE_WHERE = text("status IN ('queued', 'running')")
+
+# Semua worker mengambil job di bawah satu advisory lock transaksi, supaya batas
+# job per tenant tidak terlampaui oleh dua worker yang claim bersamaan.
+_CLAIM_LOCK_KEY = 724_311_905
+# Scheduler re-crawl berjalan di setiap proses API; hanya satu yang mengantrikan per putaran
+_RECRAWL_LOCK_KEY = 724_311_906
+
+_CLAIM_SQL = text("""
+    UPDATE ai.dt_embedding_jobs AS j
+    SET status = 'running',
+        locked_by = :worker_id,
+        heartbeat_at = now(),
+        attempts = j.attempts + 1,
+        started_at = COALESCE(j.started_at, now())
+    WHERE j.id = (
+        SELECT c.id
+        FROM ai.dt_embedding_jobs c
+        WHERE (
+                (c.status = 'queued' AND c.run_after <= now())
+                OR (c.status = 'running' AND c.heartbeat_at < now() - make_interval(secs => :stale_seconds))
+            )
+            AND (
+                SELECT COUNT(*)
+                FROM ai.dt_embedding_jobs r
+                WHERE r.client_id = c.client_id
+                    AND r.status = 'running'
+                    AND r.heartbeat_at >= now() - make_interval(secs => :stale_seconds)
+            ) < :tenant_limit
+        ORDER BY c.run_after, c.created_at
+        LIMIT 1
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING j.id
+""")
+
+class EmbeddingJobService:
+    """
+    Antrian job embedding berbasis Postgres (ai.dt_embedding_jobs).
+
+    Endpoint hanya membuat job (enqueue_pending); pemrosesan dilakukan oleh
+    EmbeddingWorker (api/jobs/embedding_worker.py) dengan session sendiri.
+    """
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _pending_sources(self, client_id: UUID, source_type: str):
+        if source_type == SOURCE_FILE:
+            rows = (
+                self.db.query(FileModel.uuid_file, FileModel.filename)
+                .filter(FileModel.client_id == client_id, FileModel.status.in_(("pending", "failed")))
+                .all()
+            )
+        else:
+            rows = (
+                self.db.query(WebSourceModel.id, WebSourceModel.url)
+                .filter(WebSourceModel.client_id == client_id, WebSourceModel.status.in_(("pending", "failed")))
+                .all()
+            )
+        return [(source_id, name) for source_id, name in rows]
+
+    def _active_job(self, source_type: str, source_id: UUID) -> Optional[EmbeddingJob]:
+        return (
+            self.db.query(EmbeddingJob)
+            .filter(
+                EmbeddingJob.source_type == source_type,
+                EmbeddingJob.source_id == source_id,
+                EmbeddingJob.status.in_(ACTIVE_STATUSES)
+            )
+            .first()
+        )
+
+    def _flush_active(self, job: EmbeddingJob) -> bool:
+        """
+        Flush job baru/yang diantrikan ulang di dalam savepoint. False jika request
+        lain sudah lebih dulu membuat job aktif untuk sumber yang sama (unique index).
+        """
+        try:
+            with self.db.begin_nested():
+                self.db.add(job)
+                self.db.flush()
+            return True
+        except IntegrityError:
+            return False
+
+    def _insert_jobs(self, values: List[dict]) -> int:
+        """Insert job queued; sumber yang sudah punya job aktif dilewati. Mengembalikan jumlah job baru."""
+        if not values:
+            return 0
+        result = self.db.execute(
+            pg_insert(EmbeddingJob)
+            .values([{"status": "queued", "max_attempts": EMBEDDING_JOB_MAX_ATTEMPTS, **value} for value in values])
+            .on_conflict_do_nothing(index_elements=["source_type", "source_id"], index_where=_ACTIVE_SOURCE_WHERE)
+            .returning(EmbeddingJob.id)
+        )
+        return len(result.all())
+
+    def enqueue_pending(self, client_id: UUID, source_type: str) -> List[EmbeddingJob]:
+        """
+        Buat job untuk setiap sumber 'pending'/'failed' milik client. Sumber yang sudah
+        punya job aktif dilewati; job gagal sebelumnya diantrikan ulang sehingga
+        melanjutkan dari completed_pages terakhir.
+        """
+        try:
+            logger.info(f"[SERVICE][EMBEDDING_JOB] Enqueue {source_type} embedding for client_id: {client_id}")
+            sources = self._pending_sources(client_id, source_type)
+            if not sources:
+                return []
+
+            existing = {
+                job.source_id: job
+                for job in (
+                    self.db.query(EmbeddingJob)
+                    .filter(
+                        EmbeddingJob.client_id == client_id,
+                        EmbeddingJob.source_type == source_type,
+                        EmbeddingJob.source_id.in_([source_id for source_id, _ in sources])
+                    )
+                    .order_by(EmbeddingJob.created_at)
+                    .all()
+                )
+            }
+
+            jobs = []
+            for source_id, name in sources:
+                job = existing.get(source_id)
+                if job is not None and job.status in ACTIVE_STATUSES:
+                    jobs.append(job)
+                    continue
+                if job is not None and job.status == "failed":
+                    job.status = "queued"
+                    job.attempts = 0
+                    job.last_error = None
+                    job.finished_at = None
+                    job.run_after = func.now()
+                else:
+                    job = EmbeddingJob(
+                        client_id=client_id,
+                        source_type=source_type,
+                        source_id=source_id,
+                        source_name=name,
+                        status="queued",
+                        max_attempts=EMBEDDING_JOB_MAX_ATTEMPTS,
+                    )
+                if not self._flush_active(job):
+                    # Kalah balapan dengan request lain: pakai job aktif yang sudah ada
+                    job = self._active_job(source_type, source_id)
+                    if job is None:
+                        continue
+                jobs.append(job)
+
+            self.db.commit()
+            for job in jobs:
+                self.db.refresh(job)
+            logger.info(f"[SERVICE][EMBEDDING_JOB] {len(jobs)} jobs queued for client_id: {client_id}")
+            return jobs
+
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"[SERVICE][EMBEDDING_JOB] DB error enqueueing jobs: {e}", exc_info=True)
+            raise DatabaseException(code="DB_ENQUEUE_EMBEDDING_ERROR", message="Failed to queue embedding jobs.")
+
+    def enqueue_reindex(self, client_id: UUID) -> int:
+        """Antrikan ulang semua file dan website 'processed' milik client (mis. konfigurasi chunking berubah)."""
+        try:
+            queued = 0
+            for source_type, model, id_column, name_column in (
+                (SOURCE_FILE, FileModel, FileModel.uuid_file, FileModel.filename),
+                (SOURCE_WEBSITE, WebSourceModel, WebSourceModel.id, WebSourceModel.url),
+            ):
+                rows = (
+                    self.db.query(id_column, name_column)
+                    .filter(
+                        model.client_id == client_id,
+                        model.status == "processed",
+                        ~self.db.query(EmbeddingJob.id)
+                        .filter(
+                            EmbeddingJob.source_type == source_type,
+                            EmbeddingJob.source_id == id_column,
+                            EmbeddingJob.status.in_(ACTIVE_STATUSES)
+                        )
+                        .exists()
+                    )
+                    .all()
+                )
+                queued += self._insert_jobs([
+                    {"client_id": client_id, "source_type": source_type, "source_id": source_id, "source_name": name}
+                    for source_id, name in rows
+                ])
+            self.db.commit()
+            logger.info(f"[SERVICE][EMBEDDING_JOB] {queued} sources queued for re-index for client_id: {client_id}")
+            return queued
+
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"[SERVICE][EMBEDDING_JOB] DB error queueing re-index: {e}", exc_info=True)
+            raise DatabaseException(code="DB_ENQUEUE_REINDEX_ERROR", message="Failed to queue knowledge re-index.")
+
+    def enqueue_recrawl(self, older_than_hours: int) -> int:
+        """
+        Antrikan ulang website 'processed' yang manifest-nya lebih tua dari
+        older_than_hours. Worker memakai conditional request dan hash konten, jadi
+        website yang tidak berubah selesai tanpa embedding ulang. Dijaga advisory
+        lock transaksi: jika proses lain sedang mengantrikan, putaran ini dilewati.
+        """
+        try:
+            if not self.db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": _RECRAWL_LOCK_KEY}).scalar():
+                self.db.rollback()
+                logger.info("[SERVICE][EMBEDDING_JOB] Re-crawl sedang diantrikan proses lain, dilewati")
+                return 0
+            rows = (
+                self.db.query(WebSourceModel.id, WebSourceModel.client_id, WebSourceModel.url)
+                .join(
+                    KnowledgeManifest,
+                    (KnowledgeManifest.source_type == SOURCE_WEBSITE) & (KnowledgeManifest.source_id == WebSourceModel.id)
+                )
+                .filter(
+                    WebSourceModel.status == "processed",
+                    KnowledgeManifest.updated_at < func.now() - timedelta(hours=older_than_hours),
+                    ~self.db.query(EmbeddingJob.id)
+                    .filter(
+                        EmbeddingJob.source_type == SOURCE_WEBSITE,
+                        EmbeddingJob.source_id == WebSourceModel.id,
+                        EmbeddingJob.status.in_(ACTIVE_STATUSES)
+                    )
+                    .exists()
+                )
+                .all()
+            )
+            queued = self._insert_jobs([
+                {"client_id": client_id, "source_type": SOURCE_WEBSITE, "source_id": source_id, "source_name": url}
+                for source_id, client_id, url in rows
+            ])
+            self.db.commit()
+            if queued:
+                logger.info(f"[SERVICE][EMBEDDING_JOB] {queued} websites queued for re-crawl")
+            return queued
+
+        except SQLAlchemyError as e:
+            self.db.rollback()
+            logger.error(f"[SERVICE][EMBEDDING_JOB] DB error queueing re-crawl: {e}", exc_info=True)
+            raise DatabaseException(code="DB_ENQUEUE_RECRAWL_ERROR", message="Failed to queue website re-crawl.")
+
+    def get_job(self, job_id: UUID, client_id: UUID) -> EmbeddingJob:
+        job = (
+            self.db.query(EmbeddingJob)
+            .filter(EmbeddingJob.id == job_id, EmbeddingJob.client_id == client_id)
+            .first()
+        )
+        if not job:
+            raise ServiceException(code="EMBEDDING_JOB_NOT_FOUND", status_code=404, message="Embedding job not found.")
+        return job
+
+    def list_jobs(self, client_id: UUID, status: Optional[str] = None, limit: int = 50) -> List[EmbeddingJob]:
+        try:
+            query = self.db.query(EmbeddingJob).filter(EmbeddingJob.client_id == client_id)
+            if status:
+                query = query.filter(EmbeddingJob.status == status)
+            return query.order_by(desc(EmbeddingJob.created_at)).limit(limit).all()
+        except SQLAlchemyError as e:
+            logger.error(f"[SERVICE][EMBEDDING_JOB] DB error listing jobs: {e}", exc_info=True)
+            raise DatabaseException(code="DB_FETCH_EMBEDDING_JOBS_ERROR", message="Failed to fetch embedding jobs.")
+
+    # ===== Dipakai worker =====
+
+    def has_active_jobs(self, client_id: UUID) -> bool:
+        return self.db.query(
+            self.db.query(EmbeddingJob.id)
+            .filter(EmbeddingJob.client_id == client_id, EmbeddingJob.status.in_(ACTIVE_STATUSES))
+            .exists()
+        ).scalar()
+
+    def claim_next(self, worker_id: str) -> Optional[EmbeddingJob]:
+        """Ambil satu job siap jalan (atau yang ditinggal worker mati) dan tandai running."""
+        try:
+            self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": _CLAIM_LOCK_KEY})
+            job_id = self.db.execute(_CLAIM_SQL, {
+                "worker_id": worker_id,
+                "stale_seconds": EMBEDDING_JOB_STALE_SECONDS,
+                "tenant_limit": EMBEDDING_JOB_TENANT_CONCURRENCY,
+            }).scalar_one_or_none()
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+        if job_id is None:
+            return None
+        return self.db.get(EmbeddingJob, job_id)
+
+    def heartbeat(self, job_id: UUID, worker_id: str) -> bool:
+        """Perbarui heartbeat_at job yang masih dipegang worker ini; False jika job sudah diambil alih/selesai."""
+        try:
+            result = self.db.execute(
+                update(EmbeddingJob)
+                .where(EmbeddingJob.id == job_id, EmbeddingJob.locked_by == worker_id, EmbeddingJob.status == "running")
+                .values(heartbeat_at=func.now())
+            )
+            self.db.commit()
+        except SQLAlchemyError:
+            self.db.rollback()
+            raise
+        return bool(result.rowcount)
+
+    def record_progress(
+        self,
+        job: EmbeddingJob,
+        completed_pages: int,
+        total_pages: Optional[int] = None,
+        chunk_hashes: Optional[List[str]] = None
+    ):
+        job.completed_pages = completed_pages
+        if total_pages is not None:
+            job.total_pages = total_pages
+        if chunk_hashes is not None:
+            job.chunk_hashes = list(chunk_hashes)
+        job.heartbeat_at = func.now()
+        self.db.commit()
+
+    def complete(self, job: EmbeddingJob):
+        job.status = "completed"
+        job.finished_at = func.now()
+        job.locked_by = None
+        self.db.commit()
+
+    def cancel(self, job: EmbeddingJob, reason: str):
+        job.status = "cancelled"
+        job.last_error = reason
+        job.finished_at = func.now()
+        job.locked_by = None
+        self.db.commit()
+
+    def release(self, job: EmbeddingJob):
+        """Kembalikan job ke antrian tanpa menghitung attempt (worker berhenti di tengah job)."""
+        self.db.rollback()
+        job.status = "queued"
+        job.attempts = max(job.attempts - 1, 0)
+        job.locked_by = None
+        job.run_after = func.now()
+        self.db.commit()
+
+    def fail(self, job: EmbeddingJob, error: str) -> bool:
+        """Catat kegagalan; kembalikan True jika job diantrikan ulang (masih ada sisa attempt)."""
+        self.db.rollback()
+        job.last_error = error[:2000]
+        job.locked_by = None
+        retry = job.attempts < job.max_attempts
+        if retry:
+            job.status = "queued"
+            # Backoff eksponensial: 30s, 60s, 120s, ...
+            job.run_after = func.now() + timedelta(seconds=EMBEDDING_JOB_RETRY_BACKOFF_SECONDS * (2 ** (job.attempts - 1)))
+        else:
+            job.status = "failed"
+            job.finished_at = func.now()
+        self.db.commit()
+        return retry
+
+def get_embedding_job_service(db: Session = Depends(config_db)) -> EmbeddingJobService:
+    return EmbeddingJobService(db)
@@ -1,23 +1,80 @@
+import asyncio
 import json
+import logging
 import time
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
 from jose import jwt
 import httpx
 from uuid import UUID
-from core.settings import FIREBASE_CONFIG
-from sqlalchemy import select
+from prometheus_client import Counter, Histogram
+from core.settings import (
+    FIREBASE_CONFIG,
+    FCM_BASE_URL,
+    FCM_TOKEN_URL,
+    FCM_MAX_CONCURRENCY,
+    FCM_TIMEOUT_SECONDS,
+    FCM_TOKEN_REFRESH_MARGIN_SECONDS
+)
+from sqlalchemy import select, delete
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 from database.models.user_model import User, UserFCM
-from firebase_admin import messaging
-from exceptions.custom_exceptions import DatabaseException
+from fastapi import status
+from exceptions.custom_exceptions import DatabaseException, ServiceException
+
+logger = logging.getLogger(__name__)
 
 SCOPES = "https://www.googleapis.com/auth/firebase.messaging"
 
-class FCMService:
-    def __init__(self, db: AsyncSession):
-        self._load_credentials()
+fcm_send_total = Counter("fcm_send_total", "FCM push attempts by outcome", ["outcome"])
+fcm_send_seconds = Histogram(
+    "fcm_send_seconds",
+    "Latency of a single FCM messages:send call",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+)
+fcm_access_token_refresh_total = Counter("fcm_access_token_refresh_total", "OAuth access tokens fetched for FCM")
+
+# Error FCM yang berarti token device sudah tidak berlaku dan harus dihapus
+_INVALID_TOKEN_ERRORS = {"UNREGISTERED", "NOT_FOUND"}
+
+@dataclass
+class PushResult:
+    token: str
+    success: bool
+    invalid_token: bool = False
+    error: Optional[str] = None
+    response: Optional[dict] = None
+
+class FCMPushSender:
+    """
+    Pengirim push FCM HTTP v1 yang dipakai bersama oleh seluruh proses.
+
+    - Access token OAuth di-cache sampai mendekati expiry; hanya satu refresh
+      berjalan pada satu waktu, dan penandatanganan JWT dijalankan di thread.
+    - Satu httpx.AsyncClient (HTTP/2 jika paket h2 tersedia) dengan connection pool.
+    - send_many() mengirim ke banyak token secara paralel dibatasi semaphore.
 
-    def _load_credentials(self):
+    FCM_BASE_URL dan FCM_TOKEN_URL bisa diarahkan ke stand-in lokal
+    (benchmarks/fcm_standin.py) untuk pengujian.
+    """
+    def __init__(self, base_url: str, token_url: str, max_concurrency: int, timeout: float, refresh_margin: int):
+        self.base_url = base_url.rstrip("/")
+        self.token_url = token_url
+        self.timeout = timeout
+        self.refresh_margin = refresh_margin
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client: Optional[httpx.AsyncClient] = None
+        self._token_lock = asyncio.Lock()
+        self._access_token: Optional[str] = None
+        self._access_token_expires_at = 0.0
+        self.project_id: Optional[str] = None
+        self.private_key: Optional[str] = None
+        self.client_email: Optional[str] = None
+
+    def load_credentials(self):
+        if self.project_id:
+            return
         if not FIREBASE_CONFIG:
             raise ValueError("FIREBASE_CONFIG environment variable is not set")
 
@@ -29,7 +86,22 @@ class FCMService:
         except Exception as e:
             raise ValueError(f"Gagal parsing FIREBASE_CONFIG: {e}")
 
-    def _generate_access_token(self):
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            limits = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+            try:
+                self._client = httpx.AsyncClient(http2=True, limits=limits, timeout=self.timeout)
+            except ImportError:
+                logger.warning("[FCM] Paket h2 tidak terpasang, memakai HTTP/1.1")
+                self._client = httpx.AsyncClient(limits=limits, timeout=self.timeout)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _sign_assertion(self) -> str:
         now = int(time.time())
         payload = {
             "iss": self.client_email,
@@ -39,20 +111,106 @@ class FCMService:
             "exp": now + 3600,
             "scope": SCOPES
         }
+        return jwt.encode(payload, self.private_key, algorithm="RS256")
+
+    async def _get_access_token(self, force_refresh: bool = False) -> str:
+        if not force_refresh and self._access_token and time.time() < self._access_token_expires_at:
+            return self._access_token
+
+        async with self._token_lock:
+            # Request lain mungkin sudah me-refresh selama menunggu lock
+            if not force_refresh and self._access_token and time.time() < self._access_token_expires_at:
+                return self._access_token
+
+            self.load_credentials()
+            assertion = await asyncio.to_thread(self._sign_assertion)
+            response = await self._get_client().post(self.token_url, data={
+                "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
+                "assertion": assertion
+            })
+            response.raise_for_status()
+            body = response.json()
+
+            self._access_token = body["access_token"]
+            expires_in = int(body.get("expires_in", 3600))
+            self._access_token_expires_at = time.time() + max(expires_in - self.refresh_margin, 0)
+            fcm_access_token_refresh_total.inc()
+            return self._access_token
+
+    async def _post_message(self, fcm_token: str, title: str, body: str, force_refresh: bool = False) -> httpx.Response:
+        access_token = await self._get_access_token(force_refresh=force_refresh)
+        payload = {
+            "message": {
+                "token": fcm_token,
+                "notification": {
+                    "title": title,
+                    "body": body
+                }
+            }
+        }
+        url = f"{self.base_url}/v1/projects/{self.project_id}/messages:send"
+        with fcm_send_seconds.time():
+            return await self._get_client().post(
+                url,
+                headers={"Authorization": f"Bearer {access_token}"},
+                json=payload
+            )
 
-        jwt_token = jwt.encode(payload, self.private_key, algorithm="RS256")
+    async def send(self, fcm_token: str, title: str, body: str) -> PushResult:
+        async with self._semaphore:
+            try:
+                res = await self._post_message(fcm_token, title, body)
+                if res.status_code == 401:
+                    # Token OAuth dicabut/kedaluwarsa lebih awal: refresh sekali lalu ulangi
+                    res = await self._post_message(fcm_token, title, body, force_refresh=True)
+            except httpx.HTTPError as e:
+                fcm_send_total.labels(outcome="error").inc()
+                logger.warning(f"[FCM] Gagal mengirim push: {e}")
+                return PushResult(token=fcm_token, success=False, error=str(e))
 
-        response = httpx.post("https://oauth2.googleapis.com/token", data={
-            "grant_type": "urn:ietf:params:oauth:grant-type:jwt-bearer",
-            "assertion": jwt_token
-        })
+        if res.is_success:
+            fcm_send_total.labels(outcome="success").inc()
+            return PushResult(token=fcm_token, success=True, response=res.json())
+
+        error_status = _error_status(res)
+        invalid = res.status_code == 404 or error_status in _INVALID_TOKEN_ERRORS
+        fcm_send_total.labels(outcome="invalid_token" if invalid else "error").inc()
+        if not invalid:
+            logger.warning(f"[FCM] Push ditolak ({res.status_code} {error_status}): {res.text[:200]}")
+        return PushResult(token=fcm_token, success=False, invalid_token=invalid, error=error_status or str(res.status_code))
+
+    async def send_many(self, fcm_tokens: Iterable[str], title: str, body: str) -> List[PushResult]:
+        unique_tokens = list(dict.fromkeys(fcm_tokens))
+        if not unique_tokens:
+            return []
+        return await asyncio.gather(*(self.send(token, title, body) for token in unique_tokens))
+
+def _error_status(res: httpx.Response) -> Optional[str]:
+    try:
+        error = res.json().get("error", {})
+    except ValueError:
+        return None
+    for detail in error.get("details", []):
+        if detail.get("errorCode"):
+            return detail["errorCode"]
+    return error.get("status")
+
+push_sender = FCMPushSender(
+    base_url=FCM_BASE_URL,
+    token_url=FCM_TOKEN_URL,
+    max_concurrency=FCM_MAX_CONCURRENCY,
+    timeout=FCM_TIMEOUT_SECONDS,
+    refresh_margin=FCM_TOKEN_REFRESH_MARGIN_SECONDS,
+)
+
+class FCMService:
+    def __init__(self, db: AsyncSession):
+        self.sender = push_sender
+        self.sender.load_credentials()
 
-        response.raise_for_status()
-        return response.json()["access_token"]
-    
     async def save_fcm_token(self, db: AsyncSession, user_id: UUID, token: str, client_id: UUID) -> None:
         try:
-            if isinstance(user_id, User): 
+            if isinstance(user_id, User):
                 user_id = user_id.id
 
             existing = await db.execute(
@@ -68,29 +226,35 @@ class FCMService:
             await db.rollback()
             raise DatabaseException(code="SAVE_TOKEN_FCM", message="Failed to save token fcm.")
 
+    async def prune_invalid_tokens(self, db: AsyncSession, results: List[PushResult]) -> int:
+        invalid_tokens = [result.token for result in results if result.invalid_token]
+        if not invalid_tokens:
+            return 0
+        try:
+            await db.execute(delete(UserFCM).where(UserFCM.token.in_(invalid_tokens)))
+            await db.commit()
+            logger.info(f"[FCM] Menghapus {len(invalid_tokens)} token FCM yang sudah tidak terdaftar")
+            return len(invalid_tokens)
+        except SQLAlchemyError as e:
+            await db.rollback()
+            logger.error(f"[FCM] Gagal menghapus token FCM tidak valid: {e}", exc_info=True)
+            return 0
 
     async def send_message(self, fcm_token: str, title: str, body: str):
-        access_token = self._generate_access_token()
-
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Content-Type": "application/json"
-        }
-
-        payload = {
-            "message": {
-                "token": fcm_token,
-                "notification": {
-                    "title": title,
-                    "body": body
-                }
-            }
-        }
-
-        url = f"https://fcm.googleapis.com/v1/projects/{self.project_id}/messages:send"
+        try:
+            result = await self.sender.send(fcm_token, title, body)
+        except httpx.HTTPError as e:
+            result = PushResult(token=fcm_token, success=False, error=str(e))
+        if not result.success:
+            raise ServiceException(
+                code="FCM_SEND_FAILED",
+                message=f"FCM send failed: {result.error}",
+                status_code=status.HTTP_502_BAD_GATEWAY
+            )
+        return result.response
 
-        async with httpx.AsyncClient() as client:
-            res = await client.post(url, headers=headers, json=payload)
-            res.raise_for_status()
-            return res.json()
-        
\ No newline at end of file
+    async def send_many(self, db: AsyncSession, fcm_tokens: Iterable[str], title: str, body: str) -> List[PushResult]:
+        """Kirim ke banyak token sekaligus, lalu hapus token yang dilaporkan tidak terdaftar."""
+        results = await self.sender.send_many(fcm_tokens, title, body)
+        await self.prune_invalid_tokens(db, results)
+        return results
@@ -1,14 +1,17 @@
 import logging
 import uuid
-import asyncio
-from typing import List, Dict, Any
-from fastapi import HTTPException, status, Depends, UploadFile
-from sqlalchemy.orm import Session
+import io
+from typing import List, Dict, Any, BinaryIO
+from fastapi import HTTPException, status, Depends
+from sqlalchemy.orm import Session, load_only
 from sqlalchemy.exc import SQLAlchemyError
 from database.models.upload_file_model import FileModel
 from core.config_db import config_db
-from utils.save_file_from_postgres_utils import save_pdfs_locally, delete_pdfs_locally
-from agents.tools.knowledge_base_tools import create_combined_knowledge_base
+from services.embedding_job_service import EmbeddingJobService, SOURCE_FILE
+from services.knowledge_index_service import delete_manifest
+from services.answer_cache_service import invalidate_answer_cache
+from services.blob_store import blob_store
+from services.upload_stream import ReceivedFile
 from exceptions.custom_exceptions import DatabaseException, ServiceException
 from sqlalchemy import text, desc, inspect
 from uuid import UUID
@@ -35,6 +38,7 @@ class FileService:
             logger.info("[SERVICE][FILE] Fetching all files from database.")
             files = (
                 self.db.query(FileModel)
+                .options(load_only(FileModel.uuid_file, FileModel.filename, FileModel.uploaded_at, FileModel.status))
                 .filter(FileModel.client_id == client_id, FileModel.status != 'inactive')
                 .order_by(desc(FileModel.uploaded_at))
                 .all()
@@ -46,43 +50,34 @@ class FileService:
             logger.error(f"[SERVICE][FILE] DB error fetching all files: {e}", exc_info=True)
             raise DatabaseException(code="DB_FETCH_FILES_ERROR", message="Failed to fetch files.")
 
-    async def save_file(self, file: UploadFile, client_id: UUID) -> FileModel:
+    def save_uploaded_files(self, received: List[ReceivedFile], client_id: UUID) -> List[FileModel]:
+        """Catat file yang sudah di-stream ke blob store oleh receive_uploads, dalam satu commit."""
         try:
-            logger.info(f"[SERVICE][FILE] Saving file: {file.filename} (size: {file.size})")
-            file_content = await file.read()
-
-            if file.content_type not in ["application/pdf", "text/plain"]:
-                raise ServiceException(status_code=400, message="Unsupported file type", code="FILE_TYPE")
-
-            if file.size and file.size > 10 * 1024 * 1024:
-                raise ServiceException(status_code=413, detail="File too large. Maximum size is 10MB", code="FILE_SIZE")
-
-            file_uuid = uuid.uuid4()
-            new_file = FileModel(
-                uuid_file=file_uuid,
-                filename=file.filename,
-                content_type=file.content_type,
-                content=file_content,
-                size=file.size,
-                status='pending',
-                client_id=client_id
-            )
-
-            self.db.add(new_file)
+            new_files = []
+            for item in received:
+                if item.blob.deduplicated:
+                    logger.info(f"[SERVICE][FILE] Reusing existing blob {item.blob.key} for {item.filename}")
+                new_files.append(FileModel(
+                    uuid_file=uuid.uuid4(),
+                    filename=item.filename,
+                    content_type=item.content_type,
+                    blob_key=item.blob.key,
+                    sha256=item.blob.sha256,
+                    size=item.blob.size,
+                    status='pending',
+                    client_id=client_id
+                ))
+
+            self.db.add_all(new_files)
             self.db.commit()
-            self.db.refresh(new_file)
 
-            logger.info(f"[SERVICE][FILE] File saved successfully with UUID: {file_uuid}")
-            return new_file
+            logger.info(f"[SERVICE][FILE] {len(new_files)} files saved for client_id: {client_id}")
+            return new_files
 
         except SQLAlchemyError as e:
             self.db.rollback()
             logger.error(f"[SERVICE][FILE] DB error saving file: {e}", exc_info=True)
             raise DatabaseException(code="DB_SAVE_FILE_ERROR", message="Failed to save file.")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"[SERVICE][FILE] Unexpected error saving file: {e}", exc_info=True)
-            raise ServiceException(code="UNEXPECTED_SAVE_FILE_ERROR", message="Unexpected error occurred while saving file.")
 
     def delete_file_from_db(self, uuid_file: uuid.UUID, client_id: UUID) -> Dict[str, str]:
         try:
@@ -114,6 +109,8 @@ class FileService:
             else:
                 logger.info(f"[SERVICE][FILE] Skipping vector delete because file status is 'pending' for: {filename_without_ext}")
 
+            delete_manifest(self.db, client_id, SOURCE_FILE, file_to_delete.uuid_file)
+            invalidate_answer_cache(self.db, client_id)
             file_to_delete.status = "inactive"
             self.db.commit()
 
@@ -131,61 +128,26 @@ class FileService:
             logger.error(f"[SERVICE][FILE] Unexpected error deleting file/vector: {e}", exc_info=True)
             raise ServiceException(code="UNEXPECTED_DELETE_FILE_VECTOR_ERROR", message="Unexpected error occurred while deleting file/vector.")
 
-    async def process_embedding(self, client_id: UUID) -> Dict[str, Any]:
-        async def _process():
-            logger.info(f"[SERVICE][FILE] Starting embedding processing for client_id: {client_id}...")
-
-            pending_files = (
-                self.db.query(FileModel)
-                .filter(FileModel.status == 'pending', FileModel.client_id == client_id)
-                .all()
-            )
-
-            if not pending_files:
-                logger.info(f"[SERVICE][FILE] No pending files found for client_id: {client_id}.")
-                return {
-                    "message": "No pending files found for embedding.",
-                    "status": "success"
-                }
-            
-            safe_name = self._get_subdomain(client_id)
-            
-            save_pdfs_locally(client_id, safe_name, [file.filename for file in pending_files])
-            logger.info(f"[SERVICE][FILE] {len(pending_files)} PDFs saved locally for embedding.")
-
-            # kb = create_pdf_knowledge_base(safe_name)
-            kb = create_combined_knowledge_base(client_id=client_id)
-
-            await kb.aload(recreate=False, upsert=True, skip_existing=True)
-            logger.info("[SERVICE][FILE] Knowledge base loaded and embeddings processed.")
-
-            updated_rows = (
-                self.db.query(FileModel)
-                .filter(FileModel.status == 'pending', FileModel.client_id == client_id)
-                .update({FileModel.status: 'processed'}, synchronize_session=False)
-            )
-            self.db.commit()
-
-            logger.info(f"[SERVICE][FILE] {updated_rows} files updated to 'processed' for client_id: {client_id}.")
-            
-            delete_pdfs_locally(safe_name, [file.filename for file in pending_files])
-            logger.info(f"[SERVICE][FILE] {len(pending_files)} PDFs removed locally after embedding.")
-
-            return {
-                "message": "Embedding processing completed.",
-                "status": "success"
-            }
-
-        try:
-            return await asyncio.wait_for(_process(), timeout=60)
-        except asyncio.TimeoutError:
-            self.db.rollback()
-            logger.error(f"[SERVICE][FILE] Embedding processing timed out for client_id: {client_id}.")
-            raise ServiceException(code="TIMEOUT_ERROR",status_code=408, message="Embedding processing exceeded 1 minute and was terminated.")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"[SERVICE][FILE] Error processing embedding for client {client_id}: {e}", exc_info=True)
-            raise ServiceException(code="EMBEDDING_PROCESSING_ERROR", message="Failed to process file embeddings.")
+    def process_embedding(self, client_id: UUID) -> Dict[str, Any]:
+        """
+        Antrikan file 'pending' untuk di-embed oleh EmbeddingWorker; progress
+        bisa dipantau lewat endpoint /embedding-jobs.
+        """
+        jobs = EmbeddingJobService(self.db).enqueue_pending(client_id, SOURCE_FILE)
+        if not jobs:
+            logger.info(f"[SERVICE][FILE] No pending files found for client_id: {client_id}.")
+            return {"message": "No pending files found for embedding.", "status": "success", "jobs": []}
+
+        logger.info(f"[SERVICE][FILE] {len(jobs)} files queued for embedding for client_id: {client_id}.")
+        return {"message": "Embedding jobs queued.", "status": "queued", "jobs": jobs}
+
+def open_file_content(file: FileModel) -> BinaryIO:
+    """Stream isi file dari blob store; baris lama yang belum dimigrasi dibaca dari kolom content."""
+    if file.blob_key:
+        return blob_store.open(file.blob_key)
+    stream = io.BytesIO(file.content)
+    stream.name = file.filename
+    return stream
 
 def get_file_service(db: Session = Depends(config_db)) -> FileService:
     return FileService(db)
@@ -0,0 +1,330 @@
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+from uuid import UUID
+from cachetools import TTLCache
+from prometheus_client import Counter
+from sqlalchemy import event, inspect, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from core.settings import (
+    IDENTITY_CACHE_TTL_SECONDS,
+    IDENTITY_CACHE_LOCAL_TTL_SECONDS,
+    IDENTITY_CACHE_SIZE,
+    IDENTITY_CACHE_CHANNEL
+)
+from api.websocket.redis_client import redis_client, sync_redis_client
+from database.models.client_model import Client
+
+logger = logging.getLogger(__name__)
+
+identity_cache_lookups_total = Counter(
+    "identity_cache_lookups_total",
+    "Auth identity lookups by kind and the layer that answered them",
+    ["kind", "source"]
+)
+
+KEY_PREFIX = "auth:identity"
+
+# Satu query per miss: client + status diambil sekaligus
+_API_KEY_QUERY = text("""
+    SELECT id AS client_id, status
+    FROM ai.ms_clients
+    WHERE subdomain = :subdomain AND api_key = :api_key
+""")
+_ADMIN_QUERY = text("""
+    SELECT u.client_id, c.status
+    FROM ai.ms_admin_users u
+    JOIN ai.ms_clients c ON c.id = u.client_id
+    WHERE u.id = :user_id
+""")
+
+@dataclass(frozen=True)
+class ClientIdentity:
+    """Hasil autentikasi yang di-cache: cukup id dan status client, bukan instance ORM."""
+    id: UUID
+    status: str
+
+    @property
+    def is_active(self) -> bool:
+        return self.status == "active"
+
+def _api_key_cache_key(subdomain: str, api_key: str) -> str:
+    # API key tidak pernah disimpan mentah di Redis
+    digest = hashlib.sha256(api_key.encode()).hexdigest()
+    return f"{KEY_PREFIX}:apikey:{subdomain}:{digest}"
+
+def _admin_cache_key(user_id) -> str:
+    return f"{KEY_PREFIX}:admin:{user_id}"
+
+def _client_index_key(client_id) -> str:
+    return f"{KEY_PREFIX}:client:{client_id}"
+
+def _encode(identity: ClientIdentity) -> str:
+    return json.dumps({"id": str(identity.id), "status": identity.status})
+
+def _decode(raw: str) -> ClientIdentity:
+    payload = json.loads(raw)
+    return ClientIdentity(id=UUID(payload["id"]), status=payload["status"])
+
+def _from_row(row) -> Optional[ClientIdentity]:
+    if not row or not row.client_id:
+        return None
+    client_id = row.client_id if isinstance(row.client_id, UUID) else UUID(str(row.client_id))
+    return ClientIdentity(id=client_id, status=row.status)
+
+class IdentityCache:
+    """
+    Cache identitas untuk dependency autentikasi HTTP dan WebSocket.
+
+    - L1: TTLCache in-process (thread-safe, dipakai dependency sync di threadpool).
+    - L2: Redis, dibagi antar worker/pod, dengan index `auth:identity:client:{id}`
+      berisi semua key yang menunjuk ke client tersebut.
+    - Miss di kedua layer menjalankan satu query gabungan ke database.
+
+    Invalidasi (user diubah/dihapus, status client berubah) menghapus key di Redis
+    dan dipublish ke IDENTITY_CACHE_CHANNEL supaya L1 di proses lain ikut dibuang.
+    Perubahan status/api_key/subdomain Client lewat ORM diinvalidasi otomatis
+    setelah commit (lihat event di bawah); perubahan langsung di database
+    diinvalidasi dengan `python -m utils.invalidate_identity_cache`, selain itu
+    TTL Redis tetap membatasi umur datanya.
+    """
+    def __init__(self, redis, sync_redis, ttl_seconds: int, local_ttl_seconds: int, max_size: int, channel: str):
+        self.redis = redis
+        self.sync_redis = sync_redis
+        self.ttl_seconds = ttl_seconds
+        self.channel = channel
+        self._local: TTLCache = TTLCache(maxsize=max_size, ttl=local_ttl_seconds)
+        self._lock = threading.Lock()
+        self._listener: Optional[asyncio.Task] = None
+        self._pubsub = None
+
+    # ===== L1 =====
+    def _local_get(self, key: str) -> Optional[ClientIdentity]:
+        with self._lock:
+            return self._local.get(key)
+
+    def _local_set(self, key: str, identity: ClientIdentity):
+        with self._lock:
+            self._local[key] = identity
+
+    def _local_evict(self, key: Optional[str] = None, client_id: Optional[str] = None):
+        with self._lock:
+            if key is not None:
+                self._local.pop(key, None)
+            if client_id is not None:
+                for cached_key, identity in list(self._local.items()):
+                    if str(identity.id) == client_id:
+                        self._local.pop(cached_key, None)
+
+    # ===== Lookup sync (dependency HTTP) =====
+    def _lookup(self, kind: str, key: str, load: Callable[[], Optional[ClientIdentity]]) -> Optional[ClientIdentity]:
+        identity = self._local_get(key)
+        if identity is not None:
+            identity_cache_lookups_total.labels(kind=kind, source="local").inc()
+            return identity
+
+        try:
+            raw = self.sync_redis.get(key)
+        except Exception as e:
+            logger.warning(f"[IDENTITY_CACHE] Redis unavailable, falling back to database: {e}")
+            raw = None
+        if raw:
+            identity = _decode(raw)
+            self._local_set(key, identity)
+            identity_cache_lookups_total.labels(kind=kind, source="redis").inc()
+            return identity
+
+        identity = load()
+        identity_cache_lookups_total.labels(kind=kind, source="db").inc()
+        if identity is not None:
+            self._local_set(key, identity)
+            try:
+                self._store_pipeline(self.sync_redis.pipeline(transaction=False), key, identity).execute()
+            except Exception as e:
+                logger.warning(f"[IDENTITY_CACHE] Failed to store {key} in Redis: {e}")
+        return identity
+
+    def get_client_by_api_key(self, db: Session, subdomain: str, api_key: str) -> Optional[ClientIdentity]:
+        return self._lookup(
+            "api_key",
+            _api_key_cache_key(subdomain, api_key),
+            lambda: _from_row(db.execute(_API_KEY_QUERY, {"subdomain": subdomain, "api_key": api_key}).fetchone())
+        )
+
+    def get_admin_client(self, db: Session, user_id: str) -> Optional[ClientIdentity]:
+        return self._lookup(
+            "admin",
+            _admin_cache_key(user_id),
+            lambda: _from_row(db.execute(_ADMIN_QUERY, {"user_id": user_id}).fetchone())
+        )
+
+    # ===== Lookup async (WebSocket) =====
+    async def _alookup(self, kind: str, key: str, load) -> Optional[ClientIdentity]:
+        identity = self._local_get(key)
+        if identity is not None:
+            identity_cache_lookups_total.labels(kind=kind, source="local").inc()
+            return identity
+
+        try:
+            raw = await self.redis.get(key)
+        except Exception as e:
+            logger.warning(f"[IDENTITY_CACHE] Redis unavailable, falling back to database: {e}")
+            raw = None
+        if raw:
+            identity = _decode(raw)
+            self._local_set(key, identity)
+            identity_cache_lookups_total.labels(kind=kind, source="redis").inc()
+            return identity
+
+        identity = await load()
+        identity_cache_lookups_total.labels(kind=kind, source="db").inc()
+        if identity is not None:
+            self._local_set(key, identity)
+            try:
+                await self._store_pipeline(self.redis.pipeline(transaction=False), key, identity).execute()
+            except Exception as e:
+                logger.warning(f"[IDENTITY_CACHE] Failed to store {key} in Redis: {e}")
+        return identity
+
+    async def aget_client_by_api_key(self, db: AsyncSession, subdomain: str, api_key: str) -> Optional[ClientIdentity]:
+        async def load():
+            result = await db.execute(_API_KEY_QUERY, {"subdomain": subdomain, "api_key": api_key})
+            return _from_row(result.fetchone())
+        return await self._alookup("api_key", _api_key_cache_key(subdomain, api_key), load)
+
+    async def aget_admin_client(self, db: AsyncSession, user_id: str) -> Optional[ClientIdentity]:
+        async def load():
+            result = await db.execute(_ADMIN_QUERY, {"user_id": user_id})
+            return _from_row(result.fetchone())
+        return await self._alookup("admin", _admin_cache_key(user_id), load)
+
+    def _store_pipeline(self, pipe, key: str, identity: ClientIdentity):
+        index_key = _client_index_key(identity.id)
+        pipe.set(key, _encode(identity), ex=self.ttl_seconds)
+        pipe.sadd(index_key, key)
+        pipe.expire(index_key, self.ttl_seconds)
+        return pipe
+
+    # ===== Invalidasi =====
+    def invalidate_admin(self, user_id):
+        """Dipanggil setelah user admin diubah atau dihapus."""
+        key = _admin_cache_key(user_id)
+        self._local_evict(key=key)
+        try:
+            pipe = self.sync_redis.pipeline(transaction=False)
+            pipe.delete(key)
+            pipe.publish(self.channel, json.dumps({"key": key}))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[IDENTITY_CACHE] Failed to invalidate admin {user_id}: {e}")
+
+    def invalidate_client(self, client_id):
+        """Dipanggil setelah status/api_key/subdomain client berubah: semua key client dibuang."""
+        self._local_evict(client_id=str(client_id))
+        index_key = _client_index_key(client_id)
+        try:
+            keys = self.sync_redis.smembers(index_key)
+            pipe = self.sync_redis.pipeline(transaction=False)
+            pipe.delete(index_key, *keys)
+            pipe.publish(self.channel, json.dumps({"client_id": str(client_id)}))
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[IDENTITY_CACHE] Failed to invalidate client {client_id}: {e}")
+
+    async def start(self):
+        if self._listener and not self._listener.done():
+            return
+        self._pubsub = self.redis.pubsub()
+        await self._pubsub.subscribe(self.channel)
+        self._listener = asyncio.create_task(self._listen())
+        logger.info(f"[IDENTITY_CACHE] Listening for invalidations on {self.channel}")
+
+    async def stop(self):
+        if self._listener:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+        if self._pubsub:
+            await self._pubsub.aclose()
+            self._pubsub = None
+
+    async def _listen(self):
+        while True:
+            try:
+                async for message in self._pubsub.listen():
+                    if message.get("type") != "message":
+                        continue
+                    try:
+                        payload: Dict[str, str] = json.loads(message.get("data"))
+                    except (TypeError, ValueError):
+                        continue
+                    self._local_evict(key=payload.get("key"), client_id=payload.get("client_id"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"[IDENTITY_CACHE] Invalidation listener error, retrying: {e}", exc_info=True)
+                # Pesan invalidasi mungkin terlewat selama putus, buang L1 agar tidak basi
+                with self._lock:
+                    self._local.clear()
+                await asyncio.sleep(1)
+
+def memoize_on_request(request, key: str, resolve: Callable[[], Optional[ClientIdentity]]) -> Optional[ClientIdentity]:
+    """
+    Simpan hasil resolve di request.state sehingga dependency berbeda yang
+    butuh identitas sama (mis. get_current_user + get_authenticated_client)
+    hanya melakukan satu lookup per request.
+    """
+    memo = getattr(request.state, "identity_memo", None)
+    if memo is None:
+        memo = {}
+        request.state.identity_memo = memo
+    if key not in memo:
+        memo[key] = resolve()
+    return memo[key]
+
+identity_cache = IdentityCache(
+    redis=redis_client,
+    sync_redis=sync_redis_client,
+    ttl_seconds=IDENTITY_CACHE_TTL_SECONDS,
+    local_ttl_seconds=IDENTITY_CACHE_LOCAL_TTL_SECONDS,
+    max_size=IDENTITY_CACHE_SIZE,
+    channel=IDENTITY_CACHE_CHANNEL,
+)
+
+# ===== Invalidasi otomatis dari ORM =====
+# Kolom Client yang ikut menentukan hasil autentikasi
+_IDENTITY_COLUMNS = ("status", "api_key", "subdomain")
+_PENDING_INVALIDATIONS = "identity_cache_pending_clients"
+
+def _queue_client_invalidation(target: Client):
+    session = inspect(target).session
+    if session is not None:
+        session.info.setdefault(_PENDING_INVALIDATIONS, set()).add(target.id)
+
+@event.listens_for(Client, "after_update")
+def _client_updated(mapper, connection, target: Client):
+    state = inspect(target)
+    if any(state.attrs[column].history.has_changes() for column in _IDENTITY_COLUMNS):
+        _queue_client_invalidation(target)
+
+@event.listens_for(Client, "after_delete")
+def _client_deleted(mapper, connection, target: Client):
+    _queue_client_invalidation(target)
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed_clients(session: Session):
+    # Setelah commit, supaya lookup yang berjalan bersamaan tidak mengisi ulang cache dengan data lama
+    for client_id in session.info.pop(_PENDING_INVALIDATIONS, ()):
+        identity_cache.invalidate_client(client_id)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_client_invalidations(session: Session):
+    session.info.pop(_PENDING_INVALIDATIONS, None)
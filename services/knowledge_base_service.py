@@ -6,6 +6,10 @@ from database.models.knowledge_base_config_model import KnowledgeBaseConfigModel
 from schemas.knowledge_base_config_schema import KnowledgeBaseConfig
 from core.config_db import config_db
 from exceptions.custom_exceptions import DatabaseException, ServiceException
+from services.embedding_job_service import EmbeddingJobService
+from services.answer_cache_service import invalidate_answer_cache
+from agents.tools.structured_chunking import MAX_CHUNK_TOKENS
+from agents.customer_service_agent.agent_pool import customer_service_agent_pool
 from uuid import UUID
 
 logger = logging.getLogger(__name__)
@@ -48,11 +52,20 @@ class KnowledgeBaseService:
 
     def update_knowledge_base_config(self, new_config: KnowledgeBaseConfig, client_id: UUID) -> KnowledgeBaseConfigModel:
         
-        if new_config.chunk_size < 100 or new_config.overlap < 0 or new_config.num_documents < 1:
+        if (
+            new_config.chunk_size < 100
+            or new_config.chunk_size > MAX_CHUNK_TOKENS
+            or new_config.overlap < 0
+            or new_config.overlap >= new_config.chunk_size
+            or new_config.num_documents < 1
+        ):
             logger.warning(f"[SERVICE][KB] Invalid config params: {new_config}")
             raise ServiceException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Invalid parameters for knowledge base config: chunk_size >= 100, overlap >= 0, num_documents >= 1",
+                message=(
+                    f"Invalid parameters for knowledge base config: 100 <= chunk_size <= {MAX_CHUNK_TOKENS}, "
+                    "0 <= overlap < chunk_size, num_documents >= 1"
+                ),
                 code="INVALID_CONFIG_PARAM_KB"
             )
 
@@ -71,16 +84,37 @@ class KnowledgeBaseService:
                     client_id=client_id,
                     chunk_size=new_config.chunk_size,
                     overlap=new_config.overlap,
-                    num_documents=new_config.num_documents
+                    num_documents=new_config.num_documents,
+                    chunking_strategy=new_config.chunking_strategy,
+                    vector_index_type=new_config.vector_index_type,
+                    vector_search_recall=new_config.vector_search_recall
                 )
                 self.db.add(config_model)
+                chunking_changed = True
             else:
+                chunking_changed = (
+                    (config_model.chunk_size, config_model.overlap, config_model.chunking_strategy)
+                    != (new_config.chunk_size, new_config.overlap, new_config.chunking_strategy)
+                )
                 config_model.chunk_size = new_config.chunk_size
                 config_model.overlap = new_config.overlap
                 config_model.num_documents = new_config.num_documents
+                config_model.chunking_strategy = new_config.chunking_strategy
+                config_model.vector_index_type = new_config.vector_index_type
+                config_model.vector_search_recall = new_config.vector_search_recall
 
+            invalidate_answer_cache(self.db, client_id)
             self.db.commit()
             self.db.refresh(config_model)
+            # Parameter pencarian (recall) dibaca saat template agent dibangun;
+            # perubahan tipe index diterapkan oleh job index vector berikutnya
+            customer_service_agent_pool.invalidate(client_id)
+
+            if chunking_changed:
+                # Chunk lama tidak cocok dengan konfigurasi baru; worker meng-chunk ulang semua sumber
+                # (manifest menyimpan profil chunking, jadi tidak dianggap "unchanged"), dan hanya
+                # chunk yang isinya berubah yang di-embed ulang
+                EmbeddingJobService(self.db).enqueue_reindex(client_id)
 
             logger.info("[SERVICE][KB] Config updated successfully.")
             return config_model
@@ -0,0 +1,154 @@
+import hashlib
+import logging
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Set
+from uuid import UUID
+import httpx
+from sqlalchemy import text, func
+from sqlalchemy.orm import Session
+from database.models import EmbeddingJob, KnowledgeManifest
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class WebValidators:
+    """Hasil conditional GET ke URL utama website."""
+    not_modified: bool
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+def hash_bytes(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+def hash_pages(pages) -> str:
+    digest = hashlib.sha256()
+    for page in pages:
+        digest.update(page.content.encode("utf-8", errors="replace"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def chunk_hash(chunk) -> str:
+    return hashlib.sha256(chunk.content.encode("utf-8", errors="replace")).hexdigest()
+
+def embedding_model_id(vector_db) -> str:
+    embedder = vector_db.embedder
+    return f"{type(embedder).__name__}:{getattr(embedder, 'id', '')}:{getattr(embedder, 'dimensions', '')}"
+
+class KnowledgeIndexService:
+    """
+    Re-indexing inkremental berbasis hash konten (ai.dt_knowledge_manifest).
+
+    - Dokumen dengan content_hash, model embedding, dan profil chunking yang sama
+      dilewati seluruhnya.
+    - Chunk diberi id deterministik dari hash isinya; hanya chunk yang belum ada
+      di manifest yang di-embed, chunk lama yang tidak muncul lagi dihapus sekaligus.
+    - Saat hanya profil chunking yang berubah, dokumen di-chunk ulang tetapi chunk
+      yang isinya sama (mis. section yang tidak terpengaruh) tetap memakai vector
+      lamanya; vector hanya bergantung pada isi chunk dan model embedding.
+    - Website memakai ETag/Last-Modified halaman utama untuk conditional request
+      sebelum crawl ulang.
+    """
+    def __init__(self, db: Session, vector_db, chunking_profile: str):
+        self.db = db
+        self.vector_db = vector_db
+        # Dokumen dianggap tidak berubah hanya jika model embedding dan konfigurasi chunking sama;
+        # vector chunk cukup butuh model embedding yang sama untuk dipakai ulang
+        self.embedding_id = embedding_model_id(vector_db)
+        self.model_id = f"{self.embedding_id}|{chunking_profile}"
+
+    @property
+    def _table(self) -> str:
+        return f"{self.vector_db.schema}.{self.vector_db.table_name}"
+
+    def get_manifest(self, job: EmbeddingJob) -> Optional[KnowledgeManifest]:
+        return self.db.get(KnowledgeManifest, (job.client_id, job.source_type, job.source_id))
+
+    def is_unchanged(
+        self,
+        manifest: Optional[KnowledgeManifest],
+        content_hash: Optional[str] = None,
+        validators: Optional[WebValidators] = None
+    ) -> bool:
+        if manifest is None or manifest.embedding_model != self.model_id:
+            return False
+        if validators is not None and validators.not_modified:
+            return True
+        return content_hash is not None and content_hash == manifest.content_hash
+
+    def _same_embedder(self, manifest: KnowledgeManifest) -> bool:
+        return (manifest.embedding_model or "").split("|", 1)[0] == self.embedding_id
+
+    def known_chunk_hashes(self, manifest: Optional[KnowledgeManifest]) -> Set[str]:
+        if manifest is None or not self._same_embedder(manifest):
+            return set()
+        return set(manifest.chunk_hashes or [])
+
+    @staticmethod
+    def vector_id(job: EmbeddingJob, chunk_digest: str) -> str:
+        return f"{job.source_type}:{job.source_id}:{chunk_digest[:32]}"
+
+    def fetch_validators(self, url: str, manifest: Optional[KnowledgeManifest]) -> WebValidators:
+        headers = {}
+        if manifest is not None and manifest.embedding_model == self.model_id:
+            if manifest.etag:
+                headers["If-None-Match"] = manifest.etag
+            if manifest.last_modified:
+                headers["If-Modified-Since"] = manifest.last_modified
+        try:
+            response = httpx.get(url, headers=headers, timeout=15, follow_redirects=True)
+        except httpx.HTTPError as e:
+            logger.warning(f"[SERVICE][KNOWLEDGE_INDEX] Conditional request failed for {url}: {e}")
+            return WebValidators(not_modified=False)
+        return WebValidators(
+            not_modified=response.status_code == 304,
+            etag=response.headers.get("etag") or (manifest.etag if manifest else None),
+            last_modified=response.headers.get("last-modified") or (manifest.last_modified if manifest else None),
+        )
+
+    def delete_source_vectors(self, name: str) -> int:
+        """Hapus vector lama (sebelum ada manifest / model embedding berbeda) berdasarkan nama dokumen."""
+        result = self.db.execute(text(f"DELETE FROM {self._table} WHERE name = :name"), {"name": name})
+        self.db.commit()
+        return result.rowcount
+
+    def delete_orphans(self, job: EmbeddingJob, orphan_hashes: Iterable[str]) -> int:
+        ids = [self.vector_id(job, digest) for digest in orphan_hashes]
+        if not ids:
+            return 0
+        result = self.db.execute(text(f"DELETE FROM {self._table} WHERE id = ANY(:ids)"), {"ids": ids})
+        return result.rowcount
+
+    def save_manifest(
+        self,
+        job: EmbeddingJob,
+        content_hash: str,
+        chunk_hashes: List[str],
+        validators: Optional[WebValidators] = None
+    ):
+        """Tidak commit; disimpan bersama status job selesai."""
+        manifest = self.get_manifest(job)
+        if manifest is None:
+            manifest = KnowledgeManifest(client_id=job.client_id, source_type=job.source_type, source_id=job.source_id)
+            self.db.add(manifest)
+        manifest.source_name = job.source_name
+        manifest.content_hash = content_hash
+        manifest.chunk_hashes = chunk_hashes
+        manifest.embedding_model = self.model_id
+        if validators is not None:
+            manifest.etag = validators.etag
+            manifest.last_modified = validators.last_modified
+
+    def mark_checked(self, manifest: KnowledgeManifest, validators: Optional[WebValidators] = None):
+        """Sumber tidak berubah: perbarui waktu cek (dipakai jadwal re-crawl) tanpa menyentuh vector. Tidak commit."""
+        manifest.updated_at = func.now()
+        if validators is not None:
+            manifest.etag = validators.etag
+            manifest.last_modified = validators.last_modified
+
+def delete_manifest(db: Session, client_id: UUID, source_type: str, source_id: UUID):
+    """Dipanggil saat sumber dihapus, supaya upload/link yang sama di-index ulang dari awal."""
+    db.query(KnowledgeManifest).filter(
+        KnowledgeManifest.client_id == client_id,
+        KnowledgeManifest.source_type == source_type,
+        KnowledgeManifest.source_id == source_id
+    ).delete(synchronize_session=False)
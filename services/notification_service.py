@@ -1,7 +1,7 @@
 # services/notification_service.py
 import json
 import logging
-from sqlalchemy import or_, func, desc, update, and_
+from sqlalchemy import or_, func, desc, update, and_, insert
 from database.models.notification_model import Notification
 from redis.asyncio import Redis
 from datetime import datetime
@@ -11,10 +11,24 @@ from core.config_db import get_db
 from fastapi import Depends, HTTPException
 from api.websocket.redis_client import get_redis_client
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.exc import SQLAlchemyError
 from exceptions.custom_exceptions import DatabaseException, ServiceException
+from typing import Iterable, Optional
+from prometheus_client import Counter
+from utils.pagination_utils import KeysetPage, paginate_async, count_rows_async
+from enums.count_mode_enum import CountMode
+from core.settings import NOTIFICATION_DEBOUNCE_SECONDS
 
 logger = logging.getLogger(__name__)
 
+notifications_created_total = Counter("notifications_created_total", "Notification rows inserted", ["mode"])
+notifications_coalesced_total = Counter("notifications_coalesced_total", "Broadcast events dropped by the debounce window")
+
+BROADCAST_CHANNEL = "notif:broadcast"
+
+def _tenant_broadcast_channel(client_id) -> str:
+    return f"notif:{client_id}:broadcast"
+
 class NotificationService:
     def __init__(self, db: AsyncSession, redis: Redis):
         self.db = db
@@ -38,7 +52,9 @@ class NotificationService:
         await self.db.commit()
         await self.db.refresh(notif)
 
-        channel = "notif:broadcast" if is_broadcast else f"notif:{receiver_id}"
+        notifications_created_total.labels(mode="single").inc()
+
+        channel = BROADCAST_CHANNEL if is_broadcast else f"notif:{receiver_id}"
         payload = {
             "id": str(notif.id),
             "message": message,
@@ -49,29 +65,111 @@ class NotificationService:
         logger.info(f"[NOTIF][PUBLISH] Publishing to channel: {channel} with payload: {payload}")
         await self.redis.publish(channel, json.dumps(payload))
 
-    async def get_notifications(self, receiver_id: UUID, client_id: UUID, limit: int = 20, offset: int = 0):
-        logger.info(f"[NOTIF][FETCH] Fetching notifications for user_id={receiver_id}, limit={limit}, offset={offset}")
-
-        query = (
-            select(Notification)
-            .where(and_(Notification.receiver_id == receiver_id, Notification.is_active == True, Notification.client_id == client_id))
-            .order_by(desc(Notification.created_at))
-            .limit(limit)
-            .offset(offset)
-        )
-        result = await self.db.execute(query)
-        notifications = result.scalars().all()
+    async def create_broadcast_notification(
+        self,
+        receiver_ids: Iterable[UUID],
+        client_id: UUID,
+        message: str,
+        notif_type: str = "chat",
+        dedupe_key: Optional[str] = None,
+        debounce_seconds: int = NOTIFICATION_DEBOUNCE_SECONDS
+    ) -> bool:
+        """
+        Fan-out satu event ke banyak admin: satu INSERT ... RETURNING untuk semua
+        penerima, satu commit, dan satu publish ke channel tenant.
+
+        Jika dedupe_key diisi, event yang sama dalam debounce_seconds digabung ke
+        notifikasi pertama (tidak ada baris/publish baru). Mengembalikan False
+        jika event digabung.
+        """
+        receiver_ids = list(dict.fromkeys(receiver_ids))
+        if not receiver_ids:
+            return False
+
+        debounce_key = None
+        if dedupe_key and debounce_seconds > 0:
+            debounce_key = f"notif:debounce:{client_id}:{dedupe_key}"
+            acquired = await self.redis.set(debounce_key, "1", nx=True, ex=debounce_seconds)
+            if not acquired:
+                notifications_coalesced_total.inc()
+                logger.debug(f"[NOTIF][BROADCAST] Event {dedupe_key} coalesced for client_id={client_id}")
+                return False
+
+        created_at = datetime.utcnow()
+        try:
+            result = await self.db.execute(
+                insert(Notification)
+                .values([
+                    {
+                        "receiver_id": receiver_id,
+                        "message": message,
+                        "type": notif_type,
+                        "created_at": created_at,
+                        "is_read": False,
+                        "is_broadcast": True,
+                        "is_active": True,
+                        "client_id": client_id,
+                    }
+                    for receiver_id in receiver_ids
+                ])
+                .returning(Notification.id, Notification.receiver_id)
+            )
+            rows = result.all()
+            await self.db.commit()
+        except SQLAlchemyError as e:
+            await self.db.rollback()
+            logger.error(f"[NOTIF][BROADCAST] Failed to insert notifications: {e}", exc_info=True)
+            if debounce_key:
+                # Tidak ada notifikasi yang tersimpan: event berikutnya tidak boleh ikut digabung
+                try:
+                    await self.redis.delete(debounce_key)
+                except Exception as redis_error:
+                    logger.warning(f"[NOTIF][BROADCAST] Failed to clear debounce key {debounce_key}: {redis_error}")
+            raise DatabaseException(code="CREATE_NOTIFICATION", message="Failed to create notifications.")
+        notifications_created_total.labels(mode="broadcast").inc(len(rows))
+
+        payload = json.dumps({
+            "client_id": str(client_id),
+            "message": message,
+            "type": notif_type,
+            "created_at": created_at.isoformat(),
+            "notifications": {str(receiver_id): str(notif_id) for notif_id, receiver_id in rows},
+        })
+        # Channel per tenant memakai payload gabungan; channel broadcast lama tetap menerima
+        # payload lama (satu pesan per notifikasi, dengan id) untuk subscriber yang sudah ada
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.publish(_tenant_broadcast_channel(client_id), payload)
+        for notif_id, _ in rows:
+            pipe.publish(BROADCAST_CHANNEL, json.dumps({
+                "id": str(notif_id),
+                "message": message,
+                "type": notif_type,
+                "created_at": created_at.isoformat()
+            }))
+        await pipe.execute()
+
+        logger.info(f"[NOTIF][BROADCAST] Created {len(rows)} notifications for client_id={client_id}")
+        return True
+
+    async def get_notifications(
+        self,
+        receiver_id: UUID,
+        client_id: UUID,
+        limit: int = 20,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.exact
+    ) -> KeysetPage:
+        logger.info(f"[NOTIF][FETCH] Fetching notifications for user_id={receiver_id}, limit={limit}, cursor={cursor}, offset={offset}")
 
-        count_query = select(func.count()).select_from(
-            select(Notification).where(
-                and_(Notification.receiver_id == receiver_id, Notification.is_active == True, Notification.client_id == client_id)
-            ).subquery()
+        query = select(Notification).where(
+            and_(Notification.receiver_id == receiver_id, Notification.is_active == True, Notification.client_id == client_id)
         )
-        total_result = await self.db.execute(count_query)
-        total = total_result.scalar_one()
+        page = await paginate_async(self.db, query, Notification.created_at, Notification.id, limit, cursor=cursor, offset=offset)
+        page.total, page.total_is_estimate = await count_rows_async(self.db, query, count_mode)
 
-        logger.info(f"[NOTIF][FETCH] Found {len(notifications)} notifications, total={total}")
-        return notifications, total
+        logger.info(f"[NOTIF][FETCH] Found {len(page.items)} notifications, total={page.total}")
+        return page
 
     async def mark_notification_as_read(self, notification_id: UUID, receiver_id: UUID, client_id: UUID):
         logger.info(f"[NOTIF][UPDATE] Marking notification {notification_id} as read for user_id={receiver_id}")
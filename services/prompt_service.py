@@ -9,6 +9,8 @@ from database.models.prompt_model import Prompt
 from schemas.prompt_schema import PromptUpdate
 from core.config_db import config_db
 from exceptions.custom_exceptions import DatabaseException, ServiceException
+from agents.customer_service_agent.agent_pool import customer_service_agent_pool
+from services.answer_cache_service import invalidate_answer_cache
 
 logger = logging.getLogger(__name__)
 class PromptService:
@@ -62,9 +64,12 @@ class PromptService:
                 setattr(prompt, field, value)
 
             prompt.updated_at = datetime.utcnow()
+            invalidate_answer_cache(self.db, prompt.client_id)
             self.db.commit()
             self.db.refresh(prompt)
 
+            customer_service_agent_pool.invalidate(prompt.client_id)
+
             logger.info(f"[SERVICE][PROMPT] Prompt '{prompt_id}' updated successfully.")
             return prompt
 
@@ -0,0 +1,275 @@
+"""
+Engine export report yang streaming: memori konstan berapa pun rentang tanggalnya.
+
+- Query dibaca lewat server-side cursor (`stream_results` + `yield_per`) per
+  REPORT_EXPORT_BATCH_ROWS baris; tidak ada `fetchall()`.
+- CSV dan Parquet di-encode per batch dan langsung dikirim ke client.
+- XLSX memakai workbook write-only openpyxl (baris ditulis ke file sementara,
+  bukan ditahan di memori), disimpan ke file sementara lalu dikirim per chunk.
+
+Setiap RowStream memegang koneksi DB sendiri (bukan session request), karena
+body StreamingResponse dibaca setelah endpoint selesai.
+"""
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, time
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import Workbook
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from sqlalchemy import text
+from core.config_db import engine
+from core.settings import REPORT_EXPORT_BATCH_ROWS
+
+logger = logging.getLogger(__name__)
+
+NO_DATA = "tidak ada report"
+FILE_CHUNK_BYTES = 1024 * 1024
+
+@dataclass(frozen=True)
+class ReportQuery:
+    label: str
+    sheet_name: str
+    sql: str
+    headers: List[str]
+    # Indeks kolom berisi array yang di CSV ditulis "a, b, c"
+    joined_columns: Tuple[int, ...] = field(default_factory=tuple)
+
+class RowStream:
+    """
+    Hasil query yang dibaca bertahap lewat server-side cursor. Query dieksekusi
+    saat dibuat, jadi error SQL muncul sebelum response mulai dikirim.
+    """
+    def __init__(self, sql: str, params: Dict[str, Any], batch_rows: int = REPORT_EXPORT_BATCH_ROWS):
+        self._conn = engine.connect().execution_options(stream_results=True, yield_per=batch_rows)
+        try:
+            self._result = self._conn.execute(text(sql), params)
+        except BaseException:
+            self._conn.close()
+            raise
+        self.columns: List[str] = list(self._result.keys())
+        # OID tipe Postgres per kolom, untuk skema Parquet yang tidak bergantung pada isi batch
+        self.type_codes: List[Any] = [column[1] for column in self._result.cursor.description]
+
+    def batches(self) -> Iterator[Sequence[Any]]:
+        try:
+            for partition in self._result.partitions():
+                yield partition
+        finally:
+            self.close()
+
+    def close(self):
+        # Aman dipanggil berulang: dari generator body dan dari background task response
+        self._result.close()
+        self._conn.close()
+
+def _join_list(value):
+    return ", ".join(str(item) for item in value) if isinstance(value, (list, tuple)) else value
+
+def _title_rows(report: ReportQuery, start_date: str, end_date: str) -> List[List[str]]:
+    return [[f"Report: {report.label}"], [f"Date Range: {start_date} to {end_date}"], []]
+
+# ===== CSV =====
+
+def csv_chunks(report: ReportQuery, rows: RowStream, start_date: str, end_date: str) -> Iterator[str]:
+    """Satu chunk teks CSV per batch query; format sama dengan export CSV sebelumnya."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def drain() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+        return chunk
+
+    try:
+        writer.writerows(_title_rows(report, start_date, end_date))
+        writer.writerow(report.headers)
+        count = 0
+        for batch in rows.batches():
+            for row in batch:
+                values = list(row)
+                for index in report.joined_columns:
+                    values[index] = _join_list(values[index])
+                writer.writerow(values)
+            count += len(batch)
+            yield drain()
+        if count == 0:
+            writer.writerow([NO_DATA] + [""] * (len(report.headers) - 1))
+        yield drain()
+    except Exception as e:
+        logger.error(f"[REPORT_EXPORT] CSV export {report.label} terhenti: {e}", exc_info=True)
+        raise
+    finally:
+        rows.close()
+
+# ===== XLSX =====
+
+def _excel_value(value):
+    if value is None or isinstance(value, (int, float, bool)):
+        return value
+    if isinstance(value, (datetime, time)) and value.tzinfo is not None:
+        # Excel tidak mengenal timezone; sama seperti export pandas sebelumnya (tz_localize(None))
+        return value.replace(tzinfo=None)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        value = _join_list(value)
+    elif isinstance(value, dict):
+        value = json.dumps(value, default=str)
+    if isinstance(value, str):
+        return ILLEGAL_CHARACTERS_RE.sub("", value)
+    return value
+
+def write_xlsx(path: str, sheets: Iterable[Tuple[ReportQuery, Callable[[], RowStream]]], start_date: str, end_date: str):
+    """
+    Tulis workbook ke `path` dengan mode write-only: tiap sheet diisi per batch
+    dan RowStream sheet berikutnya baru dibuka setelah sheet sebelumnya selesai.
+    """
+    workbook = Workbook(write_only=True)
+    for report, open_rows in sheets:
+        sheet = workbook.create_sheet(title=report.sheet_name)
+        for title_row in _title_rows(report, start_date, end_date):
+            sheet.append(title_row)
+        sheet.append(report.headers)
+        rows = open_rows()
+        count = 0
+        try:
+            for batch in rows.batches():
+                for row in batch:
+                    sheet.append([_excel_value(value) for value in row])
+                count += len(batch)
+        finally:
+            rows.close()
+        if count == 0:
+            sheet.append([NO_DATA] + [""] * (len(report.headers) - 1))
+    workbook.save(path)
+
+def xlsx_file(sheets: Iterable[Tuple[ReportQuery, Callable[[], RowStream]]], start_date: str, end_date: str) -> str:
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        write_xlsx(path, sheets, start_date, end_date)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+def remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def file_chunks(path: str) -> Iterator[bytes]:
+    """Kirim file sementara per chunk lalu hapus (juga jika client memutus download)."""
+    try:
+        with open(path, "rb") as f:
+            while True:
+                chunk = f.read(FILE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        remove_file(path)
+
+# ===== Parquet =====
+
+class _ByteSink(io.RawIOBase):
+    """Output ParquetWriter: byte yang sudah ditulis diambil per batch dengan take()."""
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._buffer += data
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def take(self) -> bytes:
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        return data
+
+# OID tipe Postgres -> tipe Arrow. Numeric ditulis sebagai float64 karena presisi
+# Decimal berbeda antar baris; tipe lain (text, uuid, json, array) sebagai string.
+_ARROW_TYPES = {
+    16: pa.bool_(),
+    20: pa.int64(),
+    21: pa.int64(),
+    23: pa.int64(),
+    700: pa.float64(),
+    701: pa.float64(),
+    1700: pa.float64(),
+    1082: pa.date32(),
+    1114: pa.timestamp("us"),
+    1184: pa.timestamp("us", tz="UTC"),
+    1186: pa.duration("us"),
+}
+
+def _arrow_schema(columns: List[str], type_codes: List[Any]):
+    return pa.schema([
+        pa.field(name, _ARROW_TYPES.get(type_code, pa.string()))
+        for name, type_code in zip(columns, type_codes)
+    ])
+
+def _parquet_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (list, tuple)):
+        return _join_list(value)
+    if isinstance(value, dict):
+        return json.dumps(value, default=str)
+    return value
+
+def _arrow_table(batch: Sequence[Any], schema):
+    values = [[_parquet_value(value) for value in column] for column in zip(*batch)] if batch else [[] for _ in schema]
+    arrays = []
+    for column, schema_field in zip(values, schema):
+        if pa.types.is_string(schema_field.type):
+            column = [None if value is None else str(value) for value in column]
+        arrays.append(pa.array(column, type=schema_field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+def parquet_chunks(report: ReportQuery, rows: RowStream) -> Iterator[bytes]:
+    """
+    Parquet dengan satu row group per batch query. Nama kolom mengikuti kolom
+    database (snake_case) agar mudah dipakai di pandas/duckdb; skema diambil dari
+    tipe kolom query, bukan dari isi batch pertama.
+    """
+    sink = _ByteSink()
+    schema = _arrow_schema(rows.columns, rows.type_codes)
+    writer = pq.ParquetWriter(sink, schema, compression="snappy")
+    try:
+        for batch in rows.batches():
+            if not batch:
+                continue
+            writer.write_table(_arrow_table(batch, schema))
+            yield sink.take()
+        writer.close()
+        writer = None
+        yield sink.take()
+    except Exception as e:
+        logger.error(f"[REPORT_EXPORT] Parquet export {report.label} terhenti: {e}", exc_info=True)
+        raise
+    finally:
+        if writer is not None:
+            writer.close()
+        rows.close()
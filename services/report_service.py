@@ -1,325 +1,208 @@
-import logging 
+import logging
+from typing import Optional
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from fastapi import HTTPException, status, Depends 
+from fastapi import status, Depends
 from fastapi.responses import StreamingResponse
-import io
-import csv
+from starlette.background import BackgroundTask
 from core.config_db import config_db
-from sqlalchemy import text
-from io import BytesIO
-import pandas as pd
 from exceptions.custom_exceptions import DatabaseException, ServiceException
+from services.report_export import ReportQuery, RowStream, csv_chunks, parquet_chunks, xlsx_file, file_chunks, remove_file
 from uuid import UUID
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+CUSTOMER_FEEDBACK_QUERY = """
+    SELECT
+        feedback_from_customer, sentiment, potential_actions, keyword_issue,
+        category, product_name, email_user, created_at
+    FROM ai.dt_customer_feedback
+    WHERE created_at BETWEEN :start_date AND :end_date
+    AND client_id = :client_id
+    ORDER BY created_at ASC
+"""
+CUSTOMER_FEEDBACK_HEADERS = [
+    "Feedback", "Sentiment", "Potential Actions", "Keyword Issue",
+    "Category", "Product Name", "Email", "Created At"
+]
+
+CUSTOMER_PROFILE_QUERY = """
+    SELECT full_name, email, phone_number,
+           customer_type, registration_date, last_activity_at, address,
+           city, country, is_active, created_at, updated_at
+    FROM ai.dt_customer_profile
+    WHERE created_at BETWEEN :start_date AND :end_date
+    AND client_id = :client_id
+    ORDER BY created_at ASC
+"""
+CUSTOMER_PROFILE_HEADERS = [
+    "Full Name", "Email", "Phone Number",
+    "Customer Type", "Registration Date", "Last Activity", "Address",
+    "City", "Country", "Is Active", "Created At", "Updated At"
+]
+
+MOST_QUESTION_QUERY = """
+    SELECT agent_response_category, COUNT(*) AS count
+    FROM ai.dt_chats
+    WHERE agent_response_category IS NOT NULL AND agent_response_category NOT IN ('', 'pending')
+          AND created_at BETWEEN :start_date AND :end_date
+          AND client_id = :client_id
+    GROUP BY agent_response_category
+    ORDER BY count DESC
+"""
+
+CUSTOMER_INTERACTION_QUERY = """
+    SELECT id, conversation_id, customer_id, start_time, end_time, duration_seconds,
+           channel, initial_query, total_messages, is_handoff_to_agent,
+           agent_id, agent_name, conversation_status, detected_intent, main_topic,
+           keywords_extracted, sentiment_score, product_involved,
+           customer_feedback_id, customer_feedback_score, customer_feedback_comment,
+           feedback_submitted, created_at
+    FROM ai.dt_customer_interactions
+    WHERE created_at BETWEEN :start_date AND :end_date
+    AND client_id = :client_id
+    ORDER BY created_at ASC
+"""
+CUSTOMER_INTERACTION_HEADERS = [
+    "ID", "Conversation ID", "Customer ID", "Start Time", "End Time", "Duration (s)",
+    "Channel", "Initial Query", "Total Messages", "Is Handoff",
+    "Agent ID", "Agent Name", "Conversation Status", "Detected Intent", "Main Topic",
+    "Keywords Extracted", "Sentiment Score", "Product", "Feedback ID",
+    "Feedback Score", "Feedback Comment", "Feedback Submitted", "Created At"
+]
+
+REPORTS = {
+    "CUSTOMER_FEEDBACK": ReportQuery("Customer Feedback", "Customer Feedback", CUSTOMER_FEEDBACK_QUERY, CUSTOMER_FEEDBACK_HEADERS),
+    "CHAT_HISTORY": ReportQuery(
+        "Chat History",
+        "Chat History",
+        """
+            SELECT
+                room_conversation_id,
+                sender_id,
+                message,
+                role,
+                created_at,
+                agent_response_category,
+                agent_response_latency,
+                agent_total_tokens,
+                agent_input_tokens,
+                agent_output_tokens,
+                agent_tools_call
+            FROM ai.dt_chats
+            WHERE created_at BETWEEN :start_date AND :end_date
+            AND client_id = :client_id
+            ORDER BY created_at ASC
+        """,
+        ["Room Conversation ID", "Sender ID", "Message", "Role", "Created At",
+         "Agent_response_category", "Agent_response_latency", "Agent_total_tokens",
+         "Agent_input_tokens", "Agent_output_tokens", "Agent_tools_call"]
+    ),
+    "CUSTOMER_PROFILE": ReportQuery("Customer Profile", "Customer Profile", CUSTOMER_PROFILE_QUERY, CUSTOMER_PROFILE_HEADERS),
+    "MOST_QUESTION": ReportQuery("Category Frequency", "Most Question", MOST_QUESTION_QUERY, ["Category", "Frequency"]),
+    "CUSTOMER_INTERACTION": ReportQuery(
+        "Customer Interactions", "Customer Interaction", CUSTOMER_INTERACTION_QUERY, CUSTOMER_INTERACTION_HEADERS,
+        joined_columns=(15,)
+    ),
+}
+
+# Sheet workbook ALL_DATA, berurutan
+ALL_DATA_SHEETS = [
+    ReportQuery("Customer Profile", "Customer Profile", CUSTOMER_PROFILE_QUERY, CUSTOMER_PROFILE_HEADERS),
+    ReportQuery("Customer Interaction", "Customer Interaction", CUSTOMER_INTERACTION_QUERY, CUSTOMER_INTERACTION_HEADERS),
+    ReportQuery("Most Question (Top Initial Queries)", "Most Question", MOST_QUESTION_QUERY, ["Category", "Frequency"]),
+    ReportQuery("Customer Feedback", "Customer Feedback", CUSTOMER_FEEDBACK_QUERY, CUSTOMER_FEEDBACK_HEADERS),
+    ReportQuery(
+        "Chat History",
+        "Chat History",
+        """
+            SELECT id, room_conversation_id, sender_id, message, role,
+                agent_response_category, created_at
+            FROM ai.dt_chats
+            WHERE created_at BETWEEN :start_date AND :end_date
+            AND client_id = :client_id
+            ORDER BY created_at ASC
+        """,
+        ["ID", "Room Conversation ID", "Sender ID", "Message", "Role",
+         "Agent Response Category", "Created At"]
+    ),
+]
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "parquet": "application/vnd.apache.parquet",
+}
+
 class ReportService:
     def __init__(self, db: Session):
         self.db = db
 
-    def _remove_timezone(self, df: pd.DataFrame) -> pd.DataFrame:
-        for col in df.select_dtypes(include=["datetimetz"]).columns:
-            df[col] = df[col].dt.tz_localize(None)
-        return df
-    
-    def _write_query_results(self, writer, query, params, headers):
-        result = self.db.execute(query, params)
-        rows = result.fetchall()
-        writer.writerow(headers)
-        if rows:
-            for row in rows:
-                writer.writerow(list(row))
-    
-    def _write_with_no_data(self, writer, headers):
-        """Menulis header dan baris pertama 'tidak ada report'."""
-        writer.writerow(headers)
-        writer.writerow(["tidak ada report"] + [""] * (len(headers) - 1))
-
-    def report_csv(self, report_type: str, start_date: str, end_date: str, client_id: UUID) -> StreamingResponse:
+    def _validate(self, report_type: str, file_format: Optional[str]) -> str:
+        if report_type != "ALL_DATA" and report_type not in REPORTS:
+            raise ServiceException(
+                code="INVALID_REPORT_TYPE",
+                message=f"Unsupported report type: {report_type}",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        # ALL_DATA adalah workbook multi-sheet, selain itu default CSV
+        file_format = (file_format or ("xlsx" if report_type == "ALL_DATA" else "csv")).lower()
+        if file_format not in MEDIA_TYPES or (report_type == "ALL_DATA" and file_format != "xlsx"):
+            raise ServiceException(
+                code="INVALID_REPORT_FORMAT",
+                message=f"Unsupported format '{file_format}' for report {report_type}",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        return file_format
+
+    def export_report(
+        self, report_type: str, start_date: str, end_date: str, client_id: UUID, file_format: Optional[str] = None
+    ) -> StreamingResponse:
+        """
+        Export report sebagai CSV, XLSX, atau Parquet. Baris dibaca per batch dari
+        server-side cursor, jadi memori worker tidak bergantung pada rentang tanggal.
+        """
+        file_format = self._validate(report_type, file_format)
+        params = {"start_date": start_date, "end_date": end_date, "client_id": client_id}
         try:
-            logger.info(f"[SERVICE][REPORT] Generating report: {report_type} from {start_date} to {end_date}")
-            buffer = io.StringIO()
-            writer = csv.writer(buffer)
-
-            if report_type == "CUSTOMER_FEEDBACK":
-                query = text("""
-                    SELECT 
-                        feedback_from_customer, sentiment, potential_actions, keyword_issue,
-                        category, product_name, email_user, created_at
-                    FROM ai.dt_customer_feedback
-                    WHERE created_at BETWEEN :start_date AND :end_date
-                    AND client_id = :client_id
-                    ORDER BY created_at ASC
-                """)
-                params = {"start_date": start_date, "end_date": end_date, "client_id": client_id}
-                result = self.db.execute(query, params)
-                rows = result.fetchall()
-
-                writer.writerow([f"Report: Customer Feedback"])
-                writer.writerow([f"Date Range: {start_date} to {end_date}"])
-                writer.writerow([])
-
-                headers = [
-                    "Feedback", "Sentiment", "Potential Actions", "Keyword Issue",
-                    "Category", "Product Name", "Email", "Created At"
-                ]
-                
-                if rows:
-                    writer.writerow(headers)
-                    for row in rows:
-                        writer.writerow(list(row))
-                else:
-                    self._write_with_no_data(writer, headers)
-
-            elif report_type == "CHAT_HISTORY":
-                query = text("""
-                    SELECT 
-                        room_conversation_id, 
-                        sender_id, 
-                        message, 
-                        role, 
-                        created_at, 
-                        agent_response_category, 
-                        agent_response_latency, 
-                        agent_total_tokens, 
-                        agent_input_tokens, 
-                        agent_output_tokens, 
-                        agent_tools_call
-                    FROM ai.dt_chats
-                    WHERE created_at BETWEEN :start_date AND :end_date
-                    AND client_id = :client_id
-                    ORDER BY created_at ASC
-                """)
-                params = {"start_date": start_date, "end_date": end_date, "client_id": client_id}
-                result = self.db.execute(query, params)
-                rows = result.fetchall()
-                
-                writer.writerow([f"Report: Chat History"])
-                writer.writerow([f"Date Range: {start_date} to {end_date}"])
-                writer.writerow([])
-                
-                headers = ["Room Conversation ID", "Sender ID", "Message", "Role", "Created At", 
-                           "Agent_response_category", "Agent_response_latency", "Agent_total_tokens", 
-                           "Agent_input_tokens", "Agent_output_tokens", "Agent_tools_call"]
-                
-                if rows:
-                    writer.writerow(headers)
-                    for row in rows:
-                        writer.writerow(list(row))
-                else:
-                    self._write_with_no_data(writer, headers)
-
-            elif report_type == "CUSTOMER_PROFILE":
-                query = text("""
-                    SELECT full_name, email, phone_number,
-                           customer_type, registration_date, last_activity_at, address,
-                           city, country, is_active, created_at, updated_at
-                    FROM ai.dt_customer_profile
-                    WHERE created_at BETWEEN :start_date AND :end_date
-                    AND client_id = :client_id
-                    ORDER BY created_at ASC
-                """)
-                
-                params = {"start_date": start_date, "end_date": end_date, "client_id": client_id}
-                result = self.db.execute(query, params)
-                rows = result.fetchall()
-                
-                writer.writerow([f"Report: Customer Profile"])
-                writer.writerow([f"Date Range: {start_date} to {end_date}"])
-                writer.writerow([])
-                headers = [
-                    "Full Name", "Email", "Phone Number",
-                    "Customer Type", "Registration Date", "Last Activity", "Address",
-                    "City", "Country", "Is Active", "Created At", "Updated At"
-                ]
-                
-                if rows:
-                    writer.writerow(headers)
-                    for row in rows:
-                        writer.writerow(list(row))
-                else:
-                    self._write_with_no_data(writer, headers)
-
-            elif report_type == "MOST_QUESTION":
-                query = text("""
-                    SELECT agent_response_category, COUNT(*) AS count
-                    FROM ai.dt_chats
-                    WHERE agent_response_category IS NOT NULL AND agent_response_category != ''
-                          AND created_at BETWEEN :start_date AND :end_date
-                          AND client_id = :client_id
-                    GROUP BY agent_response_category
-                    ORDER BY count DESC
-                """)
-                
-                params = {"start_date": start_date, "end_date": end_date, "client_id": client_id}
-                result = self.db.execute(query, params)
-                rows = result.fetchall()
-                
-                writer.writerow([f"Report: Category Frequency"])
-                writer.writerow([f"Date Range: {start_date} to {end_date}"])
-                writer.writerow([])
-                headers = ["Category", "Frequency"]
-                
-                if rows:
-                    writer.writerow(headers)
-                    for row in rows:
-                        writer.writerow(list(row))
-                else:
-                    self._write_with_no_data(writer, headers)
-
-            elif report_type == "CUSTOMER_INTERACTION":
-                query = text("""
-                    SELECT id, conversation_id, customer_id, start_time, end_time, duration_seconds,
-                           channel, initial_query, total_messages, is_handoff_to_agent,
-                           agent_id, agent_name, conversation_status, detected_intent, main_topic,
-                           keywords_extracted, sentiment_score, product_involved,
-                           customer_feedback_id, customer_feedback_score, customer_feedback_comment,
-                           feedback_submitted, created_at
-                    FROM ai.dt_customer_interactions
-                    WHERE created_at BETWEEN :start_date AND :end_date
-                    AND client_id = :client_id
-                    ORDER BY created_at ASC
-                """)
-                
-                params = {"start_date": start_date, "end_date": end_date, "client_id": client_id}
-                result = self.db.execute(query, params)
-                rows = result.fetchall()
-                
-                writer.writerow([f"Report: Customer Interactions"])
-                writer.writerow([f"Date Range: {start_date} to {end_date}"])
-                writer.writerow([])
-                headers = [
-                    "ID", "Conversation ID", "Customer ID", "Start Time", "End Time", "Duration (s)",
-                    "Channel", "Initial Query", "Total Messages", "Is Handoff",
-                    "Agent ID", "Agent Name", "Conversation Status", "Detected Intent", "Main Topic",
-                    "Keywords Extracted", "Sentiment Score", "Product", "Feedback ID",
-                    "Feedback Score", "Feedback Comment", "Feedback Submitted", "Created At"
-                ]
-                
-                if rows:
-                    writer.writerow(headers)
-                    for row in rows:
-                        row_data = list(row)
-                        if isinstance(row_data[15], list):
-                            row_data[15] = ", ".join(row_data[15]) 
-                        writer.writerow(row_data)
-                else:
-                    self._write_with_no_data(writer, headers)
-
-            elif report_type == "ALL_DATA":
-                output = BytesIO()
-                with pd.ExcelWriter(output, engine="openpyxl") as writer:
-                    def query_to_excel(query_str, sheet_name, label, headers):
-                        df = pd.read_sql_query(
-                            text(query_str),
-                            self.db.bind,
-                            params={"start_date": start_date, "end_date": end_date, "client_id": client_id}
-                        )
-                        df = self._remove_timezone(df)
-
-                        if df.empty:
-                            df = pd.DataFrame([[ "tidak ada report" ] + [""] * (len(headers) - 1)], columns=headers)
-
-                        df.to_excel(writer, sheet_name=sheet_name, startrow=3, index=False)
-                        ws = writer.book[sheet_name]
-                        ws["A1"] = f"Report: {label}"
-                        ws["A2"] = f"Date Range: {start_date} to {end_date}"
-
-                    query_to_excel("""
-                        SELECT full_name, email, phone_number,
-                           customer_type, registration_date, last_activity_at, address,
-                           city, country, is_active, created_at, updated_at
-                        FROM ai.dt_customer_profile
-                        WHERE created_at BETWEEN :start_date AND :end_date
-                        AND client_id = :client_id
-                        ORDER BY created_at ASC
-                    """, "Customer Profile", "Customer Profile",
-                    ["Full Name", "Email", "Phone Number", "Customer Type", "Registration Date",
-                    "Last Activity", "Address", "City", "Country", "Is Active", "Created At", "Updated At"])
-
-                    query_to_excel("""
-                        SELECT id, conversation_id, customer_id, start_time, end_time, duration_seconds,
-                           channel, initial_query, total_messages, is_handoff_to_agent,
-                           agent_id, agent_name, conversation_status, detected_intent, main_topic,
-                           keywords_extracted, sentiment_score, product_involved,
-                           customer_feedback_id, customer_feedback_score, customer_feedback_comment,
-                           feedback_submitted, created_at
-                        FROM ai.dt_customer_interactions
-                        WHERE created_at BETWEEN :start_date AND :end_date
-                        AND client_id = :client_id
-                        ORDER BY created_at ASC
-                    """, "Customer Interaction", "Customer Interaction",
-                    ["ID", "Conversation ID", "Customer ID", "Start Time", "End Time", "Duration (s)",
-                    "Channel", "Initial Query", "Total Messages", "Is Handoff",
-                    "Agent ID", "Agent Name", "Conversation Status", "Detected Intent", "Main Topic",
-                    "Keywords Extracted", "Sentiment Score", "Product", "Feedback ID",
-                    "Feedback Score", "Feedback Comment", "Feedback Submitted", "Created At"])
-
-                    query_to_excel("""
-                        SELECT agent_response_category, COUNT(*) AS count
-                        FROM ai.dt_chats
-                        WHERE agent_response_category IS NOT NULL AND agent_response_category != ''
-                            AND created_at BETWEEN :start_date AND :end_date
-                            AND client_id = :client_id
-                        GROUP BY agent_response_category
-                        ORDER BY count DESC
-                    """, "Most Question", "Most Question (Top Initial Queries)",
-                    ["Category", "Frequency"])
-
-                    query_to_excel("""
-                        SELECT 
-                            feedback_from_customer, sentiment, potential_actions, keyword_issue,
-                            category, product_name, email_user, created_at
-                        FROM ai.dt_customer_feedback
-                        WHERE created_at BETWEEN :start_date AND :end_date
-                        AND client_id = :client_id
-                        ORDER BY created_at ASC
-                    """, "Customer Feedback", "Customer Feedback",
-                    ["Feedback", "Sentiment", "Potential Actions", "Keyword Issue",
-                    "Category", "Product Name", "Email", "Created At"])
-
-                    query_to_excel("""
-                        SELECT id, room_conversation_id, sender_id, message, role,
-                            agent_response_category, created_at
-                        FROM ai.dt_chats
-                        WHERE created_at BETWEEN :start_date AND :end_date
-                        AND client_id = :client_id
-                        ORDER BY created_at ASC
-                    """, "Chat History", "Chat History",
-                    ["ID", "Room Conversation ID", "Sender ID", "Message", "Role",
-                    "Agent Response Category", "Created At"])
-
-                output.seek(0)
-                filename = f"{report_type.lower()}_{start_date}_to_{end_date}.xlsx"
-                return StreamingResponse(
-                    output,
-                    media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-                    headers={"Content-Disposition": f"attachment; filename={filename}"}
+            logger.info(f"[SERVICE][REPORT] Generating {file_format} report: {report_type} from {start_date} to {end_date}")
+
+            if file_format == "xlsx":
+                sheets = ALL_DATA_SHEETS if report_type == "ALL_DATA" else [REPORTS[report_type]]
+                path = xlsx_file(
+                    [(report, lambda report=report: RowStream(report.sql, params)) for report in sheets],
+                    start_date,
+                    end_date
                 )
-
+                body = file_chunks(path)
+                cleanup = BackgroundTask(remove_file, path)
             else:
-                raise HTTPException(status_code=400, detail=f"Unsupported report type: {report_type}")
+                report = REPORTS[report_type]
+                # Query dijalankan sekarang supaya error DB masih bisa dikembalikan sebagai response error
+                rows = RowStream(report.sql, params)
+                if file_format == "csv":
+                    body = csv_chunks(report, rows, start_date, end_date)
+                else:
+                    body = parquet_chunks(report, rows)
+                cleanup = BackgroundTask(rows.close)
 
-            buffer.seek(0)
+            filename = f"{report_type.lower()}_{start_date}_to_{end_date}.{file_format}"
             return StreamingResponse(
-                iter([buffer.getvalue()]),
-                media_type="text/csv",
-                headers={"Content-Disposition": f"attachment; filename={report_type.lower()}_{start_date}_to_{end_date}.csv"}
+                body,
+                media_type=MEDIA_TYPES[file_format],
+                headers={"Content-Disposition": f"attachment; filename={filename}"},
+                # Body generator tidak pernah dijalankan jika response gagal dikirim;
+                # koneksi DB / file sementara tetap dilepas setelah response selesai
+                background=cleanup
             )
 
-        except ServiceException as e:
-                self.db.rollback()
-                raise
-            
+        except ServiceException:
+            raise
         except SQLAlchemyError as e:
-            self.db.rollback()
             logger.error(f"[SERVICE][REPORT] DB error: {e}", exc_info=True)
             raise DatabaseException(code="DB_REPORT_ERROR", message="Database error during report generation.")
-        
         except Exception as e:
-            self.db.rollback()
             logger.error(f"[SERVICE][REPORT] Unexpected error: {e}", exc_info=True)
             raise ServiceException(code="UNEXPECTED_REPORT", message=f"Unexpected error: {str(e)}")
 
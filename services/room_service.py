@@ -1,7 +1,7 @@
 import logging
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, or_, String, cast , Text
+from sqlalchemy import func, or_, String, cast , Text, tuple_
 from fastapi import Depends
 from typing import List, Optional
 from core.config_db import config_db
@@ -9,6 +9,8 @@ from database.models.chat_model import Chat
 from database.models.room_conversation_model import RoomConversation
 from schemas.room_conversation_schema import RoomConversationResponse
 from exceptions.custom_exceptions import DatabaseException
+from utils.search_utils import SearchQuery
+from utils.pagination_utils import KeysetPage, paginate
 from uuid import UUID
 from datetime import datetime
 
@@ -20,23 +22,18 @@ class RoomService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_all_rooms(self, offset: int, limit: int, client_id: UUID) -> List[RoomConversation]:
+    def get_all_rooms(self, offset: int, limit: int, client_id: UUID, cursor: Optional[str] = None) -> KeysetPage:
         """
-        Mengambil semua room conversation berdasarkan client_id dengan pagination.
+        Mengambil semua room conversation berdasarkan client_id dengan pagination (cursor/offset).
         """
         try:
-            logger.info(f"[SERVICE][ROOM] Fetching all rooms (offset={offset}, limit={limit}, client_id={client_id})")
-            
-            rooms = (
-                self.db.query(RoomConversation)
-                .filter(RoomConversation.client_id == client_id)
-                .offset(offset)
-                .limit(limit)
-                .all()
-            )
+            logger.info(f"[SERVICE][ROOM] Fetching all rooms (cursor={cursor}, offset={offset}, limit={limit}, client_id={client_id})")
 
-            logger.info(f"[SERVICE][ROOM] Successfully fetched {len(rooms)} rooms.")
-            return rooms
+            query = self.db.query(RoomConversation).filter(RoomConversation.client_id == client_id)
+            page = paginate(query, RoomConversation.created_at, RoomConversation.id, limit, cursor=cursor, offset=offset)
+
+            logger.info(f"[SERVICE][ROOM] Successfully fetched {len(page.items)} rooms.")
+            return page
         
         except SQLAlchemyError as e:
             logger.error(f"[SERVICE][ROOM] SQLAlchemy Error on get_all_rooms: {e}", exc_info=True)
@@ -122,63 +119,45 @@ class RoomService:
     #         raise DatabaseException("Failed to fetch active rooms from the database.", "GET_ACTIVE_ROOMS")
 
     def get_active_rooms(
-        self, cursor: Optional[datetime], limit: int, client_id: UUID, search: Optional[str] = None
+        self,
+        cursor: Optional[datetime],
+        limit: int,
+        client_id: UUID,
+        search: Optional[str] = None,
+        cursor_id: Optional[UUID] = None
     ) -> List[RoomConversationResponse]:
+        """
+        Mengambil room 'open' terurut dari pesan terakhir, memakai kolom denormalisasi
+        last_message/last_message_at dan index (client_id, status, last_message_at DESC, id DESC).
+        """
         try:
-            latest_chat_subquery = (
-                self.db.query(
-                    Chat.room_conversation_id,
-                    func.max(Chat.created_at).label("latest_chat")
-                )
-                .join(RoomConversation, RoomConversation.id == Chat.room_conversation_id)
-                .filter(RoomConversation.client_id == client_id)
-                .group_by(Chat.room_conversation_id)
-                .subquery()
-            )
-
-            latest_message_subquery = (
-                self.db.query(
-                    Chat.room_conversation_id,
-                    Chat.message,
-                    Chat.created_at
-                )
-                .join(
-                    latest_chat_subquery,
-                    (Chat.room_conversation_id == latest_chat_subquery.c.room_conversation_id) &
-                    (Chat.created_at == latest_chat_subquery.c.latest_chat)
-                )
-                .subquery()
-            )
-
             query = (
-                self.db.query(
-                    RoomConversation,
-                    latest_message_subquery.c.message.label("last_message"),
-                    latest_message_subquery.c.created_at.label("last_time_message")
-                )
-                .join(latest_message_subquery, RoomConversation.id == latest_message_subquery.c.room_conversation_id)
+                self.db.query(RoomConversation)
                 .filter(
+                    RoomConversation.client_id == client_id,
                     RoomConversation.status == 'open',
-                    RoomConversation.client_id == client_id
+                    RoomConversation.last_message_at.isnot(None)
                 )
             )
 
             if search:
-                search_pattern = f"%{search.lower()}%"
+                # Urutan tetap berdasarkan pesan terakhir supaya cursor tetap valid
+                query = SearchQuery(
+                    term=search,
+                    trigram_columns=[RoomConversation.name, RoomConversation.description, RoomConversation.last_message],
+                    uuid_columns=[RoomConversation.id]
+                ).apply(query, ranked=False)
+
+            # keyset pagination: ambil data "lebih kecil" dari posisi terakhir (karena order DESC)
+            if cursor and cursor_id:
                 query = query.filter(
-                    or_(
-                        func.lower(cast(RoomConversation.id, Text)).like(search_pattern),
-                        func.lower(RoomConversation.description).like(search_pattern),
-                        func.lower(latest_message_subquery.c.message).like(search_pattern)
-                    )
+                    tuple_(RoomConversation.last_message_at, RoomConversation.id) < tuple_(cursor, cursor_id)
                 )
+            elif cursor:
+                query = query.filter(RoomConversation.last_message_at < cursor)
 
-            # cursor pagination: ambil data "lebih kecil" dari waktu terakhir (karena order DESC)
-            if cursor:
-                query = query.filter(latest_message_subquery.c.created_at < cursor)
-
-            results = (
-                query.order_by(latest_message_subquery.c.created_at.desc())
+            rooms = (
+                query.order_by(RoomConversation.last_message_at.desc(), RoomConversation.id.desc())
                 .limit(limit)
                 .all()
             )
@@ -192,10 +171,10 @@ class RoomService:
                     created_at=room.created_at,
                     updated_at=room.updated_at,
                     agent_active=room.agent_active,
-                    lastMessage=last_msg,
-                    lastTimeMessage=last_time
+                    lastMessage=room.last_message,
+                    lastTimeMessage=room.last_message_at
                 )
-                for room, last_msg, last_time in results
+                for room in rooms
             ]
 
         except SQLAlchemyError as e:
@@ -0,0 +1,183 @@
+"""
+Penerimaan upload multipart secara streaming.
+
+Body request dibaca per chunk dari socket dan setiap bagian file langsung ditulis
+ke blob store: tipe file divalidasi dari byte pertama, batas ukuran ditegakkan saat
+membaca, dan sha256 dihitung sambil jalan. Tidak ada file yang ditahan utuh di
+memori worker (berbeda dengan UploadFile + `await file.read()`).
+"""
+import logging
+from dataclasses import dataclass
+from typing import List, Optional
+from fastapi import Request
+from fastapi.concurrency import run_in_threadpool
+from python_multipart.multipart import MultipartParser, parse_options_header
+from exceptions.custom_exceptions import ServiceException
+from services.blob_store import BlobTooLarge, BlobWriter, StoredBlob, blob_store
+
+logger = logging.getLogger(__name__)
+
+ALLOWED_CONTENT_TYPES = ("application/pdf", "text/plain")
+# Cukup untuk magic number PDF dan untuk menilai apakah isi adalah teks
+SNIFF_BYTES = 512
+# Chunk jaringan dikumpulkan sampai ukuran ini sebelum ditulis dari thread
+WRITE_BUFFER_BYTES = 256 * 1024
+
+@dataclass
+class ReceivedFile:
+    filename: str
+    content_type: str
+    blob: StoredBlob
+
+def sniff_content_type(head: bytes) -> Optional[str]:
+    """Tebak tipe dari byte awal. Seperti git, byte NUL berarti biner (bukan teks)."""
+    if head.startswith(b"%PDF-"):
+        return "application/pdf"
+    if b"\x00" in head:
+        return None
+    return "text/plain"
+
+def _too_large(max_size: int) -> ServiceException:
+    return ServiceException(
+        status_code=413,
+        message=f"File too large. Maximum size is {max_size // (1024 * 1024)}MB",
+        code="FILE_SIZE"
+    )
+
+class _FilePart:
+    def __init__(self, filename: str, declared_type: str, max_size: int):
+        if declared_type not in ALLOWED_CONTENT_TYPES:
+            raise ServiceException(status_code=400, message="Unsupported file type", code="FILE_TYPE")
+        self.filename = filename
+        self.declared_type = declared_type
+        self.max_size = max_size
+        self._head = bytearray()
+        self._buffer = bytearray()
+        self._writer: Optional[BlobWriter] = None
+
+    def _check_type(self):
+        sniffed = sniff_content_type(bytes(self._head))
+        if sniffed != self.declared_type:
+            logger.warning(
+                f"[UPLOAD] Rejecting {self.filename}: declared {self.declared_type}, content looks like {sniffed}"
+            )
+            raise ServiceException(status_code=400, message="File content does not match its type", code="FILE_TYPE")
+
+    def _flush(self):
+        data = bytes(self._buffer)
+        self._buffer.clear()
+        try:
+            if self._writer is None:
+                self._writer = blob_store.writer(self.max_size)
+            self._writer.write(data)
+        except BlobTooLarge:
+            raise _too_large(self.max_size)
+
+    async def feed(self, data: bytes):
+        if len(self._head) < SNIFF_BYTES:
+            self._head += data[:SNIFF_BYTES - len(self._head)]
+            if len(self._head) >= SNIFF_BYTES:
+                self._check_type()
+        self._buffer += data
+        if len(self._buffer) >= WRITE_BUFFER_BYTES:
+            await run_in_threadpool(self._flush)
+
+    async def finish(self) -> ReceivedFile:
+        if len(self._head) < SNIFF_BYTES:
+            self._check_type()
+        if not self._head:
+            raise ServiceException(status_code=400, message=f"File {self.filename} is empty", code="FILE_EMPTY")
+        if self._buffer or self._writer is None:
+            await run_in_threadpool(self._flush)
+        blob = await run_in_threadpool(self._writer.commit)
+        return ReceivedFile(filename=self.filename, content_type=self.declared_type, blob=blob)
+
+    async def abort(self):
+        if self._writer is not None:
+            await run_in_threadpool(self._writer.abort)
+
+async def receive_uploads(request: Request, field_name: str, max_files: int, max_size: int) -> List[ReceivedFile]:
+    """
+    Baca body multipart/form-data dan simpan setiap bagian `field_name` ke blob store.
+    Bagian form lain diabaikan. Gagal di tengah jalan = file yang sedang ditulis dibuang.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise ServiceException(status_code=400, message="Expected multipart/form-data upload", code="UPLOAD_FORMAT")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_files * (max_size + 64 * 1024):
+        raise _too_large(max_size)
+
+    events = []
+    header_field = bytearray()
+    header_value = bytearray()
+    headers = {}
+
+    def on_part_begin():
+        headers.clear()
+
+    def on_header_field(data, start, end):
+        header_field.extend(data[start:end])
+
+    def on_header_value(data, start, end):
+        header_value.extend(data[start:end])
+
+    def on_header_end():
+        headers[bytes(header_field).lower()] = bytes(header_value)
+        header_field.clear()
+        header_value.clear()
+
+    def on_headers_finished():
+        events.append(("begin", dict(headers)))
+
+    def on_part_data(data, start, end):
+        events.append(("data", data[start:end]))
+
+    def on_part_end():
+        events.append(("end", None))
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": on_part_begin,
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+        "on_headers_finished": on_headers_finished,
+        "on_part_data": on_part_data,
+        "on_part_end": on_part_end,
+    })
+
+    received: List[ReceivedFile] = []
+    current: Optional[_FilePart] = None
+    try:
+        async for chunk in request.stream():
+            parser.write(chunk)
+            for kind, payload in events:
+                if kind == "begin":
+                    _, disposition = parse_options_header(payload.get(b"content-disposition", b""))
+                    filename = disposition.get(b"filename")
+                    if disposition.get(b"name", b"").decode() != field_name or filename is None:
+                        continue
+                    if len(received) >= max_files:
+                        raise ServiceException(status_code=400, message=f"Maximum {max_files} files per upload", code="FILE_COUNT")
+                    part_type, _ = parse_options_header(payload.get(b"content-type", b"application/octet-stream"))
+                    current = _FilePart(filename.decode("utf-8", errors="replace"), part_type.decode(), max_size)
+                elif kind == "data" and current is not None:
+                    await current.feed(payload)
+                elif kind == "end" and current is not None:
+                    received.append(await current.finish())
+                    current = None
+            events.clear()
+        parser.finalize()
+    except BaseException:
+        if current is not None:
+            await current.abort()
+        raise
+
+    if current is not None:
+        await current.abort()
+        raise ServiceException(status_code=400, message="Upload ended before the file was complete", code="UPLOAD_FORMAT")
+    if not received:
+        raise ServiceException(status_code=400, message=f"No files found in field '{field_name}'", code="UPLOAD_FORMAT")
+    return received
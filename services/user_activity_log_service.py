@@ -9,6 +9,7 @@ import json
 from core.config_db import config_db
 from database.models.user_activity_log_model import UserActivityLog
 from exceptions.custom_exceptions import DatabaseException
+from utils.search_utils import SearchQuery
 
 logger = logging.getLogger(__name__)
 
@@ -29,14 +30,11 @@ class UserActivityLogService:
             query = self.db.query(UserActivityLog).filter(UserActivityLog.client_id == client_id)
 
             if search:
-                pattern = f"%{search.lower()}%"
-                query = query.filter(
-                    or_(
-                        func.lower(cast(UserActivityLog.endpoint, String)).like(pattern),
-                        func.lower(cast(UserActivityLog.method, String)).like(pattern),
-                        cast(UserActivityLog.user_id, String).ilike(pattern)
-                    )
-                )
+                query = SearchQuery(
+                    term=search,
+                    trigram_columns=[UserActivityLog.endpoint, UserActivityLog.method],
+                    uuid_columns=[UserActivityLog.user_id]
+                ).apply(query)
 
             logs = (
                 query.order_by(UserActivityLog.timestamp.desc())
@@ -14,6 +14,10 @@ from exceptions.custom_exceptions import DatabaseException
 from uuid import UUID
 from utils.security_utils import hash_password, verify_password
 from sqlalchemy import or_
+from utils.search_utils import SearchQuery
+from utils.pagination_utils import paginate, count_rows
+from enums.count_mode_enum import CountMode
+from services.identity_cache import identity_cache
 
 logger = logging.getLogger(__name__)
 
@@ -89,32 +93,31 @@ class UserService:
         client_id: UUID,
         offset: int = 0,
         limit: int = 100,
-        search: Optional[str] = None
+        search: Optional[str] = None,
+        cursor: Optional[str] = None,
+        count_mode: CountMode = CountMode.exact
     ) -> dict:
         """
-        Mengambil semua user berdasarkan client_id dengan pagination dan search.
+        Mengambil semua user berdasarkan client_id dengan pagination (cursor/offset) dan search.
         """
         try:
-            logger.info(f"[SERVICE][USER] Fetching users for client_id={client_id}, offset={offset}, limit={limit}, search={search}")
+            logger.info(f"[SERVICE][USER] Fetching users for client_id={client_id}, cursor={cursor}, offset={offset}, limit={limit}, search={search}")
 
             query = self.db.query(User).filter(User.client_id == client_id)
 
-            if search and search.strip():
-                search_pattern = f"%{search.strip()}%"
-                query = query.filter(
-                    or_(
-                        User.email.ilike(search_pattern),
-                        User.full_name.ilike(search_pattern)
-                    )
-                )
+            ranked = bool(search and search.strip())
+            if ranked:
+                query = SearchQuery(term=search, trigram_columns=[User.email, User.full_name]).apply(query).order_by(User.id)
 
-            total = query.count()
-            users = query.offset(offset).limit(limit).all()
-            logger.info(f"[SERVICE][USER] Found {len(users)} users (total: {total}).")
+            page = paginate(query, User.created_at, User.id, limit, cursor=cursor, offset=offset, ranked=ranked)
+            total, is_estimate = count_rows(self.db, query, count_mode)
+            logger.info(f"[SERVICE][USER] Found {len(page.items)} users (total: {total}).")
 
             return {
-                "data": users,
-                "total": total
+                "data": page.items,
+                "total": total,
+                "total_is_estimate": is_estimate,
+                "next_cursor": page.next_cursor
             }
 
         except SQLAlchemyError as e:
@@ -143,6 +146,7 @@ class UserService:
 
             self.db.commit()
             self.db.refresh(user)
+            identity_cache.invalidate_admin(user_id)
             logger.info(f"[SERVICE][USER] User profile updated for ID: {user_id}")
             return user
 
@@ -205,6 +209,7 @@ class UserService:
 
             self.db.delete(user)
             self.db.commit()
+            identity_cache.invalidate_admin(user_id)
             logger.info(f"[SERVICE][USER] User with ID {user_id} deleted successfully.")
 
         except SQLAlchemyError as e:
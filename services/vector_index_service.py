@@ -0,0 +1,282 @@
+"""
+Pengelolaan index ANN (HNSW/IVFFlat) dan full-text untuk tabel PgVector per client.
+
+agno membuat tabel knowledge (`COMBINED_KNOWLEDGE_TABLE_NAME_<subdomain>`, dst.)
+tanpa index apa pun, sehingga setiap pencarian adalah sequential scan yang makin
+lambat seiring jumlah chunk client. Manager ini:
+
+- memilih tipe dan parameter index dari jumlah baris (dan pilihan client di
+  ms_knowledge_base_config.vector_index_type): tabel di bawah
+  VECTOR_INDEX_MIN_ROWS tidak diberi index ANN karena exact scan sudah cepat dan
+  recall-nya 100%;
+- membangun index dengan CREATE INDEX CONCURRENTLY (pencarian tetap jalan), lalu
+  membuang index ANN lama; IVFFlat dibangun ulang jika jumlah baris berubah lebih
+  dari VECTOR_INDEX_REBUILD_GROWTH kali (centroid basi), HNSW hanya jika
+  parameternya berubah;
+- memastikan index GIN to_tsvector(content) untuk bagian full-text hybrid search;
+- menghitung parameter pencarian (hnsw.ef_search / ivfflat.probes) sesuai
+  ms_knowledge_base_config.vector_search_recall.
+
+Dijalankan oleh embedding worker setelah antrian job client habis dan oleh
+scheduler setiap VECTOR_INDEX_INTERVAL_MINUTES.
+"""
+import hashlib
+import logging
+import math
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from uuid import UUID
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import func
+from core.config_db import engine
+from core.settings import (
+    KNOWLEDGE_PDF_TABLE_NAME,
+    KNOWLEDGE_WEB_TABLE_NAME,
+    COMBINED_KNOWLEDGE_TABLE_NAME,
+    VECTOR_INDEX_MIN_ROWS,
+    VECTOR_INDEX_REBUILD_GROWTH,
+    VECTOR_INDEX_MAINTENANCE_WORK_MEM,
+    VECTOR_SEARCH_CANDIDATES
+)
+from database.models import Client, KnowledgeBaseConfigModel, VectorIndexState
+
+logger = logging.getLogger(__name__)
+
+# Schema dan bahasa full-text default PgVector agno
+VECTOR_SCHEMA = "ai"
+CONTENT_LANGUAGE = "english"
+
+RECALL_FACTORS = {"fast": 0.5, "balanced": 1.0, "accurate": 2.5}
+MAX_EF_SEARCH = 1000
+
+@dataclass(frozen=True)
+class IndexPlan:
+    index_type: str  # hnsw | ivfflat | none
+    build_params: Dict[str, int] = field(default_factory=dict)
+
+@dataclass(frozen=True)
+class SearchParams:
+    ef_search: Optional[int] = None
+    probes: Optional[int] = None
+    candidates: int = VECTOR_SEARCH_CANDIDATES
+
+def plan_index(row_count: int, index_type: str = "auto") -> IndexPlan:
+    """Tipe dan parameter build index untuk tabel berisi `row_count` vektor."""
+    if index_type == "none" or row_count < VECTOR_INDEX_MIN_ROWS:
+        return IndexPlan("none")
+    if index_type == "ivfflat":
+        # Rekomendasi pgvector: rows/1000 list sampai 1 juta baris, sqrt(rows) setelahnya
+        lists = row_count // 1000 if row_count <= 1_000_000 else int(math.sqrt(row_count))
+        return IndexPlan("ivfflat", {"lists": max(1, lists)})
+    m = 16 if row_count < 1_000_000 else 24
+    ef_construction = 64 if row_count < 250_000 else 128
+    return IndexPlan("hnsw", {"m": m, "ef_construction": ef_construction})
+
+def plan_search(plan: IndexPlan, row_count: int, recall: str = "balanced",
+                candidates: int = VECTOR_SEARCH_CANDIDATES) -> SearchParams:
+    """
+    Parameter pencarian untuk index yang aktif. ef_search tidak pernah di bawah
+    jumlah kandidat: HNSW hanya mengembalikan paling banyak ef_search baris.
+    """
+    factor = RECALL_FACTORS.get(recall, 1.0)
+    if plan.index_type == "hnsw":
+        base = 40 if row_count < 100_000 else 64 if row_count < 1_000_000 else 100
+        return SearchParams(ef_search=min(MAX_EF_SEARCH, max(candidates, round(base * factor))), candidates=candidates)
+    if plan.index_type == "ivfflat":
+        lists = plan.build_params["lists"]
+        probes = min(lists, max(1, round(math.sqrt(lists) * factor)))
+        return SearchParams(probes=probes, candidates=candidates)
+    return SearchParams(candidates=candidates)
+
+def knowledge_table_names(name_subdomain: str) -> List[str]:
+    return [
+        prefix + f"_{name_subdomain}"
+        for prefix in (COMBINED_KNOWLEDGE_TABLE_NAME, KNOWLEDGE_PDF_TABLE_NAME, KNOWLEDGE_WEB_TABLE_NAME)
+        if prefix
+    ]
+
+def _index_name(table_name: str, suffix: str) -> str:
+    # Nama identifier Postgres maksimal 63 byte; nama tabel panjang dipendekkan + hash
+    name = f"{table_name}_{suffix}"
+    if len(name) <= 63:
+        return name
+    digest = hashlib.sha1(table_name.encode()).hexdigest()[:8]
+    return f"{table_name[:62 - len(suffix) - 9]}_{digest}_{suffix}"
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+def _qualified(name: str) -> str:
+    # Selalu di-quote: dipakai di DDL maupun sebagai argumen to_regclass
+    return f"{_quote(VECTOR_SCHEMA)}.{_quote(name)}"
+
+class VectorIndexManager:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _tenant_settings(self, client_id: UUID):
+        config = (
+            self.db.query(KnowledgeBaseConfigModel)
+            .filter(KnowledgeBaseConfigModel.client_id == client_id)
+            .first()
+        )
+        if config is None:
+            return "auto", "balanced"
+        return config.vector_index_type, config.vector_search_recall
+
+    def search_params(self, client_id: UUID, table_name: str) -> SearchParams:
+        """Parameter pencarian untuk tabel client, berdasarkan index yang terakhir dibangun."""
+        _, recall = self._tenant_settings(client_id)
+        state = self.db.get(VectorIndexState, table_name)
+        if state is None:
+            return plan_search(IndexPlan("none"), 0, recall)
+        return plan_search(IndexPlan(state.index_type, dict(state.build_params or {})), state.row_count, recall)
+
+    def maintain_client(self, client_id: UUID, force: bool = False) -> Dict[str, str]:
+        """Periksa semua tabel knowledge client; mengembalikan aksi per tabel."""
+        client = self.db.get(Client, client_id)
+        if client is None:
+            return {}
+        index_type, _ = self._tenant_settings(client_id)
+        name_subdomain = client.subdomain.lower().replace(" ", "_")
+        actions = {}
+        for table_name in knowledge_table_names(name_subdomain):
+            try:
+                actions[table_name] = self.maintain_table(client_id, table_name, index_type, force)
+            except Exception as e:
+                self.db.rollback()
+                actions[table_name] = "failed"
+                logger.error(f"[VECTOR_INDEX] Maintenance {table_name} gagal: {e}", exc_info=True)
+        return actions
+
+    def maintain_all(self, force: bool = False) -> Dict[str, str]:
+        actions = {}
+        for (client_id,) in self.db.query(Client.id).all():
+            actions.update(self.maintain_client(client_id, force))
+        return actions
+
+    def maintain_table(self, client_id: UUID, table_name: str, index_type: str = "auto", force: bool = False) -> str:
+        # DDL CONCURRENTLY tidak boleh di dalam transaksi: pakai koneksi autocommit sendiri
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            # Hanya tabel yang benar-benar ada yang diproses; nama selalu di-quote di DDL
+            if conn.execute(text("SELECT to_regclass(:name)"), {"name": _qualified(table_name)}).scalar() is None:
+                return "missing"
+            # Satu proses per tabel; yang lain melewati tabel ini
+            lock_key = int(hashlib.sha1(table_name.encode()).hexdigest()[:15], 16)
+            if not conn.execute(text("SELECT pg_try_advisory_lock(:key)"), {"key": lock_key}).scalar():
+                return "locked"
+            try:
+                return self._maintain_locked(conn, client_id, table_name, index_type, force)
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": lock_key})
+
+    def _maintain_locked(self, conn, client_id: UUID, table_name: str, index_type: str, force: bool) -> str:
+        qualified = _qualified(table_name)
+        conn.execute(text(f"ANALYZE {qualified}"))
+        row_count = int(conn.execute(
+            text("SELECT greatest(reltuples, 0)::bigint FROM pg_class WHERE oid = to_regclass(:name)"),
+            {"name": _qualified(table_name)}
+        ).scalar() or 0)
+
+        self._ensure_fulltext_index(conn, table_name)
+
+        plan = plan_index(row_count, index_type)
+        state = self.db.get(VectorIndexState, table_name)
+        if state is None:
+            state = VectorIndexState(table_name=table_name, client_id=client_id, index_type="none",
+                                     build_params={}, generation=0, built_rows=0)
+            self.db.add(state)
+        state.row_count = row_count
+
+        current = self._vector_indexes(conn, table_name)
+        reason = self._rebuild_reason(state, plan, row_count, current, force)
+        if reason is None:
+            self.db.commit()
+            return "unchanged"
+
+        logger.info(f"[VECTOR_INDEX] {table_name}: {reason} -> {plan.index_type} {plan.build_params} ({row_count} rows)")
+        new_name = None
+        if plan.index_type != "none":
+            new_name = _index_name(table_name, f"{plan.index_type}_v{state.generation + 1}")
+            self._build_vector_index(conn, table_name, new_name, plan)
+        for name in current:
+            if name != new_name:
+                conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {_qualified(name)}"))
+
+        state.index_type = plan.index_type
+        state.index_name = new_name
+        state.build_params = plan.build_params
+        state.generation += 1
+        state.built_rows = row_count
+        state.built_at = func.now()
+        self.db.commit()
+        return "dropped" if plan.index_type == "none" else "built"
+
+    @staticmethod
+    def _rebuild_reason(state: VectorIndexState, plan: IndexPlan, row_count: int,
+                        current: List[str], force: bool) -> Optional[str]:
+        if force:
+            return "forced"
+        if state.index_type != plan.index_type:
+            return f"type {state.index_type} -> {plan.index_type}"
+        if plan.index_type == "none":
+            return "stray ANN index" if current else None
+        if state.index_name not in current:
+            return "index missing"
+        if len(current) > 1:
+            return "duplicate ANN indexes"
+        if plan.index_type == "hnsw" and dict(state.build_params or {}) != plan.build_params:
+            return f"params {state.build_params} -> {plan.build_params}"
+        if plan.index_type == "ivfflat":
+            growth = max(row_count, 1) / max(state.built_rows, 1)
+            if growth >= VECTOR_INDEX_REBUILD_GROWTH or growth <= 1 / VECTOR_INDEX_REBUILD_GROWTH:
+                return f"rows {state.built_rows} -> {row_count}"
+        return None
+
+    @staticmethod
+    def _vector_indexes(conn, table_name: str) -> List[str]:
+        rows = conn.execute(text("""
+            SELECT i.relname
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            WHERE x.indrelid = to_regclass(:name) AND am.amname IN ('hnsw', 'ivfflat')
+        """), {"name": _qualified(table_name)}).all()
+        return [row[0] for row in rows]
+
+    @staticmethod
+    def _build_vector_index(conn, table_name: str, index_name: str, plan: IndexPlan):
+        options = ", ".join(f"{key} = {int(value)}" for key, value in plan.build_params.items())
+        conn.execute(text("SELECT set_config('maintenance_work_mem', :value, false)"), {"value": VECTOR_INDEX_MAINTENANCE_WORK_MEM})
+        try:
+            conn.execute(text(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_quote(index_name)} ON {_qualified(table_name)} "
+                f"USING {plan.index_type} (embedding vector_cosine_ops) WITH ({options})"
+            ))
+        except Exception:
+            # Build CONCURRENTLY yang gagal meninggalkan index INVALID
+            conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {_qualified(index_name)}"))
+            raise
+        finally:
+            conn.execute(text("RESET maintenance_work_mem"))
+
+    @staticmethod
+    def _ensure_fulltext_index(conn, table_name: str):
+        exists = conn.execute(text("""
+            SELECT 1
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            JOIN pg_am am ON am.oid = i.relam
+            WHERE x.indrelid = to_regclass(:name) AND am.amname = 'gin' AND x.indisvalid
+              AND pg_get_indexdef(x.indexrelid) ILIKE '%to_tsvector%'
+        """), {"name": _qualified(table_name)}).first()
+        if exists:
+            return
+        index_name = _index_name(table_name, "content_fts")
+        logger.info(f"[VECTOR_INDEX] {table_name}: membuat index full-text {index_name}")
+        conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {_qualified(index_name)}"))
+        conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {_quote(index_name)} ON {_qualified(table_name)} "
+            f"USING gin (to_tsvector('{CONTENT_LANGUAGE}'::regconfig, content))"
+        ))
@@ -1,6 +1,5 @@
 import logging
 import uuid
-import asyncio
 from typing import List, Dict, Any
 from fastapi import HTTPException, status, Depends
 from sqlalchemy.orm import Session
@@ -13,7 +12,9 @@ from core.config_db import config_db
 from exceptions.custom_exceptions import DatabaseException, ServiceException
 from schemas.website_source_schema import WebsiteKBInfo
 from datetime import datetime
-from agents.tools.knowledge_base_tools import create_combined_knowledge_base
+from services.embedding_job_service import EmbeddingJobService, SOURCE_WEBSITE
+from services.knowledge_index_service import delete_manifest
+from services.answer_cache_service import invalidate_answer_cache
 from database.models.client_model import Client
 from core.settings import COMBINED_KNOWLEDGE_TABLE_NAME
 
@@ -93,47 +94,17 @@ class WebSourceService:
             logger.error(f"[SERVICE][WEB] DB error updating status: {e}", exc_info=True)
             raise DatabaseException(code="DB_UPDATE_LINK_STATUS_ERROR", message="Failed to update link status.")
 
-    async def process_embedding(self, client_id: UUID) -> Dict[str, Any]:
-        async def _process():
-            logger.info(f"[SERVICE][WEB] Starting embedding processing for client_id: {client_id}...")
-
-            pending_links = (
-                self.db.query(WebSourceModel)
-                .filter(WebSourceModel.status == 'pending', WebSourceModel.client_id == client_id)
-                .all()
-            )
-
-            if not pending_links:
-                logger.info(f"[SERVICE][WEB] No pending links found for client_id: {client_id}.")
-                return {"message": "No pending links found for embedding.", "status": "success"}
-
-            urls = [link.url for link in pending_links]
-            combined_kb = create_combined_knowledge_base(client_id, urls)
-            await combined_kb.aload(recreate=False, upsert=True, skip_existing=True)
-            
-            logger.info("[SERVICE][WEB] Web knowledge base loaded and embeddings processed.")
-
-            updated_rows = (
-                self.db.query(WebSourceModel)
-                .filter(WebSourceModel.status == 'pending', WebSourceModel.client_id == client_id)
-                .update({WebSourceModel.status: 'processed'}, synchronize_session=False)
-            )
-            self.db.commit()
-
-            logger.info(f"[SERVICE][WEB] {updated_rows} links updated to 'processed' for client_id: {client_id}.")
-
-            return {"message": "Web link embedding processing completed.", "status": "success"}
+    def process_embedding(self, client_id: UUID) -> Dict[str, Any]:
+        """
+        Antrikan link 'pending' untuk di-crawl dan di-embed oleh EmbeddingWorker.
+        """
+        jobs = EmbeddingJobService(self.db).enqueue_pending(client_id, SOURCE_WEBSITE)
+        if not jobs:
+            logger.info(f"[SERVICE][WEB] No pending links found for client_id: {client_id}.")
+            return {"message": "No pending links found for embedding.", "status": "success", "jobs": []}
 
-        try:
-            return await asyncio.wait_for(_process(), timeout=60)
-        except asyncio.TimeoutError:
-            self.db.rollback()
-            logger.error(f"[SERVICE][WEB] Embedding processing timed out for client_id: {client_id}.")
-            raise ServiceException(status_code=408, code="TIMEOUT_ERROR", message="Embedding processing exceeded 1 minute and was terminated.")
-        except Exception as e:
-            self.db.rollback()
-            logger.error(f"[SERVICE][WEB] Error processing web link embedding for client {client_id}: {e}", exc_info=True)
-            raise ServiceException(code="WEB_EMBEDDING_PROCESSING_ERROR", message="Failed to process web link embeddings.")
+        logger.info(f"[SERVICE][WEB] {len(jobs)} links queued for embedding for client_id: {client_id}.")
+        return {"message": "Web link embedding jobs queued.", "status": "queued", "jobs": jobs}
 
     def delete_link_by_id(self, url_id: UUID, client_id: UUID) -> dict:
         """
@@ -171,6 +142,8 @@ class WebSourceService:
             else:
                 logger.info(f"[SERVICE][WEB] Skipping vector delete because status is 'pending'")
 
+            delete_manifest(self.db, client_id, SOURCE_WEBSITE, link.id)
+            invalidate_answer_cache(self.db, client_id)
             link.status = "inactive"
             self.db.commit()
 
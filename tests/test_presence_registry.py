@@ -0,0 +1,77 @@
+import asyncio
+import uuid
+from api.websocket.presence_registry import PresenceRegistry, _RELEASE_SCRIPT
+
+class _FakePipeline:
+    def __init__(self, redis):
+        self.redis = redis
+        self.calls = []
+
+    def __getattr__(self, name):
+        def queue(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+        return queue
+
+    async def execute(self):
+        return [await getattr(self.redis, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+class _FakeRedis:
+    """Cukup perintah Redis yang dipakai PresenceRegistry, disimpan di dict."""
+    def __init__(self):
+        self.hashes = {}
+        self.zsets = {}
+
+    def pipeline(self, transaction=False):
+        return _FakePipeline(self)
+
+    async def hincrby(self, key, field, amount):
+        values = self.hashes.setdefault(key, {})
+        values[field] = values.get(field, 0) + amount
+        return values[field]
+
+    async def expire(self, key, seconds):
+        return True
+
+    async def zadd(self, key, mapping):
+        self.zsets.setdefault(key, {}).update(mapping)
+
+    async def zscore(self, key, member):
+        return self.zsets.get(key, {}).get(member)
+
+    async def eval(self, script, numkeys, connections_key, presence_key, member, count):
+        assert script == _RELEASE_SCRIPT
+        remaining = await self.hincrby(connections_key, member, -int(count))
+        if remaining <= 0:
+            self.hashes[connections_key].pop(member, None)
+            self.zsets.get(presence_key, {}).pop(member, None)
+        return remaining
+
+def _registry():
+    return PresenceRegistry(_FakeRedis(), ttl_seconds=30, heartbeat_interval=10, reap_interval=60)
+
+def test_user_stays_online_while_another_socket_is_open():
+    async def scenario():
+        registry = _registry()
+        client_id, user_id = uuid.uuid4(), uuid.uuid4()
+        await registry.mark_online(client_id, "user", user_id)
+        await registry.mark_online(client_id, "user", user_id)
+
+        await registry.mark_offline(client_id, "user", user_id)
+        assert await registry.is_online(client_id, "user", user_id)
+
+        await registry.mark_offline(client_id, "user", user_id)
+        assert not await registry.is_online(client_id, "user", user_id)
+
+    asyncio.run(scenario())
+
+def test_mark_offline_without_local_socket_is_ignored():
+    async def scenario():
+        registry = _registry()
+        client_id, user_id = uuid.uuid4(), uuid.uuid4()
+        await registry.mark_online(client_id, "user", user_id)
+
+        await registry.mark_offline(client_id, "user", user_id)
+        await registry.mark_offline(client_id, "user", user_id)
+        assert registry.redis.hashes.get(f"presence_conns:{client_id}:users", {}) == {}
+
+    asyncio.run(scenario())
@@ -0,0 +1,27 @@
+"""
+Buang identitas client yang di-cache untuk autentikasi (Redis + L1 semua proses).
+
+Jalankan setelah status, api_key, atau subdomain client diubah langsung di
+database (bukan lewat ORM aplikasi):
+
+    python -m utils.invalidate_identity_cache --client-id <uuid> [--client-id <uuid> ...]
+"""
+import argparse
+import logging
+import uuid
+from services.identity_cache import identity_cache
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client-id", type=uuid.UUID, action="append", required=True, help="Client yang berubah")
+    args = parser.parse_args()
+
+    for client_id in args.client_id:
+        identity_cache.invalidate_client(client_id)
+        logger.info(f"[INVALIDATE_IDENTITY_CACHE] Client {client_id} invalidated")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
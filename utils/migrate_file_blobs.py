@@ -0,0 +1,53 @@
+"""
+Pindahkan isi file lama dari kolom dt_uploaded_file.content ke blob store.
+
+    python -m utils.migrate_file_blobs --batch-size 20
+
+Aman dijalankan ulang: hanya baris dengan blob_key kosong yang diproses, dan
+setiap batch di-commit sendiri.
+"""
+import argparse
+import io
+import logging
+from sqlalchemy.orm import load_only, undefer
+from core.config_db import SessionLocal
+from database.models.upload_file_model import FileModel
+from services.blob_store import blob_store
+
+logger = logging.getLogger(__name__)
+
+def migrate(batch_size: int) -> int:
+    moved = 0
+    while True:
+        with SessionLocal() as db:
+            ids = [
+                row.id for row in
+                db.query(FileModel)
+                .options(load_only(FileModel.id))
+                .filter(FileModel.blob_key.is_(None), FileModel.content.isnot(None))
+                .limit(batch_size)
+                .all()
+            ]
+            if not ids:
+                return moved
+
+            # Memuat isi hanya untuk satu batch kecil
+            for file in db.query(FileModel).options(undefer(FileModel.content)).filter(FileModel.id.in_(ids)):
+                blob = blob_store.put(io.BytesIO(file.content))
+                file.blob_key = blob.key
+                file.sha256 = blob.sha256
+                file.content = None
+                moved += 1
+            db.commit()
+            logger.info(f"[MIGRATE_FILE_BLOBS] {moved} files moved to blob store")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=20)
+    args = parser.parse_args()
+    moved = migrate(args.batch_size)
+    logger.info(f"[MIGRATE_FILE_BLOBS] Done, {moved} files moved")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
@@ -0,0 +1,153 @@
+import base64
+import json
+import logging
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, List, Optional, Tuple
+from sqlalchemy import and_, func, or_, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+from enums.count_mode_enum import CountMode
+from exceptions.custom_exceptions import ServiceException
+
+logger = logging.getLogger(__name__)
+
+class _ExplainJson(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+@compiles(_ExplainJson, "postgresql")
+def _compile_explain_json(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+def encode_cursor(created_at: Optional[datetime], row_id: Any) -> str:
+    """Cursor opaque (base64url) dari posisi (created_at, id) baris terakhir; created_at boleh NULL."""
+    raw = json.dumps(
+        {"t": created_at.isoformat() if created_at is not None else None, "id": str(row_id)},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, id_column) -> Tuple[Optional[datetime], Any]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        created_at = datetime.fromisoformat(payload["t"]) if payload["t"] is not None else None
+        row_id = int(payload["id"]) if id_column.type.python_type is int else uuid.UUID(payload["id"])
+        return created_at, row_id
+    except Exception:
+        raise ServiceException(message="Invalid pagination cursor", status_code=400, code="INVALID_CURSOR")
+
+@dataclass
+class KeysetPage:
+    items: List[Any] = field(default_factory=list)
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None
+    total_is_estimate: bool = False
+
+def _nullable(column) -> bool:
+    return bool(getattr(column.expression, "nullable", True))
+
+def keyset_order(created_at_column, id_column):
+    """
+    ORDER BY keyset. Untuk created_at yang nullable, baris NULL diletakkan paling
+    akhir (index keyset dibuat dengan DESC NULLS LAST agar urutannya sama).
+    """
+    created_at_order = created_at_column.desc()
+    if _nullable(created_at_column):
+        created_at_order = created_at_order.nulls_last()
+    return created_at_order, id_column.desc()
+
+def _keyset_filter(created_at_column, id_column, cursor_created_at, cursor_id):
+    if cursor_created_at is None:
+        # Cursor sudah berada di kelompok created_at NULL (paling akhir)
+        return and_(created_at_column.is_(None), id_column < cursor_id)
+    after_cursor = tuple_(created_at_column, id_column) < tuple_(cursor_created_at, cursor_id)
+    if _nullable(created_at_column):
+        return or_(after_cursor, created_at_column.is_(None))
+    return after_cursor
+
+def apply_keyset(query, created_at_column, id_column, cursor: Optional[str], limit: int):
+    """
+    Tambahkan ORDER BY (created_at DESC, id DESC), filter posisi cursor dan LIMIT+1
+    ke query ORM/select. Baris ekstra dipakai untuk tahu apakah masih ada halaman berikutnya.
+    """
+    if cursor:
+        cursor_created_at, cursor_id = decode_cursor(cursor, id_column)
+        query = query.filter(_keyset_filter(created_at_column, id_column, cursor_created_at, cursor_id))
+    return query.order_by(*keyset_order(created_at_column, id_column)).limit(limit + 1)
+
+def build_page(rows: List[Any], limit: int, created_at_attr: str = "created_at", id_attr: str = "id") -> KeysetPage:
+    has_more = len(rows) > limit
+    items = list(rows[:limit])
+    next_cursor = None
+    if has_more and items:
+        last = items[-1]
+        next_cursor = encode_cursor(getattr(last, created_at_attr), getattr(last, id_attr))
+    return KeysetPage(items=items, next_cursor=next_cursor)
+
+def paginate(query, created_at_column, id_column, limit: int, cursor: Optional[str] = None, offset: int = 0, ranked: bool = False) -> KeysetPage:
+    """
+    Ambil satu halaman dari query ORM sync.
+
+    Default memakai keyset (created_at, id) sehingga halaman dalam sama murahnya
+    dengan halaman pertama. OFFSET hanya dipakai untuk klien lama yang masih
+    mengirim offset tanpa cursor, atau untuk hasil pencarian yang diurutkan
+    berdasarkan relevansi (ranked) yang tidak punya urutan keyset stabil.
+    """
+    if ranked:
+        return KeysetPage(items=query.offset(offset).limit(limit).all())
+    if cursor is None and offset:
+        query = query.order_by(*keyset_order(created_at_column, id_column))
+        return KeysetPage(items=query.offset(offset).limit(limit).all())
+    rows = apply_keyset(query, created_at_column, id_column, cursor, limit).all()
+    return build_page(rows, limit, created_at_column.key, id_column.key)
+
+async def paginate_async(db, statement, created_at_column, id_column, limit: int, cursor: Optional[str] = None, offset: int = 0) -> KeysetPage:
+    """Versi AsyncSession dari paginate untuk select() 2.0-style."""
+    if cursor is None and offset:
+        result = await db.execute(statement.order_by(*keyset_order(created_at_column, id_column)).offset(offset).limit(limit))
+        return KeysetPage(items=result.scalars().all())
+    result = await db.execute(apply_keyset(statement, created_at_column, id_column, cursor, limit))
+    return build_page(result.scalars().all(), limit, created_at_column.key, id_column.key)
+
+def _plan_rows(result) -> int:
+    plan = result.scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+def explain_statement(query):
+    statement = query.statement if hasattr(query, "statement") else query
+    return _ExplainJson(statement.order_by(None).limit(None).offset(None))
+
+def count_statement(query):
+    statement = query.statement if hasattr(query, "statement") else query
+    return select(func.count()).select_from(statement.order_by(None).limit(None).offset(None).subquery())
+
+def count_rows(db, query, mode: CountMode) -> Tuple[Optional[int], bool]:
+    """
+    Hitung total untuk query (sebelum ORDER BY/LIMIT) pada Session sync.
+
+    - exact: COUNT(*) biasa.
+    - estimate: perkiraan jumlah baris dari planner (EXPLAIN), tanpa scan.
+    - none: tidak menghitung sama sekali.
+
+    Mengembalikan (total, is_estimate).
+    """
+    if mode == CountMode.none:
+        return None, False
+    if mode == CountMode.estimate and db.bind.dialect.name == "postgresql":
+        return _plan_rows(db.execute(explain_statement(query))), True
+    return db.execute(count_statement(query)).scalar() or 0, False
+
+async def count_rows_async(db, query, mode: CountMode) -> Tuple[Optional[int], bool]:
+    """Versi AsyncSession dari count_rows."""
+    if mode == CountMode.none:
+        return None, False
+    if mode == CountMode.estimate and db.bind.dialect.name == "postgresql":
+        return _plan_rows(await db.execute(explain_statement(query))), True
+    return (await db.execute(count_statement(query))).scalar() or 0, False
@@ -0,0 +1,35 @@
+"""
+Bangun atau bangun ulang index ANN dan full-text tabel knowledge client.
+
+    python -m utils.rebuild_vector_indexes                      # semua client, hanya yang perlu
+    python -m utils.rebuild_vector_indexes --client-id <uuid> --force
+
+Tanpa --force hanya tabel yang rencananya berubah (jumlah baris, tipe index)
+yang dibangun ulang, sama seperti job scheduler.
+"""
+import argparse
+import logging
+import uuid
+from core.config_db import SessionLocal
+from services.vector_index_service import VectorIndexManager
+
+logger = logging.getLogger(__name__)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--client-id", type=uuid.UUID, help="Hanya client ini")
+    parser.add_argument("--force", action="store_true", help="Bangun ulang walau rencana index tidak berubah")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        manager = VectorIndexManager(db)
+        if args.client_id:
+            actions = manager.maintain_client(args.client_id, force=args.force)
+        else:
+            actions = manager.maintain_all(force=args.force)
+    for table, action in sorted(actions.items()):
+        logger.info(f"[REBUILD_VECTOR_INDEXES] {table}: {action}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    main()
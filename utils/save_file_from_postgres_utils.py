@@ -2,14 +2,18 @@
 from database.models.upload_file_model import FileModel
 from core.config_db import config_db
 import os
+import shutil
+from sqlalchemy.orm import load_only
 from core.settings import KNOWLEDGE_WEB_TABLE_NAME
+from services.file_service import open_file_content
 
 def get_all_pdfs_from_db(client_id, filenames: list[str]):
-    """Ambil semua PDF dari database berdasarkan list filename."""
+    """Ambil metadata PDF dari database berdasarkan list filename (isi dibaca terpisah dari blob store)."""
     db = next(config_db())
     try:
         pdf_records = (
             db.query(FileModel)
+            .options(load_only(FileModel.uuid_file, FileModel.filename, FileModel.blob_key))
             .filter(FileModel.filename.in_(filenames))
             .filter(FileModel.client_id == client_id)
             .all()
@@ -18,7 +22,7 @@ def get_all_pdfs_from_db(client_id, filenames: list[str]):
             {
                 "uuid_file": pdf.uuid_file,
                 "filename": pdf.filename,
-                "content": pdf.content
+                "blob_key": pdf.blob_key
             }
             for pdf in pdf_records
         ]
@@ -32,17 +36,28 @@ def save_pdfs_locally(client_id, client_name, filenames: list[str]):
     if not os.path.exists(base_dir):
         os.makedirs(base_dir, exist_ok=True)
 
-    all_pdfs = get_all_pdfs_from_db(client_id, filenames)
+    db = next(config_db())
+    try:
+        pdf_records = (
+            db.query(FileModel)
+            .options(load_only(FileModel.filename, FileModel.blob_key))
+            .filter(FileModel.filename.in_(filenames))
+            .filter(FileModel.client_id == client_id)
+            .all()
+        )
 
-    if not all_pdfs:
-        print("Tidak ada file PDF yang ditemukan di database.")
-        return
-    
-    for pdf in all_pdfs:
-        file_path = os.path.join(base_dir, pdf["filename"])
-        with open(file_path, "wb") as f:
-            f.write(pdf["content"])
-        print(f"✅ File {pdf['filename']} telah disimpan di {file_path}")
+        if not pdf_records:
+            print("Tidak ada file PDF yang ditemukan di database.")
+            return
+
+        # Disalin per chunk; baris lama tanpa blob_key memuat kolom content satu per satu
+        for pdf in pdf_records:
+            file_path = os.path.join(base_dir, pdf.filename)
+            with open_file_content(pdf) as src, open(file_path, "wb") as f:
+                shutil.copyfileobj(src, f)
+            print(f"✅ File {pdf.filename} telah disimpan di {file_path}")
+    finally:
+        db.close()
 
 def delete_pdfs_locally(client_name, filenames: list[str]):
     """
@@ -0,0 +1,96 @@
+import logging
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Optional, Sequence
+from sqlalchemy import func, or_, literal
+from sqlalchemy.sql.elements import ColumnElement
+
+logger = logging.getLogger(__name__)
+
+# Konfigurasi text search yang juga dipakai index GIN di migration;
+# ekspresi to_tsvector di query harus sama persis agar index terpakai.
+TS_CONFIG = "simple"
+
+def _escape_like(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def parse_uuid(term: str) -> Optional[uuid.UUID]:
+    try:
+        return uuid.UUID(term.strip())
+    except (ValueError, AttributeError):
+        return None
+
+@dataclass
+class SearchQuery:
+    """
+    Query builder pencarian yang dipakai bersama oleh service list admin.
+
+    - fulltext_columns: kolom teks panjang, dicari lewat to_tsvector/websearch_to_tsquery
+      (index GIN expression) dan trigram ILIKE sebagai fallback untuk potongan kata.
+    - trigram_columns: kolom pendek (nama, email, endpoint) dicari dengan ILIKE
+      yang dilayani index GIN gin_trgm_ops.
+    - uuid_columns: hanya dicocokkan secara exact jika term adalah UUID valid,
+      bukan dengan cast ke text yang memaksa sequential scan.
+    """
+    term: str
+    fulltext_columns: Sequence[ColumnElement] = field(default_factory=list)
+    trigram_columns: Sequence[ColumnElement] = field(default_factory=list)
+    uuid_columns: Sequence[ColumnElement] = field(default_factory=list)
+
+    def __post_init__(self):
+        self.term = (self.term or "").strip()
+
+    @property
+    def is_empty(self) -> bool:
+        return not self.term
+
+    @property
+    def _pattern(self) -> str:
+        return f"%{_escape_like(self.term)}%"
+
+    @property
+    def _tsquery(self):
+        return func.websearch_to_tsquery(TS_CONFIG, self.term)
+
+    def filter(self) -> ColumnElement:
+        conditions: List[ColumnElement] = []
+        for column in self.fulltext_columns:
+            conditions.append(func.to_tsvector(TS_CONFIG, func.coalesce(column, "")).op("@@")(self._tsquery))
+            conditions.append(column.ilike(self._pattern, escape="\\"))
+        for column in self.trigram_columns:
+            conditions.append(column.ilike(self._pattern, escape="\\"))
+
+        term_uuid = parse_uuid(self.term)
+        if term_uuid is not None:
+            for column in self.uuid_columns:
+                conditions.append(column == term_uuid)
+
+        return or_(*conditions) if conditions else literal(False)
+
+    def rank(self) -> ColumnElement:
+        """
+        Skor relevansi: ts_rank_cd untuk kolom full-text ditambah similarity trigram
+        tertinggi dari kolom pendek. Dipakai sebagai ORDER BY ... DESC.
+        """
+        scores: List[ColumnElement] = []
+        for column in self.fulltext_columns:
+            scores.append(func.ts_rank_cd(func.to_tsvector(TS_CONFIG, func.coalesce(column, "")), self._tsquery))
+        if self.trigram_columns:
+            similarities = [func.similarity(func.coalesce(column, ""), self.term) for column in self.trigram_columns]
+            scores.append(similarities[0] if len(similarities) == 1 else func.greatest(*similarities))
+
+        if not scores:
+            return literal(0)
+        total = scores[0]
+        for score in scores[1:]:
+            total = total + score
+        return total
+
+    def apply(self, query, ranked: bool = True):
+        """Tambahkan filter (dan ORDER BY rank jika ranked) ke query ORM."""
+        if self.is_empty:
+            return query
+        query = query.filter(self.filter())
+        if ranked:
+            query = query.order_by(self.rank().desc())
+        return query